@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+"""Compare the request rate over tcp, ipc, and inproc transports.
+
+The Server node defined in conf.toml is started in a process (tcp / ipc) or a thread (inproc),
+and the Client requests in the main thread.
+The transport is selected automatically (auto_transport) except for tcp.
+
+"""
+
+import copy
+import time
+import argparse
+import multiprocessing as mp
+
+import numpy as np
+
+from mahos import load_gconf
+from mahos.node.comm import Context
+from mahos.node.node import start_node_proc, start_node_thread
+
+from nodes import Client, Server
+
+
+def measure(gconf: dict, name: str, num: int, context=None) -> float:
+    cli = Client(gconf, name, context=context)
+    data = np.random.default_rng(11).normal(size=gconf["localhost"]["server"]["data_size"])
+    print(f"  {cli.req.endpoint}")
+    cli.request(data)  # warm up
+
+    t0 = time.perf_counter()
+    for _ in range(num):
+        cli.request(data)
+    elapsed = time.perf_counter() - t0
+    cli.close(close_ctx=context is None)
+    return num / elapsed
+
+
+def run_proc(gconf: dict, name: str, num: int) -> float:
+    proc, ev = start_node_proc(mp.get_context(), Server, gconf, name)
+    time.sleep(1.0)  # wait for server to bind
+    try:
+        return measure(gconf, name, num)
+    finally:
+        ev.set()
+        proc.join()
+
+
+def run_thread(gconf: dict, name: str, num: int) -> float:
+    ctx = Context()
+    ctx.inproc_endpoints.add(gconf["localhost"]["server"]["rep_endpoint"])
+    thread, ev = start_node_thread(ctx, Server, gconf, name)
+    try:
+        return measure(gconf, name, num, context=ctx)
+    finally:
+        ev.set()
+        thread.join()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare transports.")
+    parser.add_argument("-c", "--conf", type=str, default="conf.toml", help="config file name")
+    parser.add_argument("-n", "--num", type=int, default=200, help="number of requests")
+    args = parser.parse_args()
+
+    gconf = load_gconf(args.conf)
+    gconf_tcp = copy.deepcopy(gconf)
+    gconf_tcp.setdefault("global", {})["auto_transport"] = False
+    name = "localhost::server"
+    data_size = gconf["localhost"]["server"]["data_size"]
+    data_MB = 1e-6 * data_size * np.dtype(np.float64).itemsize
+
+    results = {}
+    print("tcp")
+    results["tcp"] = run_proc(gconf_tcp, name, args.num)
+    print("ipc")
+    results["ipc"] = run_proc(gconf, name, args.num)
+    print("inproc")
+    results["inproc"] = run_thread(gconf, name, args.num)
+
+    print(f"Payload size: {data_MB} MB")
+    for transport, rate in results.items():
+        # factor of 2 is request and reply
+        print(f"{transport:>6s}: {rate:7.2f} Hz, {2 * data_MB * rate:8.2f} MB/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -27,6 +27,7 @@ from mahos_dq.msgs.confocal_msgs import (
     ExportViewReq,
     LoadImageReq,
     Image,
+    ImageAssembler,
     BufferCommand,
     CommandBufferReq,
     SaveTraceReq,
@@ -47,10 +48,13 @@ class QConfocalSubWorker(QStatusSubWorker):
 
     def __init__(self, lconf: dict, context, parent=None):
         QStatusSubWorker.__init__(self, lconf, context, parent=parent)
+        self._image_assembler = ImageAssembler()
         self.add_handler(lconf, b"image", self.handle_image)
 
     def handle_image(self, msg):
-        self.imageUpdated.emit(msg)
+        image = self._image_assembler.assemble(msg)
+        if image is not None:
+            self.imageUpdated.emit(image)
 
 
 class QConfocalClient(QStateReqClient):
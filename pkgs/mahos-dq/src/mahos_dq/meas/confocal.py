@@ -23,6 +23,7 @@ from mahos_dq.msgs.confocal_msgs import (
     CommandBufferReq,
 )
 from mahos_dq.msgs.confocal_msgs import ConfocalStatus, TraceStatus, Image, Trace, ScanDirection
+from mahos_dq.msgs.confocal_msgs import ImageAssembler
 from mahos.msgs.param_msgs import GetParamDictReq
 from mahos.node.node import Node
 from mahos.node.client import NodeClient
@@ -58,16 +59,27 @@ class ConfocalClient(NodeClient, BaseMeasClientMixin):
     ):
         NodeClient.__init__(self, gconf, name, context=context, prefix=prefix)
 
+        self._image_assembler = ImageAssembler()
+        self._image_handler = image_handler
         getters = self.add_sub(
-            [(b"status", status_handler), (b"image", image_handler), (b"trace", trace_handler)]
+            [
+                (b"status", status_handler),
+                (b"image", self._handle_image),
+                (b"trace", trace_handler),
+            ]
         )
 
         self.get_status: T.Callable[[], ConfocalStatus] = getters[0]
-        self.get_image: T.Callable[[], Image] = getters[1]
+        self.get_image: T.Callable[[], Image] = self._image_assembler.latest
         self.get_trace: T.Callable[[], Trace] = getters[2]
 
         self.req = self.add_req(gconf)
 
+    def _handle_image(self, msg: Image):
+        image = self._image_assembler.assemble(msg)
+        if image is not None and self._image_handler is not None:
+            self._image_handler(image)
+
     def shutdown(self) -> bool:
         rep = self.req.request(ShutdownReq())
         return rep.success
@@ -256,6 +268,10 @@ class Confocal(Node):
     :type pg_channels: list[str]
     :param pub_interval_sec: Period for forced periodic publication while running.
     :type pub_interval_sec: float
+    :param pub_image_delta: (default: True) During the scan, publish the Images containing
+        only the new lines (delta) except every pub_interval_sec (full Image).
+        The clients (ConfocalClient and QConfocalClient) reassemble the full Image.
+    :type pub_image_delta: bool
     :param scanner: Scanner worker configuration dictionary.
     :type scanner: dict
     :param scanner.xnum: (default: 51) Default value of param xnum.
@@ -347,6 +363,7 @@ class Confocal(Node):
         self.piezo = Piezo(self.cli, self.logger, self.conf.get("piezo", {}))
         self.tracer = Tracer(self.cli, self.logger, self.conf.get("tracer", {}))
         self.pub_timer = IntervalTimer(self.conf.get("pub_interval_sec", 0.5))
+        self._pub_image_delta = self.conf.get("pub_image_delta", True)
 
         self.io = ConfocalIO(self.logger)
         self.image_buf = ImageBuffer()
@@ -648,7 +665,13 @@ class Confocal(Node):
             img = self.scanner.image_msg()
             # image pub rate is limited here when finished (not running) to avoid
             # publishing possibly large data at too high-rate
-            if img.running or publish_image:
+            if publish_image:
+                self.image_pub.publish(self.scanner.image_pub_msg(delta=False))
+            elif img.running and self._pub_image_delta:
+                delta = self.scanner.image_pub_msg(delta=True)
+                if delta is not None:
+                    self.image_pub.publish(delta)
+            elif img.running:
                 self.image_pub.publish(img)
         if self._tracer_active(self.state):
             self.trace_pub.publish(self.tracer.trace_msg())
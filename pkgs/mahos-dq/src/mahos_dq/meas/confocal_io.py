@@ -14,13 +14,15 @@ import time
 from datetime import datetime
 
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
 
 from mahos_dq.msgs.confocal_msgs import Image, Trace, ScanDirection, update_image, update_trace
 from mahos.node.log import DummyLogger
 from mahos.util.io import save_pickle_or_h5, load_pickle_or_h5
 from mahos.util.image import save_map, plot_map, plot_map_only
+from mahos.util.lazy import lazy_import
+
+pd = lazy_import("pandas")
+plt = lazy_import("matplotlib.pyplot")
 
 
 class ConfocalIO(object):
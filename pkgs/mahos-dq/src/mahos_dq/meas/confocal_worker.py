@@ -348,6 +348,14 @@ class Scanner(Worker):
         self._conf = conf
 
         self.image = Image()
+        self._init_buffer()
+
+    def _init_buffer(self):
+        # lines are written into preallocated buffer of shape (ynum, xnum)
+        # and self.image.image is a (transposed) view of the completed lines.
+        self._buffer: np.ndarray | None = None
+        self._lines = 0
+        self._published_lines = 0
 
     def get_param_dict(self, label: str) -> P.ParamDict[str, P.PDValue] | None:
         capability = self.scanner.get_capability()
@@ -405,6 +413,7 @@ class Scanner(Worker):
         params = P.unwrap(params)
 
         self.image = Image(params)
+        self._init_buffer()
         if not self.scanner.lock():
             return self.fail_with_release("Error acquiring scanner lock.")
         self.image.cunit = self.scanner.get_unit()
@@ -418,11 +427,29 @@ class Scanner(Worker):
         self.image.running = True
         return True
 
+    def _grow_buffer(self, line: np.ndarray):
+        ynum = self.image.params.get("ynum", 0) if self.image.has_params() else 0
+        capacity = max(ynum, self._lines + 1)
+        dtype = line.dtype
+        if self._buffer is not None:
+            capacity = max(capacity, 2 * len(self._buffer))
+            dtype = np.result_type(dtype, self._buffer.dtype)
+        buffer = np.empty((capacity, len(line)), dtype=dtype)
+        if self._lines:
+            buffer[: self._lines] = self._buffer[: self._lines]
+        self._buffer = buffer
+
     def append_line(self, line):
-        if self.image.image is None:
-            self.image.image = np.array(line, ndmin=2).T
-        else:
-            self.image.image = np.append(self.image.image, np.array(line, ndmin=2).T, axis=1)
+        line = np.asarray(line).ravel()
+        if (
+            self._buffer is None
+            or self._lines >= len(self._buffer)
+            or not np.can_cast(line.dtype, self._buffer.dtype)
+        ):
+            self._grow_buffer(line)
+        self._buffer[self._lines] = line
+        self._lines += 1
+        self.image.image = self._buffer[: self._lines].T
 
     def work(self) -> bool:
         if not self.image.running:
@@ -454,5 +481,24 @@ class Scanner(Worker):
     def image_msg(self) -> Image:
         return self.image
 
+    def image_pub_msg(self, delta: bool) -> Image | None:
+        """Get Image to publish.
+
+        :param delta: If True, get delta Image containing the lines since last call,
+            or None if there's no new line. If False, get full Image.
+
+        """
+
+        if not delta:
+            self._published_lines = self._lines
+            return self.image
+        if self._lines <= self._published_lines:
+            return None
+        img = copy.copy(self.image)
+        img.image = self._buffer[self._published_lines : self._lines].T
+        img.line_offset = self._published_lines
+        self._published_lines = self._lines
+        return img
+
     def running(self) -> bool:
         return self.image.running
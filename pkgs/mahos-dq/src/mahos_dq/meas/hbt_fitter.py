@@ -12,12 +12,14 @@ from __future__ import annotations
 
 import numpy as np
 from numpy.typing import NDArray
-import lmfit as F
 
 from mahos.msgs import param_msgs as P
 from mahos_dq.msgs.hbt_msgs import HBTData
 from mahos.node.log import DummyLogger
 from mahos.meas.common_fitter import BaseFitter
+from mahos.util.lazy import lazy_import
+
+F = lazy_import("lmfit")
 
 
 class Fitter(BaseFitter):
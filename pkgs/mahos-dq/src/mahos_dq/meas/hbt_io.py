@@ -13,12 +13,16 @@ from os import path
 from itertools import cycle
 
 import numpy as np
-import matplotlib.pyplot as plt
 
 from mahos_dq.meas.hbt_fitter import HBTFitter
 from mahos_dq.msgs.hbt_msgs import HBTData, update_data
+from mahos.msgs.inst.tdc_msgs import RawEvents
+from mahos.inst.tdc_core.correlator import Correlator
 from mahos.node.log import DummyLogger
-from mahos.util.io import save_pickle_or_h5, load_pickle_or_h5
+from mahos.util.io import save_pickle_or_h5, load_pickle_or_h5, load_h5
+from mahos.util.lazy import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
 
 
 class HBTIO(object):
@@ -41,6 +45,59 @@ class HBTIO(object):
         if d is not None:
             return update_data(d)
 
+    def correlate_raw_events(
+        self,
+        raw_events: RawEvents | str,
+        params: dict,
+        tbin: float,
+        start_channel: int = 0,
+        stop_channel: int = 1,
+        mode: str = "full",
+    ) -> HBTData | None:
+        """Compute HBTData from RawEvents of two channels by software correlator.
+
+        This enables HBT measurement with list-mode TDCs (e.g. MCS with raw_events_channels),
+        and re-binning of the data after acquisition.
+        return None if RawEvents has no channel information.
+
+        :param raw_events: RawEvents or its file name.
+        :param params: HBT params. range (-range / 2 to range / 2 for full mode) and bin are used.
+        :param tbin: time resolution of raw_events in sec.
+        :param start_channel: the start channel in raw_events.
+        :param stop_channel: the stop channel in raw_events.
+        :param mode: full (cross-correlation) or start_stop. See Correlator for details.
+
+        """
+
+        if isinstance(raw_events, str):
+            raw_events = load_h5(raw_events, RawEvents, self.logger)
+            if raw_events is None:
+                return None
+        if not raw_events.has_channels():
+            self.logger.error("RawEvents doesn't have channels.")
+            return None
+
+        start = raw_events.get_channel_data(start_channel)
+        stop = raw_events.get_channel_data(stop_channel)
+        binwidth = max(int(round(params["bin"] / tbin)), 1)
+        if mode == "full":
+            window = int(round(params["range"] / 2 / tbin))
+        else:
+            window = int(round(params["range"] / tbin))
+        correlator = Correlator(window, binwidth, mode)
+        correlator.add(start, stop)
+        correlator.finalize()
+
+        data = HBTData(params)
+        data.set_bin(binwidth * tbin)
+        # symmetric time axis for full cross-correlation.
+        data.tdc_correlation = mode == "full"
+        data.data = correlator.hist
+        if mode == "full" and len(raw_events.data):
+            duration = int(raw_events.data[-1]) - int(raw_events.data[0])
+            data.data_normalized = correlator.normalized(duration)
+        return data
+
     def refit_data(self, params: dict, data: HBTData) -> bool:
         fitter = HBTFitter(self.logger)
         success = bool(fitter.fitd(data, params["fit"], params["fit_label"]))
@@ -21,22 +21,23 @@ from functools import partial
 
 import numpy as np
 from numpy.typing import NDArray
-import lmfit as F
-from lmfit.model import ModelResult
 
 from mahos_dq.meas import odmr_fitter as OF
 
 from mahos.node.log import DummyLogger
 from mahos_dq.msgs.iodmr_msgs import IODMRData
 from mahos.util.timer import StopWatch
-from mahos_dq.util.nv import Dgs_MHz, gamma_MHz_mT
+from mahos_dq.util.nv import Dgs_MHz, gamma_MHz_mT, peaks_of_B_aligned
 from mahos.util.image import apply_binning
+from mahos.util.lazy import lazy_import
+
+F = lazy_import("lmfit")
 
 
 def load_modelresult(s: str):
     """Load ModelResult from dumped string."""
 
-    res = ModelResult(F.Model(lambda x: x, None), F.Parameters())
+    res = F.model.ModelResult(F.Model(lambda x: x, None), F.Parameters())
     return res.loads(s)
 
 
@@ -73,7 +74,7 @@ def _fit(
     dip: bool = True,
     n_workers: int = 1,
     print_fn=print,
-) -> list[ModelResult]:
+) -> list[F.model.ModelResult]:
     f, H, W = image.shape
     img = image.reshape((f, H * W), order="C")
     num = img.shape[1]
@@ -126,7 +127,7 @@ fit_quad = partial(_fit, OF.fit_quad, _fit_quad_dumps)
 
 
 class IODMRFitResult(object):
-    def __init__(self, params: dict, label: str, result: list[ModelResult]):
+    def __init__(self, params: dict, label: str, result: list[F.model.ModelResult]):
         self.params = params
         self.label = label
         self.result = result
@@ -162,7 +163,7 @@ class IODMRFitResult(object):
         binning = self.params.get("binning", 1)
         return self.params["size"]["width"] // binning
 
-    def r(self, h, w) -> ModelResult:
+    def r(self, h, w) -> F.model.ModelResult:
         """Get result at height=h, width=w."""
 
         W = self.width()
@@ -175,7 +176,7 @@ class IODMRFitResult(object):
         d = {}
         for key, vals in zip(("init", "best"), (res.init_values, res.best_values)):
             if self.label == "nvba":
-                centers = OF.peaks_of_B_aligned(vals["B"])
+                centers = peaks_of_B_aligned(vals["B"])
             else:
                 centers = [v for k, v in vals.items() if k.endswith("center")]
             d[key] = {
@@ -184,7 +185,7 @@ class IODMRFitResult(object):
             }
         return d
 
-    def make_image(self, func: T.Callable[[ModelResult], float]) -> NDArray:
+    def make_image(self, func: T.Callable[[F.model.ModelResult], float]) -> NDArray:
         image = []
         for h in range(self.height()):
             line = []
@@ -336,5 +337,5 @@ class IODMRFitter(object):
         #     w = params["resize"].get("width", d.shape[2])
         #     d = np.array([cv2.resize(img, (w, h)) for img in d])
         if "binning" in params and params["binning"] > 1:
-            d = np.array([apply_binning(img, params["binning"]) for img in d])
+            d = apply_binning(d, params["binning"], remainder="crop")
         return xdata, d
@@ -16,16 +16,18 @@ from itertools import cycle
 
 import numpy as np
 from numpy.typing import NDArray
-import matplotlib.pyplot as plt
-import matplotlib as mpl
-from matplotlib.patches import Rectangle
-from lmfit.model import ModelResult
 
 from mahos_dq.msgs.iodmr_msgs import IODMRData
 from mahos.node.log import DummyLogger
 from mahos.util.io import save_pickle_or_h5, load_pickle, load_h5
 from mahos.util.image import save_image
 from mahos_dq.meas.iodmr_fitter import IODMRFitResult, IODMRFitter
+from mahos.util.lazy import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
+mpl = lazy_import("matplotlib")
+patches = lazy_import("matplotlib.patches")
+F = lazy_import("lmfit")
 
 
 class IODMRIO(object):
@@ -178,7 +180,13 @@ class IODMRIO(object):
             self._export_fit_all(head + "_all", fit, params)
 
     def _export_fit(
-        self, result: ModelResult, features: dict, h: int, w: int, dirname: str, params: dict
+        self,
+        result: F.model.ModelResult,
+        features: dict,
+        h: int,
+        w: int,
+        dirname: str,
+        params: dict,
     ):
         fig = plt.figure(figsize=params.get("figsize", (12, 12)), dpi=params.get("dpi"))
         ax = fig.add_subplot(111)
@@ -285,7 +293,7 @@ class IODMRIO(object):
         for i, data in enumerate(data_list):
             freq, img = self.get_freq_image(data, params)
             hslice, wslice = self.get_hwslice(data, params)
-            rect = Rectangle(
+            rect = patches.Rectangle(
                 (wslice.start, hslice.start),
                 wslice.stop - wslice.start,
                 hslice.stop - hslice.start,
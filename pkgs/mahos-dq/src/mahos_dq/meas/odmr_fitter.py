@@ -14,15 +14,17 @@ from operator import add
 
 import numpy as np
 from numpy.typing import NDArray
-import lmfit as F
-from scipy.cluster.vq import kmeans2
 
-from mahos_dq.util.nv import peaks_of_B, peaks_of_B_aligned, gamma_MHz_mT
+from mahos_dq.util.nv import sorted_peaks_of_B, gamma_MHz_mT
 from mahos.msgs import param_msgs as P
 from mahos_dq.msgs.odmr_msgs import ODMRData
 from mahos.msgs.fit_msgs import PeakType
 from mahos.node.log import DummyLogger
 from mahos.meas.common_fitter import gaussian, lorentzian, voigt, BaseFitter
+from mahos.util.lazy import lazy_import
+
+F = lazy_import("lmfit")
+vq = lazy_import("scipy.cluster.vq")
 
 
 def normalize(data: np.ndarray) -> np.ndarray:
@@ -73,7 +75,7 @@ def guess_multi_peak(xdata, ydata, dip: bool, n_peaks: int, n_samples: int = 10)
     else:
         idx = np.argpartition(ydata, kth=-n_samples)[-n_samples:]
     xs = xdata[idx]
-    centroids, _ = kmeans2(xs, n_peaks, minit="++")
+    centroids, _ = vq.kmeans2(xs, n_peaks, minit="++")
     return sorted(centroids)
 
 
@@ -319,6 +321,13 @@ class MultiFitter(Fitter):
             raise ValueError("Unexpected peak_type: " + str(peak_type))
 
 
+def _sum_peaks(func, x, amplitudes, centers, *widths):
+    """Evaluate the sum of peaks func(x, amplitude, center, *width) in a broadcasted way."""
+
+    x = np.asarray(x, dtype=np.float64)[..., np.newaxis]
+    return func(x, np.array(amplitudes), centers, *[np.array(w) for w in widths]).sum(axis=-1)
+
+
 def B_lorentzians_many(
     x,
     B,
@@ -341,41 +350,34 @@ def B_lorentzians_many(
     p6_gamma,
     p7_gamma,
 ):
-    centers = sorted(peaks_of_B(B, theta, phi))
-    return (
-        lorentzian(x, p0_amplitude, centers[0], p0_gamma)
-        + lorentzian(x, p1_amplitude, centers[1], p1_gamma)
-        + lorentzian(x, p2_amplitude, centers[2], p2_gamma)
-        + lorentzian(x, p3_amplitude, centers[3], p3_gamma)
-        + lorentzian(x, p4_amplitude, centers[4], p4_gamma)
-        + lorentzian(x, p5_amplitude, centers[5], p5_gamma)
-        + lorentzian(x, p6_amplitude, centers[6], p6_gamma)
-        + lorentzian(x, p7_amplitude, centers[7], p7_gamma)
+    centers = sorted_peaks_of_B(B, theta, phi)
+    return _sum_peaks(
+        lorentzian,
+        x,
+        (
+            p0_amplitude,
+            p1_amplitude,
+            p2_amplitude,
+            p3_amplitude,
+            p4_amplitude,
+            p5_amplitude,
+            p6_amplitude,
+            p7_amplitude,
+        ),
+        centers,
+        (p0_gamma, p1_gamma, p2_gamma, p3_gamma, p4_gamma, p5_gamma, p6_gamma, p7_gamma),
     )
 
 
 def B_lorentzians(x, B, theta, phi, amplitude, gamma):
-    centers = sorted(peaks_of_B(B, theta, phi))
-    return (
-        lorentzian(x, amplitude, centers[0], gamma)
-        + lorentzian(x, amplitude, centers[1], gamma)
-        + lorentzian(x, amplitude, centers[2], gamma)
-        + lorentzian(x, amplitude, centers[3], gamma)
-        + lorentzian(x, amplitude, centers[4], gamma)
-        + lorentzian(x, amplitude, centers[5], gamma)
-        + lorentzian(x, amplitude, centers[6], gamma)
-        + lorentzian(x, amplitude, centers[7], gamma)
-    )
+    return _sum_peaks(lorentzian, x, amplitude, sorted_peaks_of_B(B, theta, phi), gamma)
 
 
 def B_lorentzians_aligned(x, B, p03_amplitude, p12_amplitude, p03_gamma, p12_gamma):
-    centers = sorted(peaks_of_B_aligned(B))
-    return (
-        lorentzian(x, p03_amplitude, centers[0], p03_gamma)
-        + lorentzian(x, p12_amplitude, centers[1], p12_gamma)
-        + lorentzian(x, p12_amplitude, centers[2], p12_gamma)
-        + lorentzian(x, p03_amplitude, centers[3], p03_gamma)
-    )
+    centers = sorted_peaks_of_B(B, 0.0, 0.0, num=2)
+    amplitudes = (p03_amplitude, p12_amplitude, p12_amplitude, p03_amplitude)
+    gammas = (p03_gamma, p12_gamma, p12_gamma, p03_gamma)
+    return _sum_peaks(lorentzian, x, amplitudes, centers, gammas)
 
 
 def B_gaussians_many(
@@ -400,67 +402,48 @@ def B_gaussians_many(
     p6_sigma,
     p7_sigma,
 ):
-    centers = sorted(peaks_of_B(B, theta, phi))
-    return (
-        gaussian(x, p0_amplitude, centers[0], p0_sigma)
-        + gaussian(x, p1_amplitude, centers[1], p1_sigma)
-        + gaussian(x, p2_amplitude, centers[2], p2_sigma)
-        + gaussian(x, p3_amplitude, centers[3], p3_sigma)
-        + gaussian(x, p4_amplitude, centers[4], p4_sigma)
-        + gaussian(x, p5_amplitude, centers[5], p5_sigma)
-        + gaussian(x, p6_amplitude, centers[6], p6_sigma)
-        + gaussian(x, p7_amplitude, centers[7], p7_sigma)
+    centers = sorted_peaks_of_B(B, theta, phi)
+    return _sum_peaks(
+        gaussian,
+        x,
+        (
+            p0_amplitude,
+            p1_amplitude,
+            p2_amplitude,
+            p3_amplitude,
+            p4_amplitude,
+            p5_amplitude,
+            p6_amplitude,
+            p7_amplitude,
+        ),
+        centers,
+        (p0_sigma, p1_sigma, p2_sigma, p3_sigma, p4_sigma, p5_sigma, p6_sigma, p7_sigma),
     )
 
 
 def B_gaussians(x, B, theta, phi, amplitude, sigma):
-    centers = sorted(peaks_of_B(B, theta, phi))
-    return (
-        gaussian(x, amplitude, centers[0], sigma)
-        + gaussian(x, amplitude, centers[1], sigma)
-        + gaussian(x, amplitude, centers[2], sigma)
-        + gaussian(x, amplitude, centers[3], sigma)
-        + gaussian(x, amplitude, centers[4], sigma)
-        + gaussian(x, amplitude, centers[5], sigma)
-        + gaussian(x, amplitude, centers[6], sigma)
-        + gaussian(x, amplitude, centers[7], sigma)
-    )
+    return _sum_peaks(gaussian, x, amplitude, sorted_peaks_of_B(B, theta, phi), sigma)
 
 
 def B_gaussians_aligned(x, B, p03_amplitude, p12_amplitude, p03_sigma, p12_sigma):
-    centers = sorted(peaks_of_B_aligned(B))
-    return (
-        gaussian(x, p03_amplitude, centers[0], p03_sigma)
-        + gaussian(x, p12_amplitude, centers[1], p12_sigma)
-        + gaussian(x, p12_amplitude, centers[2], p12_sigma)
-        + gaussian(x, p03_amplitude, centers[3], p03_sigma)
-    )
+    centers = sorted_peaks_of_B(B, 0.0, 0.0, num=2)
+    amplitudes = (p03_amplitude, p12_amplitude, p12_amplitude, p03_amplitude)
+    sigmas = (p03_sigma, p12_sigma, p12_sigma, p03_sigma)
+    return _sum_peaks(gaussian, x, amplitudes, centers, sigmas)
 
 
 def B_voigts(x, B, theta, phi, amplitude, sigma, gamma):
-    centers = sorted(peaks_of_B(B, theta, phi))
-    return (
-        voigt(x, amplitude, centers[0], sigma, gamma)
-        + voigt(x, amplitude, centers[1], sigma, gamma)
-        + voigt(x, amplitude, centers[2], sigma, gamma)
-        + voigt(x, amplitude, centers[3], sigma, gamma)
-        + voigt(x, amplitude, centers[4], sigma, gamma)
-        + voigt(x, amplitude, centers[5], sigma, gamma)
-        + voigt(x, amplitude, centers[6], sigma, gamma)
-        + voigt(x, amplitude, centers[7], sigma, gamma)
-    )
+    return _sum_peaks(voigt, x, amplitude, sorted_peaks_of_B(B, theta, phi), sigma, gamma)
 
 
 def B_voigts_aligned(
     x, B, p03_amplitude, p12_amplitude, p03_sigma, p12_sigma, p03_gamma, p12_gamma
 ):
-    centers = sorted(peaks_of_B_aligned(B))
-    return (
-        voigt(x, p03_amplitude, centers[0], p03_sigma, p03_gamma)
-        + voigt(x, p12_amplitude, centers[1], p12_sigma, p12_gamma)
-        + voigt(x, p12_amplitude, centers[2], p12_sigma, p12_gamma)
-        + voigt(x, p03_amplitude, centers[3], p03_sigma, p03_gamma)
-    )
+    centers = sorted_peaks_of_B(B, 0.0, 0.0, num=2)
+    amplitudes = (p03_amplitude, p12_amplitude, p12_amplitude, p03_amplitude)
+    sigmas = (p03_sigma, p12_sigma, p12_sigma, p03_sigma)
+    gammas = (p03_gamma, p12_gamma, p12_gamma, p03_gamma)
+    return _sum_peaks(voigt, x, amplitudes, centers, sigmas, gammas)
 
 
 class NVBFitter(Fitter):
@@ -13,13 +13,15 @@ from os import path
 from itertools import cycle
 
 import numpy as np
-import matplotlib.pyplot as plt
 
 from mahos_dq.meas.odmr_fitter import ODMRFitter
 from mahos_dq.msgs.odmr_msgs import ODMRData, update_data
 from mahos.node.log import DummyLogger
 from mahos.util.io import save_pickle_or_h5, load_pickle_or_h5
 from mahos.util.plot import colors_tab20_pair
+from mahos.util.lazy import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
 
 
 class ODMRIO(object):
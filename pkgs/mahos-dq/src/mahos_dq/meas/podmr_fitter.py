@@ -14,7 +14,6 @@ from operator import add
 
 import numpy as np
 from numpy.typing import NDArray
-import lmfit as F
 
 from mahos_dq.msgs.podmr_msgs import PODMRData
 from mahos.msgs.fit_msgs import PeakType
@@ -23,6 +22,9 @@ from mahos.node.log import DummyLogger
 from mahos.util.conv import real_fft
 from mahos.meas.common_fitter import gaussian, lorentzian, voigt, BaseFitter
 from mahos_dq.meas.odmr_fitter import guess_single_peak, guess_multi_peak, guess_background
+from mahos.util.lazy import lazy_import
+
+F = lazy_import("lmfit")
 
 
 class Fitter(BaseFitter):
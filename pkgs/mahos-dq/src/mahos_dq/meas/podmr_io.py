@@ -13,7 +13,6 @@ from os import path
 from itertools import cycle
 
 import numpy as np
-import matplotlib.pyplot as plt
 
 from mahos_dq.msgs.podmr_msgs import PODMRData, update_data
 from mahos_dq.meas.podmr_worker import PODMRDataOperator
@@ -23,6 +22,9 @@ from mahos.util.io import save_pickle_or_h5, load_pickle_or_h5
 from mahos.util.unit import SI_scale
 from mahos.util.conv import real_fft, real_fftfreq
 from mahos.util.plot import colors_tab20_pair
+from mahos.util.lazy import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
 
 
 class PODMRIO(object):
@@ -14,7 +14,6 @@ import copy
 from dataclasses import dataclass
 
 import numpy as np
-from scipy.optimize import isotonic_regression
 
 from mahos.util.timer import IntervalTimer
 from mahos_dq.msgs.podmr_msgs import (
@@ -37,6 +36,9 @@ from mahos.meas.common_worker import Worker
 from mahos.node.log import DummyLogger
 
 from mahos_dq.meas.podmr_generator.generator import make_generators
+from mahos.util.lazy import lazy_import
+
+optimize = lazy_import("scipy.optimize")
 
 
 @dataclass(frozen=True)
@@ -83,60 +85,91 @@ class LaserTimingDetector(object):
 
     @staticmethod
     def _moving_average(data: np.ndarray, window: int) -> np.ndarray:
+        """Centered moving average along the last axis (same as np.convolve(mode="same"))."""
+
         if window <= 1:
             return data
-        kernel = np.full(window, 1.0 / window, dtype=np.float64)
-        return np.convolve(data, kernel, mode="same")
+        h = window // 2
+        pad = [(0, 0)] * (data.ndim - 1) + [(h + 1, h)]
+        cs = np.cumsum(np.pad(data, pad), axis=-1)
+        return (cs[..., window:] - cs[..., :-window]) / window
 
-    def _estimate_edge_constant_fraction(
-        self, seg: np.ndarray, smooth_window: int, fraction: float
-    ) -> float | None:
-        """Estimate rising edge timing in seg and return edge index in float."""
+    def _estimate_edges_constant_fraction(
+        self, segs: np.ndarray, smooth_window: int, fraction: float
+    ) -> np.ndarray:
+        """Estimate rising edge timing in each row of segs.
 
-        seg = np.asarray(seg, dtype=np.float64)
-        if seg.ndim != 1 or len(seg) < 3:
-            return None
+        :returns: edge indices in float. NaN for the rows without valid edge.
+
+        """
+
+        segs = np.asarray(segs, dtype=np.float64)
+        n, length = segs.shape
+        edges = np.full(n, np.nan, dtype=np.float64)
+        if length < 3:
+            return edges
 
-        smooth = self._moving_average(seg, self._odd_window_length(len(seg), smooth_window))
+        smooth = self._moving_average(segs, self._odd_window_length(length, smooth_window))
 
-        q = max(1, len(smooth) // 4)
-        baseline = float(np.median(smooth[:q]))
-        level = float(np.median(smooth[-q:]))
+        q = max(1, length // 4)
+        baseline = np.median(smooth[:, :q], axis=1)
+        level = np.median(smooth[:, -q:], axis=1)
         amp = level - baseline
-        if not np.isfinite(amp) or amp <= 0.0:
-            return None
+        ok = np.isfinite(amp) & (amp > 0.0)
+
+        threshold = (baseline + fraction * amp)[:, np.newaxis]
+        crossings = (smooth[:, :-1] < threshold) & (smooth[:, 1:] >= threshold)
+        found = crossings.any(axis=1)
+        i0 = np.argmax(crossings, axis=1)
+        i1 = i0 + 1
+        # fallback to the closest sample to threshold
+        closest = np.argmin(np.abs(smooth - threshold), axis=1)
+        i1 = np.where(found, i1, np.maximum(closest, 1))
+        i0 = i1 - 1
+
+        rows = np.arange(n)
+        y0, y1 = smooth[rows, i0], smooth[rows, i1]
+        ok &= np.isfinite(y0) & np.isfinite(y1)
+        dy = np.where(y1 == y0, 1.0, y1 - y0)
+        # sub-bin linear interpolation
+        frac = np.clip((threshold[:, 0] - y0) / dy, 0.0, 1.0)
+        edge = np.where(y1 == y0, i1, i0 + frac)
+
+        edges[ok] = edge[ok]
+        return edges
+
+    def _estimate_segment_edges(
+        self,
+        source: np.ndarray,
+        starts: np.ndarray,
+        stops: np.ndarray,
+        smooth_window: int,
+        fraction: float,
+    ) -> np.ndarray:
+        """Estimate rising edges in the segments [starts[i], stops[i]) of source.
 
-        threshold = baseline + fraction * amp
-        crossings = np.flatnonzero((smooth[:-1] < threshold) & (smooth[1:] >= threshold))
-        if len(crossings):
-            i0 = int(crossings[0])
-            i1 = i0 + 1
-        else:
-            # fallback to the closest sample to threshold
-            i1 = int(np.argmin(np.abs(smooth - threshold)))
-            if i1 <= 0:
-                i0, i1 = 0, 1
-            else:
-                i0 = i1 - 1
+        If source is 2D, i-th segment is taken from source[i].
+        The segments of the same length are stacked and processed at once.
 
-        y0, y1 = smooth[i0], smooth[i1]
-        if not np.isfinite(y0) or not np.isfinite(y1):
-            return None
-        if y1 == y0:
-            edge = float(i1)
-        else:
-            # sub-bin linear interpolation
-            frac = (threshold - y0) / (y1 - y0)
-            edge = float(i0) + float(np.clip(frac, 0.0, 1.0))
+        :returns: edge indices relative to starts. NaN for the segments without valid edge.
 
-        return edge
+        """
+
+        lengths = stops - starts
+        edges = np.full(len(starts), np.nan, dtype=np.float64)
+        for length in np.unique(lengths[lengths >= 3]):
+            idx = np.flatnonzero(lengths == length)
+            cols = starts[idx, np.newaxis] + np.arange(length)
+            segs = source[cols] if source.ndim == 1 else source[idx[:, np.newaxis], cols]
+            edges[idx] = self._estimate_edges_constant_fraction(segs, smooth_window, fraction)
+        return edges
 
     def _fit_monotonic_offsets(self, offsets: np.ndarray) -> np.ndarray:
         """Fit monotonic drift (increasing or decreasing) by isotonic regression."""
 
         offsets = np.asarray(offsets, dtype=np.float64)
-        inc = isotonic_regression(offsets, increasing=True).x
-        dec = isotonic_regression(offsets, increasing=False).x
+        inc = optimize.isotonic_regression(offsets, increasing=True).x
+        dec = optimize.isotonic_regression(offsets, increasing=False).x
 
         err_inc = np.sum(np.square(offsets - inc))
         err_dec = np.sum(np.square(offsets - dec))
@@ -169,37 +202,27 @@ class LaserTimingDetector(object):
         """Detect laser timing offsets in ROI mode."""
 
         head, tail = config.scope
-        if traces.ndim != 2 or len(traces) != len(laser_timing):
+        if traces.ndim != 2 or not (len(traces) == len(laser_timing) == len(rois)):
             self.logger.error(
                 "FindLaserTiming (ROI): invalid trace shape. "
-                f"ndim={traces.ndim}, traces={len(traces)}, laser_timing={len(laser_timing)}"
+                f"ndim={traces.ndim}, traces={len(traces)}, rois={len(rois)}, "
+                f"laser_timing={len(laser_timing)}"
             )
             return LaserTimingResult(False)
 
-        starts = np.round((laser_timing - head) / tbin).astype(int)
-        stops = np.round((laser_timing + tail) / tbin).astype(int)
-
-        offsets = np.full(len(laser_timing), np.nan, dtype=np.float64)
-        short_segments = 0
-        no_edge = 0
-
-        for i, (timing, start, stop, (roi_start, _), trace) in enumerate(
-            zip(laser_timing, starts, stops, rois, traces)
-        ):
-            local_start = max(0, start - roi_start)
-            local_stop = min(len(trace), stop - roi_start)
-            if local_stop - local_start < 3:
-                short_segments += 1
-                continue
-
-            edge = self._estimate_edge_constant_fraction(
-                trace[local_start:local_stop], config.smooth_window, config.fraction
-            )
-            if edge is None:
-                no_edge += 1
-                continue
+        roi_starts = np.array([roi[0] for roi in rois], dtype=np.int64)
+        starts = np.round((laser_timing - head) / tbin).astype(np.int64)
+        stops = np.round((laser_timing + tail) / tbin).astype(np.int64)
+        local_starts = np.maximum(0, starts - roi_starts)
+        local_stops = np.minimum(traces.shape[1], stops - roi_starts)
 
-            offsets[i] = (roi_start + local_start + edge) * tbin - timing
+        short = local_stops - local_starts < 3
+        edges = self._estimate_segment_edges(
+            traces, local_starts, local_stops, config.smooth_window, config.fraction
+        )
+        short_segments = int(np.count_nonzero(short))
+        no_edge = int(np.count_nonzero(~short & np.isnan(edges)))
+        offsets = (roi_starts + local_starts + edges) * tbin - laser_timing
 
         valid = np.isfinite(offsets)
         valid_num = int(np.count_nonzero(valid))
@@ -232,28 +255,16 @@ class LaserTimingDetector(object):
             self.logger.error(f"FindLaserTiming (no-ROI): invalid raw_data ndim={raw.ndim}.")
             return LaserTimingResult(False)
 
-        starts = np.round((laser_timing - head) / tbin).astype(int)
-        stops = np.round((laser_timing + tail) / tbin).astype(int)
-
-        offsets = np.full(len(laser_timing), np.nan, dtype=np.float64)
-        short_segments = 0
-        no_edge = 0
-
-        for i, (start, stop, timing) in enumerate(zip(starts, stops, laser_timing)):
-            start = max(0, start)
-            stop = min(len(raw), stop)
-            if stop - start < 3:
-                short_segments += 1
-                continue
+        starts = np.maximum(0, np.round((laser_timing - head) / tbin).astype(np.int64))
+        stops = np.minimum(len(raw), np.round((laser_timing + tail) / tbin).astype(np.int64))
 
-            edge = self._estimate_edge_constant_fraction(
-                raw[start:stop], config.smooth_window, config.fraction
-            )
-            if edge is None:
-                no_edge += 1
-                continue
-
-            offsets[i] = (start + edge) * tbin - timing
+        short = stops - starts < 3
+        edges = self._estimate_segment_edges(
+            raw, starts, stops, config.smooth_window, config.fraction
+        )
+        short_segments = int(np.count_nonzero(short))
+        no_edge = int(np.count_nonzero(~short & np.isnan(edges)))
+        offsets = (starts + edges) * tbin - laser_timing
 
         valid = np.isfinite(offsets)
         valid_num = int(np.count_nonzero(valid))
@@ -546,6 +557,7 @@ class PODMRDataOperator(object):
             data.params["plot"] = plot_params
         else:
             data.params["plot"].update(plot_params)
+        data.invalidate_cache()
         if updated:
             self.update_axes(data)
         return updated
@@ -11,11 +11,12 @@ File I/O for Qdyne.
 from __future__ import annotations
 from os import path
 
-import matplotlib.pyplot as plt
-
 from mahos_dq.msgs.qdyne_msgs import QdyneData, update_data
 from mahos.node.log import DummyLogger
 from mahos.util.io import save_pickle_or_h5, load_pickle_or_h5
+from mahos.util.lazy import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
 
 
 class QdyneIO(object):
@@ -145,7 +145,67 @@ class BlocksBuilder(object):
 
 
 class QdyneAnalyzer(object):
-    """Analyzer for QdyneData."""
+    """Analyzer for QdyneData.
+
+    analyze() processes whole data.raw_data at once.
+    analyze_chunk() processes the chunks of events incrementally:
+    only the counts per period are kept, and the events are discarded.
+
+    """
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        """Reset the state of incremental analysis (analyze_chunk())."""
+
+        self._counts = np.zeros(0, dtype=np.uint64)
+        # the last event seen so far
+        self._last = -1
+
+    def _grow_counts(self, n: int):
+        if n > len(self._counts):
+            counts = np.zeros(max(n, 2 * len(self._counts)), dtype=np.uint64)
+            counts[: len(self._counts)] = self._counts
+            self._counts = counts
+
+    def analyze_chunk(self, data: QdyneData, events: np.ndarray) -> bool:
+        """Analyze a chunk of new events and set data.data and data.xdata.
+
+        The result is same as analyze() with data.raw_data of all the events so far,
+        provided that the chunks are given in order (events are sorted as a whole).
+
+        """
+
+        if data.marker_indices is None:
+            return False
+        signal_head, signal_tail, reference_head, reference_tail = data.marker_indices.T[0]
+        T = data.get_period_bins()
+
+        if len(events):
+            events = np.asarray(events).astype(np.int64, copy=False)
+            # k: index of period, counted if head <= (offset in period) <= tail
+            k = events // T
+            offset = events - k * T
+            k = k[(signal_head <= offset) & (offset <= signal_tail)]
+            if len(k):
+                n = int(k[-1]) + 1
+                self._grow_counts(n)
+                self._counts[:n] += np.bincount(k, minlength=n).astype(np.uint64)
+            self._last = max(self._last, int(events[-1]))
+
+        # N: number of measurements performed (see analyze())
+        if self._last < 0:
+            N = 0
+        else:
+            N = self._last // T
+            if N * T + signal_tail < self._last:
+                N += 1
+        self._grow_counts(N)
+
+        data.xdata = np.arange(0, N * T, T, dtype=np.uint64)
+        data.data = self._counts[:N].copy()
+        return True
 
     def _analyze_py(self, data: QdyneData) -> bool:
         """Analyze data.raw_data and set data.data and data.xdata.
@@ -255,6 +315,8 @@ class Pulser(Worker, ConfAccessorMixin):
         )
         self._raw_events_dir = self.conf.get("raw_events_dir", "")
         self._remove_raw_events = self._conf_bool("remove_raw_events", True)
+        self._stream_raw_events = self._conf_bool("stream_raw_events", False)
+        self._streaming = False
         self._start_delay = self._conf_nonneg_num("start_delay", 0.0)
         self._tdc_ch0 = self._conf_nonneg_int("tdc_primary_ch", 0)
         self._tdc_ch1 = self._conf_nonneg_int("tdc_secondary_ch", 1)
@@ -326,7 +388,11 @@ class Pulser(Worker, ConfAccessorMixin):
         # Detector
         trange = self.length / self.freq
         save_file = "qdyne_" + self.data.ident.hex
-        if not self.tdc.configure_raw_events("qdyne", save_file, trange=trange, tbin=0.0):
+        # raw_data cannot be retained in stream mode
+        self._streaming = self._stream_raw_events and params.get("remove_raw_data", True)
+        if not self.tdc.configure_raw_events(
+            "qdyne", save_file, trange=trange, tbin=0.0, stream=self._streaming
+        ):
             self.logger.error("Error configuring TDC.")
             return False
         if params.get("sweeps", 0) and not self.tdc.set_sweeps(params["sweeps"]):
@@ -440,9 +506,23 @@ class Pulser(Worker, ConfAccessorMixin):
             return False
 
         self.data.set_status(self.get_tdc_status())
+        if self._streaming:
+            self.fetch_chunk()
 
         return True
 
+    def fetch_chunk(self, final: bool = False) -> bool:
+        """Fetch new raw events from TDC and analyze them incrementally."""
+
+        raw_events = self.tdc.get_raw_events_chunk(final)
+        if final:
+            self.tdc.release()
+        if raw_events is None:
+            self.logger.error("Failed to fetch chunk of raw events data.")
+            return False
+
+        return self.analyzer.analyze_chunk(self.data, raw_events.data)
+
     def fetch_data(self) -> bool:
         self.logger.info("Fetching raw events data.")
         raw_events = self.tdc.get_raw_events()
@@ -483,6 +563,7 @@ class Pulser(Worker, ConfAccessorMixin):
         resume = params is None or ("resume" in params and params["resume"])
         if not resume:
             self.data = QdyneData(params, label)
+            self.analyzer.reset()
         else:
             self.data.update_params(params)
 
@@ -547,7 +628,11 @@ class Pulser(Worker, ConfAccessorMixin):
             success &= self.fg.set_output(False)
         success &= self.fg.release()
 
-        success &= self.fetch_data()
+        if self._streaming:
+            # return True anyway to finalize measurement
+            self.fetch_chunk(final=True)
+        else:
+            success &= self.fetch_data()
 
         if success:
             self.timer = None
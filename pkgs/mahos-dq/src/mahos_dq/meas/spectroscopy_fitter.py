@@ -13,14 +13,16 @@ from functools import reduce
 from operator import add
 
 import numpy as np
-import lmfit as F
-from scipy.cluster.vq import kmeans2
 
 from mahos.msgs import param_msgs as P
 from mahos_dq.msgs.spectroscopy_msgs import SpectroscopyData
 from mahos.msgs.fit_msgs import PeakType
 from mahos.node.log import DummyLogger
 from mahos.meas.common_fitter import gaussian, lorentzian, voigt, BaseFitter
+from mahos.util.lazy import lazy_import
+
+F = lazy_import("lmfit")
+vq = lazy_import("scipy.cluster.vq")
 
 
 def guess_background(ydata, bins=40):
@@ -43,7 +45,7 @@ def guess_multi_peak(xdata, ydata, n_peaks: int, n_samples: int = 10):
 
     idx = np.argpartition(ydata, kth=-n_samples)[-n_samples:]
     xs = xdata[idx]
-    centroids, _ = kmeans2(xs, n_peaks, minit="++")
+    centroids, _ = vq.kmeans2(xs, n_peaks, minit="++")
     return sorted(centroids)
 
 
@@ -13,12 +13,14 @@ from os import path
 from itertools import cycle
 
 import numpy as np
-import matplotlib.pyplot as plt
 
 from mahos_dq.meas.spectroscopy_fitter import SpectroscopyFitter
 from mahos_dq.msgs.spectroscopy_msgs import SpectroscopyData, update_data
 from mahos.node.log import DummyLogger
 from mahos.util.io import save_pickle_or_h5, load_pickle_or_h5
+from mahos.util.lazy import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
 
 
 class SpectroscopyIO(object):
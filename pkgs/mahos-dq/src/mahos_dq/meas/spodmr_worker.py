@@ -83,6 +83,7 @@ class SPODMRDataOperator(object):
             data.params["plot"] = plot_params
         else:
             data.params["plot"].update(plot_params)
+        data.invalidate_cache()
         if updated:
             self.update_axes(data)
         return updated
@@ -31,6 +31,8 @@ class APODMRStatus(Status):
 
     """
 
+    SCHEMA = {"state": BinaryState, "pg_freq": None}
+
     def __init__(self, state: BinaryState, pg_freq: float):
         self.state = state
         self.pg_freq = pg_freq
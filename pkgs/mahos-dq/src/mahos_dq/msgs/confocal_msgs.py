@@ -12,9 +12,9 @@ from __future__ import annotations
 import enum
 import uuid
 import time
+import copy
 
 import numpy as np
-import pandas as pd
 import msgpack
 
 from mahos.msgs.common_msgs import Message, Request, State, Status, BinaryState
@@ -22,6 +22,9 @@ from mahos.msgs.data_msgs import Data, ComplexDataMixin, FormatTimeMixin
 
 from mahos.msgs.common_msgs import SaveDataReq, ExportDataReq, LoadDataReq
 from mahos.msgs.inst.piezo_msgs import Axis
+from mahos.util.lazy import lazy_import
+
+pd = lazy_import("pandas")
 
 
 class ConfocalState(State):
@@ -142,6 +145,21 @@ class PiezoPos(Message):
 
     """
 
+    SCHEMA = {
+        "x": None,
+        "y": None,
+        "z": None,
+        "x_range": tuple,
+        "y_range": tuple,
+        "z_range": tuple,
+        "x_ont": None,
+        "y_ont": None,
+        "z_ont": None,
+        "x_tgt": None,
+        "y_tgt": None,
+        "z_tgt": None,
+    }
+
     def __init__(
         self,
         x=None,
@@ -214,6 +232,8 @@ class Image(Data, ComplexDataMixin, FormatTimeMixin):
     :ivar finish_time: Acquisition finish timestamp, or ``None`` while running.
     :ivar clabel: Colorbar label string for visualization.
     :ivar cunit: Colorbar unit string for visualization.
+    :ivar line_offset: Index of the first line in ``image`` if this is a delta
+        (an image containing only the new lines), or ``None`` for a full image.
 
     """
 
@@ -234,12 +254,25 @@ class Image(Data, ComplexDataMixin, FormatTimeMixin):
 
         self.clabel: str = "Intensity"
         self.cunit: str = ""
+        self.line_offset: int | None = None
 
     def has_data(self) -> bool:
         """return True if data is ready and valid data could be read out."""
 
         return self.image is not None
 
+    def is_delta(self) -> bool:
+        """return True if this image contains only the new lines. See ImageAssembler."""
+
+        return getattr(self, "line_offset", None) is not None
+
+    def num_lines(self) -> int:
+        """return number of (completed) lines in the image."""
+
+        if not self.has_data():
+            return 0
+        return self.image.shape[1]
+
     def is_complex(self) -> bool:
         return self.has_data() and np.issubdtype(self.image.dtype, np.complexfloating)
 
@@ -310,6 +343,84 @@ def update_image(image: Image):
     return image
 
 
+class ImageAssembler(object):
+    """Reassemble the full Images from the published full Images and deltas.
+
+    During the scan, Confocal publishes the delta Images (``Image.is_delta()``) containing
+    only the new lines, along with the full Images at lower rate.
+    The lines are written into a preallocated buffer (``(ynum, xnum)``) and
+    the assembled Image holds a view of completed lines.
+    A delta which doesn't follow the current image (lost or out-of-order messages) is ignored
+    until the next full Image arrives.
+
+    """
+
+    def __init__(self):
+        self._image: Image | None = None
+        self._buffer: np.ndarray | None = None
+
+    def latest(self) -> Image | None:
+        """Get the latest assembled Image."""
+
+        return self._image
+
+    def _grow(self, num_lines: int, line: np.ndarray):
+        if self._image.has_params():
+            capacity = max(self._image.params.get("ynum", 0), num_lines)
+        else:
+            capacity = num_lines
+        if self._buffer is not None:
+            capacity = max(capacity, 2 * len(self._buffer))
+        dtype = line.dtype
+        if self._image.has_data():
+            dtype = np.result_type(dtype, self._image.image.dtype)
+        buffer = np.empty((capacity, line.shape[0]), dtype=dtype)
+        n = self._image.num_lines()
+        if n:
+            buffer[:n] = self._image.image.T
+        self._buffer = buffer
+
+    def assemble(self, image: Image) -> Image | None:
+        """Update with a published `image` and get the assembled Image.
+
+        :returns: the assembled Image, or None if `image` is a delta which cannot be assembled.
+
+        """
+
+        if not image.is_delta():
+            self._image = image
+            self._buffer = None
+            return image
+
+        current = self._image
+        if (
+            current is None
+            or current.ident != image.ident
+            or current.num_lines() != image.line_offset
+            or not image.has_data()
+            or current.has_data()
+            and current.image.shape[0] != image.image.shape[0]
+        ):
+            return None
+
+        lines = image.image.T
+        n = current.num_lines() + len(lines)
+        if (
+            self._buffer is None
+            or n > len(self._buffer)
+            or not np.can_cast(lines.dtype, self._buffer.dtype)
+        ):
+            self._grow(n, lines[0])
+        self._buffer[current.num_lines() : n] = lines
+
+        # shallow copy: lines written before are not touched, so the views are kept valid.
+        assembled = copy.copy(image)
+        assembled.image = self._buffer[:n].T
+        assembled.line_offset = None
+        self._image = assembled
+        return assembled
+
+
 class Trace(Data, ComplexDataMixin):
     """Multi-channel confocal trace buffer with timestamped samples.
 
@@ -408,6 +519,8 @@ class ConfocalStatus(Status):
 
     """
 
+    SCHEMA = {"state": ConfocalState, "pos": PiezoPos, "tracer_paused": None}
+
     def __init__(self, state: ConfocalState, pos: PiezoPos, tracer_paused: bool):
         self.state = state
         self.pos = pos
@@ -428,6 +541,8 @@ class TraceStatus(Status):
 
     """
 
+    SCHEMA = {"state": BinaryState, "tracer_paused": None}
+
     def __init__(self, state: BinaryState, tracer_paused: bool):
         self.state = state
         self.tracer_paused = tracer_paused
@@ -34,6 +34,8 @@ class ConfocalTrackerStatus(Status):
 
     """
 
+    SCHEMA = {"state": BinaryState, "tracking": None}
+
     def __init__(self, state: BinaryState, tracking: bool):
         self.state = state
         self.tracking = tracking
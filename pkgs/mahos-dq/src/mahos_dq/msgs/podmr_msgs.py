@@ -21,6 +21,7 @@ import msgpack
 from mahos.msgs.fit_msgs import PeakType
 from mahos.util.comp import dict_isclose
 from mahos.msgs.common_msgs import Message, Request, BinaryState, Status
+from mahos.msgs.data_msgs import memoized
 from mahos.msgs.common_meas_msgs import BasicMeasData
 
 
@@ -136,6 +137,8 @@ class PODMRStatus(Status):
 
     """
 
+    SCHEMA = {"state": BinaryState, "pg_freq": None}
+
     def __init__(self, state: BinaryState, pg_freq: float):
         self.state = state
         self.pg_freq = pg_freq
@@ -167,6 +170,11 @@ class PODMRData(BasicMeasData):
     Pattern-indexed access is provided by ``data(index)`` / ``data_ref(index)``
     and ``set_data(index, value)`` / ``set_data_ref(index, value)``.
 
+    The derived arrays (``get_xdata()``, ``get_ydata()``, and ``get_total_scale()``)
+    are memoized until an attribute is set or ``invalidate_cache()`` is called.
+    Changes of ``params["plot"]`` are tracked, but ``invalidate_cache()`` must be called
+    after modifying the arrays or the other ``params`` in place.
+
     """
 
     def __init__(self, params: dict | None = None, label: str = ""):
@@ -235,6 +243,11 @@ class PODMRData(BasicMeasData):
         self._check_pattern_index(index)
         self._set_pattern_ref(index, value)
 
+    def _memo_stamp(self):
+        if not self.has_params() or "plot" not in self.params:
+            return None
+        return tuple(sorted(self.params["plot"].items()))
+
     def init_xdata(self):
         if not self.has_params():
             # dummy xdata
@@ -407,6 +420,7 @@ class PODMRData(BasicMeasData):
             xdata = np.repeat(xdata, N)
         return xdata
 
+    @memoized
     def get_total_scale(self):
         """Get the scaling parameters to get total precession time.
 
@@ -479,6 +493,7 @@ class PODMRData(BasicMeasData):
         else:
             return signal_head[0 : len(xdata) * self.num_pattern() : self.num_pattern()] * tbin
 
+    @memoized
     def get_xdata(self, fit=False, force_taumode: str = "") -> NDArray | None:
         """Get analyzed xdata.
 
@@ -513,6 +528,7 @@ class PODMRData(BasicMeasData):
     def get_fit_ydata(self):
         return self.fit_data
 
+    @memoized
     def get_ydata(self) -> tuple[NDArray | None, NDArray | None]:
         """Get analyzed ydata.
 
@@ -29,6 +29,8 @@ class SpectroscopyStatus(Status):
 
     """
 
+    SCHEMA = {"state": BinaryState, "temperature": Temperature}
+
     def __init__(self, state: BinaryState, temperature: Temperature | None):
         self.state = state
         self.temperature = temperature
@@ -18,7 +18,7 @@ from mahos.msgs.fit_msgs import PeakType
 from mahos.util.comp import dict_isclose
 from mahos.msgs.common_msgs import Request, BinaryState, Status
 from mahos.msgs.common_meas_msgs import BasicMeasData
-from mahos.msgs.data_msgs import ComplexDataMixin
+from mahos.msgs.data_msgs import ComplexDataMixin, memoized
 
 # just for re-export
 from mahos_dq.msgs.podmr_msgs import MWMode  # noqa: F401
@@ -76,6 +76,8 @@ class SPODMRStatus(Status):
 
     """
 
+    SCHEMA = {"state": BinaryState, "pg_freq": None}
+
     def __init__(self, state: BinaryState, pg_freq: float):
         self.state = state
         self.pg_freq = pg_freq
@@ -94,6 +96,12 @@ class SPODMRData(BasicMeasData, ComplexDataMixin):
     :ivar data1: Secondary accumulated signal matrix for dual-sequence methods.
     :ivar laser_duties: Per-point laser duty factors used for normalization.
 
+    The derived arrays (``get_xdata()``, ``get_ydata()``, ``get_image()``,
+    and ``get_total_scale()``) are memoized until an attribute is set
+    or ``invalidate_cache()`` is called.
+    Changes of ``params["plot"]`` are tracked, but ``invalidate_cache()`` must be called
+    after modifying the arrays or the other ``params`` in place.
+
     """
 
     def __init__(self, params: dict | None = None, label: str = ""):
@@ -107,6 +115,11 @@ class SPODMRData(BasicMeasData, ComplexDataMixin):
         self.data1 = None
         self.laser_duties = None
 
+    def _memo_stamp(self):
+        if not self.has_params() or "plot" not in self.params:
+            return None
+        return tuple(sorted(self.params["plot"].items()))
+
     def init_xdata(self):
         if not self.has_params():
             # dummy xdata
@@ -183,6 +196,7 @@ class SPODMRData(BasicMeasData, ComplexDataMixin):
         else:
             return data
 
+    @memoized
     def get_image(self, last_n: int = 0) -> NDArray:
         if self.partial() in (0, 2):
             return self._normalize_image(self._conv_complex(self.data0))[:, -last_n:]
@@ -230,6 +244,7 @@ class SPODMRData(BasicMeasData, ComplexDataMixin):
             xdata = np.column_stack((xdata, xdata)).reshape(len(xdata) * 2)
         return xdata
 
+    @memoized
     def get_total_scale(self):
         """Get the scaling parameters to get total precession time.
 
@@ -292,6 +307,7 @@ class SPODMRData(BasicMeasData, ComplexDataMixin):
         else:
             raise ValueError(f"invalid method {m} for taumode == freq")
 
+    @memoized
     def get_xdata(self, fit=False, force_taumode: str = "") -> NDArray | None:
         """get analyzed xdata.
 
@@ -322,6 +338,7 @@ class SPODMRData(BasicMeasData, ComplexDataMixin):
     def get_fit_ydata(self):
         return self.fit_data
 
+    @memoized
     def get_ydata(
         self, last_n: int = 0, std: bool = False
     ) -> tuple[NDArray | None, NDArray | None]:
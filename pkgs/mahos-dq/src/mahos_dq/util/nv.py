@@ -9,12 +9,15 @@ Functions for Diamond NV centers.
 """
 
 from __future__ import annotations
+import functools
 
 import numpy as np
 from numpy.typing import NDArray
-from scipy.linalg import eigh
-import matplotlib as mpl
-import matplotlib.pyplot as plt
+from mahos.util.lazy import lazy_import
+
+linalg = lazy_import("scipy.linalg")
+mpl = lazy_import("matplotlib")
+plt = lazy_import("matplotlib.pyplot")
 
 
 # Default parameters
@@ -147,11 +150,94 @@ projector_from100 = Projector_from100()
 project_from100 = projector_from100.project
 
 
+def peaks_of_B_array(
+    B, theta=None, phi=None, num: int = 4, D: float = Dgs_MHz, gamma: float = gamma_MHz_mT
+) -> NDArray:
+    """Compute peak positions for NV centers under B field. Vectorized version of peaks_of_B.
+
+    The eigenvalues of ground state Hamiltonian are solved analytically
+    (trigonometric solution of the characteristic cubic equation).
+
+    :param B: magnitude of B field in mT if theta and phi are given (broadcastable arrays).
+        Otherwise, B field vector(s) with shape (..., 3).
+    :returns: peak positions in MHz with shape (..., 2 * num). The order is same as peaks_of_B.
+
+    """
+
+    if theta is not None and phi is not None:
+        B, theta, phi = np.broadcast_arrays(
+            *[np.asarray(v, dtype=np.float64) for v in (B, theta, phi)]
+        )
+        st = np.sin(theta)
+        vec = np.stack((B * st * np.cos(phi), B * st * np.sin(phi), B * np.cos(theta)), axis=-1)
+    else:
+        vec = np.asarray(B, dtype=np.float64)
+
+    # components along the NV axes: (..., num, 3)
+    b = np.einsum("ikj,...j->...ik", np.array(projector.Rinvs[:num]), vec) * gamma
+    bz = b[..., 2]
+    # squared modulus of each off-diagonal element: |gamma * (Bx + i By) / sqrt(2)| ** 2
+    off = (b[..., 0] ** 2 + b[..., 1] ** 2) / 2.0
+
+    # The eigenvalues D + m satisfy m^3 + D m^2 - (bz^2 + 2 off) m - D bz^2 = 0.
+    # The lowest one is isolated and solved by the trigonometric method for
+    # the diagonal (0, D - bz, D + bz) shifted by the mean q.
+    q = 2.0 * D / 3.0
+    a0, a1, a2 = -q, D - bz - q, D + bz - q
+    p = np.sqrt((a0**2 + a1**2 + a2**2 + 4.0 * off) / 6.0)
+    det = a0 * a1 * a2 - off * (a1 + a2)
+    r = np.clip(det / (2.0 * p**3), -1.0, 1.0)
+    m0 = q + 2.0 * p * np.cos(np.arccos(r) / 3.0 + 2.0 * np.pi / 3.0) - D
+    # polish by a Newton step
+    bz2 = bz**2
+    c1 = bz2 + 2.0 * off
+    m0 = m0 - (((m0 + D) * m0 - c1) * m0 - D * bz2) / ((3.0 * m0 + 2.0 * D) * m0 - c1)
+
+    # The other two (possibly near-degenerate) are the roots of deflated quadratic
+    # m^2 + s m + D bz^2 / m0 = 0, solved without cancellation.
+    s = D + m0
+    m2 = (np.sqrt(s**2 - 4.0 * D * bz2 / m0) - s) / 2.0
+    prod = D * bz2 / m0
+    m1 = np.divide(prod, m2, out=np.zeros_like(m2), where=m2 != 0.0)
+
+    peaks = np.stack((m1 - m0, m2 - m0), axis=-1)
+    return peaks.reshape(peaks.shape[:-2] + (2 * num,))
+
+
+@functools.lru_cache(maxsize=256)
+def _sorted_peaks_of_B(B: float, theta: float, phi: float, num: int, D: float, gamma: float):
+    peaks = np.sort(peaks_of_B_array(B, theta, phi, num=num, D=D, gamma=gamma))
+    peaks.flags.writeable = False
+    return peaks
+
+
+def sorted_peaks_of_B(
+    B, theta, phi, num: int = 4, D: float = Dgs_MHz, gamma: float = gamma_MHz_mT
+) -> NDArray:
+    """Compute sorted peak positions for scalar (B, theta, phi) with memoization.
+
+    This is intended for model functions evaluated many times with the same B field
+    (e.g., the numerical derivatives with respect to other parameters).
+    The returned array is read-only.
+
+    """
+
+    return _sorted_peaks_of_B(float(B), float(theta), float(phi), num, float(D), float(gamma))
+
+
 def peaks_of_B(
     B, theta=None, phi=None, num: int = 4, D: float = Dgs_MHz, gamma: float = gamma_MHz_mT
 ) -> list[float]:
     """Compute peak positions (energies) for NV centers under B field (without E field)."""
 
+    return peaks_of_B_array(B, theta, phi, num=num, D=D, gamma=gamma).tolist()
+
+
+def peaks_of_B_eigh(
+    B, theta=None, phi=None, num: int = 4, D: float = Dgs_MHz, gamma: float = gamma_MHz_mT
+) -> list[float]:
+    """Compute peak positions by numerical diagonalization. Reference for peaks_of_B."""
+
     if theta is not None and phi is not None:
         B = B * np.array([np.sin(theta) * np.cos(phi), np.sin(theta) * np.sin(phi), np.cos(theta)])
     peaks = []
@@ -164,7 +250,7 @@ def peaks_of_B(
         H[2, 0] = gamma * (Bx - 1j * By) / np.sqrt(2)
         # we don't need to set these. only lower triangle is seen.
         # H[0, 1] = np.conjugate(H[1, 0]); H[0, 2] = np.conjugate(H[2, 0])
-        w = eigh(H, eigvals_only=True, lower=True)
+        w = linalg.eigh(H, eigvals_only=True, lower=True)
         peaks.extend([w[1] - w[0], w[2] - w[0]])
     return peaks
 
@@ -228,7 +314,7 @@ def peaks_of_BE(
         H[2, 0] = od2
         # we don't need to set these. only lower triangle is seen.
         # H[0, 1] = np.conjugate(H[1, 0]); H[0, 2] = np.conjugate(H[2, 0])
-        w = eigh(H, eigvals_only=True, lower=True)
+        w = linalg.eigh(H, eigvals_only=True, lower=True)
         peaks.extend([w[1] - w[0], w[2] - w[0]])
     return peaks
 
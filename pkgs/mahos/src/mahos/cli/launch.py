@@ -15,6 +15,11 @@ import importlib
 import argparse
 import multiprocessing as mp
 
+START_METHODS = ("spawn", "fork", "forkserver")
+
+#: Modules preloaded in the forkserver in addition to the modules of nodes.
+COMMON_PRELOAD = ("numpy", "zmq", "msgpack", "mahos.node.node", "mahos.node.comm")
+
 
 def build_parser(add_help: bool = True):
     parser = argparse.ArgumentParser(
@@ -32,6 +37,26 @@ def build_parser(add_help: bool = True):
         default=[],
         help="node names (or threaded nodes names) to exclude",
     )
+    parser.add_argument(
+        "-m",
+        "--start-method",
+        type=str,
+        choices=START_METHODS,
+        help="multiprocessing start method (default: launch_start_method in global conf)."
+        + " forkserver preloads the modules of nodes to launch.",
+    )
+    parser.add_argument(
+        "-r",
+        "--restart",
+        action="store_true",
+        help="restart the nodes terminated unexpectedly",
+    )
+    parser.add_argument(
+        "--max-restarts",
+        type=int,
+        help="max number of consecutive restarts of a node"
+        + " (default: launch_max_restarts in global conf or 5)",
+    )
     parser.add_argument(
         "include",
         type=str,
@@ -58,18 +83,65 @@ def is_gui_node_class(NodeClass):
     return issubclass(NodeClass, GUINode)
 
 
-def run_node_name_proc(gconf: dict, name: str, shutdown_ev: mp.Event):
+def _is_excluded_module(module: str, exclude) -> bool:
+    return any(module == m or module.startswith(m + ".") for m in exclude)
+
+
+def preload_modules(
+    gconf: dict, host: str, names: list[str], extra=None, exclude=None
+) -> list[str]:
+    """Get list of modules to preload in the forkserver.
+
+    The modules of the node classes in `names` are derived from the config
+    without importing them here.
+    GUI nodes (judged by the module path or class name) are excluded
+    because Qt should not be initialized in the forkserver.
+    The modules in `exclude` (or their submodules) are excluded too.
+    The modules that cannot be imported are ignored by the forkserver
+    (the error is reported by the node process).
+
+    """
+
+    from mahos.node.node import local_conf, join_name
+    from mahos.cli.threaded_nodes import is_gui_like_conf
+
+    exclude = list(exclude or [])
+    modules = list(COMMON_PRELOAD) + list(extra or [])
+    for name in names:
+        conf = local_conf(gconf, join_name((host, name)))
+        if "module" not in conf or is_gui_like_conf(conf):
+            continue
+        modules.append(conf["module"])
+    modules = [m for m in modules if not _is_excluded_module(m, exclude)]
+    return list(dict.fromkeys(modules))
+
+
+def _report_startup(n, name: str, launch_time: float, import_time: float):
+    t = time.time()
+    msg = "Started in {:.3f} sec (import: {:.3f} sec, init: {:.3f} sec)".format(
+        t - launch_time, import_time - launch_time, t - import_time
+    )
+    if hasattr(n, "logger"):
+        n.logger.info(msg)
+    else:
+        print(f"{name}: {msg}")
+
+
+def run_node_name_proc(gconf: dict, name: str, shutdown_ev: mp.Event, launch_time: float):
     from mahos.node.node import Node, local_conf
 
     conf = local_conf(gconf, name)
     module = importlib.import_module(conf["module"])
     NodeClass = getattr(module, conf["class"])
+    import_time = time.time()
 
     if issubclass(NodeClass, Node):
         n: Node = NodeClass(gconf, name)
+        _report_startup(n, name, launch_time, import_time)
         n.main_event(shutdown_ev)
     elif is_gui_node_class(NodeClass):
         n = NodeClass(gconf, name)
+        _report_startup(n, name, launch_time, import_time)
         n.main()
     else:
         raise ValueError(f"{name} isn't a valid Node class: {NodeClass.__name__}")
@@ -92,11 +164,11 @@ def start_node_name_proc(
 
     from mahos.node.node import join_name
 
-    shutdown_ev = mp.Event()
+    shutdown_ev = ctx.Event()
 
     proc = ctx.Process(
         target=run_node_name_proc,
-        args=(gconf, name, shutdown_ev),
+        args=(gconf, name, shutdown_ev, time.time()),
         name=join_name(name),
     )
     proc.start()
@@ -117,21 +189,39 @@ class Launcher(object):
         include: list[str] | None,
         exclude: list[str] | None,
         shutdown_delay_sec: float = 1.0,
+        start_method: str | None = None,
+        restart: bool = False,
+        max_restarts: int | None = None,
     ):
         from mahos.cli.util import init_gconf_host
         from mahos.node.log_broker import log_broker_is_up
-        from mahos.node.node import is_threaded, join_name
+        from mahos.node.node import is_threaded, join_name, GLOBAL_KEY
 
         self.gconf, self.host = init_gconf_host(gconf_fn, host)
         self.include = include or []
         self.exclude = exclude or []
 
-        self.ctx = mp.get_context()
+        gl = self.gconf.get(GLOBAL_KEY, {})
+        self.start_method = start_method or gl.get("launch_start_method")
+        self.ctx = mp.get_context(self.start_method)
+        self.restart = restart or gl.get("launch_restart", False)
+        if max_restarts is None:
+            max_restarts = gl.get("launch_max_restarts", 5)
+        self.max_restarts = max_restarts
         self.procs = {}
         self.shutdown_events = {}
         self.class_names = {}
 
         self.check_interval_sec = 0.5
+        # restart is delayed by backoff_sec * 2 ** (count - 1), up to max_backoff_sec.
+        # count is reset if the node has been alive for stable_sec.
+        self.restart_backoff_sec = 1.0
+        self.restart_max_backoff_sec = 60.0
+        self.restart_stable_sec = 60.0
+        self._start_times: dict[str, float] = {}
+        self._restart_counts: dict[str, int] = {}
+        # name: time to restart
+        self._pending_restarts: dict[str, float] = {}
         self.shutdown_delay_sec = shutdown_delay_sec
         self.shutdown_order = ["InstrumentServer", "LogBroker"]  # GlobalParams?
         self._threaded_node_names = []
@@ -148,6 +238,19 @@ class Launcher(object):
         if self._exclude_log:
             print(f"Automatically excluding {log_name} that's already up.")
 
+        if self.ctx.get_start_method() == "forkserver":
+            names = [n for n in self.gconf[self.host] if not self.is_excluded(n)]
+            self.preload = preload_modules(
+                self.gconf,
+                self.host,
+                names,
+                gl.get("launch_preload"),
+                gl.get("launch_preload_exclude"),
+            )
+            self.ctx.set_forkserver_preload(self.preload)
+        else:
+            self.preload = []
+
     def start_node(self, name: str):
         from mahos.node.node import local_conf
 
@@ -197,12 +300,14 @@ class Launcher(object):
             if ev is not None:
                 self.shutdown_events[n] = ev
             self.class_names[n] = class_name
+            self._start_times[n] = time.monotonic()
 
     def start_all_nodes(self):
         self.start_threaded_nodes()
         self.start_raw_nodes()
 
     def check_alive(self):
+        now = time.monotonic()
         terminated = []
         for name, proc in self.procs.items():
             if not proc.is_alive():
@@ -210,6 +315,28 @@ class Launcher(object):
                 terminated.append(name)
         for name in terminated:
             del self.procs[name]
+            if self.restart and self.class_names[name] != "ThreadedNodes":
+                self._schedule_restart(name, now)
+
+        for name, t in list(self._pending_restarts.items()):
+            if now >= t:
+                del self._pending_restarts[name]
+                proc, ev, _ = self.start_node(name)
+                self.procs[name] = proc
+                self.shutdown_events[name] = ev
+                self._start_times[name] = now
+
+    def _schedule_restart(self, name: str, now: float):
+        if now - self._start_times.get(name, now) >= self.restart_stable_sec:
+            self._restart_counts[name] = 0
+        count = self._restart_counts.get(name, 0) + 1
+        if count > self.max_restarts:
+            print(f"Not restarting {name}: restarted {self.max_restarts} times in a row.")
+            return
+        self._restart_counts[name] = count
+        delay = min(self.restart_backoff_sec * 2 ** (count - 1), self.restart_max_backoff_sec)
+        print(f"Restarting {name} in {delay:.1f} sec ({count}/{self.max_restarts}).")
+        self._pending_restarts[name] = now + delay
 
     def check_loop(self):
         while True:
@@ -247,8 +374,18 @@ class Launcher(object):
 def main(args=None):
     args = parse_args(args)
 
-    launcher = Launcher(args.conf, args.host, args.include, args.exclude)
+    launcher = Launcher(
+        args.conf,
+        args.host,
+        args.include,
+        args.exclude,
+        start_method=args.start_method,
+        restart=args.restart,
+        max_restarts=args.max_restarts,
+    )
     print("Launching at {} (config file: {}).".format(launcher.host, args.conf))
+    if launcher.preload:
+        print("Preloading modules in forkserver: {}".format(launcher.preload))
 
     if launcher.include:
         print("Including nodes: {}".format(launcher.include))
@@ -9,6 +9,7 @@ mahos log command.
 """
 
 import time
+import datetime
 import argparse
 from functools import partial
 
@@ -29,6 +30,31 @@ def build_parser(add_help: bool = True):
         default="DEBUG",
         help="log level (NOTSET|DEBUG|INFO|WARNING|ERROR|CRITICAL)",
     )
+    parser.add_argument(
+        "-i",
+        "--history",
+        action="store_true",
+        help="print stored logs (requires LogBroker's conf store = true) instead of subscribing",
+    )
+    parser.add_argument(
+        "-s",
+        "--since",
+        type=str,
+        help="start of time range for --history (ISO format or relative: 30s, 10m, 2h, 1d)",
+    )
+    parser.add_argument(
+        "-u",
+        "--until",
+        type=str,
+        help="end of time range for --history (ISO format or relative: 30s, 10m, 2h, 1d)",
+    )
+    parser.add_argument(
+        "-n",
+        "--name",
+        type=str,
+        nargs="*",
+        help="node names (name or host::name) to filter logs for --history",
+    )
     parser.add_argument(
         "node",
         type=str,
@@ -46,6 +72,44 @@ def parse_args(args):
     return args
 
 
+_TIME_UNITS = {"s": 1.0, "m": 60.0, "h": 3600.0, "d": 86400.0}
+
+
+def parse_time(s: str | None) -> float | None:
+    """Parse ISO format or relative (e.g. 10m for 10 minutes ago) time to UNIX time."""
+
+    if s is None:
+        return None
+    if s[-1:] in _TIME_UNITS:
+        try:
+            return time.time() - float(s[:-1]) * _TIME_UNITS[s[-1]]
+        except ValueError:
+            pass
+    return datetime.datetime.fromisoformat(s).timestamp()
+
+
+def print_history(gconf: dict, joined_name: str, args):
+    from mahos.node.node import local_conf
+    from mahos.node.log_broker import (
+        LogStore,
+        log_store_directory,
+        format_log,
+        format_log_term_color,
+    )
+
+    directory = log_store_directory(local_conf(gconf, joined_name), joined_name)
+    fmt = format_log_term_color if args.color else format_log
+    logs = LogStore.query(
+        directory,
+        since=parse_time(args.since),
+        until=parse_time(args.until),
+        level=args.level,
+        names=args.name or None,
+    )
+    for _, log in logs:
+        print(fmt(log), end="")
+
+
 def main(args=None):
     from mahos.node.node import join_name, is_threaded
     from mahos.node.log_broker import (
@@ -69,6 +133,9 @@ def main(args=None):
     gconf, host, node = init_gconf_host_node(args.conf, args.host, args.node)
     joined_name = join_name((host, node))
 
+    if args.history:
+        return print_history(gconf, joined_name, args)
+
     if (
         host_is_local(gconf, host)
         and not is_threaded(gconf, joined_name)
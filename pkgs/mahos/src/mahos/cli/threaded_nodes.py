@@ -13,7 +13,14 @@ import time
 import importlib
 import multiprocessing as mp
 
-from mahos.node.node import Node, join_name, local_conf, start_node_thread, threaded_nodes
+from mahos.node.node import (
+    Node,
+    join_name,
+    local_conf,
+    get_value,
+    start_node_thread,
+    threaded_nodes,
+)
 from mahos.node.comm import Context
 
 
@@ -38,6 +45,24 @@ def gui_nodes_in_group(gconf: dict, host: str, node_names: list[str]) -> list[st
     return gui_names
 
 
+def tcp_endpoints_in_group(gconf: dict, host: str, node_names: list[str]) -> set[str]:
+    """Get TCP endpoints bound by the nodes in a group (with auto_transport enabled).
+
+    These endpoints are accessed via inproc transport within the group.
+
+    """
+
+    endpoints = set()
+    for node_name in node_names:
+        conf = local_conf(gconf, join_name((host, node_name)))
+        if not get_value(gconf, conf, "auto_transport", True):
+            continue
+        for key, value in conf.items():
+            if key.endswith("_endpoint") and isinstance(value, str) and value.startswith("tcp://"):
+                endpoints.add(value)
+    return endpoints
+
+
 def start_gui_node_thread_lazy(ctx: Context, NodeClass, gconf: dict, name: str):
     from mahos.gui.gui_node import start_gui_node_thread
 
@@ -78,6 +103,9 @@ class ThreadedNodes(object):
                 "discouraged on Windows "
                 "because native module import order can cause crashes."
             )
+        ctx.inproc_endpoints.update(
+            tcp_endpoints_in_group(self.gconf, self.host, tnodes[self.name])
+        )
 
         for node_name in tnodes[self.name]:
             name = join_name((self.host, node_name))
@@ -155,7 +183,7 @@ def run_threaded_nodes_proc(gconf: dict, host: str, name: str, shutdown_ev: mp.E
 def start_threaded_nodes_proc(
     ctx: mp.context.BaseContext, gconf: dict, host: str, name: str
 ) -> (mp.Process, mp.Event):
-    shutdown_ev = mp.Event()
+    shutdown_ev = ctx.Event()
     proc = ctx.Process(target=run_threaded_nodes_proc, args=(gconf, host, name, shutdown_ev))
     proc.start()
     return proc, shutdown_ev
@@ -29,7 +29,7 @@ class QSubWorker(QtCore.QObject):
         self._closed = False
 
     def add_handler(self, lconf: dict, topic: bytes, handler, endpoint: str = "pub_endpoint"):
-        self.ctx.add_sub(lconf[endpoint], topic, handler)
+        return self.ctx.add_sub(lconf[endpoint], topic, handler)
 
     def close(self):
         self._closed = True
@@ -39,8 +39,19 @@ class QSubWorker(QtCore.QObject):
             self.ctx.poll()
 
 
+#: Default of conf ``gui_coalesce``.
+DEFAULT_COALESCE = {"data": 0.0, "buffer": 0.0}
+
+
 class QNodeClient(QtCore.QObject):
-    """Qt-based client to use Node's function."""
+    """Qt-based client to use Node's function.
+
+    The subscribed messages of the topics in conf ``gui_coalesce`` (mapping from topic to
+    max delivery rate in Hz, 0 for no limit) are coalesced:
+    only the newest message is delivered so that the GUI doesn't lag behind
+    when the node publishes faster than the GUI can draw.
+
+    """
 
     def __init__(
         self,
@@ -53,6 +64,7 @@ class QNodeClient(QtCore.QObject):
         self._host, self._name, self.conf, self.ctx = init_node_client(
             gconf, name, context=context
         )
+        self.ctx.set_coalesce(get_value(gconf, self.conf, "gui_coalesce", DEFAULT_COALESCE))
 
         self._subscribers = []
         self._closed = False
@@ -80,6 +92,11 @@ class QNodeClient(QtCore.QObject):
         thread.start()  # QtCore.QTimer.singleShot(0, self.sub_thread.start)
         self._subscribers.append((sub, thread))
 
+    def dropped_counts(self) -> dict[str, int]:
+        """Get number of subscribed messages dropped by coalescing for each topic."""
+
+        return {t.decode(): n for t, n in self.ctx.dropped_counts().items()}
+
     def name(self) -> tuple[str, str]:
         return (self._host, self._name)
 
@@ -14,7 +14,7 @@ import multiprocessing as mp
 import threading as mt
 import importlib.resources
 
-from mahos.node.node import NodeBase, join_name
+from mahos.node.node import NodeBase, join_name, sub_proxy_endpoints
 from mahos.node.comm import Context
 from mahos.gui.Qt import QtWidgets, QtCore
 from mahos.util.typing import NodeName
@@ -28,6 +28,13 @@ class GUINode(NodeBase):
     def __init__(self, gconf: dict, name: NodeName, context: Context | None = None):
         NodeBase.__init__(self, gconf, name)
 
+        if "target" in self.conf and "sub_proxy" in self.conf["target"]:
+            # the clients created with this context subscribe through the SubProxy.
+            context = Context(context=context)
+            context.sub_endpoints.update(
+                sub_proxy_endpoints(gconf, self.conf["target"]["sub_proxy"])
+            )
+
         self.app = QtWidgets.QApplication(sys.argv)
         self.load_stylesheet()
 
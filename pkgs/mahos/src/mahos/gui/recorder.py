@@ -32,9 +32,10 @@ from mahos.util.unit import SI_scale
 
 
 class PlotWidget(QtWidgets.QWidget):
-    def __init__(self, parent=None):
+    def __init__(self, max_points: int = 0, parent=None):
         QtWidgets.QWidget.__init__(self, parent)
 
+        self.max_points = max_points
         self._units = []
         self._plots = []
         self.init_ui()
@@ -79,11 +80,13 @@ class PlotWidget(QtWidgets.QWidget):
         self.set_axes(data)
 
         unit_to_channels = data.get_unit_to_channels()
-        x = data.get_xdata()
         for plot, channels in zip(self._plots, unit_to_channels.values()):
             plot.clearPlots()
             for ch, color in zip(channels, cycle(colors_tab10())):
-                y = data.get_ydata(ch)
+                if data.get_ydata(ch).dtype.kind in "biuf":
+                    x, y = data.get_downsampled(ch, self.max_points)
+                else:
+                    x, y = data.get_xdata(), data.get_ydata(ch)
                 plot.plot(x, y, name=ch, pen=color, width=1)
 
         latest_data = []
@@ -245,7 +248,7 @@ class RecorderMainWindow(QtWidgets.QMainWindow):
         lconf = local_conf(gconf, name)
         target = lconf["target"]
 
-        self.plot = PlotWidget(parent=self)
+        self.plot = PlotWidget(max_points=lconf.get("max_points", 0), parent=self)
         self.meas = RecorderWidget(
             gconf, target["recorder"], target["gparams"], self.plot, context, parent=self
         )
@@ -275,6 +278,10 @@ class RecorderGUI(GUINode):
     :type target.recorder: tuple[str, str] | str
     :param target.gparams: Target GlobalParams node full name.
     :type target.gparams: tuple[str, str] | str
+    :param max_points: (default: 0) Maximum number of points to plot for each channel.
+        Long history is downsampled keeping the minimum and maximum values.
+        Non-positive value disables the downsampling.
+    :type max_points: int
 
     """
 
@@ -138,10 +138,12 @@ class InstrumentInterface(object):
 
         return self.cli.help(self.inst, func)
 
-    def get_param_dict(self, label: str = "") -> P.ParamDict[str, P.PDValue] | None:
-        """Get ParamDict for `label`."""
+    def get_param_dict(
+        self, label: str = "", refresh: bool = False
+    ) -> P.ParamDict[str, P.PDValue] | None:
+        """Get ParamDict for `label`. If `refresh` is True, the server's cache is bypassed."""
 
-        return self.cli.get_param_dict(self.inst, label)
+        return self.cli.get_param_dict(self.inst, label, refresh)
 
     def get_param_dict_labels(self) -> list[str]:
         """Get list of available ParamDict labels."""
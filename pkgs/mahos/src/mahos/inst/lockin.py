@@ -639,36 +639,42 @@ class LI5640(VisaInstrument):
         """execute setting initialization."""
 
         self.inst.write("INIT")
+        self.invalidate_state()
         return True
 
     def set_auto(self) -> bool:
         """execute auto setting."""
 
         self.inst.write("ASET")
+        self.invalidate_state()
         return True
 
     def set_auto_phase_offset(self) -> bool:
         """set auto phase offset."""
 
         self.inst.write("APHS")
+        self.invalidate_state()
         return True
 
     def set_auto_sensitivity(self) -> bool:
         """execute auto sensitivity setting."""
 
         self.inst.write("ASEN")
+        self.invalidate_state()
         return True
 
     def set_auto_time_constant(self) -> bool:
         """execute auto time constant setting."""
 
         self.inst.write("ATIM")
+        self.invalidate_state()
         return True
 
     def set_auto_offset(self) -> bool:
         """execute auto offset setting."""
 
         self.inst.write("AOFS")
+        self.invalidate_state()
         return True
 
     def _check_and_set(self, key: str, value) -> bool:
@@ -1378,18 +1384,21 @@ class SR860(VisaInstrument):
         """set auto phase offset."""
 
         self.inst.write("APHS")
+        self.invalidate_state()
         return True
 
     def set_auto_range(self) -> bool:
         """execute auto range setting."""
 
         self.inst.write("ARNG")
+        self.invalidate_state()
         return True
 
     def set_auto_scale(self) -> bool:
         """execute auto scale setting."""
 
         self.inst.write("ASCL")
+        self.invalidate_state()
         return True
 
     def _check_and_set(self, key: str, value) -> bool:
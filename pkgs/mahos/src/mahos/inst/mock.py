@@ -15,8 +15,8 @@ import enum
 import numpy as np
 
 from mahos.inst.instrument import Instrument
-from mahos.inst.pg_core import DTGCoreMixin
-from mahos.inst.tdc_core import TDCBase
+from mahos.inst.pg_core import DTGCoreMixin, PulseStreamerCoreMixin, dtg_io
+from mahos.inst.tdc_core import TDCBase, PhotonEventSimulator
 from mahos.msgs.inst.piezo_msgs import Axis
 from mahos.msgs.inst.camera_msgs import FrameResult
 from mahos.msgs.inst.tdc_msgs import ChannelStatus, RawEvents
@@ -573,6 +573,21 @@ class TDC_mock(TDCBase):
     This mock uses internal defaults for range and timing and does not require
     static configuration keys.
 
+    If the simulator is enabled (by conf or set("simulator", params)),
+    histograms and raw events (including chunks by get("raw_events_chunk"))
+    are generated by PhotonEventSimulator according to the elapsed time of measurement.
+    Otherwise, dummy (Gaussian noise) histograms and raw events are returned.
+
+    :param simulator: Optional parameters for PhotonEventSimulator.
+        Besides the arguments of PhotonEventSimulator, it can include
+        ``blocks`` (Blocks played by PG, can be given only via set()),
+        ``freq`` (PG frequency, default: 2.0e9),
+        ``period`` and ``laser_width`` (used to build simple laser-only blocks if
+        ``blocks`` is not given, default: 10e-6 and 3e-6),
+        and ``run_length`` (fixed length of raw events in sec,
+        default: elapsed time of measurement).
+    :type simulator: dict
+
     """
 
     def __init__(self, name, conf=None, prefix=None):
@@ -583,10 +598,66 @@ class TDC_mock(TDCBase):
         self._starts = 0
         self._mean_events = 0.0
         self._tstart = time.time()
+        self._tstop = None
         self._running = False
         self._num_histo = 1
 
+        self._sim_params = self.conf.get("simulator")
+        self._simulator = None
+        self._sim_hist = None
+        self._sim_time = 0.0
+        self._chunk_periods = 0
+        self._chunk_head = 0
+
+    def _make_simulator(self) -> PhotonEventSimulator:
+        params = self._sim_params.copy()
+        freq = params.pop("freq", 2.0e9)
+        period = params.pop("period", 10e-6)
+        laser_width = params.pop("laser_width", 3e-6)
+        params.pop("run_length", None)
+        blocks = params.pop("blocks", None)
+        if blocks is None:
+            w = int(round(laser_width * freq))
+            blocks = Blocks([Block("sim", [("laser", w), (None, int(round(period * freq)) - w)])])
+        return PhotonEventSimulator(blocks, freq, tbin=self._bin, **params)
+
+    def _runtime(self) -> float:
+        if self._running or self._tstop is None:
+            return time.time() - self._tstart
+        return self._tstop - self._tstart
+
+    def _update_sim_hist(self):
+        runtime = self._runtime()
+        n = self._simulator.num_periods(runtime) - self._simulator.num_periods(self._sim_time)
+        if n > 0:
+            self._sim_hist += self._simulator.histogram(n * self._simulator.period, self._range)
+            self._sim_time = runtime
+
+    def _reset_sim_hist(self):
+        # (re-)allocate for current range. events are accumulated from now on.
+        self._sim_hist = np.zeros(self._range, dtype=np.uint64)
+        self._sim_time = self._runtime()
+
+    def set_simulator(self, params: dict | None) -> bool:
+        self._sim_params = params
+        self._simulator = None
+        self._sim_hist = None
+        if params is None:
+            return True
+        try:
+            self._simulator = self._make_simulator()
+        except Exception:
+            self.logger.exception("Failed to initialize simulator.")
+            self._sim_params = None
+            return False
+        self._reset_sim_hist()
+        return True
+
     def get_data(self, ch: int):
+        if self._simulator is not None and self._num_histo == 1:
+            self._update_sim_hist()
+            return self._sim_hist.copy()
+
         self._mean_events += 1.0
         if self._num_histo == 1:
             shape = self._range
@@ -596,15 +667,32 @@ class TDC_mock(TDCBase):
         return data
 
     def get_status(self, ch: int) -> ChannelStatus:
-        runtime = time.time() - self._tstart
+        runtime = self._runtime()
         # dummy status
         total = 0
         self._starts += 1
         return ChannelStatus(self._running, runtime, total, self._starts)
 
     def get_raw_events(self) -> RawEvents | None:
+        if self._simulator is not None:
+            self._simulator.reset()
+            run_length = self._sim_params.get("run_length") or self._runtime()
+            return self._simulator.raw_events(run_length)
+
         return RawEvents(np.arange(0, 10_000_000, 10, dtype=np.uint64))
 
+    def get_raw_events_chunk(self, final: bool = False) -> RawEvents:
+        if self._simulator is not None:
+            run_length = self._sim_params.get("run_length") or self._runtime()
+            n = max(self._simulator.num_periods(run_length) - self._chunk_periods, 0)
+            self._chunk_periods += n
+            return RawEvents(self._simulator.next_chunk(n))
+
+        # the dummy events are returned at once.
+        events = np.arange(self._chunk_head, 10_000_000, 10, dtype=np.uint64)
+        self._chunk_head = 10_000_000
+        return RawEvents(events)
+
     # Standard API
 
     def configure(self, params: dict, label: str = "") -> bool:
@@ -617,6 +705,9 @@ class TDC_mock(TDCBase):
             self._num_histo = params["num"]
         else:
             self._num_histo = 1
+        if self._sim_params is not None:
+            # re-create simulator to reflect the time bin.
+            return self.set_simulator(self._sim_params)
         return True
 
     def set(self, key: str, value=None, label: str = "") -> bool:
@@ -624,6 +715,8 @@ class TDC_mock(TDCBase):
             return True
         elif key == "sweeps":
             return True
+        elif key == "simulator":
+            return self.set_simulator(value)
         else:
             self.logger.error(f"unknown set() key: {key}")
             return False
@@ -645,6 +738,8 @@ class TDC_mock(TDCBase):
             return self.get_status(args)
         elif key == "raw_events":
             return self.get_raw_events()
+        elif key == "raw_events_chunk":
+            return self.get_raw_events_chunk(bool(args))
         else:
             self.logger.error(f"unknown get() key: {key}")
             return None
@@ -655,6 +750,15 @@ class TDC_mock(TDCBase):
         self._starts = 0
         self._mean_events = 0.0
         self._tstart = time.time()
+        self._tstop = None
+        self._chunk_periods = 0
+        self._chunk_head = 0
+        if self._sim_params is not None and self._simulator is None:
+            if not self.set_simulator(self._sim_params):
+                return False
+        if self._simulator is not None:
+            self._simulator.reset()
+            self._reset_sim_hist()
         return True
 
     def resume(self, label: str = "") -> bool:
@@ -664,6 +768,8 @@ class TDC_mock(TDCBase):
 
     def stop(self, label: str = "") -> bool:
         self.logger.info("Stopped dummy TDC.")
+        if self._running:
+            self._tstop = time.time()
         self._running = False
         return True
 
@@ -902,9 +1008,18 @@ class Params_mock(Instrument):
         self.paramB: float = 0.5
         self.paramC: str = "aaa"
         self.paramD: bool = False
+        #: number of get_param_dict() calls (to check the cache of server).
+        self.reads: int = 0
 
     # Standard API
 
+    def get(self, key: str, args=None, label: str = ""):
+        if key == "reads":
+            return self.reads
+        else:
+            self.logger.error(f"unknown get() key: {key}")
+            return None
+
     def start(self, label: str = "") -> bool:
         self.logger.info(f"Start {label}")
         return True
@@ -927,6 +1042,7 @@ class Params_mock(Instrument):
             return True
 
     def get_param_dict(self, label: str = "") -> P.ParamDict[str, P.PDValue] | None:
+        self.reads += 1
         if label == "labelA":
             return P.ParamDict(
                 paramA=P.IntParam(self.paramA, 0, 10),
@@ -969,9 +1085,19 @@ class DTG5274_mock(Instrument, DTGCoreMixin):
         # last total block length and offsets.
         self.length = 0
         self.offsets = None
+        # stands for the transfer buffer of the instrument.
+        self._transfer_buffer = bytearray()
 
         self.logger.info(f"opened {name} (mock)")
 
+    def _upload(self, tree) -> bool:
+        size = dtg_io.tree_nbytes(tree)
+        if len(self._transfer_buffer) < size:
+            self._transfer_buffer = bytearray(size)
+        dtg_io.dump_tree_into(tree, self._transfer_buffer)
+        self.logger.debug(f"Uploaded DTG setup ({size} bytes).")
+        return True
+
     def block_granularity(self, freq):
         return 4
 
@@ -997,7 +1123,9 @@ class DTG5274_mock(Instrument, DTGCoreMixin):
         tree = self._configure_tree_blocks(
             blocks, freq, trigger_positive, scaffold_name=scaffold_name, endless=endless
         )
-        return tree is not None
+        if tree is None:
+            return False
+        return self._upload(tree)
 
     def configure_blockseq(
         self,
@@ -1015,7 +1143,9 @@ class DTG5274_mock(Instrument, DTGCoreMixin):
         tree = self._configure_tree_blockseq(
             blockseq, freq, trigger_positive, scaffold_name=scaffold_name, endless=endless
         )
-        return tree is not None
+        if tree is None:
+            return False
+        return self._upload(tree)
 
     def get_finished(self) -> bool:
         time.sleep(0.01)
@@ -1087,7 +1217,7 @@ class DTG5274_mock(Instrument, DTGCoreMixin):
             return None
 
 
-class PulseStreamer_mock(Instrument):
+class PulseStreamer_mock(Instrument, PulseStreamerCoreMixin):
     """Mock Swabian PulseStreamer with digital and optional analog conversion.
 
     :param resource: Resource identifier string used for connection logging.
@@ -1121,6 +1251,7 @@ class PulseStreamer_mock(Instrument):
             self.analog_values = {}
         self._strict = conf.get("strict", True)
 
+        self.sequence = None
         # last total block length and offsets.
         self.length = 0
         self.offsets = None
@@ -1165,35 +1296,13 @@ class PulseStreamer_mock(Instrument):
                 trigger = True
         return trigger
 
-    def _generate_seq_blocks(self, blocks: Blocks[Block]):
-        rle_patterns = [(ch, []) for ch in self._included_channels_blocks(blocks)]
-        a0_patterns = []
-        a1_patterns = []
-        _analog_given = bool(blocks.analog_channels())
+    def _generate_seq_blocks(self, blocks: Blocks[Block]) -> int:
+        """Generate run-length encoded patterns from blocks and return the duration."""
 
-        for i, block in enumerate(blocks):
-            for channels, length in block.total_pattern():
-                high_channels = self.channels_to_ints(channels)
-                for ch, pat in rle_patterns:
-                    pat.append((length, 1 if ch in high_channels else 0))
-
-                if _analog_given:
-                    # if any AnalogChannel is involved, use these values instead of
-                    # sparse D/A conversion using self.analog_values
-                    a0 = block.analog_value(self.analog_channels[0], channels)
-                    a0_patterns.append((length, a0))
-                    a1 = block.analog_value(self.analog_channels[1], channels)
-                    a1_patterns.append((length, a1))
-                elif self.analog_channels:
-                    # self.analog_channels are included as digital channels in blocks.
-                    # perform sparse D/A conversion using self.analog_values
-                    label = "".join(
-                        ("1" if ch in channels else "0" for ch in self.analog_channels)
-                    )
-                    a0, a1 = self.analog_values[label]
-                    a0_patterns.append((length, a0))
-                    a1_patterns.append((length, a1))
-        return
+        digital, analog = self._generate_rle_blocks(blocks)
+        self.sequence = (digital, analog)
+        durations = [d for d, _ in list(digital.values()) + analog]
+        return int(durations[0].sum()) if durations else 0
 
     def _scale_blocks(self, blocks: Blocks[Block], freq: float) -> Blocks[Block] | None:
         """Return scaled blocks according to freq, or None if any failure."""
@@ -1277,11 +1386,15 @@ class PulseStreamer_mock(Instrument):
         self.length = blocks.total_length()
 
         try:
-            self._generate_seq_blocks(blocks)
+            duration = self._generate_seq_blocks(blocks)
         except ValueError:
             self.logger.exception("Failed to generate sequence. Check channel name settings.")
             return False
 
+        # sanity check
+        if duration != self.length:
+            return self.fail_with("length is not correct. Debug _generate_seq_blocks().")
+
         msg = f"Configured sequence. length: {self.length} offset: {self.offsets[-1]}"
         msg += f" trigger: {trigger}"
         self.logger.info(msg)
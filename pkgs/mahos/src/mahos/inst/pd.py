@@ -13,11 +13,13 @@ import os
 import ctypes
 
 import numpy as np
-from scipy.interpolate import InterpolatedUnivariateSpline
 
 from mahos.inst.instrument import Instrument
 from mahos.inst.daq import AnalogIn, BufferedEdgeCounter
 from mahos.msgs import param_msgs as P
+from mahos.util.lazy import lazy_import
+
+interpolate = lazy_import("scipy.interpolate")
 
 
 class SinglePhotonCounter(BufferedEdgeCounter):
@@ -59,7 +61,7 @@ class SinglePhotonCounter(BufferedEdgeCounter):
             self._spline = None
         else:
             self.check_required_conf(("corr_x_kcps", "corr_y"))
-            self._spline = InterpolatedUnivariateSpline(
+            self._spline = interpolate.InterpolatedUnivariateSpline(
                 1e3 * np.array(self.conf["corr_x_kcps"]), np.array(self.conf["corr_y"])
             )
 
@@ -12,9 +12,11 @@ from __future__ import annotations
 import typing as T
 import sys
 import os
+import time
 import ctypes as C
 
 from mahos.inst.instrument import Instrument
+from mahos.inst.pg_core.compress import compress_blocks, estimate_instructions
 from mahos.msgs.inst.pg_msgs import TriggerType, Block, Blocks, BlockSeq
 from mahos.util.unit import SI_scale
 
@@ -49,6 +51,11 @@ class SpinCore_PulseBlasterESR_PRO(Instrument):
     :param sanity_check: (default: False) Set True to run a sanity check on BlockSeq fixing.
         Note that this can be very time-consuming for long pulse pattern.
     :type sanity_check: bool
+    :param compress: (default: False) Set True to always compress Blocks into BlockSeq
+        by detecting repeated patterns (converted to loops) in configure_blocks().
+        Even if False, compression is performed when the Blocks are estimated to
+        exceed max_instructions.
+    :type compress: bool
 
     """
 
@@ -113,6 +120,7 @@ class SpinCore_PulseBlasterESR_PRO(Instrument):
         self._max_loop_num = self.conf.get("max_loop_num", 1_048_576)
         self._verbose = self.conf.get("verbose", False)
         self._sanity_check = self.conf.get("sanity_check", False)
+        self._compress = self.conf.get("compress", False)
         self._last_addr = 0
 
     def close_resources(self):
@@ -296,13 +304,28 @@ class SpinCore_PulseBlasterESR_PRO(Instrument):
                     return False
         return True
 
+    def _estimate_instructions_blocks(self, blocks: Blocks[Block], trigger: bool) -> int:
+        """Estimate number of instructions to configure blocks without compression."""
+
+        n = 3 if trigger else 0  # _make_trigger_block()
+        for i, block in enumerate(blocks):
+            if not trigger and i == len(blocks) - 1:
+                n += block.total_pattern_num()
+            else:
+                n += block.raw_pattern_num()
+        return n
+
     def configure_blocks(
         self,
         blocks: Blocks[Block],
         freq: float,
         trigger_type: TriggerType | None = None,
     ) -> bool:
-        """Make sequence from blocks."""
+        """Make sequence from blocks.
+
+        The blocks are compressed into BlockSeq (see compress conf) if necessary.
+
+        """
 
         if freq != self._freq:
             return self.fail_with("freq must be {:.1f} MHz".format(self._freq * 1e-6))
@@ -311,6 +334,19 @@ class SpinCore_PulseBlasterESR_PRO(Instrument):
         if trigger is None:
             return False
 
+        inst_num = self._estimate_instructions_blocks(blocks, trigger)
+        if self._compress or inst_num > self._max_instructions:
+            blockseq = compress_blocks(blocks)
+            self.logger.info(
+                "Compressed blocks into loops. Estimated inst: {} -> {}".format(
+                    inst_num, estimate_instructions(blockseq)
+                )
+            )
+            if not self.configure_blockseq(blockseq, freq, trigger_type=trigger_type):
+                return False
+            self.offsets = [0] * len(blocks)
+            return True
+
         self.offsets = [0] * len(blocks)
         self.length = blocks.total_length()
 
@@ -318,6 +354,7 @@ class SpinCore_PulseBlasterESR_PRO(Instrument):
             return self.fail_with("Failed to stop.")
 
         # 0 is PULSE_PROGRAM
+        t0 = time.perf_counter()
         if not self.check_error(self.dll.pb_start_programming(0)):
             return self.fail_with("Failed to start programming.")
         try:
@@ -335,6 +372,7 @@ class SpinCore_PulseBlasterESR_PRO(Instrument):
         scale, prefix = SI_scale(length_s)
         msg = f"Configured with blocks. length: {self.length} ({length_s * scale:.3f} {prefix}s),"
         msg += f" {self._last_addr + 1}/{self._max_instructions} inst"
+        msg += f", programmed in {time.perf_counter() - t0:.3f} s"
         self.logger.info(msg)
         return True
 
@@ -683,6 +721,7 @@ class SpinCore_PulseBlasterESR_PRO(Instrument):
             return self.fail_with("Failed to stop.")
 
         # 0 is PULSE_PROGRAM
+        t0 = time.perf_counter()
         if not self.check_error(self.dll.pb_start_programming(0)):
             return self.fail_with("Failed to start programming.")
         try:
@@ -702,6 +741,7 @@ class SpinCore_PulseBlasterESR_PRO(Instrument):
             f"Configured with blockseq. length: {self.length} ({length_s * scale:.3f} {prefix}s),"
         )
         msg += f" {self._last_addr + 1}/{self._max_instructions} inst"
+        msg += f", programmed in {time.perf_counter() - t0:.3f} s"
         self.logger.info(msg)
         return True
 
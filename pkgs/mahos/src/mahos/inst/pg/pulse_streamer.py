@@ -13,10 +13,11 @@ from __future__ import annotations
 import pulsestreamer
 
 from mahos.inst.instrument import Instrument
+from mahos.inst.pg_core import PulseStreamerCoreMixin
 from mahos.msgs.inst.pg_msgs import TriggerType, Block, Blocks, BlockSeq, AnalogChannel
 
 
-class PulseStreamer(Instrument):
+class PulseStreamer(Instrument, PulseStreamerCoreMixin):
     """Swabian Instruments Pulse Streamer 8/2.
 
     :param channels: mapping from channel names to indices.
@@ -128,40 +129,12 @@ class PulseStreamer(Instrument):
     def _generate_seq_blocks(self, blocks: Blocks[Block]) -> pulsestreamer.Sequence:
         """Generate sequence from blocks."""
 
-        rle_patterns = [(ch, []) for ch in self._included_channels_blocks(blocks)]
-        a0_patterns = []
-        a1_patterns = []
-        _analog_given = bool(blocks.analog_channels())
-
-        for i, block in enumerate(blocks):
-            for channels, length in block.total_pattern():
-                high_channels = self.channels_to_ints(channels)
-                for ch, pat in rle_patterns:
-                    pat.append((length, 1 if ch in high_channels else 0))
-
-                if _analog_given:
-                    # if any AnalogChannel is involved, use these values instead of
-                    # sparse D/A conversion using self.analog_values
-                    a0 = block.analog_value(self.analog_channels[0], channels)
-                    a0_patterns.append((length, a0))
-                    a1 = block.analog_value(self.analog_channels[1], channels)
-                    a1_patterns.append((length, a1))
-                elif self.analog_channels:
-                    # self.analog_channels are included as digital channels in blocks.
-                    # perform sparse D/A conversion using self.analog_values
-                    label = "".join(
-                        ("1" if ch in channels else "0" for ch in self.analog_channels)
-                    )
-                    a0, a1 = self.analog_values[label]
-                    a0_patterns.append((length, a0))
-                    a1_patterns.append((length, a1))
-
+        digital, analog = self._generate_rle_blocks(blocks)
         seq = self.ps.createSequence()
-        for ch, pat in rle_patterns:
-            seq.setDigital(ch, pat)
-        if self.analog_channels:
-            seq.setAnalog(0, a0_patterns)
-            seq.setAnalog(1, a1_patterns)
+        for ch, rle in digital.items():
+            seq.setDigital(ch, rle)
+        for ch, rle in enumerate(analog):
+            seq.setAnalog(ch, rle)
 
         return seq
 
@@ -7,5 +7,6 @@ Core shared components for PG (Pulse Generator) module
 """
 
 from mahos.inst.pg_core.dtg_core import DTGCoreMixin
+from mahos.inst.pg_core.pulse_streamer_core import PulseStreamerCoreMixin
 
-__all__ = ["DTGCoreMixin"]
+__all__ = ["DTGCoreMixin", "PulseStreamerCoreMixin"]
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+
+"""
+Pattern compression (loop detection) for Pulse Generators with loop instructions.
+
+.. This file is a part of MAHOS project, which is released under the 3-Clause BSD license.
+.. See included LICENSE file or https://github.com/ToyotaCRDL/mahos/blob/main/LICENSE for details.
+
+"""
+
+from __future__ import annotations
+import typing as T
+
+from mahos.msgs.inst.pg_msgs import Block, Blocks, BlockSeq
+
+
+def find_repeats(
+    keys: list[T.Hashable], max_period: int = 64, min_period: int = 1
+) -> list[tuple[int, int, int]]:
+    """Find tandem repeats in `keys` by greedy (LZ-style) scan from the head.
+
+    At each position, the period (in [min_period, max_period]) removing
+    the most elements by repetition is taken.
+
+    :returns: list of segments (start, period, count) covering whole `keys` in order.
+        The literal (not repeated) segment is represented with count = 1.
+
+    """
+
+    # intern keys to ints for fast comparison of slices.
+    table = {}
+    ids = [table.setdefault(k, len(table)) for k in keys]
+    n = len(ids)
+
+    segments = []
+    literal = i = 0
+    while i < n:
+        best_gain, best = 0, None
+        for k in range(min_period, min(max_period, (n - i) // 2) + 1):
+            if ids[i + k] != ids[i]:
+                continue
+            head = ids[i : i + k]
+            r = 1
+            while ids[i + r * k : i + (r + 1) * k] == head:
+                r += 1
+            gain = (r - 1) * k
+            if gain > best_gain:
+                best_gain, best = gain, (k, r)
+        if best is None:
+            i += 1
+            continue
+        if literal < i:
+            segments.append((literal, i - literal, 1))
+        k, r = best
+        segments.append((i, k, r))
+        i += k * r
+        literal = i
+    if literal < n:
+        segments.append((literal, n - literal, 1))
+    return segments
+
+
+def pattern_key(bs: Block | BlockSeq) -> tuple:
+    """Hashable key of Block / BlockSeq representing the pattern (ignoring names)."""
+
+    if isinstance(bs, Block):
+        return ("B", tuple(bs.pattern), bs.Nrep)
+    return ("S", tuple(pattern_key(b) for b in bs.data), bs.Nrep)
+
+
+def estimate_instructions(bs: Block | BlockSeq) -> int:
+    """Estimate number of instructions assuming loops are implemented by flags of instructions.
+
+    Note that actual number can be slightly larger due to the fixes of nested loops.
+
+    """
+
+    if isinstance(bs, Block):
+        return len(bs.pattern)
+    return sum(estimate_instructions(b) for b in bs.data)
+
+
+def _looped_block(name: str, pattern: list, Nrep: int) -> Block:
+    if len(pattern) == 1 and Nrep > 1:
+        # loop of single pulse is just a long pulse.
+        channels, duration = pattern[0]
+        return Block(name, [(channels, duration * Nrep)])
+    return Block(name, pattern, Nrep=Nrep)
+
+
+def compress_pattern(block: Block, max_period: int = 64) -> list[Block]:
+    """Split the pattern of `block` (Nrep is ignored) into Blocks of repeated sub-patterns."""
+
+    pattern = block.simplify().pattern
+    # contiguous pulses with same channels have been merged. single pulse is never repeated.
+    segments = find_repeats(pattern, max_period=max_period, min_period=2)
+    if len(segments) == 1:
+        s, k, r = segments[0]
+        return [_looped_block(block.name, pattern[s : s + k], r)]
+    return [
+        _looped_block(f"{block.name}_{j}", pattern[s : s + k], r)
+        for j, (s, k, r) in enumerate(segments)
+    ]
+
+
+def compress_blocks(blocks: Blocks[Block], max_depth: int = 8, max_period: int = 64) -> BlockSeq:
+    """Compress `blocks` into equivalent BlockSeq by detecting repeated patterns.
+
+    Repeated sub-patterns inside each Block are turned into looped Blocks,
+    and repeated sequences of (compressed) Blocks into looped BlockSeqs.
+    Nest depth of the result is kept within `max_depth`.
+    Trigger of the first Block is set to the returned BlockSeq.
+
+    """
+
+    items = []
+    for block in blocks:
+        elems = compress_pattern(block, max_period=max_period)
+        if not elems or not block.Nrep:
+            continue
+        if len(elems) == 1:
+            items.append(_looped_block(block.name, elems[0].pattern, elems[0].Nrep * block.Nrep))
+        elif block.Nrep > 1:
+            items.append(BlockSeq(block.name, elems, Nrep=block.Nrep))
+        else:
+            items.extend(elems)
+
+    compressed = []
+    segments = find_repeats([pattern_key(b) for b in items], max_period=max_period)
+    for j, (s, k, r) in enumerate(segments):
+        if r == 1:
+            compressed.extend(items[s : s + k])
+        elif k == 1 and isinstance(items[s], Block):
+            b = items[s]
+            compressed.append(_looped_block(b.name, b.pattern, b.Nrep * r))
+        elif k == 1:
+            compressed.append(items[s].repeat(r))
+        else:
+            bs = BlockSeq(f"loop{j}", items[s : s + k], Nrep=r)
+            if bs.nest_depth() < max_depth:
+                compressed.append(bs)
+            else:
+                compressed.extend(b.copy() for _ in range(r) for b in items[s : s + k])
+
+    return BlockSeq("compressed", compressed, trigger=bool(blocks) and blocks[0].trigger)
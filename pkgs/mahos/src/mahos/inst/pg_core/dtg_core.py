@@ -4,6 +4,8 @@ from __future__ import annotations
 import typing as T
 from dataclasses import dataclass
 from os import path
+import os
+import copy
 
 import numpy as np
 
@@ -159,6 +161,10 @@ def gen_sequence(label, subname, Nrep, goto, jumpto, trigger):
     ]
 
 
+# cache of parsed scaffold trees: path -> (mtime_ns, tree)
+_scaffold_cache: dict[str, tuple[int, list]] = {}
+
+
 @dataclass
 class Sequence:
     name: str
@@ -203,12 +209,22 @@ class DTGCoreMixin(object):
         return trigger_type != TriggerType.HARDWARE_FALLING
 
     def load_scaffold(self, path):
-        """load and return the DTG config scaffold."""
+        """load and return the DTG config scaffold.
+
+        parsed tree is cached in memory and reused until the file is modified (mtime changes).
+        returned tree is a copy and can be modified freely.
 
-        with open(path, "rb") as f:
-            data = f.read()
+        """
 
-        return dtg_io.read_tree(data)
+        mtime = os.stat(path).st_mtime_ns
+        cached = _scaffold_cache.get(path)
+        if cached is None or cached[0] != mtime:
+            with open(path, "rb") as f:
+                data = f.read()
+            cached = (mtime, dtg_io.read_tree(data))
+            _scaffold_cache[path] = cached
+
+        return copy.deepcopy(cached[1])
 
     def channels_to_int(self, channels):
         def parse(c):
@@ -231,6 +247,26 @@ class DTGCoreMixin(object):
 
         return bits
 
+    def encode_pattern(self, block: Block, masks: dict | None = None) -> np.ndarray:
+        """encode the pattern of `block` into DTG pattern data (uint8 array of channel bits).
+
+        `masks` is a cache of channel bits (channels -> int) that can be shared among blocks.
+
+        """
+
+        if masks is None:
+            masks = {}
+        n = len(block.pattern)
+        bits = np.empty(n, dtype=np.uint8)
+        lengths = np.empty(n, dtype=np.int64)
+        for i, (channels, length) in enumerate(block.pattern):
+            try:
+                bits[i] = masks[channels]
+            except KeyError:
+                bits[i] = masks[channels] = self.channels_to_int(channels)
+            lengths[i] = length
+        return np.repeat(bits, lengths)
+
     def _find_name(self, li: list[Block | SubSequence], name: str) -> Block | SubSequence | None:
         for elem in li:
             if elem.name == name:
@@ -321,6 +357,7 @@ class DTGCoreMixin(object):
         blk_trees = []
         seq_trees = []
         ptn_trees = []
+        masks = {}
 
         for i, block in enumerate(blocks):
             blk_trees.append(gen_block(block.raw_length(), i + 1, block.name))
@@ -328,12 +365,7 @@ class DTGCoreMixin(object):
             seq_trees.append(gen_sequence("", block.name, block.Nrep, "", "", int(block.trigger)))
 
             self.logger.debug(self._block_to_str(block))
-            pulses = np.concatenate(
-                [
-                    self.channels_to_int(channels) * np.ones(length, dtype=np.uint8)
-                    for channels, length in block.pattern
-                ]
-            )
+            pulses = self.encode_pattern(block, masks)
 
             ptn_trees.append(gen_pattern(i + 1, pulses))
 
@@ -405,17 +437,13 @@ class DTGCoreMixin(object):
         seq_trees = []
         subseq_trees = []
         ptn_trees = []
+        masks = {}
 
         for i, block in enumerate(blocks):
             blk_trees.append(gen_block(block.raw_length(), i + 1, block.name))
 
             self.logger.debug(self._block_to_str(block))
-            pulses = np.concatenate(
-                [
-                    self.channels_to_int(channels) * np.ones(length, dtype=np.uint8)
-                    for channels, length in block.pattern
-                ]
-            )
+            pulses = self.encode_pattern(block, masks)
             ptn_trees.append(gen_pattern(i + 1, pulses))
 
         for i, subseq in enumerate(subsequences):
@@ -71,20 +71,80 @@ def read_leaf(recid_hr, data):
     return d, l + 4, data[4 + l :]
 
 
+_HEADER = struct.Struct("<HI")
+
+
+def iter_chunks(tree, chunk_bytes=65536):
+    """serialize a DTG setup tree 'tree' into a sequence of buffers.
+
+    headers and small leaves are coalesced into bytearrays of about 'chunk_bytes'.
+    large leaves (pattern data) are yielded as memoryviews of the arrays without copy.
+
+    """
+
+    buf = bytearray()
+
+    def walk(tree):
+        nonlocal buf
+        for recid_hr, length, data in tree:
+            recid = RECIDS[recid_hr]
+            buf += _HEADER.pack(recid, length)
+            if is_interior(recid):
+                yield from walk(data)
+                continue
+
+            view = memoryview(np.ascontiguousarray(data)).cast("B")
+            if view.nbytes < chunk_bytes:
+                buf += view
+            else:
+                yield buf
+                buf = bytearray()
+                yield view
+            if len(buf) >= chunk_bytes:
+                yield buf
+                buf = bytearray()
+
+    yield from walk(tree)
+    if buf:
+        yield buf
+
+
+def tree_nbytes(tree) -> int:
+    """total number of bytes of a DTG setup tree 'tree' (after recalculate_space())."""
+
+    # 6 is for recid (2 bytes) and length (4 bytes).
+    return sum(node[1] + 6 for node in tree)
+
+
 def dump_tree(tree, f):
-    """dump a DTG setup tree 'tree' to the file 'f'."""
+    """dump a DTG setup tree 'tree' to the file 'f'.
 
-    for node in tree:
-        recid_hr, length, data = node
-        recid = RECIDS[recid_hr]
-        if is_interior(recid):
-            f.write(struct.pack("<H", recid))
-            f.write(struct.pack("<I", length))
-            dump_tree(data, f)
-        else:  # leaf node
-            f.write(struct.pack("<H", recid))
-            f.write(struct.pack("<I", length))
-            f.write(data.tobytes())
+    the tree is written in chunks (see iter_chunks()) without building whole bytes in memory.
+
+    """
+
+    for chunk in iter_chunks(tree):
+        f.write(chunk)
+
+
+def dump_tree_into(tree, buf) -> int:
+    """dump a DTG setup tree 'tree' into a writable buffer 'buf' and return written size.
+
+    'buf' (bytearray, memoryview, etc.) must be large enough to hold tree_nbytes(tree).
+
+    """
+
+    total = tree_nbytes(tree)
+    mv = memoryview(buf).cast("B")
+    if mv.nbytes < total:
+        raise ValueError(f"buffer is too small ({mv.nbytes} < {total})")
+
+    pos = 0
+    for chunk in iter_chunks(tree):
+        n = len(chunk)
+        mv[pos : pos + n] = chunk
+        pos += n
+    return pos
 
 
 def recalculate_space(tree):
@@ -99,7 +159,7 @@ def recalculate_space(tree):
             node[1], node[2] = recalculate_space(data)
             tree[i] = node
         else:  # leaf node
-            node[1] = len(data.tobytes())
+            node[1] = data.nbytes
             tree[i] = node
         # add length of the treated node to total length.
         # 6 is for recid (2 bytes) and length (4 bytes).
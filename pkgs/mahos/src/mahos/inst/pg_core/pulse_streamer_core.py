@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+
+"""
+Shared sequence generation for PulseStreamer.
+
+.. This file is a part of MAHOS project, which is released under the 3-Clause BSD license.
+.. See included LICENSE file or https://github.com/ToyotaCRDL/mahos/blob/main/LICENSE for details.
+
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+from mahos.msgs.inst.pg_msgs import Block, Blocks
+
+#: Run-length encoded pattern: (durations, levels).
+RLE = tuple[np.ndarray, np.ndarray]
+
+
+def merge_runs(durations: np.ndarray, levels: np.ndarray) -> RLE:
+    """Merge adjacent runs with equal levels.
+
+    :returns: (durations, levels) of merged runs.
+
+    """
+
+    if not len(levels):
+        return durations, levels
+    starts = np.flatnonzero(np.concatenate(([True], levels[1:] != levels[:-1])))
+    return np.add.reduceat(durations, starts), levels[starts]
+
+
+class PulseStreamerCoreMixin(object):
+    """Run-length encoder of Blocks shared by PulseStreamer and its mock.
+
+    Requires channels_to_ints(), _included_channels_blocks(),
+    analog_channels and analog_values of the PulseStreamer class.
+
+    """
+
+    def _step_values(self, channels, block: Block, analog_given: bool) -> tuple[int, float, float]:
+        """Get digital bitmask and analog values (a0, a1) of a pulse step."""
+
+        mask = 0
+        for ch in set(self.channels_to_ints(channels)):
+            mask |= 1 << ch
+
+        if analog_given:
+            # if any AnalogChannel is involved, use these values instead of
+            # sparse D/A conversion using self.analog_values
+            a0 = block.analog_value(self.analog_channels[0], channels)
+            a1 = block.analog_value(self.analog_channels[1], channels)
+        elif self.analog_channels:
+            # self.analog_channels are included as digital channels in blocks.
+            # perform sparse D/A conversion using self.analog_values
+            label = "".join(("1" if ch in channels else "0" for ch in self.analog_channels))
+            a0, a1 = self.analog_values[label]
+        else:
+            a0 = a1 = 0.0
+        return mask, a0, a1
+
+    def _generate_rle_blocks(self, blocks: Blocks[Block]) -> tuple[dict[int, RLE], list[RLE]]:
+        """Generate run-length encoded patterns from blocks.
+
+        Each block's pattern is encoded once and repeated Nrep times with numpy.
+        Zero-duration steps are dropped and adjacent runs with equal levels are merged.
+
+        :returns: (mapping from digital channel to RLE, list of RLE for analog channels).
+            The list is empty if analog channels are not used.
+
+        """
+
+        analog_given = bool(blocks.analog_channels())
+        step_cache = {}
+        durations = [np.empty(0, dtype=np.int64)]
+        masks = [np.empty(0, dtype=np.int64)]
+        analogs = [np.empty((0, 2), dtype=np.float64)]
+        for block in blocks:
+            n = len(block.pattern)
+            d = np.empty(n, dtype=np.int64)
+            m = np.empty(n, dtype=np.int64)
+            a = np.empty((n, 2), dtype=np.float64)
+            for i, (channels, length) in enumerate(block.pattern):
+                try:
+                    mask, a0, a1 = step_cache[channels]
+                except KeyError:
+                    mask, a0, a1 = self._step_values(channels, block, analog_given)
+                    step_cache[channels] = (mask, a0, a1)
+                d[i] = length
+                m[i] = mask
+                a[i] = a0, a1
+            durations.append(np.tile(d, block.Nrep))
+            masks.append(np.tile(m, block.Nrep))
+            analogs.append(np.tile(a, (block.Nrep, 1)))
+
+        durations = np.concatenate(durations)
+        nonzero = durations > 0
+        durations = durations[nonzero]
+        masks = np.concatenate(masks)[nonzero]
+
+        digital = {
+            ch: merge_runs(durations, (masks >> ch) & 1)
+            for ch in self._included_channels_blocks(blocks)
+        }
+        if self.analog_channels:
+            analogs = np.concatenate(analogs)[nonzero]
+            analog = [merge_runs(durations, analogs[:, 0]), merge_runs(durations, analogs[:, 1])]
+        else:
+            analog = []
+        return digital, analog
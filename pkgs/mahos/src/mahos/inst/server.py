@@ -9,7 +9,10 @@ Instrument RPC.
 """
 
 from __future__ import annotations
+import typing as T
 import importlib
+import copy
+import time
 from collections import ChainMap
 from inspect import signature, getdoc, getfile
 from functools import wraps
@@ -28,10 +31,18 @@ from mahos.msgs.inst.server_msgs import (
 )
 from mahos.msgs.inst.server_msgs import ShutdownReq, StartReq, StopReq, PauseReq, ResumeReq
 from mahos.msgs.inst.server_msgs import ResetReq, ConfigureReq, SetReq, GetReq, HelpReq
-from mahos.msgs.inst.server_msgs import GetParamDictReq, GetParamDictLabelsReq
+from mahos.msgs.inst.server_msgs import GetParamDictReq, GetParamDictLabelsReq, GetParamDictsReq
+from mahos.msgs.inst.server_msgs import ParamDictChanged
 from mahos.node.node import Node, NodeName, split_name
 from mahos.node.client import StatusClient
-from mahos.util.graph import sort_dependency
+from mahos.util.graph import sort_dependency, run_dependency
+from mahos.util.shm import (
+    SharedRingBuffer,
+    SharedRingReader,
+    is_local_endpoint,
+    pack_shared,
+    unpack_shared,
+)
 from mahos.inst.instrument import Instrument
 from mahos.inst.overlay.overlay import InstrumentOverlay
 
@@ -43,7 +54,7 @@ class OverlayConf(object):
         self._lays = {}
 
         dep_dict = {lay: self.ref_names(lay) for lay in self.conf}
-        self.sorted_lays = [lay for lay in sort_dependency(dep_dict) if lay not in insts.keys()]
+        self.sorted_lays = [lay for lay in sort_dependency(dep_dict) if lay in self.conf]
 
     def get(self, lay: str) -> dict:
         return self.conf[lay]
@@ -130,21 +141,110 @@ class Locks(object):
                 self.locks[n] = None
 
 
+class ParamDictCache(object):
+    """Cache of ParamDicts (keyed by (inst, label)) and ParamDict labels of instruments.
+
+    An instrument and overlays sharing the instruments are considered related.
+    invalidate() drops the entries of all the related instruments and overlays.
+    If `enable` is False, nothing is cached but the served instruments are still tracked.
+    The instruments in `uncached` and the overlays referencing them are not cached either.
+
+    """
+
+    def __init__(self, locks: Locks, enable: bool = True, uncached: T.Iterable[str] = ()):
+        self.locks = locks
+        self.enable = enable
+        self.uncached = set(uncached)
+        for lay, inst_names in self.locks.overlay_deps.items():
+            if self.uncached.intersection(inst_names):
+                self.uncached.add(lay)
+        self._param_dicts: dict[tuple[str, str], P.ParamDict[str, P.PDValue]] = {}
+        self._labels: dict[str, list[str]] = {}
+        self._served: set[str] = set()
+
+    def get(self, inst: str, label: str) -> P.ParamDict[str, P.PDValue] | None:
+        return self._param_dicts.get((inst, label))
+
+    def put(self, inst: str, label: str, param_dict: P.ParamDict[str, P.PDValue]):
+        self._served.add(inst)
+        if self.enable and inst not in self.uncached:
+            self._param_dicts[(inst, label)] = copy.deepcopy(param_dict)
+
+    def get_labels(self, inst: str) -> list[str] | None:
+        return self._labels.get(inst)
+
+    def put_labels(self, inst: str, labels: list[str]):
+        self._served.add(inst)
+        if self.enable and inst not in self.uncached:
+            self._labels[inst] = list(labels)
+
+    def related(self, inst: str) -> set[str]:
+        """Get set of instrument and overlay names related to `inst` (including itself)."""
+
+        if inst in self.locks.insts:
+            deps = {inst}
+        else:
+            deps = set(self.locks.overlay_deps.get(inst, ()))
+        names = {inst} | deps
+        for lay, inst_names in self.locks.overlay_deps.items():
+            if deps.intersection(inst_names):
+                names.add(lay)
+        return names
+
+    def invalidate(self, inst: str) -> list[str]:
+        """Invalidate entries related to `inst`.
+
+        :returns: sorted list of names whose ParamDicts (or labels) have been served.
+
+        """
+
+        names = self.related(inst)
+        for key in [k for k in self._param_dicts if k[0] in names]:
+            del self._param_dicts[key]
+        for n in names:
+            self._labels.pop(n, None)
+        served = sorted(names & self._served)
+        self._served.difference_update(names)
+        return served
+
+
+def shm_name(host: str, name: str, inst: str) -> str:
+    """Name of shared memory block for instrument `inst` of InstrumentServer (host, name)."""
+
+    return "mahos_" + "_".join((host, name, inst)).replace("/", "_").replace("\\", "_")
+
+
 class InstrumentClient(StatusClient):
     """Instrument RPC Client.
 
     Client API for RPC services provided by InstrumentServer.
 
+    If the server is on the same host and has ``shm`` conf for an instrument,
+    arrays returned by get() are received as zero-copy views of shared memory.
+
+    If `param_dict_handler` is given, it is called with ParamDictChanged message
+    when the ParamDicts of instruments may have been changed.
+
     """
 
     M = server_msgs
 
-    def __init__(self, gconf: dict, name, context=None, prefix=None, status_handler=None):
+    def __init__(
+        self,
+        gconf: dict,
+        name,
+        context=None,
+        prefix=None,
+        status_handler=None,
+        param_dict_handler=None,
+    ):
         """Instrument RPC Client."""
 
         StatusClient.__init__(
             self, gconf, name, context=context, prefix=prefix, status_handler=status_handler
         )
+        if param_dict_handler is not None:
+            self.add_sub([(b"param_dict", param_dict_handler)])
 
         self.ident = Ident(self.full_name())
 
@@ -154,6 +254,27 @@ class InstrumentClient(StatusClient):
         for lay, ldict in self.conf.get("instrument_overlay", {}).items():
             self._mod_classes[lay] = (ldict["module"], ldict["class"])
 
+        self._shm_reader = SharedRingReader()
+        if is_local_endpoint(self.conf.get("rep_endpoint", "")):
+            self._shm_insts = set(self.conf.get("shm", {}).keys())
+        else:
+            self._shm_insts = set()
+
+    def close(self, close_ctx=True):
+        if self._closed:
+            return
+        StatusClient.close(self, close_ctx=close_ctx)
+        self._shm_reader.close()
+
+    def _use_shm(self, inst: str) -> bool:
+        if inst not in self._shm_insts:
+            return False
+        if self._shm_reader.attach(shm_name(self._host, self._name, inst)):
+            return True
+        self.logger.warn(f"Shared memory for {inst} is not available. Using copy.")
+        self._shm_insts.remove(inst)
+        return False
+
     def module_class_names(self, inst: str) -> tuple[str, str] | None:
         """Get tuple of (module name, class name) of instrument `inst`."""
 
@@ -297,11 +418,13 @@ class InstrumentClient(StatusClient):
 
         """
 
-        rep = self.req.request(GetReq(self.ident, inst, key, args=args, label=label))
-        if rep.success:
-            return rep.ret
-        else:
+        shm = self._use_shm(inst)
+        rep = self.req.request(GetReq(self.ident, inst, key, args=args, label=label, shm=shm))
+        if not rep.success:
             return None
+        if shm:
+            return unpack_shared(rep.ret, self._shm_reader)
+        return rep.ret
 
     def help(self, inst: str, func: str | None = None) -> str:
         """Get help of instrument `inst`.
@@ -314,29 +437,50 @@ class InstrumentClient(StatusClient):
         rep = self.req.request(HelpReq(inst, func))
         return rep.message
 
-    def get_param_dict(self, inst: str, label: str = "") -> P.ParamDict[str, P.PDValue] | None:
+    def get_param_dict(
+        self, inst: str, label: str = "", refresh: bool = False
+    ) -> P.ParamDict[str, P.PDValue] | None:
         """Get ParamDict for `label` of instrument `inst`.
 
         :param inst: instrument name.
         :param label: param dict label.
                       can be empty if target inst provides only one ParamDict.
+        :param refresh: bypass the cache of the server to read current values.
 
         """
 
-        rep = self.req.request(GetParamDictReq(self.ident, inst, label))
+        rep = self.req.request(GetParamDictReq(self.ident, inst, label, refresh))
         if rep.success:
             return rep.ret
         else:
             return None
 
-    def get_param_dict_labels(self, inst: str) -> list[str]:
+    def get_param_dicts(
+        self, keys: list[tuple[str, str]], refresh: bool = False
+    ) -> list[P.ParamDict[str, P.PDValue] | None]:
+        """Get ParamDicts for list of (inst, label) `keys` by a single request.
+
+        :param refresh: bypass the cache of the server to read current values.
+        :returns: list of ParamDicts in the order of `keys`. The failed one is None.
+
+        """
+
+        if not keys:
+            return []
+        rep = self.req.request(GetParamDictsReq(self.ident, keys, refresh))
+        if rep.ret is None:
+            return [None] * len(keys)
+        return rep.ret
+
+    def get_param_dict_labels(self, inst: str, refresh: bool = False) -> list[str]:
         """Get list of available ParamDict labels.
 
         :param inst: instrument name.
+        :param refresh: bypass the cache of the server.
 
         """
 
-        rep = self.req.request(GetParamDictLabelsReq(self.ident, inst))
+        rep = self.req.request(GetParamDictLabelsReq(self.ident, inst, refresh))
         if rep.success:
             return rep.ret
         else:
@@ -356,7 +500,11 @@ def remap_inst(f):
 
 
 class MultiInstrumentClient(object):
-    """Proxy-interface to multiple InstrumentClients."""
+    """Proxy-interface to multiple InstrumentClients.
+
+    `param_dict_handler` is passed to each InstrumentClient.
+
+    """
 
     def __init__(
         self,
@@ -365,6 +513,7 @@ class MultiInstrumentClient(object):
         inst_remap: dict[str, str] | None = None,
         context=None,
         prefix=None,
+        param_dict_handler=None,
     ):
         self.inst_to_nodename = {k: split_name(v) for k, v in inst_to_nodename.items()}
         self.inst_remap = inst_remap or {}
@@ -372,7 +521,11 @@ class MultiInstrumentClient(object):
         for name in self.inst_to_nodename.values():
             if name not in self.nodename_to_client:
                 self.nodename_to_client[name] = InstrumentClient(
-                    gconf, name, context=context, prefix=prefix
+                    gconf,
+                    name,
+                    context=context,
+                    prefix=prefix,
+                    param_dict_handler=param_dict_handler,
                 )
 
     def insts(self):
@@ -543,26 +696,54 @@ class MultiInstrumentClient(object):
         return self.get_client(inst).help(inst, func)
 
     @remap_inst
-    def get_param_dict(self, inst: str, label: str = "") -> P.ParamDict[str, P.PDValue] | None:
+    def get_param_dict(
+        self, inst: str, label: str = "", refresh: bool = False
+    ) -> P.ParamDict[str, P.PDValue] | None:
         """Get ParamDict for `label` of instrument `inst`.
 
         :param inst: instrument name.
         :param label: param dict label.
                       can be empty if target inst provides only one ParamDict.
+        :param refresh: bypass the cache of the server to read current values.
 
         """
 
-        return self.get_client(inst).get_param_dict(inst, label)
+        return self.get_client(inst).get_param_dict(inst, label, refresh)
+
+    def get_param_dicts(
+        self, keys: list[tuple[str, str]], refresh: bool = False
+    ) -> list[P.ParamDict[str, P.PDValue] | None]:
+        """Get ParamDicts for list of (inst, label) `keys`.
+
+        A single request is sent to each InstrumentServer.
+
+        :param refresh: bypass the cache of the servers to read current values.
+        :returns: list of ParamDicts in the order of `keys`. The failed one is None.
+
+        """
+
+        keys = [(self.inst_remap.get(inst, inst), label) for inst, label in keys]
+        indices = {}
+        for i, (inst, _) in enumerate(keys):
+            indices.setdefault(self.inst_to_nodename[inst], []).append(i)
+
+        param_dicts = [None] * len(keys)
+        for name, idx in indices.items():
+            pds = self.nodename_to_client[name].get_param_dicts([keys[i] for i in idx], refresh)
+            for i, pd in zip(idx, pds):
+                param_dicts[i] = pd
+        return param_dicts
 
     @remap_inst
-    def get_param_dict_labels(self, inst: str) -> list[str]:
+    def get_param_dict_labels(self, inst: str, refresh: bool = False) -> list[str]:
         """Get list of available ParamDict labels.
 
         :param inst: instrument name.
+        :param refresh: bypass the cache of the server.
 
         """
 
-        return self.get_client(inst).get_param_dict_labels(inst)
+        return self.get_client(inst).get_param_dict_labels(inst, refresh)
 
 
 class InstrumentServer(Node):
@@ -584,6 +765,10 @@ class InstrumentServer(Node):
     - ``class``: The Instrument class name. The class must be an attribute of the ``module``.
     - ``conf``: The configuration dictionary for the Instrument
       (this is optional, but usually necessary).
+    - ``param_dict_cache``: (default: True) Set False if the ParamDicts of the Instrument
+      hold the values that can change without configuration
+      (e.g., measured by the instrument or changed on the front panel).
+      The ParamDicts of the Instrument and the overlays referencing it are not cached then.
 
     An :class:`InstrumentOverlay <mahos.inst.overlay.overlay.InstrumentOverlay>` config is
     defined under the ``instrument_overlay`` dictionary in the config.
@@ -605,16 +790,36 @@ class InstrumentServer(Node):
     :type instrument: dict[str, dict[str, str | dict]]
     :param instrument_overlay: Optional overlay class configuration mapping.
     :type instrument_overlay: dict[str, dict[str, str | dict]]
+    :param shm: Optional shared-memory data plane configuration mapping.
+        The key is the instrument (or overlay) name, and the value (dict) has
+        ``slots`` (number of slots, default: 8), ``slot_bytes`` (size of a slot),
+        and ``lease_sec`` (time limit for a client to claim the slot, default: 30.0).
+        Arrays returned by get() of the instrument are written into a ring buffer of slots
+        in shared memory, and only the descriptors are sent to the clients on the same host.
+        An array is sent in the regular way if it doesn't fit in a slot
+        or all the slots are still used by the clients.
+        The slots held by exited clients or not claimed within ``lease_sec``
+        (e.g., lost reply) are reclaimed.
+    :type shm: dict[str, dict[str, int]]
+    :param param_dict_cache: (default: True) Cache the ParamDicts (and labels) of instruments.
+        The cache of an instrument is invalidated when a function other than get() is called,
+        i.e., configure(), set(), reset(), start(), etc.
+        The overlays sharing the instrument are invalidated together.
+        The notification (ParamDictChanged) is published under ``param_dict`` topic then.
+        The cache can be disabled per instrument (``param_dict_cache`` in instrument config),
+        or bypassed (and updated) by the requests with ``refresh=True``.
+    :type param_dict_cache: bool
+    :param init_workers: (default: 1) Number of threads to initialize the instruments.
+        If larger than 1, independent instruments are initialized concurrently,
+        and each overlay is initialized as soon as the referenced ones are ready.
+        Keep 1 if the drivers are not safe to initialize in parallel (or in sub-threads).
+    :type init_workers: int
 
     """
 
-    _noarg_calls = (
-        ShutdownReq,
-        GetParamDictLabelsReq,
-    )
+    _noarg_calls = (ShutdownReq,)
     _noarg_func_names = {
         "ShutdownReq": "shutdown",
-        "GetParamDictLabelsReq": "get_param_dict_labels",
     }
     _labeled_calls = (
         StartReq,
@@ -622,7 +827,6 @@ class InstrumentServer(Node):
         PauseReq,
         ResumeReq,
         ResetReq,
-        GetParamDictReq,
     )
     _labeled_func_names = {
         "StartReq": "start",
@@ -630,7 +834,6 @@ class InstrumentServer(Node):
         "PauseReq": "pause",
         "ResumeReq": "resume",
         "ResetReq": "reset",
-        "GetParamDictReq": "get_param_dict",
     }
     _std_funcs = (
         "start",
@@ -645,6 +848,8 @@ class InstrumentServer(Node):
         "get_param_dict",
         "get_param_dict_labels",
     )
+    #: functions not changing the ParamDicts.
+    _read_funcs = ("get", "get_param_dict", "get_param_dict_labels")
     _bool_funcs = (
         "start",
         "stop",
@@ -667,47 +872,105 @@ class InstrumentServer(Node):
         self._overlays: dict[str, InstrumentOverlay] = {}
         self.locks = Locks([i for i in self.conf["instrument"].keys() if not self._is_excluded(i)])
 
+        # import all the classes here before initializing any instruments.
+        classes = {}
         for inst, idict in self.conf["instrument"].items():
             if self._is_excluded(inst):
                 continue
-            C = self._get_class(
+            classes[inst] = self._get_class(
                 ["mahos.inst." + idict["module"], idict["module"]], idict["class"], Instrument
             )
-            prefix = self.joined_name()
-
-            try:
-                if "conf" in idict:
-                    self._insts[inst]: Instrument = C(inst, conf=idict["conf"], prefix=prefix)
-                else:
-                    self._insts[inst]: Instrument = C(inst, prefix=prefix)
-            except Exception:
-                self.logger.exception(f"Failed to initialize {inst}.")
-                self._insts[inst] = None
+            self._insts[inst] = None
+        deps = {inst: () for inst in classes}
 
+        lay_conf = None
         if "instrument_overlay" in self.conf:
-            conf = OverlayConf(self.conf["instrument_overlay"], self._insts)
-            self.logger.debug(f"sorted overlay names: {conf.sorted_lays}")
+            lay_conf = OverlayConf(self.conf["instrument_overlay"], self._insts)
+            self.logger.debug(f"sorted overlay names: {lay_conf.sorted_lays}")
 
-            for lay in conf.sorted_lays:
+            for lay in lay_conf.sorted_lays:
                 if self._is_excluded(lay):
                     continue
-                ldict = conf.get(lay)
-                C = self._get_class(
+                ldict = lay_conf.get(lay)
+                classes[lay] = self._get_class(
                     ["mahos.inst.overlay." + ldict["module"], ldict["module"]],
                     ldict["class"],
                     InstrumentOverlay,
                 )
-                prefix = self.joined_name()
-                try:
-                    self._overlays[lay] = C(lay, conf=conf.resolved_conf(lay), prefix=prefix)
-                    conf.add_overlay(lay, self._overlays[lay])
-                    self.locks.add_overlay(lay, conf.inst_names(lay))
-                except Exception:
-                    self.logger.exception(f"Failed to initialize {lay}")
-                    self._overlays[lay] = None
+                self._overlays[lay] = None
+                deps[lay] = lay_conf.ref_names(lay)
+
+        def init(name):
+            if name in self._insts:
+                self._init_instrument(name, classes[name])
+            else:
+                self._init_overlay(name, classes[name], lay_conf)
+
+        t0 = time.perf_counter()
+        run_dependency(deps, init, self.conf.get("init_workers", 1))
+        self.logger.info(
+            f"Initialized {len(self._insts)} instruments and {len(self._overlays)} overlays"
+            + f" in {time.perf_counter() - t0:.3f} s."
+        )
+
+        self._rings: dict[str, SharedRingBuffer] = {}
+        self._ring_overflows: dict[str, int] = {}
+        for inst, sdict in self.conf.get("shm", {}).items():
+            if self._is_excluded(inst):
+                continue
+            try:
+                self._rings[inst] = SharedRingBuffer(
+                    sdict.get("slots", 8),
+                    sdict["slot_bytes"],
+                    name=shm_name(self._host, self._name, inst),
+                    lease_sec=sdict.get("lease_sec", 30.0),
+                )
+                self._ring_overflows[inst] = 0
+            except Exception:
+                self.logger.exception(f"Failed to initialize shared memory for {inst}.")
+
+        uncached = [
+            inst
+            for inst, idict in self.conf["instrument"].items()
+            if not idict.get("param_dict_cache", True)
+        ]
+        self._pd_cache = ParamDictCache(
+            self.locks, self.conf.get("param_dict_cache", True), uncached
+        )
 
         self.add_rep()
         self.status_pub = self.add_pub(b"status")
+        self.param_dict_pub = self.add_pub(b"param_dict")
+
+    def _init_instrument(self, inst: str, C: T.Type[Instrument]):
+        idict = self.conf["instrument"][inst]
+        prefix = self.joined_name()
+        t0 = time.perf_counter()
+        try:
+            if "conf" in idict:
+                self._insts[inst] = C(inst, conf=idict["conf"], prefix=prefix)
+            else:
+                self._insts[inst] = C(inst, prefix=prefix)
+            self.logger.info(f"Initialized {inst} in {time.perf_counter() - t0:.3f} s.")
+        except Exception:
+            self.logger.exception(
+                f"Failed to initialize {inst} (in {time.perf_counter() - t0:.3f} s)."
+            )
+            self._insts[inst] = None
+
+    def _init_overlay(self, lay: str, C: T.Type[InstrumentOverlay], conf: OverlayConf):
+        prefix = self.joined_name()
+        t0 = time.perf_counter()
+        try:
+            self._overlays[lay] = C(lay, conf=conf.resolved_conf(lay), prefix=prefix)
+            conf.add_overlay(lay, self._overlays[lay])
+            self.locks.add_overlay(lay, conf.inst_names(lay))
+            self.logger.info(f"Initialized {lay} in {time.perf_counter() - t0:.3f} s.")
+        except Exception:
+            self.logger.exception(
+                f"Failed to initialize {lay} (in {time.perf_counter() - t0:.3f} s)"
+            )
+            self._overlays[lay] = None
 
     def _is_excluded(self, inst: str):
         return (self.include and inst not in self.include) or inst in self.exclude
@@ -751,6 +1014,8 @@ class InstrumentServer(Node):
         for inst in self._insts.values():
             if inst is not None:
                 inst.close()
+        for ring in self._rings.values():
+            ring.close()
 
     def _get(self, inst: str) -> Instrument | InstrumentOverlay:
         if inst in self._insts:
@@ -759,6 +1024,8 @@ class InstrumentServer(Node):
             return self._overlays[inst]
 
     def handle_req(self, msg: Request) -> Reply:
+        if isinstance(msg, GetParamDictsReq):
+            return self._handle_get_param_dicts(msg)
         if not (msg.inst in self._insts or msg.inst in self._overlays):
             return Reply(False, "Unknown instrument {}".format(msg.inst))
 
@@ -776,6 +1043,10 @@ class InstrumentServer(Node):
             return self._handle_get(msg)
         elif isinstance(msg, HelpReq):
             return self._handle_help(msg)
+        elif isinstance(msg, GetParamDictReq):
+            return self._handle_get_param_dict(msg)
+        elif isinstance(msg, GetParamDictLabelsReq):
+            return self._handle_get_param_dict_labels(msg)
         elif isinstance(msg, LockReq):
             return self._handle_lock(msg)
         elif isinstance(msg, ReleaseReq):
@@ -785,11 +1056,17 @@ class InstrumentServer(Node):
         else:
             return Reply(False, "Unknown message type")
 
-    def _call(self, inst, ident, func, args):
+    def _check_lock(self, inst: str, ident: Ident) -> Reply | None:
         if self.locks.is_locked(inst, ident):
             return Reply(
                 False, "Instrument {} is locked by {}".format(inst, self.locks.locked_by(inst))
             )
+        return None
+
+    def _call(self, inst, ident, func, args):
+        if (rep := self._check_lock(inst, ident)) is not None:
+            return rep
+        name = inst
         inst = self._get(inst)
         if not hasattr(inst, func):
             return Reply(False, f"Unknown function name {func} for instrument {inst}")
@@ -803,6 +1080,9 @@ class InstrumentServer(Node):
             msg = f"Error calling function {func}."
             self.logger.exception(msg)
             return Reply(False, msg)
+        finally:
+            if func not in self._read_funcs:
+                self._invalidate_param_dicts(name)
         if func in self._bool_funcs:
             # these functions returns success status in bool
             return Reply(r)
@@ -837,7 +1117,24 @@ class InstrumentServer(Node):
             args["args"] = msg.args
         if msg.label:
             args["label"] = msg.label
-        return self._call(msg.inst, msg.ident, "get", args)
+        rep = self._call(msg.inst, msg.ident, "get", args)
+        # shm may be missing in GetReq from older client.
+        if rep.success and getattr(msg, "shm", False) and msg.inst in self._rings:
+            rep.ret = self._pack_shared(msg.inst, rep.ret)
+        return rep
+
+    def _pack_shared(self, inst: str, value):
+        ring = self._rings[inst]
+        value = pack_shared(value, ring)
+        overflows = ring.overflows()
+        if overflows > self._ring_overflows[inst]:
+            self.logger.debug(
+                f"Shared memory for {inst} overflowed {overflows} times"
+                + f" ({len(ring)}/{ring.size()} slots in use, {ring.slot_bytes} bytes each,"
+                + f" {ring.reclaims()} reclaimed)."
+            )
+            self._ring_overflows[inst] = overflows
+        return value
 
     def _handle_help(self, msg: HelpReq) -> Reply:
         inst = self._get(msg.inst)
@@ -857,6 +1154,49 @@ class InstrumentServer(Node):
         file = f"(file: {getfile(func)})"
         return Reply(True, "\n".join((sig, doc, file)).strip())
 
+    def _invalidate_param_dicts(self, inst: str):
+        insts = self._pd_cache.invalidate(inst)
+        if insts:
+            self.param_dict_pub.publish(ParamDictChanged(self._host, self._name, insts))
+
+    def _get_param_dict(self, inst: str, ident: Ident, label: str, refresh: bool) -> Reply:
+        if (rep := self._check_lock(inst, ident)) is not None:
+            return rep
+        if not refresh and (pd := self._pd_cache.get(inst, label)) is not None:
+            return Reply(True, ret=pd)
+        rep = self._call(inst, ident, "get_param_dict", {"label": label})
+        if rep.success and rep.ret is not None:
+            self._pd_cache.put(inst, label, rep.ret)
+        return rep
+
+    def _handle_get_param_dict(self, msg: GetParamDictReq) -> Reply:
+        return self._get_param_dict(msg.inst, msg.ident, msg.label, msg.refresh)
+
+    def _handle_get_param_dicts(self, msg: GetParamDictsReq) -> Reply:
+        param_dicts = []
+        errors = []
+        for inst, label in msg.keys:
+            if not (inst in self._insts or inst in self._overlays):
+                rep = Reply(False, f"Unknown instrument {inst}")
+            else:
+                rep = self._get_param_dict(inst, msg.ident, label, msg.refresh)
+            if rep.success and rep.ret is not None:
+                param_dicts.append(rep.ret)
+            else:
+                param_dicts.append(None)
+                errors.append(f"{inst}::{label}: {rep.message}")
+        return Reply(not errors, "\n".join(errors), ret=param_dicts)
+
+    def _handle_get_param_dict_labels(self, msg: GetParamDictLabelsReq) -> Reply:
+        if (rep := self._check_lock(msg.inst, msg.ident)) is not None:
+            return rep
+        if not msg.refresh and (labels := self._pd_cache.get_labels(msg.inst)) is not None:
+            return Reply(True, ret=labels)
+        rep = self._call(msg.inst, msg.ident, "get_param_dict_labels", None)
+        if rep.success and rep.ret is not None:
+            self._pd_cache.put_labels(msg.inst, rep.ret)
+        return rep
+
     def _handle_lock(self, msg: LockReq) -> Reply:
         if self.locks.is_locked(msg.inst, msg.ident, any):
             return Reply(False, "Already locked by: {}".format(self.locks.locked_by(msg.inst)))
@@ -26,6 +26,9 @@ class Mode(enum.Enum):
 class N5182B(VisaInstrument):
     """Keysight N5182B/N5172B Vector Signal Generator.
 
+    configure() resets the device (``*RST``) by default, which invalidates the state cache
+    (``state_cache`` conf). Pass ``reset = False`` in the params to skip the unchanged settings.
+
     :param power_bounds: Power bounds in dBm (min, max).
     :type power_bounds: tuple[float, float]
     :param freq_bounds: Frequency bounds in Hz (min, max).
@@ -125,7 +128,7 @@ class N5182B(VisaInstrument):
         }
 
     def query_power_condition(self) -> int:
-        ans = int(self.inst.query("STAT:QUES:COND?"))
+        ans = int(self.query("STAT:QUES:COND?"))
 
         if ans == 8:
             self.logger.warning("OUTPUT UNLEVELED")
@@ -136,32 +139,32 @@ class N5182B(VisaInstrument):
 
     def set_output(self, on: bool, silent: bool = False) -> bool:
         if on:
-            self.inst.write("OUTP:STAT ON")
+            self.write("OUTP:STAT ON")
             if not silent:
                 self.logger.info("Output ON")
         else:
-            self.inst.write("OUTP:STAT OFF")
+            self.write("OUTP:STAT OFF")
             if not silent:
                 self.logger.info("Output OFF")
         return True
 
     def set_init_cont(self, on: bool) -> bool:
         if on:
-            self.inst.write("INIT:CONT ON")
+            self.write("INIT:CONT ON")
         else:
-            self.inst.write("INIT:CONT OFF")
+            self.write("INIT:CONT OFF")
         return True
 
     def initiate(self) -> bool:
-        self.inst.write("INIT")
+        self.write("INIT")
         return True
 
     def abort(self) -> bool:
-        self.inst.write("ABOR")
+        self.write("ABOR")
         return True
 
     def trigger(self) -> bool:
-        self.inst.write("TRIG")
+        self.write("TRIG")
         return True
 
     def set_freq_mode(self, mode: str) -> bool:
@@ -174,7 +177,7 @@ class N5182B(VisaInstrument):
         if mode.upper() not in self.FREQ_MODE:
             return self.fail_with("invalid frequency mode.")
 
-        self.inst.write("FREQ:MODE " + mode)
+        self.write_cached("FREQ:MODE " + mode)
         return True
 
     def set_power_mode(self, mode: str) -> bool:
@@ -187,7 +190,7 @@ class N5182B(VisaInstrument):
         if mode.upper() not in self.POWER_MODE:
             return self.fail_with("invalid power mode.")
 
-        self.inst.write("POW:MODE " + mode)
+        self.write_cached("POW:MODE " + mode)
         return True
 
     def _fmt_freq(self, freq) -> str | None:
@@ -213,7 +216,7 @@ class N5182B(VisaInstrument):
         if f is None:
             return False
 
-        self.inst.write("FREQ " + f)
+        self.write_cached("FREQ " + f)
         return True
 
     def set_freq_range(self, start, stop) -> bool:
@@ -221,7 +224,7 @@ class N5182B(VisaInstrument):
         if start is None or stop is None:
             return False
 
-        self.inst.write("FREQ:STAR {};STOP {}".format(start, stop))
+        self.write_cached("FREQ:STAR {};STOP {}".format(start, stop))
         return True
 
     def set_freq_list(self, freq_list) -> bool:
@@ -230,25 +233,25 @@ class N5182B(VisaInstrument):
             return False
 
         cmd = "LIST:FREQ " + ",".join(fs)
-        self.inst.write(cmd)
+        self.write_cached(cmd)
         return True
 
     def set_sweep_points(self, num: int) -> bool:
-        self.inst.write(f"SWE:POIN {num:d}")
+        self.write_cached(f"SWE:POIN {num:d}")
         return True
 
     def set_power(self, power_dBm) -> bool:
         if power_dBm < self.power_min or power_dBm > self.power_max:
             return self.fail_with("Invalid power.")
 
-        self.inst.write(f"POW {power_dBm:.3f} dBm")
+        self.write_cached(f"POW {power_dBm:.3f} dBm")
         return True
 
     def set_list_type(self, stepped=True) -> bool:
         if stepped:
-            self.inst.write("LIST:TYPE STEP")
+            self.write_cached("LIST:TYPE STEP")
         else:
-            self.inst.write("LIST:TYPE LIST")
+            self.write_cached("LIST:TYPE LIST")
 
         return True
 
@@ -258,7 +261,7 @@ class N5182B(VisaInstrument):
         if route.upper() not in self.TRIG_OUT_ROUTE:
             return self.fail_with("invalid output route")
 
-        self.inst.write(f"ROUT:TRIG{ch:d}:OUTP {route}")
+        self.write_cached(f"ROUT:TRIG{ch:d}:OUTP {route}")
         return True
 
     def set_trig_source(self, source: str, ext: str = "TRIGGER1") -> bool:
@@ -268,7 +271,7 @@ class N5182B(VisaInstrument):
         if source not in self.TRIG_SOURCE:
             return self.fail_with("invalid trigger source.")
 
-        self.inst.write("TRIG:SOUR " + source)
+        self.write_cached("TRIG:SOUR " + source)
 
         if source not in self._EXT:
             return True
@@ -276,7 +279,7 @@ class N5182B(VisaInstrument):
         if ext.upper() not in self.EXT_TRIG_SOURCE:
             return self.fail_with("invalid external trigger source.")
 
-        self.inst.write("TRIG:EXT:SOUR " + ext)
+        self.write_cached("TRIG:EXT:SOUR " + ext)
         return True
 
     def set_point_trig_source(self, source: str, ext: str = "TRIGGER1") -> bool:
@@ -290,7 +293,7 @@ class N5182B(VisaInstrument):
         if source not in self.TRIG_SOURCE:
             return self.fail_with("invalid sweep trigger source.")
 
-        self.inst.write("LIST:TRIG:SOUR " + source)
+        self.write_cached("LIST:TRIG:SOUR " + source)
 
         if source not in self._EXT:
             return True
@@ -298,7 +301,7 @@ class N5182B(VisaInstrument):
         if ext.upper() not in self.EXT_TRIG_SOURCE:
             return self.fail_with("invalid external trigger source")
 
-        self.inst.write("LIST:TRIG:EXT:SOUR " + ext)
+        self.write_cached("LIST:TRIG:EXT:SOUR " + ext)
         return True
 
     def set_dm_source(self, source: str) -> bool:
@@ -311,7 +314,7 @@ class N5182B(VisaInstrument):
         if source.upper() not in ("EXT", "EXTERNAL", "INT", "INTERNAL", "SUM"):
             return self.fail_with("invalid digital modulation source")
 
-        self.inst.write(":DM:SOUR " + source)
+        self.write_cached(":DM:SOUR " + source)
         return True
 
     def set_dm_invert(self, invert: bool) -> bool:
@@ -326,19 +329,19 @@ class N5182B(VisaInstrument):
         """
 
         if invert:
-            self.inst.write(":DM:POL INV")
+            self.write_cached(":DM:POL INV")
         else:
-            self.inst.write(":DM:POL NORM")
+            self.write_cached(":DM:POL NORM")
         return True
 
     def set_dm(self, on: bool) -> bool:
         """If on is True turn on digital modulation."""
 
         if on:
-            self.inst.write(":DM:STAT ON")
+            self.write_cached(":DM:STAT ON")
             self.logger.info("Digital modulation ON.")
         else:
-            self.inst.write(":DM:STAT OFF")
+            self.write_cached(":DM:STAT OFF")
             self.logger.info("Digital modulation OFF.")
         return True
 
@@ -346,8 +349,8 @@ class N5182B(VisaInstrument):
         cpl = "DC" if DC_coupling else "AC"
         if impedance not in (50, 600, 1000000):
             return self.fail_with(f"invalid impedance {impedance}")
-        self.inst.write(f":{AM_FM}:EXT:COUP " + cpl)
-        self.inst.write(f":{AM_FM}:EXT:IMP {impedance:d}")
+        self.write_cached(f":{AM_FM}:EXT:COUP " + cpl)
+        self.write_cached(f":{AM_FM}:EXT:IMP {impedance:d}")
         return True
 
     def set_fm_ext_opts(self, DC_coupling: bool, impedance: int) -> bool:
@@ -376,23 +379,23 @@ class N5182B(VisaInstrument):
         ):
             return self.fail_with("invalid FM source")
 
-        self.inst.write(":FM:SOUR " + source)
+        self.write_cached(":FM:SOUR " + source)
         return True
 
     def set_fm_deviation(self, deviation_Hz: float) -> bool:
         """Set FM deviation in Hz."""
 
-        self.inst.write(f":FM {deviation_Hz:.8E}")
+        self.write_cached(f":FM {deviation_Hz:.8E}")
         return True
 
     def set_fm(self, on: bool) -> bool:
         """If on is True turn on FM (Frequency Modulation)."""
 
         if on:
-            self.inst.write(":FM:STAT ON")
+            self.write_cached(":FM:STAT ON")
             self.logger.info("Frequency modulation ON.")
         else:
-            self.inst.write(":FM:STAT OFF")
+            self.write_cached(":FM:STAT OFF")
             self.logger.info("Frequency modulation OFF.")
         return True
 
@@ -416,28 +419,28 @@ class N5182B(VisaInstrument):
         ):
             return self.fail_with("invalid AM source")
 
-        self.inst.write(":AM:SOUR " + source)
+        self.write_cached(":AM:SOUR " + source)
         return True
 
     def set_am_depth(self, depth: float, log: bool) -> bool:
         """Set AM depth."""
 
         if log:
-            self.inst.write("AM:TYPE EXP")
-            self.inst.write(f"AM:EXP {depth:.8f}")
+            self.write_cached("AM:TYPE EXP")
+            self.write_cached(f"AM:EXP {depth:.8f}")
         else:
-            self.inst.write("AM:TYPE LIN")
-            self.inst.write(f"AM {depth:.8f}")
+            self.write_cached("AM:TYPE LIN")
+            self.write_cached(f"AM {depth:.8f}")
         return True
 
     def set_am(self, on: bool) -> bool:
         """If on is True turn on AM (Amplitude Modulation)."""
 
         if on:
-            self.inst.write(":AM:STAT ON")
+            self.write_cached(":AM:STAT ON")
             self.logger.info("Amplitude modulation ON.")
         else:
-            self.inst.write(":AM:STAT OFF")
+            self.write_cached(":AM:STAT OFF")
             self.logger.info("Amplitude modulation OFF.")
         return True
 
@@ -445,10 +448,10 @@ class N5182B(VisaInstrument):
         """If on is True turn on modulation."""
 
         if on:
-            self.inst.write(":OUTP:MOD:STAT ON")
+            self.write_cached(":OUTP:MOD:STAT ON")
             self.logger.info("Modulation ON.")
         else:
-            self.inst.write(":OUTP:MOD:STAT OFF")
+            self.write_cached(":OUTP:MOD:STAT OFF")
             self.logger.info("Modulation OFF.")
         return True
 
@@ -456,14 +459,15 @@ class N5182B(VisaInstrument):
         """Setup Continuous Wave output with fixed freq and power."""
 
         self._mode = Mode.UNCONFIGURED
-        success = (
-            (self.rst_cls() if reset else True)
-            and self.set_freq_mode("CW")
-            and self.set_power_mode("FIX")
-            and self.set_freq_CW(freq)
-            and self.set_power(power)
-            and self.check_error()
-        )
+        with self.coalesce():
+            success = (
+                (self.rst_cls() if reset else True)
+                and self.set_freq_mode("CW")
+                and self.set_power_mode("FIX")
+                and self.set_freq_CW(freq)
+                and self.set_power(power)
+                and self.check_error()
+            )
         if success:
             self._mode = Mode.CW
             self.logger.info("Configured CW output.")
@@ -474,12 +478,13 @@ class N5182B(VisaInstrument):
     def configure_iq_ext(self) -> bool:
         """Setup external IQ modulation mode."""
 
-        success = (
-            self.set_modulation(True)
-            and self.set_dm_source("EXT")
-            and self.set_dm(True)
-            and self.check_error()
-        )
+        with self.coalesce():
+            success = (
+                self.set_modulation(True)
+                and self.set_dm_source("EXT")
+                and self.set_dm(True)
+                and self.check_error()
+            )
         if success:
             self.logger.info("Configured external IQ modulation.")
         else:
@@ -489,16 +494,17 @@ class N5182B(VisaInstrument):
     def configure_fm_ext(self, deviation) -> bool:
         """Setup external FM mode."""
 
-        success = (
-            self.set_modulation(True)
-            and self.set_fm_source(self.fm_ext_conf["source"])
-            and self.set_fm_ext_opts(
-                self.fm_ext_conf["DC_coupling"], self.fm_ext_conf["impedance"]
+        with self.coalesce():
+            success = (
+                self.set_modulation(True)
+                and self.set_fm_source(self.fm_ext_conf["source"])
+                and self.set_fm_ext_opts(
+                    self.fm_ext_conf["DC_coupling"], self.fm_ext_conf["impedance"]
+                )
+                and self.set_fm_deviation(deviation)
+                and self.set_fm(True)
+                and self.check_error()
             )
-            and self.set_fm_deviation(deviation)
-            and self.set_fm(True)
-            and self.check_error()
-        )
         if success:
             self.logger.info("Configured external FM.")
         else:
@@ -508,16 +514,17 @@ class N5182B(VisaInstrument):
     def configure_am_ext(self, depth, log) -> bool:
         """Setup external AM mode."""
 
-        success = (
-            self.set_modulation(True)
-            and self.set_am_source(self.am_ext_conf["source"])
-            and self.set_am_ext_opts(
-                self.am_ext_conf["DC_coupling"], self.am_ext_conf["impedance"]
+        with self.coalesce():
+            success = (
+                self.set_modulation(True)
+                and self.set_am_source(self.am_ext_conf["source"])
+                and self.set_am_ext_opts(
+                    self.am_ext_conf["DC_coupling"], self.am_ext_conf["impedance"]
+                )
+                and self.set_am_depth(depth, log)
+                and self.set_am(True)
+                and self.check_error()
             )
-            and self.set_am_depth(depth, log)
-            and self.set_am(True)
-            and self.check_error()
-        )
         if success:
             self.logger.info("Configured for external AM.")
         else:
@@ -543,24 +550,25 @@ class N5182B(VisaInstrument):
         """
 
         self._mode = Mode.UNCONFIGURED
-        success = (
-            (self.rst_cls() if reset else True)
-            and self.set_freq_mode("LIST")
-            and self.set_power_mode("FIX")
-            and self.set_trig_source("IMM")
-            and self.set_point_trig_source(
-                source=trig or self.point_trig_freq_sweep_conf["trig"],
-                ext=ext_trig or self.point_trig_freq_sweep_conf["ext_trig"],
-            )
-            and self.set_list_type(stepped=True)
-            and self.set_route_trig_out(
-                sweep_out_ch or self.point_trig_freq_sweep_conf["sweep_out_ch"], "SETT"
+        with self.coalesce():
+            success = (
+                (self.rst_cls() if reset else True)
+                and self.set_freq_mode("LIST")
+                and self.set_power_mode("FIX")
+                and self.set_trig_source("IMM")
+                and self.set_point_trig_source(
+                    source=trig or self.point_trig_freq_sweep_conf["trig"],
+                    ext=ext_trig or self.point_trig_freq_sweep_conf["ext_trig"],
+                )
+                and self.set_list_type(stepped=True)
+                and self.set_route_trig_out(
+                    sweep_out_ch or self.point_trig_freq_sweep_conf["sweep_out_ch"], "SETT"
+                )
+                and self.set_freq_range(start, stop)
+                and self.set_sweep_points(num)
+                and self.set_power(power)
+                and self.check_error()
             )
-            and self.set_freq_range(start, stop)
-            and self.set_sweep_points(num)
-            and self.set_power(power)
-            and self.check_error()
-        )
         if success:
             self._mode = Mode.POINT_TRIG_FREQ_SWEEP
             self.logger.info("Configured point trigger freq sweep.")
@@ -653,6 +661,9 @@ class N5182B(VisaInstrument):
 class MG3710E(VisaInstrument):
     """Anritsu MG3710E Vector Signal Generator.
 
+    configure() resets the device (``*RST``) by default, which invalidates the state cache
+    (``state_cache`` conf). Pass ``reset = False`` in the params to skip the unchanged settings.
+
     If second SG (SG2) is available, only CW output from SG2 can be used through
     configure(label="cw2") set(key="output", label="2").
 
@@ -765,7 +776,7 @@ class MG3710E(VisaInstrument):
         }
 
     def query_power_condition(self):
-        ans = int(self.inst.query("STAT:QUES:COND?"))
+        ans = int(self.query("STAT:QUES:COND?"))
 
         if ans == 8:
             self.logger.warning("OUTPUT UNLEVELED")
@@ -776,24 +787,24 @@ class MG3710E(VisaInstrument):
 
     def set_output(self, on: bool, ch: int = 1, silent: bool = False) -> bool:
         if on:
-            self.inst.write(f"OUTP{ch}:STAT ON")
+            self.write(f"OUTP{ch}:STAT ON")
             if not silent:
                 self.logger.info(f"SG{ch} Output ON")
         else:
-            self.inst.write(f"OUTP{ch}:STAT OFF")
+            self.write(f"OUTP{ch}:STAT OFF")
             if not silent:
                 self.logger.info(f"SG{ch} Output OFF")
         return True
 
     def set_init_cont(self, on: bool) -> bool:
         if on:
-            self.inst.write("INIT:CONT ON")
+            self.write("INIT:CONT ON")
         else:
-            self.inst.write("INIT:CONT OFF")
+            self.write("INIT:CONT OFF")
         return True
 
     def initiate(self) -> bool:
-        self.inst.write("INIT")
+        self.write("INIT")
         return True
 
     def abort(self) -> bool:
@@ -810,7 +821,7 @@ class MG3710E(VisaInstrument):
         if mode.upper() not in self.FREQ_MODE:
             return self.fail_with("invalid frequency mode.")
 
-        self.inst.write(f"SOUR{ch}:FREQ:MODE " + mode)
+        self.write_cached(f"SOUR{ch}:FREQ:MODE " + mode)
         return True
 
     def set_power_mode(self, mode: str, ch: int = 1) -> bool:
@@ -823,7 +834,7 @@ class MG3710E(VisaInstrument):
         if mode.upper() not in self.POWER_MODE:
             return self.fail_with("invalid power mode.")
 
-        self.inst.write(f"SOUR{ch}:POW:MODE " + mode)
+        self.write_cached(f"SOUR{ch}:POW:MODE " + mode)
         return True
 
     def _fmt_freq(self, freq) -> str | None:
@@ -849,7 +860,7 @@ class MG3710E(VisaInstrument):
         if f is None:
             return False
 
-        self.inst.write(f"SOUR{ch}:FREQ " + f)
+        self.write_cached(f"SOUR{ch}:FREQ " + f)
         return True
 
     def set_freq_range(self, start, stop) -> bool:
@@ -857,25 +868,25 @@ class MG3710E(VisaInstrument):
         if start is None or stop is None:
             return False
 
-        self.inst.write("FREQ:STAR {};FREQ:STOP {}".format(start, stop))
+        self.write_cached("FREQ:STAR {};FREQ:STOP {}".format(start, stop))
         return True
 
     def set_sweep_points(self, num: int) -> bool:
-        self.inst.write(f"SWE:POIN {num:d}")
+        self.write_cached(f"SWE:POIN {num:d}")
         return True
 
     def set_power(self, power_dBm, ch: int = 1) -> bool:
         if power_dBm < self.power_min or power_dBm > self.power_max:
             return self.fail_with("Invalid power.")
 
-        self.inst.write(f"SOUR{ch}:POW {power_dBm:.3f} dBm")
+        self.write_cached(f"SOUR{ch}:POW {power_dBm:.3f} dBm")
         return True
 
     def set_list_type(self, stepped=True) -> bool:
         if stepped:
-            self.inst.write("LIST:TYPE STEP")
+            self.write_cached("LIST:TYPE STEP")
         else:
-            self.inst.write("LIST:TYPE LIST")
+            self.write_cached("LIST:TYPE LIST")
 
         return True
 
@@ -883,7 +894,7 @@ class MG3710E(VisaInstrument):
         if route.upper() not in self.MARKER1_ROUTE:
             return self.fail_with("invalid output route")
 
-        self.inst.write(f"ROUT:OUTP:MARKER1 {route}")
+        self.write_cached(f"ROUT:OUTP:MARKER1 {route}")
         return True
 
     def set_trig_source(self, source: str) -> bool:
@@ -893,21 +904,21 @@ class MG3710E(VisaInstrument):
         if source not in self.TRIG_SOURCE:
             return self.fail_with("invalid trigger source.")
 
-        self.inst.write(":TRIG:SEQ:SOUR " + source)
+        self.write_cached(":TRIG:SEQ:SOUR " + source)
         return True
 
     def set_sweep_trigger(self, on: bool) -> bool:
         if on:
-            self.inst.write("LIST:TRIG ON")
+            self.write_cached("LIST:TRIG ON")
         else:
-            self.inst.write("LIST:TRIG OFF")
+            self.write_cached("LIST:TRIG OFF")
         return True
 
     def set_sweep_trigger_mode(self, point: bool) -> bool:
         if point:
-            self.inst.write("LIST:TRIG:MODE POINTS")
+            self.write_cached("LIST:TRIG:MODE POINTS")
         else:
-            self.inst.write("LIST:TRIG:MODE START")
+            self.write_cached("LIST:TRIG:MODE START")
         return True
 
     def set_sweep_trig_source(self, source: str) -> bool:
@@ -921,11 +932,11 @@ class MG3710E(VisaInstrument):
         if source not in self.TRIG_SOURCE:
             return self.fail_with("invalid sweep trigger source.")
 
-        self.inst.write("LIST:TRIG:SOUR " + source)
+        self.write_cached("LIST:TRIG:SOUR " + source)
         return True
 
     def set_sweep_dwell_time(self, time: str) -> bool:
-        self.inst.write(f"SWE:DWELL {time:s}")
+        self.write_cached(f"SWE:DWELL {time:s}")
         return True
 
     def set_dm_source(self, source: str) -> bool:
@@ -940,15 +951,15 @@ class MG3710E(VisaInstrument):
         if source.startswith("EXT"):
             source = "A" + source
 
-        self.inst.write(":DM:SOUR " + source)
+        self.write_cached(":DM:SOUR " + source)
 
         return True
 
     def set_dm_output(self, external: bool) -> bool:
         if external:
-            self.inst.write(":DM:OUTP AEXT")
+            self.write_cached(":DM:OUTP AEXT")
         else:
-            self.inst.write(":DM:OUTP RFO")
+            self.write_cached(":DM:OUTP RFO")
         return True
 
     def set_dm_invert(self, invert: bool) -> bool:
@@ -963,9 +974,9 @@ class MG3710E(VisaInstrument):
         """
 
         if invert:
-            self.inst.write(":DM:POL INV")
+            self.write_cached(":DM:POL INV")
         else:
-            self.inst.write(":DM:POL NORM")
+            self.write_cached(":DM:POL NORM")
         return True
 
     def set_dm(self, on: bool) -> bool:
@@ -982,8 +993,8 @@ class MG3710E(VisaInstrument):
         cpl = "DC" if DC_coupling else "AC"
         if impedance not in (50, 600, "HIZ"):
             return self.fail_with(f"invalid impedance {impedance}")
-        self.inst.write(f"SOUR{ch}:EXTM:COUP " + cpl)
-        self.inst.write(f"SOUR{ch}:EXTM:IMP {impedance:d}")
+        self.write_cached(f"SOUR{ch}:EXTM:COUP " + cpl)
+        self.write_cached(f"SOUR{ch}:EXTM:IMP {impedance:d}")
         return True
 
     def set_fm_source(self, source: str, ch: int = 1) -> bool:
@@ -992,23 +1003,23 @@ class MG3710E(VisaInstrument):
         if source.upper() not in ("EXT", "INT", "INT1", "INT2"):
             return self.fail_with("invalid FM source")
 
-        self.inst.write(f"SOUR{ch}:FM:SOUR " + source)
+        self.write_cached(f"SOUR{ch}:FM:SOUR " + source)
         return True
 
     def set_fm_deviation(self, deviation_Hz: float, ch: int = 1) -> bool:
         """Set FM deviation in Hz."""
 
-        self.inst.write(f"SOUR{ch}:FM {deviation_Hz:.8E}")
+        self.write_cached(f"SOUR{ch}:FM {deviation_Hz:.8E}")
         return True
 
     def set_fm(self, on: bool, ch: int = 1) -> bool:
         """If on is True turn on FM (Frequency Modulation)."""
 
         if on:
-            self.inst.write(f"SOUR{ch}:FM:STAT ON")
+            self.write_cached(f"SOUR{ch}:FM:STAT ON")
             self.logger.info(f"SG{ch} Frequency modulation ON.")
         else:
-            self.inst.write(f"SOUR{ch}:FM:STAT OFF")
+            self.write_cached(f"SOUR{ch}:FM:STAT OFF")
             self.logger.info(f"SG{ch} Frequency modulation OFF.")
         return True
 
@@ -1018,18 +1029,18 @@ class MG3710E(VisaInstrument):
         if source.upper() not in ("EXT", "INT", "INT1", "INT2"):
             return self.fail_with("invalid AM source")
 
-        self.inst.write(f"SOUR{ch}:AM:SOUR " + source)
+        self.write_cached(f"SOUR{ch}:AM:SOUR " + source)
         return True
 
     def set_am_depth(self, depth: float, log: bool, ch: int = 1) -> bool:
         """Set AM depth."""
 
         if log:
-            self.inst.write(f"SOUR{ch}:AM:TYPE EXP")
-            self.inst.write(f"SOUR{ch}:AM:EXP {depth:.8f}")
+            self.write_cached(f"SOUR{ch}:AM:TYPE EXP")
+            self.write_cached(f"SOUR{ch}:AM:EXP {depth:.8f}")
         else:
-            self.inst.write(f"SOUR{ch}:AM:TYPE LIN")
-            self.inst.write(f"SOUR{ch}:AM {depth:.8f}")
+            self.write_cached(f"SOUR{ch}:AM:TYPE LIN")
+            self.write_cached(f"SOUR{ch}:AM {depth:.8f}")
         return True
 
     def set_am_depth_ext(self, depth: float, log: bool, ch: int = 1) -> bool:
@@ -1042,17 +1053,17 @@ class MG3710E(VisaInstrument):
 
         if log:
             return self.fail_with("Cannot use log scale for external AM.")
-        self.inst.write(f"SOUR{ch}:AM {depth:.8f}")
+        self.write_cached(f"SOUR{ch}:AM {depth:.8f}")
         return True
 
     def set_am(self, on: bool, ch: int = 1) -> bool:
         """If on is True turn on AM (Amplitude Modulation)."""
 
         if on:
-            self.inst.write(f"SOUR{ch}:AM:STAT ON")
+            self.write_cached(f"SOUR{ch}:AM:STAT ON")
             self.logger.info(f"SG{ch} Amplitude modulation ON.")
         else:
-            self.inst.write(f"SOUR{ch}:AM:STAT OFF")
+            self.write_cached(f"SOUR{ch}:AM:STAT OFF")
             self.logger.info(f"SG{ch} Amplitude modulation OFF.")
         return True
 
@@ -1060,34 +1071,35 @@ class MG3710E(VisaInstrument):
         """If on is True turn on modulation."""
 
         if on:
-            self.inst.write(f":OUTP{ch}:MOD:STAT ON")
+            self.write_cached(f":OUTP{ch}:MOD:STAT ON")
             self.logger.info(f"SG{ch} Modulation ON.")
         else:
-            self.inst.write(f":OUTP{ch}:MOD:STAT OFF")
+            self.write_cached(f":OUTP{ch}:MOD:STAT OFF")
             self.logger.info(f"SG{ch} Modulation OFF.")
         return True
 
     def set_arb(self, on: bool, ch: int = 1) -> bool:
         if on:
-            self.inst.write(f"SOUR{ch}:RAD:ARB ON")
+            self.write_cached(f"SOUR{ch}:RAD:ARB ON")
         else:
-            self.inst.write(f"SOUR{ch}:RAD:ARB OFF")
+            self.write_cached(f"SOUR{ch}:RAD:ARB OFF")
         return True
 
     def configure_cw(self, freq, power, ch: int = 1, reset: bool = True) -> bool:
         """Setup Continuous Wave output with fixed freq and power."""
 
         self._mode = Mode.UNCONFIGURED
-        success = (
-            (self.rst_cls() if reset else True)
-            and self.set_freq_mode("CW", ch=ch)
-            and self.set_power_mode("FIX", ch=ch)
-            and self.set_freq_CW(freq, ch=ch)
-            and self.set_power(power, ch=ch)
-            and self.set_arb(False, ch=ch)
-            and self.set_modulation(False, ch=ch)
-            and self.check_error()
-        )
+        with self.coalesce():
+            success = (
+                (self.rst_cls() if reset else True)
+                and self.set_freq_mode("CW", ch=ch)
+                and self.set_power_mode("FIX", ch=ch)
+                and self.set_freq_CW(freq, ch=ch)
+                and self.set_power(power, ch=ch)
+                and self.set_arb(False, ch=ch)
+                and self.set_modulation(False, ch=ch)
+                and self.check_error()
+            )
         if success:
             self._mode = Mode.CW
             self.logger.info("Configured CW output.")
@@ -1101,13 +1113,14 @@ class MG3710E(VisaInstrument):
         if self._mode != Mode.CW:
             return self.fail_with("external IQ modulation is only for CW.")
 
-        success = (
-            self.set_modulation(True, ch=1)
-            and self.set_dm_output(True)
-            and self.set_dm_source("EXT")
-            and self.set_dm(True)
-            and self.check_error()
-        )
+        with self.coalesce():
+            success = (
+                self.set_modulation(True, ch=1)
+                and self.set_dm_output(True)
+                and self.set_dm_source("EXT")
+                and self.set_dm(True)
+                and self.check_error()
+            )
         if success:
             self.logger.info("Configured external IQ modulation.")
         else:
@@ -1120,16 +1133,17 @@ class MG3710E(VisaInstrument):
         if self._mode != Mode.CW:
             return self.fail_with("external FM is only for CW.")
 
-        success = (
-            self.set_modulation(True, ch=ch)
-            and self.set_fm_source("EXT", ch=ch)
-            and self.set_ext_mod_opts(
-                self.fm_ext_conf["DC_coupling"], self.fm_ext_conf["impedance"], ch=ch
+        with self.coalesce():
+            success = (
+                self.set_modulation(True, ch=ch)
+                and self.set_fm_source("EXT", ch=ch)
+                and self.set_ext_mod_opts(
+                    self.fm_ext_conf["DC_coupling"], self.fm_ext_conf["impedance"], ch=ch
+                )
+                and self.set_fm_deviation(deviation, ch=ch)
+                and self.set_fm(True, ch=ch)
+                and self.check_error()
             )
-            and self.set_fm_deviation(deviation, ch=ch)
-            and self.set_fm(True, ch=ch)
-            and self.check_error()
-        )
         if success:
             self.logger.info("Configured external FM.")
         else:
@@ -1142,16 +1156,17 @@ class MG3710E(VisaInstrument):
         if self._mode != Mode.CW:
             return self.fail_with("external AM is only for CW.")
 
-        success = (
-            self.set_modulation(True, ch=ch)
-            and self.set_am_source("EXT", ch=ch)
-            and self.set_ext_mod_opts(
-                self.am_ext_conf["DC_coupling"], self.am_ext_conf["impedance"], ch=ch
+        with self.coalesce():
+            success = (
+                self.set_modulation(True, ch=ch)
+                and self.set_am_source("EXT", ch=ch)
+                and self.set_ext_mod_opts(
+                    self.am_ext_conf["DC_coupling"], self.am_ext_conf["impedance"], ch=ch
+                )
+                and self.set_am_depth_ext(depth, log, ch=ch)
+                and self.set_am(True, ch=ch)
+                and self.check_error()
             )
-            and self.set_am_depth_ext(depth, log, ch=ch)
-            and self.set_am(True, ch=ch)
-            and self.check_error()
-        )
         if success:
             self.logger.info("Configured external AM.")
         else:
@@ -1175,24 +1190,25 @@ class MG3710E(VisaInstrument):
         """
 
         self._mode = Mode.UNCONFIGURED
-        success = (
-            (self.rst_cls() if reset else True)
-            and self.set_freq_mode("LIST")
-            and self.set_power_mode("FIX")
-            and self.set_sweep_trigger(True)
-            and self.set_sweep_trigger_mode(True)
-            and self.set_sweep_trig_source(
-                trig or self.point_trig_freq_sweep_conf["trig"],
+        with self.coalesce():
+            success = (
+                (self.rst_cls() if reset else True)
+                and self.set_freq_mode("LIST")
+                and self.set_power_mode("FIX")
+                and self.set_sweep_trigger(True)
+                and self.set_sweep_trigger_mode(True)
+                and self.set_sweep_trig_source(
+                    trig or self.point_trig_freq_sweep_conf["trig"],
+                )
+                and self.set_sweep_dwell_time("100US")
+                and self.set_list_type(stepped=True)
+                and self.set_route_marker1("SET")
+                and self.set_freq_range(start, stop)
+                and self.set_sweep_points(num)
+                and self.set_power(power)
+                and self.set_init_cont(True)
+                and self.check_error()
             )
-            and self.set_sweep_dwell_time("100US")
-            and self.set_list_type(stepped=True)
-            and self.set_route_marker1("SET")
-            and self.set_freq_range(start, stop)
-            and self.set_sweep_points(num)
-            and self.set_power(power)
-            and self.set_init_cont(True)
-            and self.check_error()
-        )
         if success:
             self._mode = Mode.POINT_TRIG_FREQ_SWEEP
             self.logger.info("Configured point trigger freq sweep.")
@@ -40,13 +40,18 @@ class MCS(TDCBase):
     :type mcs_dir: str
     :param raw_events_dir: (default: mcs_dir) The directory to save RawEvents data.
     :type raw_events_dir: str
-    :param remove_lst: (default: True) Remove .lst file after loading it.
+    :param remove_lst: (default: True) Remove .lst file after loading it
+        (by get_raw_events() or final call of get_raw_events_chunk()).
     :type remove_lst: bool
     :param lst_channels: (default: [8, 9]) Collected channels for lst file.
         Under a setting, default value [8, 9] corresponds to STOP1 and STOP2.
         As correspondence is unclear after reading the manual (maybe dependent on the setting),
         it is recommended to inspect the output lst file first.
     :type lst_channels: list[int]
+    :param raw_events_channels: (default: False) Keep the channel of each event
+        in RawEvents (channels attribute) for correlation between channels (e.g. HBT).
+        The channels are indices of lst_channels.
+    :type raw_events_channels: bool
     :param dll_mod: (default: True) Set True if modified DLL below is installed.
         Set False if DLL is the original version.
 
@@ -164,8 +169,11 @@ class MCS(TDCBase):
         self._raw_events_dir = os.path.expanduser(self.conf.get("raw_events_dir", self._mcs_dir))
         self._remove_lst = self.conf.get("remove_lst", True)
         self._lst_channels = self.conf.get("lst_channels", [8, 9])
+        self._raw_events_channels = self.conf.get("raw_events_channels", False)
         self.logger.debug(f"available base config files: {self._base_configs}")
         self._save_file_name = None
+        self._lst_format = None
+        self._lst_offset = 0
 
         # Ref. clock setting is not affected by load_config() and
         # persistent during MCS software is alive.
@@ -384,21 +392,86 @@ class MCS(TDCBase):
         events = self.convert_raw_events(format_info, data)
 
         self.logger.debug("Start sorting raw events")
-        data = np.concatenate(events)
-        # in-place sort to reduce memory consumption? (effect not confirmed)
-        data.sort()
+        data, channels = self.merge_raw_events(events)
         self.logger.debug("Finished sorting raw events")
 
         h5_name = os.path.splitext(self._save_file_name)[0] + ".h5"
         h5_path = os.path.join(self._raw_events_dir, h5_name)
 
         self.logger.info(f"Saving converted raw events to {h5_path}")
-        success = save_h5(h5_path, RawEvents(data), RawEvents, self.logger, compression="lzf")
+        success = save_h5(
+            h5_path, RawEvents(data, channels), RawEvents, self.logger, compression="lzf"
+        )
         if success:
             return h5_name
         else:
             return None
 
+    def get_raw_events_chunk(self, final: bool = False) -> RawEvents | None:
+        """Get raw events appended to the lst file since last call.
+
+        Only binary lst file (DATSETTING.mpafmt == 1) is supported.
+        If `final` is True, the lst file is removed after read if remove_lst is True.
+
+        """
+
+        if not self._save_file_name:
+            self.logger.error("save file name has not been set.")
+            return None
+
+        lst_name = os.path.splitext(self._save_file_name)[0] + ".lst"
+        lst_path = os.path.join(self._mcs_dir, lst_name)
+        empty = RawEvents(
+            np.zeros(0, dtype=np.uint64),
+            np.zeros(0, dtype=np.uint8) if self._raw_events_channels else None,
+        )
+        if not os.path.exists(lst_path):
+            # file is not created yet
+            return empty
+
+        with open(lst_path, "rb") as f:
+            if self._lst_format is None:
+                if self.get_data_setting().mpafmt != 1:
+                    self.logger.error("Only binary lst file is supported for raw_events_chunk.")
+                    return None
+                ret = self.read_lst_header(f, True)
+                if ret is None:
+                    # header is not written completely yet
+                    return empty
+                _, self._lst_format = ret
+                self._lst_offset = f.tell()
+
+            # read whole 64 bit records only: the last one may be being written.
+            num = (os.path.getsize(lst_path) - self._lst_offset) // 8
+            f.seek(self._lst_offset)
+            data = np.fromfile(f, dtype=np.uint64, count=num)
+            self._lst_offset += 8 * len(data)
+
+        if final and self._remove_lst:
+            self.remove_saved_file(lst_path)
+
+        events = self.convert_raw_events(self._lst_format, data)
+        return RawEvents(*self.merge_raw_events(events))
+
+    def merge_raw_events(self, events: list[np.ndarray]) -> tuple[np.ndarray, np.ndarray | None]:
+        """Merge and sort the events of channels.
+
+        :returns: (data, channels). channels is None if raw_events_channels is False.
+
+        """
+
+        data = np.concatenate(events)
+        if self._raw_events_channels:
+            channels = np.repeat(
+                np.arange(len(events), dtype=np.uint8), [len(ev) for ev in events]
+            )
+            idx = np.argsort(data, kind="stable")
+            return data[idx], channels[idx]
+
+        # in-place sort to reduce memory consumption? (effect not confirmed)
+        data.sort()
+        return data, None
+
     def convert_raw_events(self, format_info, data) -> list[np.ndarray]:
         cl, ch = format_info["channel"]
         tl, th = format_info["timedata"]
@@ -426,6 +499,36 @@ class MCS(TDCBase):
             self.logger.error(f"Unsupported DATSETTING.mpafmt: {setting.mapfmt}")
             return None
 
+        f = open(file_name, "rb" if binary else "r")
+        ret = self.read_lst_header(f, binary)
+        if ret is None:
+            self.logger.error("[DATA] line not found in lst file.")
+            return None
+        header, format_info = ret
+
+        self.logger.debug(f"Loaded header. {format_info}")
+
+        if not binary:
+            data = np.array([int(l, base=16) for l in f.readlines()], dtype=np.uint64)
+        else:
+            dsize = os.path.getsize(file_name) - f.tell()
+            dlen = format_info["datalength"]
+            if dsize % dlen:
+                self.logger.error(
+                    f"data size {dsize} is not integer multiple of datalength {dlen}"
+                )
+                return None
+            data = np.fromfile(f, dtype=np.uint64)
+
+        return header, format_info, data
+
+    def read_lst_header(self, f, binary: bool) -> tuple[list[str], dict] | None:
+        """Read the header of lst file until [DATA] line.
+
+        :returns: (header lines, format_info) or None if [DATA] line is not found.
+
+        """
+
         format_info = {
             "datalength": None,
             "channel": None,
@@ -433,9 +536,7 @@ class MCS(TDCBase):
             "timedata": None,
             "datalost": None,
         }
-
         header = []
-        f = open(file_name, "rb" if binary else "r")
 
         pat_b = re.compile(r"^;datalength=(\d+)bytes")
         pat_c = re.compile(r"^;bit(\d+)\.\.(\d+):channel")
@@ -461,27 +562,9 @@ class MCS(TDCBase):
                 format_info["datalost"] = int(m.group(1))
 
             if l == "[DATA]":
-                break
+                return header, format_info
             header.append(l)
-        else:
-            self.logger.error("[DATA] line not found in lst file.")
-            return None
-
-        self.logger.debug(f"Loaded header. {format_info}")
-
-        if not binary:
-            data = np.array([int(l, base=16) for l in f.readlines()], dtype=np.uint64)
-        else:
-            dsize = os.path.getsize(file_name) - f.tell()
-            dlen = format_info["datalength"]
-            if dsize % dlen:
-                self.logger.error(
-                    f"data size {dsize} is not integer multiple of datalength {dlen}"
-                )
-                return None
-            data = np.fromfile(f, dtype=np.uint64)
-
-        return header, format_info, data
+        return None
 
     def configure_raw_events(
         self,
@@ -536,6 +619,8 @@ class MCS(TDCBase):
     def start(self, label: str = "") -> bool:
         """Clear data and start a new acquisition."""
 
+        self._lst_format = None
+        self._lst_offset = 0
         return self.run_command("start")
 
     def stop(self, label: str = "") -> bool:
@@ -601,6 +686,8 @@ class MCS(TDCBase):
             return self.get_status(args)
         elif key == "raw_events":
             return self.get_raw_events()
+        elif key == "raw_events_chunk":
+            return self.get_raw_events_chunk(bool(args))
         else:
             self.logger.error(f"unknown get() key: {key}")
             return None
@@ -50,6 +50,9 @@ class TimeTagger(TDCBase):
     :type clock_out: bool | None
     :param remove_ttbin: (default: True) Remove raw events (.ttbin) file after load.
     :type remove_ttbin: bool
+    :param stream_buffer_size: (default: 10_000_000) Max number of events buffered
+        between the calls of get_raw_events_chunk() in stream mode of raw_events.
+    :type stream_buffer_size: int
     :param serial: (default: "") Serial string to discriminate multiple TimeTaggers.
         Blank is fine if only one TimeTagger is connected.
     :type serial: str
@@ -66,6 +69,7 @@ class TimeTagger(TDCBase):
         self._base_configs = self.conf.get("base_configs", {})
         self._raw_events_dir = os.path.expanduser(self.conf.get("raw_events_dir", "~"))
         self._remove_ttbin = self.conf.get("remove_ttbin", True)
+        self._stream_buffer_size = self.conf.get("stream_buffer_size", 10_000_000)
         self.logger.debug(f"available base configs: {self._base_configs}")
 
         if not os.path.exists(self._raw_events_dir):
@@ -74,12 +78,15 @@ class TimeTagger(TDCBase):
         # always use SynchronizedMeasurements to avoid autostart
         # on initialization of measurement class.
         self.sync: tt.SynchronizedMeasurements | None = None
-        self.meas: tt.Correlation | tt.FileWriter | list[tt.Histogram] | None = None
+        self.meas: (
+            tt.Correlation | tt.FileWriter | tt.TimeTagStream | list[tt.Histogram] | None
+        ) = None
         self.counter: tt.Counter | None = None
         self._duration_ps: int = 0
 
         self._raw_events_start_ch = None
         self._save_file_name = None
+        self._stream_start_stamp = None
         self._tstart = time.time()
         self.trange = self.tbin = 0.0
 
@@ -220,7 +227,14 @@ class TimeTagger(TDCBase):
         self._duration_ps = 0
         return True
 
-    def configure_raw_events(self, base_config: str, save_file: str) -> bool:
+    def configure_raw_events(self, base_config: str, save_file: str, stream: bool = False) -> bool:
+        """Configure raw events measurement.
+
+        If stream is True, events are read by get_raw_events_chunk() via TimeTagStream
+        instead of writing the file (get_raw_events() cannot be used).
+
+        """
+
         if base_config not in self._base_configs:
             return self.fail_with("Unknown base config name")
         save_file_path = os.path.join(self._raw_events_dir, save_file)
@@ -235,11 +249,18 @@ class TimeTagger(TDCBase):
             self.tagger.setTriggerLevel(channel, level)
 
         self.sync = tt.SynchronizedMeasurements(self.tagger)
-        self.meas = tt.FileWriter(
-            self.sync.getTagger(),
-            filename=save_file_path,
-            channels=conf["channels"],
-        )
+        if stream:
+            self.meas = tt.TimeTagStream(
+                self.sync.getTagger(),
+                n_max_events=self._stream_buffer_size,
+                channels=conf["channels"],
+            )
+        else:
+            self.meas = tt.FileWriter(
+                self.sync.getTagger(),
+                filename=save_file_path,
+                channels=conf["channels"],
+            )
         self.counter = tt.Counter(self.sync.getTagger(), conf["channels"])
         self._duration_ps = 0
 
@@ -250,7 +271,7 @@ class TimeTagger(TDCBase):
         self.tbin = 1e-12
         self.trange = 0.0
         msg = f"Configured raw_events mode. start_ch: {self._raw_events_start_ch}"
-        msg += f" file: {save_file_path}"
+        msg += " stream" if stream else f" file: {save_file_path}"
         self.logger.info(msg)
 
         return True
@@ -352,7 +373,7 @@ class TimeTagger(TDCBase):
                 self.logger.error(f"ch {ch} is out of bounds.")
                 return None
             return ChannelStatus(running, runtime, total, starts)
-        elif isinstance(self.meas, (tt.Correlation, tt.FileWriter)):
+        elif isinstance(self.meas, (tt.Correlation, tt.FileWriter, tt.TimeTagStream)):
             # Correlation / Raw events measurement
             starts = 0
             try:
@@ -366,6 +387,9 @@ class TimeTagger(TDCBase):
             return None
 
     def get_raw_events(self) -> str | None:
+        if isinstance(self.meas, tt.TimeTagStream):
+            self.logger.error("Raw events are not saved in stream mode.")
+            return None
         if not self._save_file_name:
             self.logger.error("save file name has not been set.")
             return None
@@ -423,6 +447,32 @@ class TimeTagger(TDCBase):
         else:
             return None
 
+    def get_raw_events_chunk(self, final: bool = False) -> RawEvents | None:
+        if not isinstance(self.meas, tt.TimeTagStream):
+            self.logger.error("Measurement is not configured for stream of raw events.")
+            return None
+
+        data = self.meas.getData()
+        # stamps is np.int64 array
+        stamps = data.getTimestamps()
+        if len(stamps) >= self._stream_buffer_size:
+            self.logger.warn("Stream buffer is full. Some events may be lost.")
+
+        if self._raw_events_start_ch is not None:
+            channels = data.getChannels()
+            if self._stream_start_stamp is None:
+                indices = np.where(channels == self._raw_events_start_ch)[0]
+                if len(indices) == 0:
+                    self.logger.debug("Start stamp not found in this chunk")
+                    return RawEvents(np.zeros(0, dtype=np.int64))
+                self._stream_start_stamp = stamps[indices[0]]
+                self.logger.info(f"Found Start stamp: {self._stream_start_stamp}")
+            stamps = stamps[channels != self._raw_events_start_ch] - self._stream_start_stamp
+            stamps = stamps[stamps >= 0]
+
+        stamps.sort()
+        return RawEvents(stamps)
+
     # Standard API
 
     def close_resources(self):
@@ -439,6 +489,7 @@ class TimeTagger(TDCBase):
             self.sync.clear()
             self.sync.start()
         self._tstart = time.time()
+        self._stream_start_stamp = None
         self.logger.info("Started measurement.")
         return True
 
@@ -479,7 +530,9 @@ class TimeTagger(TDCBase):
                 )
         elif label == "raw_events":
             if all([k in params for k in ("base_config", "save_file")]):
-                return self.configure_raw_events(params["base_config"], params["save_file"])
+                return self.configure_raw_events(
+                    params["base_config"], params["save_file"], params.get("stream", False)
+                )
         else:
             return self.fail_with(f"invalid label {label}")
 
@@ -511,6 +564,8 @@ class TimeTagger(TDCBase):
             return self.get_status(args)
         elif key == "raw_events":
             return self.get_raw_events()
+        elif key == "raw_events_chunk":
+            return self.get_raw_events_chunk(bool(args))
         else:
             self.logger.error(f"unknown get() key: {key}")
             return None
@@ -9,5 +9,7 @@ Core shared components for Time to Digital Converter (Time Digitizer) module
 """
 
 from mahos.inst.tdc_core.tdc_core import TDCBase
+from mahos.inst.tdc_core.event_sim import PhotonEventSimulator
+from mahos.inst.tdc_core.correlator import Correlator, correlate
 
-__all__ = ["TDCBase"]
+__all__ = ["TDCBase", "PhotonEventSimulator", "Correlator", "correlate"]
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+
+"""
+Software time-tag correlator for two channels (HBT / g2 measurement).
+
+.. This file is a part of MAHOS project, which is released under the 3-Clause BSD license.
+.. See included LICENSE file or https://github.com/ToyotaCRDL/mahos/blob/main/LICENSE for details.
+
+"""
+
+from __future__ import annotations
+
+import numpy as np
+from numpy.typing import NDArray
+
+
+def _as_tags(events) -> NDArray[np.int64]:
+    if events is None:
+        return np.zeros(0, dtype=np.int64)
+    return np.asarray(events).astype(np.int64, copy=False)
+
+
+class Correlator(object):
+    """Histogram of time differences between start and stop channels.
+
+    The time tags are integers in the unit of TDC resolution (such as RawEvents data).
+    The histogram bin k counts the pairs with round((stop - start) / binwidth) == k.
+
+    mode "full" computes the full cross-correlation: all the pairs with
+    |stop - start| <= window are counted, and the bins are k = -n, ..., n
+    (n = window // binwidth). This is equivalent to the correlation mode of TDCs
+    (e.g. TimeTagger's Correlation).
+
+    mode "start_stop" emulates the classic start-stop measurement: each start is paired with
+    the first stop after it, only if no other start comes in between.
+    The bins are k = 0, ..., n.
+
+    The events can be given incrementally by :meth:`add`; the pairs across the chunks
+    are counted exactly once. Only the events which can still pair with future events
+    are retained between the calls. To bound the memory even if a channel is silent,
+    pass `until` (all the events before it have been given).
+
+    :param window: maximum time difference in the unit of time tag.
+    :param binwidth: width of histogram bin in the unit of time tag.
+    :param mode: "full" or "start_stop".
+    :param block: number of start events processed at once (bounds the working memory).
+
+    """
+
+    MODES = ("full", "start_stop")
+
+    def __init__(self, window: int, binwidth: int = 1, mode: str = "full", block: int = 1 << 16):
+        if mode not in self.MODES:
+            raise ValueError(f"unknown mode {mode}")
+        if window < 0 or binwidth <= 0:
+            raise ValueError("window must be non-negative and binwidth must be positive")
+        self.window = int(window)
+        self.binwidth = int(binwidth)
+        self.mode = mode
+        self.block = block
+
+        self._n = self.window // self.binwidth
+        if mode == "full":
+            self.num_bins = 2 * self._n + 1
+        else:
+            self.num_bins = self._n + 1
+        self.reset()
+
+    def reset(self):
+        """Clear the histogram and the retained events."""
+
+        self.hist = np.zeros(self.num_bins, dtype=np.uint64)
+        #: total numbers of start and stop events.
+        self.starts = 0
+        self.stops = 0
+        self._start = np.zeros(0, dtype=np.int64)
+        self._stop = np.zeros(0, dtype=np.int64)
+        self._last_start = None
+        self._last_stop = None
+
+    def get_delays(self) -> NDArray[np.int64]:
+        """Get the time difference at the center of each bin in the unit of time tag."""
+
+        k = np.arange(self.num_bins, dtype=np.int64)
+        if self.mode == "full":
+            k -= self._n
+        return k * self.binwidth
+
+    def _bin_index(self, dt: NDArray[np.int64]) -> NDArray[np.int64]:
+        k = np.floor_divide(dt + self.binwidth // 2, self.binwidth)
+        if self.mode == "full":
+            k += self._n
+        return k
+
+    def _accumulate(self, dt: NDArray[np.int64]):
+        dt = dt[np.abs(dt) <= self.window]
+        k = self._bin_index(dt)
+        k = k[(k >= 0) & (k < self.num_bins)]
+        self.hist += np.bincount(k, minlength=self.num_bins).astype(np.uint64)
+
+    def _count_window(self, start: NDArray[np.int64], stop: NDArray[np.int64]):
+        """Count all the pairs within window (windowed counting by searchsorted)."""
+
+        if not len(start) or not len(stop):
+            return
+        for i in range(0, len(start), self.block):
+            a = start[i : i + self.block]
+            lo = np.searchsorted(stop, a - self.window, side="left")
+            hi = np.searchsorted(stop, a + self.window, side="right")
+            counts = hi - lo
+            total = int(counts.sum())
+            if not total:
+                continue
+            heads = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+            idx = np.arange(total, dtype=np.int64) + heads
+            self._accumulate(stop[idx] - np.repeat(a, counts))
+
+    def _horizons(self, start, stop, until) -> tuple[int | None, int | None]:
+        """Lower bounds of the future start and stop events."""
+
+        if len(start):
+            self._last_start = int(start[-1])
+        if len(stop):
+            self._last_stop = int(stop[-1])
+        hs, ht = self._last_start, self._last_stop
+        if until is not None:
+            hs = until if hs is None else max(hs, until)
+            ht = until if ht is None else max(ht, until)
+        return hs, ht
+
+    def _add_full(self, start, stop, until):
+        # new starts with all (retained and new) stops, and retained starts with new stops.
+        self._count_window(start, np.concatenate((self._stop, stop)))
+        self._count_window(self._start, stop)
+
+        next_start, next_stop = self._horizons(start, stop, until)
+        start = np.concatenate((self._start, start))
+        stop = np.concatenate((self._stop, stop))
+        if next_stop is not None:
+            start = start[start >= next_stop - self.window]
+        if next_start is not None:
+            stop = stop[stop >= next_start - self.window]
+        self._start, self._stop = start, stop
+
+    @staticmethod
+    def _first_stops(start, stop) -> tuple[NDArray[np.bool_], NDArray[np.int64]]:
+        """Find the first stop at or after each start.
+
+        :returns: (found, dt). dt is the time difference (undefined where not found).
+
+        """
+
+        i = np.searchsorted(stop, start, side="left")
+        found = i < len(stop)
+        if not len(stop):
+            return found, np.zeros(len(start), dtype=np.int64)
+        return found, stop[np.minimum(i, len(stop) - 1)] - start
+
+    def _add_start_stop(self, start, stop, until):
+        next_start, next_stop = self._horizons(start, stop, until)
+        # self._start holds the pending starts (whose pairs are not determined yet).
+        start = np.concatenate((self._start, start))
+        stop = np.concatenate((self._stop, stop))
+        if not len(start):
+            self._stop = stop[stop >= next_start] if next_start is not None else stop
+            return
+
+        found, dt = self._first_stops(start, stop)
+        first = start + dt
+        # the following start is known except for the last one (lower bound: next_start).
+        following = np.append(start[1:], next_start)
+        is_last = np.zeros(len(start), dtype=np.bool_)
+        is_last[-1] = True
+
+        paired = found & (first < following)
+        # a start with a known stop is resolved unless it is the last one and
+        # a future start might come before the stop.
+        resolved = found & (paired | ~is_last | (dt > self.window))
+        if next_stop is not None:
+            # future stops don't come before next_stop.
+            resolved |= ~found & (
+                (next_stop > start + self.window) | (~is_last & (next_stop >= following))
+            )
+
+        # once a start is pending, the later ones are pending too.
+        pending = np.flatnonzero(~resolved)
+        p = int(pending[0]) if len(pending) else len(start)
+        self._accumulate(dt[:p][paired[:p]])
+        if p < len(start):
+            self._start = start[p:]
+            self._stop = stop[stop >= start[p]]
+        else:
+            self._start = start[:0]
+            self._stop = stop[stop >= next_start]
+
+    def add(self, start, stop, until: int | None = None):
+        """Add chunks of sorted time tags of start and stop channels.
+
+        Each chunk must come after the previous chunk of the same channel.
+
+        :param start: sorted time tags of start channel.
+        :param stop: sorted time tags of stop channel.
+        :param until: all the events before this time have been given (optional).
+
+        """
+
+        start, stop = _as_tags(start), _as_tags(stop)
+        self.starts += len(start)
+        self.stops += len(stop)
+        if self.mode == "full":
+            self._add_full(start, stop, until)
+        else:
+            self._add_start_stop(start, stop, until)
+
+    def finalize(self):
+        """Count the pending pairs assuming no more events come."""
+
+        if self.mode == "start_stop" and len(self._start):
+            found, dt = self._first_stops(self._start, self._stop)
+            following = np.append(self._start[1:], np.iinfo(np.int64).max)
+            self._accumulate(dt[found & (self._start + dt < following)])
+        self._start = self._start[:0]
+        self._stop = self._stop[:0]
+
+    def normalized(self, duration: int) -> NDArray[np.float64]:
+        """Get g2 normalized by the accidental coincidences of uncorrelated (Poisson) sources.
+
+        :param duration: total measurement time in the unit of time tag.
+
+        """
+
+        if not self.starts or not self.stops or duration <= 0:
+            return np.zeros(self.num_bins)
+        accidental = self.starts * self.stops * self.binwidth / duration
+        return self.hist / accidental
+
+
+def correlate(
+    start, stop, window: int, binwidth: int = 1, mode: str = "full"
+) -> tuple[NDArray[np.int64], NDArray[np.uint64]]:
+    """Compute the correlation histogram of start and stop time tags at once.
+
+    See :class:`Correlator` for the details.
+
+    :returns: (delays, histogram)
+
+    """
+
+    c = Correlator(window, binwidth, mode)
+    c.add(start, stop)
+    c.finalize()
+    return c.get_delays(), c.hist
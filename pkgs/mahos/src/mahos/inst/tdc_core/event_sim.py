@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+
+"""
+Synthetic photon event stream for TDC mocks and benchmarks.
+
+.. This file is a part of MAHOS project, which is released under the 3-Clause BSD license.
+.. See included LICENSE file or https://github.com/ToyotaCRDL/mahos/blob/main/LICENSE for details.
+
+"""
+
+from __future__ import annotations
+import typing as T
+
+import numpy as np
+from numpy.typing import NDArray
+
+from mahos.msgs.inst.pg_msgs import Block, Blocks
+from mahos.msgs.inst.tdc_msgs import RawEvents
+from mahos.util.lazy import lazy_import
+
+h5py = lazy_import("h5py")
+
+
+def remove_dead_time(events: NDArray, dead_time: int, last: int | None = None) -> NDArray:
+    """Remove events within `dead_time` after preceding detected events (non-paralyzable).
+
+    :param events: sorted time tags.
+    :param dead_time: dead time in the unit of time tag.
+    :param last: the last detected event before `events` (e.g. in the previous chunk).
+
+    """
+
+    if dead_time <= 0 or not len(events):
+        return events
+    if last is not None:
+        events = events[events >= last + dead_time]
+    while True:
+        bad = np.flatnonzero(np.diff(events) < dead_time) + 1
+        if not len(bad):
+            return events
+        # an event can be removed safely only if its preceding event is not removed.
+        # the others are reconsidered in the next iteration.
+        safe = bad[np.isin(bad - 1, bad, assume_unique=True, invert=True)]
+        events = np.delete(events, safe)
+
+
+class PhotonEventSimulator(object):
+    """Generator of Poisson-distributed photon time tags for a pulse sequence.
+
+    The pulse sequence (one period) is given as Blocks played by a pulse generator.
+    Photons are emitted only when the laser channel is high.
+    The spin state at each laser pulse is determined by the total MW time
+    since the previous laser pulse (Rabi oscillation with `rabi_freq`).
+    During the `readout` window after each laser rising edge,
+    the emission rate is reduced by `contrast` times the population of dark state.
+    If `ac_freq` is given, the dark state population is modulated instead
+    by an AC signal in absolute time to emulate Qdyne (continuous heterodyne) measurement.
+
+    Time tags are integers in the unit of `tbin` counted from the start of measurement.
+    The stream is reproducible for the same `seed` and chunk sizes.
+
+    :param blocks: the pulse sequence (one period).
+    :param freq: sampling rate of pulse generator (Blocks' unit of duration) in Hz.
+    :param tbin: time bin (resolution) of TDC in sec.
+    :param count_rate: photon count rate during laser illumination in counts per sec.
+    :param contrast: fluorescence contrast between bright and dark states.
+    :param readout: duration of spin-dependent fluorescence after laser rising edge in sec.
+    :param rabi_freq: Rabi frequency in Hz.
+    :param ac_freq: frequency of AC signal for Qdyne in Hz. If None, Rabi model is used.
+    :param ac_depth: modulation depth of dark state population by the AC signal.
+    :param dark_rate: background (dark) count rate in counts per sec.
+    :param dead_time: dead time of detector in sec.
+    :param laser_channel: name of laser channel in the Blocks.
+    :param mw_channels: names of MW channels in the Blocks.
+    :param seed: seed for random number generator.
+
+    """
+
+    def __init__(
+        self,
+        blocks: Blocks[Block] | Block,
+        freq: float,
+        tbin: float = 0.2e-9,
+        count_rate: float = 1e6,
+        contrast: float = 0.3,
+        readout: float = 300e-9,
+        rabi_freq: float = 10e6,
+        ac_freq: float | None = None,
+        ac_depth: float = 1.0,
+        dark_rate: float = 0.0,
+        dead_time: float = 0.0,
+        laser_channel: str | int = "laser",
+        mw_channels: T.Iterable[str | int] = ("mw",),
+        seed: int | None = None,
+    ):
+        if isinstance(blocks, Block):
+            blocks = Blocks([blocks])
+        self.freq = freq
+        self.tbin = tbin
+        self.count_rate = count_rate
+        self.contrast = contrast
+        self.readout = readout
+        self.rabi_freq = rabi_freq
+        self.ac_freq = ac_freq
+        self.ac_depth = ac_depth
+        self.dark_rate = dark_rate
+        self.dead_time_bins = int(round(dead_time / tbin))
+        self.rng = np.random.default_rng(seed)
+
+        self._parse_blocks(blocks, laser_channel, tuple(mw_channels))
+        self.reset()
+
+    def _parse_blocks(self, blocks: Blocks[Block], laser_channel, mw_channels):
+        t = 0
+        heads, tails, mw_times = [], [], []
+        mw_time = 0
+        laser = False
+        for block in blocks:
+            for channels, duration in block.total_pattern():
+                on = laser_channel in channels
+                if on and not laser:
+                    heads.append(t)
+                    mw_times.append(mw_time)
+                    mw_time = 0
+                elif laser and not on:
+                    tails.append(t)
+                if any(ch in channels for ch in mw_channels):
+                    mw_time += duration
+                laser = on
+                t += duration
+        if laser:
+            tails.append(t)
+        if mw_times:
+            # the sequence is periodic: MW after the last laser pulse affects the first one.
+            mw_times[0] += mw_time
+
+        #: period of sequence in sec.
+        self.period = t / self.freq
+        #: head and tail of laser pulses in a period in sec.
+        self.laser_heads = np.array(heads, dtype=np.float64) / self.freq
+        self.laser_tails = np.array(tails, dtype=np.float64) / self.freq
+        #: total MW time before each laser pulse in sec.
+        self.mw_times = np.array(mw_times, dtype=np.float64) / self.freq
+
+    def reset(self):
+        """Reset the state of stream (the time and dead time memory)."""
+
+        self._next_period = 0
+        self._last_event = None
+
+    def num_periods(self, run_length: float) -> int:
+        """Number of sequence periods in `run_length` sec."""
+
+        if self.period <= 0.0:
+            return 0
+        return int(run_length // self.period)
+
+    def dark_population(self, period_heads: NDArray) -> NDArray:
+        """Dark state population at each laser pulse. Shape: (len(period_heads), num_laser)."""
+
+        if self.ac_freq is None:
+            p = np.sin(np.pi * self.rabi_freq * self.mw_times) ** 2
+            return np.broadcast_to(p, (len(period_heads), len(p)))
+        t = period_heads[:, np.newaxis] + self.laser_heads[np.newaxis, :]
+        return 0.5 * (1.0 - self.ac_depth * np.cos(2 * np.pi * self.ac_freq * t))
+
+    def _segments(self, period_heads: NDArray) -> tuple[NDArray, NDArray, NDArray]:
+        """Emission segments (head, width, rate) with shape (len(period_heads), num_segments)."""
+
+        n, m = len(period_heads), len(self.laser_heads)
+        readout_tails = np.minimum(self.laser_heads + self.readout, self.laser_tails)
+        p = self.dark_population(period_heads)
+
+        ph = period_heads[:, np.newaxis]
+        heads = [ph + self.laser_heads, ph + readout_tails]
+        widths = [
+            np.broadcast_to(readout_tails - self.laser_heads, (n, m)),
+            np.broadcast_to(self.laser_tails - readout_tails, (n, m)),
+        ]
+        rates = [self.count_rate * (1.0 - self.contrast * p), np.full((n, m), self.count_rate)]
+        if self.dark_rate > 0.0:
+            heads.append(ph)
+            widths.append(np.full((n, 1), self.period))
+            rates.append(np.full((n, 1), self.dark_rate))
+
+        return (
+            np.concatenate(heads, axis=1),
+            np.concatenate(widths, axis=1),
+            np.concatenate(rates, axis=1),
+        )
+
+    def next_chunk(self, num_periods: int) -> NDArray[np.uint64]:
+        """Generate sorted time tags for next `num_periods` periods."""
+
+        period_heads = self.period * np.arange(
+            self._next_period, self._next_period + num_periods, dtype=np.float64
+        )
+        self._next_period += num_periods
+        if not len(period_heads) or not len(self.laser_heads) and self.dark_rate <= 0.0:
+            return np.zeros(0, dtype=np.uint64)
+
+        heads, widths, rates = self._segments(period_heads)
+        counts = self.rng.poisson(rates * widths).ravel()
+        t = np.repeat(heads.ravel(), counts) + self.rng.random(counts.sum()) * np.repeat(
+            widths.ravel(), counts
+        )
+        events = np.sort((t / self.tbin).astype(np.uint64))
+        events = remove_dead_time(events, self.dead_time_bins, self._last_event)
+        if len(events):
+            self._last_event = int(events[-1])
+        return events
+
+    def iter_chunks(
+        self, run_length: float, chunk_periods: int = 1000
+    ) -> T.Iterator[NDArray[np.uint64]]:
+        """Iterate over chunks of time tags for `run_length` sec."""
+
+        remaining = self.num_periods(run_length)
+        while remaining > 0:
+            n = min(chunk_periods, remaining)
+            remaining -= n
+            yield self.next_chunk(n)
+
+    def events(self, run_length: float, chunk_periods: int = 1000) -> NDArray[np.uint64]:
+        """Generate all the time tags for `run_length` sec."""
+
+        chunks = list(self.iter_chunks(run_length, chunk_periods))
+        if not chunks:
+            return np.zeros(0, dtype=np.uint64)
+        return np.concatenate(chunks)
+
+    def raw_events(self, run_length: float, chunk_periods: int = 1000) -> RawEvents:
+        """Generate RawEvents for `run_length` sec."""
+
+        return RawEvents(self.events(run_length, chunk_periods))
+
+    def histogram(
+        self, run_length: float, num_bins: int, chunk_periods: int = 1000
+    ) -> NDArray[np.uint64]:
+        """Generate histogram of time tags folded by the period.
+
+        The histogram starts at the head of period and has `num_bins` bins of `tbin` width.
+        This emulates the histogram mode of TDC started by sync pulse at the sequence head.
+
+        """
+
+        hist = np.zeros(num_bins, dtype=np.uint64)
+        T_bins = self.period / self.tbin
+        for chunk in self.iter_chunks(run_length, chunk_periods):
+            idx = np.floor(np.mod(chunk.astype(np.float64), T_bins)).astype(np.int64)
+            hist += np.bincount(idx[idx < num_bins], minlength=num_bins).astype(np.uint64)
+        return hist
+
+    def save_h5(
+        self,
+        fn: str,
+        run_length: float,
+        chunk_periods: int = 1000,
+        compression: str | None = "lzf",
+    ) -> int:
+        """Stream time tags for `run_length` sec to a RawEvents HDF5 file.
+
+        The events are written chunk by chunk without materializing the whole array.
+        The file can be loaded by mahos.util.io.load_h5(fn, RawEvents, logger).
+
+        :returns: number of events written.
+
+        """
+
+        num = 0
+        with h5py.File(fn, "w") as f:
+            RawEvents().to_h5(f)
+            dset = f.create_dataset(
+                "data",
+                shape=(0,),
+                maxshape=(None,),
+                dtype=np.uint64,
+                chunks=True,
+                compression=compression,
+            )
+            for chunk in self.iter_chunks(run_length, chunk_periods):
+                dset.resize((num + len(chunk),))
+                dset[num:] = chunk
+                num += len(chunk)
+        return num
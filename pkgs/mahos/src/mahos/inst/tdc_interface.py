@@ -21,11 +21,18 @@ class TDCInterface(InstrumentInterface):
     """Interface for Time to Digital Converter."""
 
     def configure_raw_events(
-        self, base_config: str, save_file: str, trange: float = 0.0, tbin: float = 0.0
+        self,
+        base_config: str,
+        save_file: str,
+        trange: float = 0.0,
+        tbin: float = 0.0,
+        stream: bool = False,
     ) -> bool:
         """Configure for raw_events measurement.
 
         trange and tbin may not be required for some instruments.
+        If stream is True, raw events are read by get_raw_events_chunk() during measurement.
+        Some instruments don't save the file (get_raw_events() cannot be used) in this case.
 
         """
 
@@ -34,6 +41,7 @@ class TDCInterface(InstrumentInterface):
             "save_file": save_file,
             "range": trange,
             "bin": tbin,
+            "stream": stream,
         }
         return self.configure(params, label="raw_events")
 
@@ -135,3 +143,19 @@ class TDCInterface(InstrumentInterface):
         """
 
         return self.get("raw_events")
+
+    def get_raw_events_chunk(self, final: bool = False) -> RawEvents | None:
+        """Get raw events newly acquired since last call.
+
+        The events are filtered by channel, corrected by offset (start stamp),
+        and sorted in the same manner as get_raw_events().
+        The first call after start() returns the events from the head of measurement.
+
+        :param final: set True on the last call after the measurement is stopped.
+            The TDC may clean up the resources (e.g. saved file) then.
+        :returns: RawEvents: the new events (can be empty).
+                  None: failure.
+
+        """
+
+        return self.get("raw_events_chunk", final)
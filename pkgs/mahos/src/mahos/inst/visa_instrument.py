@@ -7,20 +7,53 @@ Base class for visa instrument.
 .. See included LICENSE file or https://github.com/ToyotaCRDL/mahos/blob/main/LICENSE for details.
 """
 
+from __future__ import annotations
+import contextlib
+
 import pyvisa
 
 from mahos.inst.instrument import Instrument
 
 
 class VisaInstrument(Instrument):
-    """Base class for VISA instruments. Implements common VISA set/query commands."""
+    """Base class for VISA instruments. Implements common VISA set/query commands.
+
+    :param resource: VISA resource name.
+    :type resource: str
+    :param visa_library: (default: "") VISA library passed to pyvisa.ResourceManager.
+        Use "path/to/sim.yaml@sim" for pyvisa-sim.
+    :type visa_library: str
+    :param state_cache: (default: False) Enable shadow-state cache of settings.
+        The setting commands sent by write_cached() are skipped if the same command
+        has been sent for the same header (setting) since the last invalidation.
+        The cache is invalidated on rst(), rst_cls(), reset(), and errors.
+        The device state after ``*RST`` is not assumed.
+        Thus, the cache helps only when the instrument is reconfigured without reset
+        (e.g., ``reset`` param of configure() is False).
+        Enable this only if the instrument is not operated from other clients or front panel.
+    :type state_cache: bool
+    :param coalesce_writes: (default: False) Join the commands written inside coalesce() block
+        into one message with ";:" (the device must accept compound SCPI commands).
+    :type coalesce_writes: bool
+    :param coalesce_max_len: (default: 256) Maximum length of a joined message.
+    :type coalesce_max_len: int
+
+    """
 
     def __init__(self, name, conf, prefix=None):
         Instrument.__init__(self, name, conf=conf, prefix=prefix)
 
         self.check_required_conf(("resource",))
 
-        rm = pyvisa.ResourceManager()
+        self._state_cache = self.conf.get("state_cache", False)
+        self._coalesce_writes = self.conf.get("coalesce_writes", False)
+        self._coalesce_max_len = self.conf.get("coalesce_max_len", 256)
+        # header (key) -> last command sent
+        self._shadow: dict[str, str] = {}
+        # pending commands in coalesce() block. None if not in the block.
+        self._pending: list[str] | None = None
+
+        rm = pyvisa.ResourceManager(self.conf.get("visa_library", ""))
         self.inst = rm.open_resource(self.conf.get("resource"))
         self.logger.info("opened {} on {}".format(name, self.inst.resource_name))
         self._resource_name = self.inst.resource_name
@@ -45,26 +78,134 @@ class VisaInstrument(Instrument):
     def __repr__(self):
         return "VisaInstrument({}, {})".format(self.full_name(), self._resource_name)
 
+    # Write with state cache and coalescing
+
+    def write(self, cmd: str):
+        """Write a command. The command is deferred if in coalesce() block."""
+
+        if self._pending is None:
+            self.inst.write(cmd)
+        else:
+            self._pending.append(cmd)
+
+    def write_cached(self, cmd: str, key: str | None = None) -> bool:
+        """Write a setting command, skipping it if state_cache knows it's already set.
+
+        :param cmd: the command like "FREQ 1.0E9".
+        :param key: key of the setting. If None, the header of cmd (e.g. "FREQ") is used.
+        :returns: True if the command is actually written (or deferred).
+
+        """
+
+        if not self._state_cache:
+            self.write(cmd)
+            return True
+
+        if key is None:
+            key = cmd.split(" ", 1)[0]
+        if self._shadow.get(key) == cmd:
+            return False
+        self.write(cmd)
+        self._shadow[key] = cmd
+        return True
+
+    def invalidate_state(self):
+        """Invalidate the state cache.
+
+        Call this when the device state may be changed by the commands other than
+        write_cached() (e.g. automatic adjustment commands).
+
+        """
+
+        self._shadow.clear()
+
+    def _join_commands(self, cmds: list[str]) -> list[str]:
+        msgs = []
+        current = ""
+        for cmd in cmds:
+            # start from the root of SCPI command tree
+            if not cmd.startswith((":", "*")):
+                cmd = ":" + cmd
+            if current and len(current) + len(cmd) + 1 > self._coalesce_max_len:
+                msgs.append(current)
+                current = ""
+            current = cmd if not current else current + ";" + cmd
+        if current:
+            msgs.append(current)
+        return msgs
+
+    def flush_writes(self):
+        """Write the commands deferred in coalesce() block."""
+
+        if not self._pending:
+            return
+        cmds, self._pending[:] = list(self._pending), []
+        if self._coalesce_writes:
+            cmds = self._join_commands(cmds)
+        try:
+            for cmd in cmds:
+                self.inst.write(cmd)
+        except Exception:
+            # unknown which command has been applied.
+            self.invalidate_state()
+            raise
+
+    @contextlib.contextmanager
+    def coalesce(self):
+        """Context to defer the writes and send them at once (if coalesce_writes is True).
+
+        The deferred commands are flushed before queries (query_* methods) and on exit.
+
+        """
+
+        if self._pending is not None:
+            # nested
+            yield
+            return
+        self._pending = []
+        try:
+            yield
+            self.flush_writes()
+        except Exception:
+            self.invalidate_state()
+            raise
+        finally:
+            self._pending = None
+
+    def query(self, cmd: str, delay=None) -> str:
+        """Query after flushing the deferred writes."""
+
+        self.flush_writes()
+        return self.inst.query(cmd, delay=delay)
+
+    # Common commands
+
     def rst(self) -> bool:
-        self.inst.write("*RST")
+        self.write("*RST")
+        self.invalidate_state()
         return True
 
     def cls(self) -> bool:
-        self.inst.write("*CLS")
+        self.write("*CLS")
         return True
 
     def rst_cls(self) -> bool:
-        self.inst.write("*RST;*CLS")
+        self.write("*RST;*CLS")
+        self.invalidate_state()
         return True
 
     def query_opc(self, delay=None) -> bool:
-        return self.inst.query("*OPC?", delay=delay) == "1"
+        return self.query("*OPC?", delay=delay) == "1"
 
     def query_error(self):
-        return self.inst.query("SYST:ERR?")
+        return self.query("SYST:ERR?")
 
     def check_error(self) -> bool:
-        """query error, parse the error message, and log it if there is an error."""
+        """query error, parse the error message, and log it if there is an error.
+
+        The state cache is invalidated if there is an error.
+
+        """
 
         ret = self.query_error()
         try:
@@ -74,17 +215,17 @@ class VisaInstrument(Instrument):
             if not code:
                 return True
             self.logger.error(f"{code}: {msg}")
-            return False
         except Exception:
             self.logger.exception(f"Error parsing error message: {ret}")
-            return False
+        self.invalidate_state()
+        return False
 
     def trg(self) -> bool:
-        self.inst.write("*TRG")
+        self.write("*TRG")
         return True
 
     def query_idn(self):
-        return self.inst.query("*IDN?")
+        return self.query("*IDN?")
 
     def flush_writebuf(self):
         self.inst.flush(pyvisa.constants.BufferOperation.flush_write_buffer)
@@ -95,7 +236,7 @@ class VisaInstrument(Instrument):
         """Close visa resource explicitly."""
 
         if hasattr(self, "inst"):
-            self.logger.info("Closing Visa Resource {}.".format(self.inst.resource_name))
+            self.logger.info("Closing Visa Resource {}.".format(self._resource_name))
             self.inst.close()
 
     def reset(self, label: str = "") -> bool:
@@ -12,11 +12,13 @@ from __future__ import annotations
 from os import path
 
 # import numpy as np
-import matplotlib.pyplot as plt
 
 from mahos.msgs.camera_msgs import Image
 from mahos.node.log import DummyLogger
 from mahos.util.io import save_pickle_or_h5, load_pickle_or_h5
+from mahos.util.lazy import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
 
 
 class CameraIO(object):
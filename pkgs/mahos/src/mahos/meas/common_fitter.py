@@ -9,14 +9,24 @@ Common Fitter functions.
 """
 
 from __future__ import annotations
+import copy
+import os
+import pickle
+import threading
+import time
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 
-import lmfit as F
 import numpy as np
 from numpy.typing import NDArray
-from scipy.special import wofz
 
 from mahos.msgs.data_msgs import Data
 from mahos.msgs import param_msgs as P
+from mahos.util.lazy import lazy_import
+
+F = lazy_import("lmfit")
+special = lazy_import("scipy.special")
 
 
 def gaussian(x, amplitude, center, sigma):
@@ -48,7 +58,7 @@ def norm_voigt(x, center, sigma, gamma):
     """Normalized Voigt function. Definition as p.d.f. (integral is unity)."""
 
     z = (x - center + 1j * gamma) / (sigma * np.sqrt(2.0))
-    return wofz(z).real / (sigma * np.sqrt(2 * np.pi))
+    return special.wofz(z).real / (sigma * np.sqrt(2 * np.pi))
 
 
 def voigt(x, amplitude, center, sigma, gamma):
@@ -59,10 +69,84 @@ def voigt(x, amplitude, center, sigma, gamma):
     )
 
 
+#: persistent process pool for multi-start fitting: (executor, max_workers).
+_process_pool: tuple[ProcessPoolExecutor, int] | None = None
+_process_pool_lock = threading.Lock()
+
+
+def _get_process_pool(workers: int) -> ProcessPoolExecutor:
+    """Get the process pool shared by fitters, (re-)creating it if necessary.
+
+    The workers are started by forkserver (or spawn) because forking
+    a multi-threaded node process is unsafe.
+
+    """
+
+    global _process_pool
+
+    with _process_pool_lock:
+        if _process_pool is not None and _process_pool[1] >= workers:
+            return _process_pool[0]
+        if _process_pool is not None:
+            # running fits (of other threads) are completed.
+            _process_pool[0].shutdown(wait=False)
+        method = "forkserver" if "forkserver" in mp.get_all_start_methods() else "spawn"
+        executor = ProcessPoolExecutor(workers, mp_context=mp.get_context(method))
+        _process_pool = (executor, workers)
+        return executor
+
+
+def _discard_process_pool(executor: ProcessPoolExecutor):
+    global _process_pool
+
+    with _process_pool_lock:
+        if _process_pool is not None and _process_pool[0] is executor:
+            _process_pool = None
+    executor.shutdown(wait=False)
+
+
+def _fit_start(
+    model: F.Model, xdata, ydata, params: F.Parameters
+) -> tuple[F.model.ModelResult | None, float, bool]:
+    """Fit from a starting point and return (result, chisqr, success)."""
+
+    try:
+        res = model.fit(ydata, x=xdata, params=params)
+    except Exception:
+        return None, np.inf, False
+    chisqr = float(res.chisqr) if np.isfinite(res.chisqr) else np.inf
+    return res, chisqr, bool(res.success)
+
+
+def _fit_starts(
+    model: F.Model, xdata, ydata, starts: list[F.Parameters]
+) -> list[tuple[F.model.ModelResult | None, float, bool]]:
+    return [_fit_start(model, xdata, ydata, ps) for ps in starts]
+
+
 class BaseFitter(object):
+    """Base class for fitters based on lmfit.
+
+    Fitting can be started from multiple starting points (param ``multi_start``):
+    the initial (guessed) parameters and randomly perturbed ones.
+    The fits are performed concurrently and the one with minimum chi-square is taken.
+    With param ``warm_start``, fitting starts from the previous result (guess is skipped).
+
+    :param multi_start_pool: (default: "process") Pool to run multi-start fits.
+        One of "process", "thread", or "serial".
+        "process" uses a persistent pool of forkserver (or spawn) workers shared by fitters.
+        It falls back to "thread" if the model cannot be pickled.
+        "thread" gains little as lmfit holds the GIL for most of the fit.
+    :type multi_start_pool: str
+    :param multi_start_workers: (default: number of CPUs) Max number of multi-start workers.
+    :type multi_start_workers: int
+
+    """
+
     def __init__(self, print_fn=print, conf=None):
         self.print_fn = print_fn
         self.conf = conf or {}
+        self._last_best_values: dict[str, float] | None = None
 
     def make_model_param(
         self,
@@ -140,6 +224,16 @@ class BaseFitter(object):
                 ),
             ],
             fit_xnum=P.IntParam(301, 2, 10000, doc="number of points in x to draw fit curve"),
+            multi_start=P.IntParam(
+                1, 1, 100, doc="number of starting points. the best (min. chi-square) is taken."
+            ),
+            multi_start_scale=P.FloatParam(
+                0.1,
+                0.0,
+                1.0,
+                doc="random perturbation of starting points relative to bounds (or value).",
+            ),
+            warm_start=P.BoolParam(False, doc="start from previous result, skipping guess"),
             model=self.model_params(),
         )
 
@@ -204,6 +298,96 @@ class BaseFitter(object):
         xdata, ydata = self.get_xydata(data, P.unwrap(params))
         return self._fit_core(xdata, ydata, data, params, label)
 
+    def _apply_warm_start(self, fit_params: F.Parameters) -> bool:
+        """Set the previous result to `fit_params`. Returns False if it's not applicable."""
+
+        if self._last_best_values is None or set(self._last_best_values) != set(fit_params):
+            return False
+        for name, p in fit_params.items():
+            if p.vary and not p.expr:
+                p.set(value=float(np.clip(self._last_best_values[name], p.min, p.max)))
+        return True
+
+    def _perturb_params(
+        self, fit_params: F.Parameters, num: int, scale: float, rng: np.random.Generator
+    ) -> list[F.Parameters]:
+        """Generate `num` starting points: `fit_params` and `num` - 1 perturbed ones."""
+
+        starts = [fit_params]
+        for _ in range(num - 1):
+            ps = copy.deepcopy(fit_params)
+            for p in ps.values():
+                if not p.vary or p.expr:
+                    continue
+                if np.isfinite(p.min) and np.isfinite(p.max):
+                    width = p.max - p.min
+                else:
+                    width = abs(p.value) or 1.0
+                v = p.value + scale * width * rng.standard_normal()
+                p.set(value=float(np.clip(v, p.min, p.max)))
+            starts.append(ps)
+        return starts
+
+    def _run_starts(
+        self, model: F.Model, xdata, ydata, starts: list[F.Parameters]
+    ) -> list[tuple[F.model.ModelResult | None, float, bool]]:
+        pool = self.conf.get("multi_start_pool", "process")
+        workers = min(len(starts), self.conf.get("multi_start_workers", os.cpu_count() or 1))
+        if pool == "serial" or workers <= 1:
+            return _fit_starts(model, xdata, ydata, starts)
+        if pool == "process":
+            try:
+                pickle.dumps(model)
+            except Exception:
+                pool = "thread"
+                if self.print_fn is not None:
+                    self.print_fn("Model cannot be pickled. Falling back to thread pool.")
+        if pool == "process":
+            executor = _get_process_pool(workers)
+            # the job is passed explicitly, split into a chunk per worker.
+            try:
+                futures = [
+                    executor.submit(_fit_starts, model, xdata, ydata, starts[i::workers])
+                    for i in range(workers)
+                ]
+                chunks = [f.result() for f in futures]
+            except BrokenProcessPool:
+                _discard_process_pool(executor)
+                raise
+            results = [None] * len(starts)
+            for i, chunk in enumerate(chunks):
+                results[i::workers] = chunk
+            return results
+        with ThreadPoolExecutor(workers) as executor:
+            return list(executor.map(lambda ps: _fit_start(model, xdata, ydata, ps), starts))
+
+    def _fit_multi_start(
+        self, model: F.Model, xdata, ydata, fit_params: F.Parameters, raw_params: dict
+    ) -> tuple[F.model.ModelResult, dict]:
+        starts = self._perturb_params(
+            fit_params,
+            raw_params.get("multi_start", 1),
+            raw_params.get("multi_start_scale", 0.1),
+            np.random.default_rng(0),
+        )
+        results = self._run_starts(model, xdata, ydata, starts)
+        chisqrs = [chisqr for _, chisqr, _ in results]
+        # prefer converged results
+        best = min(range(len(results)), key=lambda i: (not results[i][2], chisqrs[i]))
+
+        res = results[best][0]
+        if res is None:
+            # every start has raised: fit once more to raise the error here.
+            res = model.fit(ydata, x=xdata, params=fit_params)
+        stats = {
+            "starts": len(starts),
+            "converged": sum(success for _, _, success in results),
+            "best_start": best,
+            "total_nfev": sum(r.nfev for r, _, _ in results if r is not None),
+            "start_chisqr": [float(c) if np.isfinite(c) else None for c in chisqrs],
+        }
+        return res, stats
+
     def _fit_core(
         self,
         xdata,
@@ -212,18 +396,28 @@ class BaseFitter(object):
         params: P.ParamDict[str, P.PDValue] | dict[str, P.RawPDValue],
         label: str,
     ) -> tuple[F.model.ModelResult, dict]:
+        t0 = time.perf_counter()
         raw_params = P.unwrap(params)
         model = self.model(raw_params)
         fit_params = self.make_fit_params(raw_params)
         self.add_fit_params(fit_params, raw_params, xdata, ydata)
-        if raw_params.get("guess", True):
+        warm_start = raw_params.get("warm_start", False) and self._apply_warm_start(fit_params)
+        if not warm_start and raw_params.get("guess", True):
             self.guess_fit_params(xdata, ydata, fit_params, raw_params)
         xdata_, ydata_ = self._filter_data(xdata, ydata, raw_params)
 
         if self.print_fn is not None:
             self.print_fn("Fit with parameters:\n" + fit_params.pretty_repr().rstrip())
 
-        res = model.fit(ydata_, x=xdata_, params=fit_params)
+        if raw_params.get("multi_start", 1) > 1:
+            res, stats = self._fit_multi_start(model, xdata_, ydata_, fit_params, raw_params)
+        else:
+            res = model.fit(ydata_, x=xdata_, params=fit_params)
+            stats = {"starts": 1, "converged": int(res.success)}
+        stats["warm_start"] = bool(warm_start)
+        stats["nfev"] = int(res.nfev)
+        stats["chisqr"] = float(res.chisqr)
+        stats["time"] = time.perf_counter() - t0
 
         if self.print_fn is not None:
             self.print_fn("Fit report:\n" + res.fit_report())
@@ -231,6 +425,8 @@ class BaseFitter(object):
         if not res.success:
             return res, {}
 
+        self._last_best_values = dict(res.best_values)
+
         x = np.linspace(min(xdata_), max(xdata_), raw_params.get("fit_xnum", 301))
         y = res.eval(x=x)
 
@@ -244,7 +440,7 @@ class BaseFitter(object):
         if amsg:
             msg += "\n" + amsg
 
-        res_dict = {"msg": msg, "popt": popt.unwrap(), "pcov": res.covar}
+        res_dict = {"msg": msg, "popt": popt.unwrap(), "pcov": res.covar, "stats": stats}
 
         if data is not None:
             self.set_fit_data(data, x, y, raw_params, label, res_dict)
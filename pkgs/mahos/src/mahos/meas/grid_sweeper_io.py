@@ -12,12 +12,14 @@ from __future__ import annotations
 
 from os import path
 
-import matplotlib.pyplot as plt
 import numpy as np
 
 from ..msgs.grid_sweeper_msgs import GridSweeperData, update_data
 from ..node.log import DummyLogger
 from ..util.io import load_pickle_or_h5, save_pickle_or_h5
+from mahos.util.lazy import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
 
 
 class GridSweeperIO(object):
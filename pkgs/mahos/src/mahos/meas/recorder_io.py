@@ -13,11 +13,12 @@ from os import path
 from itertools import cycle
 from datetime import datetime
 
-import matplotlib.pyplot as plt
-
 from mahos.msgs.recorder_msgs import RecorderData, update_data
 from mahos.node.log import DummyLogger
 from mahos.util.io import save_pickle_or_h5, load_pickle_or_h5
+from mahos.util.lazy import lazy_import
+
+plt = lazy_import("matplotlib.pyplot")
 
 
 class RecorderIO(object):
@@ -9,13 +9,15 @@ Generic tweaker for manually-tunable Instrument's ParamDicts.
 """
 
 from __future__ import annotations
+import threading
 
 from mahos.msgs.common_msgs import Reply
 from mahos.msgs import param_msgs as P
 from mahos.msgs import tweaker_msgs
 from mahos.msgs.tweaker_msgs import TweakerStatus, ReadReq, ReadAllReq, WriteReq, WriteAllReq
 from mahos.msgs.tweaker_msgs import StartReq, StopReq, ResetReq, SaveReq, LoadReq
-from mahos.node.node import Node
+from mahos.msgs.inst.server_msgs import ParamDictChanged
+from mahos.node.node import Node, join_name, split_name
 from mahos.node.client import NodeClient, StatusClient
 from mahos.inst.server import MultiInstrumentClient
 from mahos.meas.tweaker_io import TweakerIO
@@ -87,6 +89,10 @@ class Tweaker(Node):
     The instrument must provide a ParamDict-based interface, i.e.,
     ``get_param_dict_labels()``, ``get_param_dict()``, and ``configure()``.
 
+    The ParamDicts are read through the cache of InstrumentServer.
+    The ParamDicts of the instruments are re-read when the server notifies
+    that they may have been changed (ParamDictChanged).
+
     :param target.servers: InstrumentServer targets (instrument name, server full name).
         Required keys: instrument names referenced by ``param_dicts`` entries.
     :type target.servers: dict[str, str]
@@ -102,8 +108,20 @@ class Tweaker(Node):
     def __init__(self, gconf: dict, name, context=None):
         Node.__init__(self, gconf, name, context=context)
 
+        self._servers = {
+            inst: join_name(split_name(server))
+            for inst, server in self.conf["target"]["servers"].items()
+        }
+        # names of instruments notified by ParamDictChanged (from subscriber threads).
+        self._changed: set[str] = set()
+        self._changed_lock = threading.Lock()
+
         self.cli = MultiInstrumentClient(
-            gconf, self.conf["target"]["servers"], context=self.ctx, prefix=self.joined_name()
+            gconf,
+            self.conf["target"]["servers"],
+            context=self.ctx,
+            prefix=self.joined_name(),
+            param_dict_handler=self._handle_param_dict_changed,
         )
         self.add_clients(self.cli)
 
@@ -132,11 +150,30 @@ class Tweaker(Node):
         for inst_name in self.conf["target"]["servers"]:
             self.cli.wait(inst_name)
 
+    def _handle_param_dict_changed(self, msg: ParamDictChanged):
+        server = join_name((msg.host, msg.name))
+        insts = [inst for inst in msg.insts if self._servers.get(inst) == server]
+        with self._changed_lock:
+            self._changed.update(insts)
+
+    def _read_changed(self):
+        with self._changed_lock:
+            changed, self._changed = self._changed, set()
+        if not changed:
+            return
+        pids = [pid for pid in self._param_dicts if self._parse_param_dict_id(pid)[0] in changed]
+        keys = [self._parse_param_dict_id(pid) for pid in pids]
+        for pid, res in zip(pids, self.cli.get_param_dicts(keys)):
+            if res is not None:
+                self._param_dicts[pid] = res
+
     def read_all(self, msg: ReadAllReq) -> Reply:
+        pids = list(self._param_dicts.keys())
+        keys = [self._parse_param_dict_id(pid) for pid in pids]
         success = True
-        for pid in self._param_dicts:
-            res = self._read(pid)
+        for pid, res in zip(pids, self.cli.get_param_dicts(keys)):
             if res is None:
+                self.logger.error(f"Failed to read ParamDict {pid}")
                 success = False
             else:
                 self._param_dicts[pid] = res
@@ -254,4 +291,5 @@ class Tweaker(Node):
 
     def main(self):
         self.poll()
+        self._read_changed()
         self._publish()
@@ -11,10 +11,11 @@ File I/O for Tweaker.
 from __future__ import annotations
 from os import path
 
-import h5py
-
 from mahos.msgs import param_msgs as P
 from mahos.node.log import DummyLogger
+from mahos.util.lazy import lazy_import
+
+h5py = lazy_import("h5py")
 
 
 class TweakerIO(object):
@@ -12,14 +12,164 @@ from __future__ import annotations
 import enum
 import pprint
 import pickle
+import importlib
+import uuid
 
 import numpy as np
+import msgpack
 
 
 # As of Python 3.8, we can use pickle protocol version 5 (that is not default).
 # https://peps.python.org/pep-0574/
 pickle_proto = 5
 
+#: Prefix of the schema-based serialization.
+#: Never collides with pickle (protocol >= 2), which starts with PROTO opcode (0x80).
+schema_magic = b"\xfeS"
+
+
+def dict_of(spec):
+    """Field spec of dict (with str keys) whose values are encoded by `spec`."""
+
+    return ("dict", spec)
+
+
+def list_of(spec):
+    """Field spec of list whose items are encoded by `spec`."""
+
+    return ("list", spec)
+
+
+def _identity(v):
+    return v
+
+
+def _optional(enc, dec):
+    return (lambda v: None if v is None else enc(v)), (lambda v: None if v is None else dec(v))
+
+
+def _check_type(v, cls):
+    if type(v) is not cls:
+        raise TypeError(f"{v} is not {cls.__name__}")
+    return v
+
+
+def _field_codec(spec):
+    """Get (encoder, decoder) of a field spec.
+
+    Available specs are:
+    None (value of msgpack-native type), tuple, uuid.UUID, Enum subclass,
+    class with SCHEMA (nested message), dict_of(spec) and list_of(spec).
+    None is always accepted as a value.
+
+    """
+
+    if spec is None:
+        return _identity, _identity
+    if isinstance(spec, tuple):
+        kind, inner = spec
+        enc, dec = _field_codec(inner)
+        if kind == "dict":
+            return _optional(
+                lambda d: {k: enc(v) for k, v in d.items()},
+                lambda d: {k: dec(v) for k, v in d.items()},
+            )
+        elif kind == "list":
+            return _optional(lambda li: [enc(v) for v in li], lambda li: [dec(v) for v in li])
+        raise ValueError(f"Unknown container kind: {kind}")
+    if spec is tuple:
+        return _identity, (lambda v: None if v is None else tuple(v))
+    if spec is uuid.UUID:
+        return _optional(lambda v: v.bytes, lambda b: uuid.UUID(bytes=b))
+    if isinstance(spec, type) and issubclass(spec, enum.Enum):
+        return _optional(lambda v: _check_type(v, spec).value, spec)
+    if isinstance(spec, type) and getattr(spec, "SCHEMA", None) is not None:
+        return _optional(
+            lambda v: _encode_fields(_check_type(v, spec)), lambda v: _decode_fields(spec, v)
+        )
+    raise TypeError(f"Invalid field spec: {spec}")
+
+
+_schema_codecs_cache = {}
+_class_key_cache = {}
+_key_class_cache = {}
+
+
+def _schema_codecs(cls) -> list[tuple]:
+    try:
+        return _schema_codecs_cache[cls]
+    except KeyError:
+        codecs = [(name, *_field_codec(spec)) for name, spec in cls.SCHEMA.items()]
+        _schema_codecs_cache[cls] = codecs
+        return codecs
+
+
+def _class_key(cls) -> str:
+    try:
+        return _class_key_cache[cls]
+    except KeyError:
+        key = f"{cls.__module__}:{cls.__qualname__}"
+        _class_key_cache[cls] = key
+        return key
+
+
+def _key_class(key: str):
+    try:
+        return _key_class_cache[key]
+    except KeyError:
+        module_name, qualname = key.split(":")
+        cls = importlib.import_module(module_name)
+        for name in qualname.split("."):
+            cls = getattr(cls, name)
+        if not (isinstance(cls, type) and issubclass(cls, Message)):
+            raise TypeError(f"{key} is not a Message class")
+        _key_class_cache[key] = cls
+        return cls
+
+
+def _encode_fields(msg) -> list:
+    codecs = _schema_codecs(type(msg))
+    d = msg.__dict__
+    if len(d) != len(codecs):
+        raise KeyError("attributes don't match the SCHEMA")
+    return [enc(d[name]) for name, enc, _ in codecs]
+
+
+def _decode_fields(cls, fields: list):
+    msg = cls.__new__(cls)
+    msg.__dict__.update({name: dec(v) for (name, _, dec), v in zip(_schema_codecs(cls), fields)})
+    return msg
+
+
+def serialize_schema(msg) -> bytes | None:
+    """Serialize `msg` (State or message with SCHEMA) into compact schema-based format.
+
+    The encoded bytes is msgpack array of the class key (module:qualname)
+    and the values of the fields (in SCHEMA order) prefixed by schema_magic.
+    Returns None if `msg` cannot be encoded,
+    e.g., when the attributes don't match the SCHEMA or a value is not msgpack-able.
+
+    """
+
+    try:
+        if isinstance(msg, enum.Enum):
+            fields = [msg.value]
+        else:
+            fields = _encode_fields(msg)
+        return schema_magic + msgpack.packb([_class_key(type(msg)), *fields])
+    except (KeyError, TypeError, ValueError, OverflowError):
+        return None
+
+
+def deserialize_schema(b: bytes):
+    """Deserialize bytes `b` serialized by :func:`serialize_schema`."""
+
+    key, *fields = msgpack.unpackb(memoryview(b)[len(schema_magic) :])
+    cls = _key_class(key)
+    if issubclass(cls, enum.Enum):
+        return cls(fields[0])
+    return _decode_fields(cls, fields)
+
 
 class Message(object):
     """Base class for mahos messages."""
@@ -55,11 +205,13 @@ class Message(object):
     def deserialize(cls, b: bytes):
         """Deserialize given bytes `b` to reconstruct an instance if this class.
 
-        Default implementation uses pickle.
+        Default implementation uses pickle (or schema-based one if `b` is encoded so).
         Override this method (and serialize()) to implement custom serialization.
 
         """
 
+        if b[: len(schema_magic)] == schema_magic:
+            return deserialize_schema(b)
         return pickle.loads(b)
 
 
@@ -88,15 +240,40 @@ class Request(Message):
 
 
 class Status(Message):
-    """Base class for node status."""
+    """Base class for node status.
 
-    pass
+    Status is published frequently. To reduce the serialization cost,
+    a subclass can define SCHEMA, the mapping from attribute name to field spec.
+    The field spec is one of None (value of msgpack-native type), tuple, uuid.UUID,
+    Enum subclass, class with SCHEMA (nested message), dict_of(spec), or list_of(spec).
+    The status with SCHEMA is serialized by compact schema-based format,
+    falling back to pickle if the attributes don't match the SCHEMA.
+
+    """
+
+    #: Mapping from attribute name to field spec for schema-based serialization.
+    SCHEMA: dict | None = None
+
+    def serialize(self) -> bytes:
+        if self.SCHEMA is not None:
+            b = serialize_schema(self)
+            if b is not None:
+                return b
+        return pickle.dumps(self, protocol=pickle_proto)
 
 
 class State(Message, enum.Enum):
-    """Base class for node state."""
+    """Base class for node state.
 
-    pass
+    State is serialized by compact schema-based format (class key and value).
+
+    """
+
+    def serialize(self) -> bytes:
+        b = serialize_schema(self)
+        if b is not None:
+            return b
+        return pickle.dumps(self, protocol=pickle_proto)
 
 
 class BinaryState(State):
@@ -109,6 +286,8 @@ class BinaryState(State):
 class BinaryStatus(Status):
     """Status only with state: BinaryState."""
 
+    SCHEMA = {"state": BinaryState}
+
     def __init__(self, state: BinaryState):
         self.state = state
 
@@ -11,21 +11,93 @@ Base Data type definitions for mahos measurements.
 from __future__ import annotations
 import uuid
 import datetime
+import functools
 import time
 
 import numpy as np
-import h5py
 import msgpack
 
 from mahos.msgs.common_msgs import Message
+from mahos.util.lazy import lazy_import
+
+h5py = lazy_import("h5py")
 
 
 _H5_RESERVED_ATTRS = ("_description", "_type", "_save_time", "_version_h5_base")
+# attributes for memoization. not pickled nor written into HDF5.
+_TRANSIENT_ATTRS = ("_memo", "_generation")
+
+
+def memoized(method):
+    """Decorator to memoize the result of a Data method.
+
+    The result is cached per instance, keyed by the method, the arguments,
+    :meth:`Data._memo_stamp`, and the generation counter of the Data.
+    The generation is incremented (and the cache is invalidated) on every attribute assignment,
+    or by :meth:`Data.invalidate_cache` which must be called after in-place modification.
+    If the key is not hashable, the result is computed without caching.
+    The cached value is returned as is, and thus, the caller must not modify it in place.
+
+    """
+
+    name = method.__qualname__
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        d = self.__dict__
+        gen = d.get("_generation", 0)
+        memo = d.get("_memo")
+        if memo is None or memo[0] != gen:
+            memo = d["_memo"] = (gen, {})
+        key = (name, args, tuple(sorted(kwargs.items())), self._memo_stamp())
+        cache = memo[1]
+        try:
+            if key in cache:
+                return cache[key]
+        except TypeError:
+            return method(self, *args, **kwargs)
+        value = cache[key] = method(self, *args, **kwargs)
+        return value
+
+    return wrapper
 
 
 class Data(Message):
     """Base class for measurement data."""
 
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if "_memo" in self.__dict__ and name not in _TRANSIENT_ATTRS:
+            self.invalidate_cache()
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        for key in _TRANSIENT_ATTRS:
+            state.pop(key, None)
+        return state
+
+    def invalidate_cache(self):
+        """Invalidate the values memoized by :func:`memoized` methods.
+
+        This is done automatically on attribute assignment.
+        Call this explicitly after in-place modification of attributes (e.g., params).
+
+        """
+
+        d = self.__dict__
+        d["_generation"] = d.get("_generation", 0) + 1
+        d.pop("_memo", None)
+
+    def _memo_stamp(self):
+        """Get a hashable stamp of the state not tracked by attribute assignment.
+
+        It is added to the key of memoized values. Override this to track the state
+        which is frequently modified in place (e.g., plot params).
+
+        """
+
+        return None
+
     # Common meta data: note, version, version_h5
 
     def set_note(self, note: str):
@@ -107,6 +179,7 @@ class Data(Message):
         if params is None:
             return
         self.params.update({k: v for k, v in params.items() if k != "ident"})
+        self.invalidate_cache()
 
     # h5
 
@@ -178,7 +251,7 @@ class Data(Message):
         attr_writers = self._h5_attr_writers()
         dataset_writers = self._h5_dataset_writers()
         for key, val in self.__dict__.items():
-            if val is None:
+            if val is None or key in _TRANSIENT_ATTRS:
                 # None val is skipped because there is no dedicated way to express None (null)
                 # in HDF5 (or numpy).
                 # We could use empty array for example, but we don't need to do it.
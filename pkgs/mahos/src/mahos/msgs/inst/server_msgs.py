@@ -13,7 +13,31 @@ import copy
 import uuid
 from pprint import pformat
 
-from mahos.msgs.common_msgs import Message, Request, Status
+from mahos.msgs.common_msgs import Message, Request, Status, dict_of
+
+
+class Ident(Message):
+    """Client identity token used by instrument lock and RPC requests.
+
+    :ivar name: Human-readable client name.
+    :ivar uuid: Random UUID assigned once to distinguish concurrent clients.
+
+    """
+
+    SCHEMA = {"name": None, "uuid": uuid.UUID}
+
+    def __init__(self, name: str):
+        self.name = name
+        self.uuid = uuid.uuid4()
+
+    def __eq__(self, o):
+        return self.name == o.name and self.uuid == o.uuid
+
+    def __repr__(self):
+        return f"Ident({self.name}, {self.uuid})"
+
+    def __str__(self):
+        return f"Id({self.name})"
 
 
 class ServerStatus(Status):
@@ -27,6 +51,14 @@ class ServerStatus(Status):
 
     """
 
+    SCHEMA = {
+        "host": None,
+        "name": None,
+        "locks": dict_of(Ident),
+        "inst_num": None,
+        "overlay_num": None,
+    }
+
     def __init__(self, host, name, locks, inst_num, overlay_num):
         self.host = host
         self.name = name
@@ -44,28 +76,6 @@ class ServerStatus(Status):
         return f"Server({self.host}::{self.name})->locks:\n" + pformat(self.locks)
 
 
-class Ident(Message):
-    """Client identity token used by instrument lock and RPC requests.
-
-    :ivar name: Human-readable client name.
-    :ivar uuid: Random UUID assigned once to distinguish concurrent clients.
-
-    """
-
-    def __init__(self, name: str):
-        self.name = name
-        self.uuid = uuid.uuid4()
-
-    def __eq__(self, o):
-        return self.name == o.name and self.uuid == o.uuid
-
-    def __repr__(self):
-        return f"Ident({self.name}, {self.uuid})"
-
-    def __str__(self):
-        return f"Id({self.name})"
-
-
 class NoArgReq(Request):
     """Base request carrying client identity and target instrument name.
 
@@ -180,14 +190,22 @@ class SetReq(Request):
 
 
 class GetReq(Request):
-    """call get() of instrument `inst`."""
+    """call get() of instrument `inst`.
+
+    If `shm` is True, arrays in the returned value may be passed via shared memory
+    (replaced by SharedSlot descriptors in the Reply).
+
+    """
 
-    def __init__(self, ident: Ident, inst: str, key: str, args=None, label: str = ""):
+    def __init__(
+        self, ident: Ident, inst: str, key: str, args=None, label: str = "", shm: bool = False
+    ):
         self.ident = ident
         self.inst = inst
         self.key = key
         self.args = args
         self.label = label
+        self.shm = shm
 
 
 class HelpReq(Request):
@@ -199,14 +217,59 @@ class HelpReq(Request):
 
 
 class GetParamDictReq(LabeledReq):
-    """get ParamDict for `label` of instrument `inst`."""
+    """get ParamDict for `label` of instrument `inst`.
 
-    pass
+    If `refresh` is True, the cache of the server is bypassed (and updated).
+
+    """
+
+    def __init__(self, ident: Ident, inst: str, label: str = "", refresh: bool = False):
+        LabeledReq.__init__(self, ident, inst, label)
+        self.refresh = refresh
 
 
 class GetParamDictLabelsReq(Request):
-    """Request to get list of param dict labels for instrument `inst`."""
+    """Request to get list of param dict labels for instrument `inst`.
 
-    def __init__(self, ident: Ident, inst: str):
+    If `refresh` is True, the cache of the server is bypassed (and updated).
+
+    """
+
+    def __init__(self, ident: Ident, inst: str, refresh: bool = False):
         self.ident = ident
         self.inst = inst
+        self.refresh = refresh
+
+
+class GetParamDictsReq(Request):
+    """get ParamDicts for the list of (inst, label) `keys` at once.
+
+    If `refresh` is True, the cache of the server is bypassed (and updated).
+
+    """
+
+    def __init__(self, ident: Ident, keys: list[tuple[str, str]], refresh: bool = False):
+        self.ident = ident
+        self.keys = [tuple(k) for k in keys]
+        self.refresh = refresh
+
+
+class ParamDictChanged(Message):
+    """Notification that ParamDicts of instruments `insts` may have been changed.
+
+    Published by the instrument server under ``param_dict`` topic when state-changing
+    functions (configure(), set(), reset(), etc.) are called on the instruments.
+
+    :ivar host: Host name of the instrument server.
+    :ivar name: Node name of the instrument server.
+    :ivar insts: Names of instruments (and overlays) whose ParamDicts may have been changed.
+
+    """
+
+    def __init__(self, host: str, name: str, insts: list[str]):
+        self.host = host
+        self.name = name
+        self.insts = insts
+
+    def __repr__(self):
+        return f"ParamDictChanged({self.host}, {self.name}, {self.insts})"
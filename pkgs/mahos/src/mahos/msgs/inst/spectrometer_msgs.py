@@ -21,6 +21,8 @@ class Temperature(Message):
 
     """
 
+    SCHEMA = {"current": None, "target": None}
+
     def __init__(self, current: float, target: float):
         self.current = current
         self.target = target
@@ -36,11 +36,29 @@ class RawEvents(Data):
     """The raw events data.
 
     :ivar data: The events data. Should be sorted before storing.
+    :ivar channels: (optional) The channel of each event in data.
+        If None, the channels are not distinguished.
 
     """
 
-    def __init__(self, data: np.ndarray | None = None):
+    def __init__(self, data: np.ndarray | None = None, channels: np.ndarray | None = None):
         self.data = data
+        self.channels = channels
 
-    def set_data(self, data: np.ndarray):
+    def set_data(self, data: np.ndarray, channels: np.ndarray | None = None):
         self.data = data
+        self.channels = channels
+
+    def has_channels(self) -> bool:
+        return self.data is not None and getattr(self, "channels", None) is not None
+
+    def get_channel_data(self, channel: int) -> np.ndarray:
+        """Get the (sorted) events of `channel`.
+
+        :raises ValueError: channels are not available.
+
+        """
+
+        if not self.has_channels():
+            raise ValueError("channels are not available in this RawEvents")
+        return self.data[self.channels == channel]
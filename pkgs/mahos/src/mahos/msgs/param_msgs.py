@@ -28,12 +28,14 @@ import re
 import pprint
 
 import numpy as np
-import h5py
 
 from mahos.msgs.common_msgs import Request
 from mahos.util.unit import SI_scale
 from mahos.util.comp import dict_isclose, has_compatible_types
 from mahos.util.conv import args_to_list
+from mahos.util.lazy import lazy_import
+
+h5py = lazy_import("h5py")
 
 
 LABEL_DELIM = "::"
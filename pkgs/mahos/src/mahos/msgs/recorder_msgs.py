@@ -28,27 +28,68 @@ class ResetReq(Request):
         self.label = label
 
 
+def _infer_dtype(value) -> np.dtype:
+    """Infer dtype of channel buffer from the first recorded value."""
+
+    if isinstance(value, (bool, np.bool_)):
+        return np.dtype(np.bool_)
+    if isinstance(value, (complex, np.complexfloating)):
+        return np.dtype(np.complex128)
+    if isinstance(value, (int, float, np.number)):
+        return np.dtype(np.float64)
+    return np.dtype(object)
+
+
+def _fill_value(dtype: np.dtype):
+    """Value for a channel sample missing at an append."""
+
+    if dtype.kind in "fc":
+        return np.nan
+    if dtype.kind == "b":
+        return False
+    return None
+
+
 class RecorderData(BasicMeasData):
     """Recorded multi-channel timeseries with channel/unit metadata.
 
     :ivar units: Ordered ``(channel, unit)`` tuples defining recorded channels.
     :ivar data: Per-channel sample buffers aligned to ``xdata``.
-    :ivar xdata: Time-axis samples in seconds.
+    :ivar xdata: Time-axis sample buffer in seconds.
 
     Call :meth:`set_units` before appending measurement samples.
 
+    The samples are stored in preallocated ring buffers so that :meth:`append` is O(1)
+    (amortized) even when the history is bounded by ``params["max_len"]``.
+    Only the region of length ``len(self)`` ending at ``_stop`` is valid in the buffers:
+    use :meth:`get_xdata` and :meth:`get_ydata` (zero-copy views) to read them.
+    The buffers are compacted when this data is pickled or saved to HDF5 file.
+
     """
 
     def __init__(self, params: dict | None = None, label: str = ""):
-        self.set_version(1)
+        self.set_version(2)
         self.init_params(params, label)
         self.init_attrs()
 
         # not using dict for units and data here
         # because assoc. array is easier to save to / load from HDF5 file
         self.units: list[tuple[str, str]] = []
-        self.data: list[list[float]] = []
-        self.xdata: list[float] = []
+        self.data: list[np.ndarray] = []
+        self.xdata: np.ndarray = np.zeros(0)
+        self._stop: int = 0
+        self._len: int = 0
+        self._channel_index: dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getstate__(self):
+        state = super().__getstate__()
+        state["xdata"] = self.get_xdata().copy()
+        state["data"] = [self._valid(buf).copy() for buf in self.data]
+        state["_stop"] = self._len
+        return state
 
     def set_units(self, units: list[tuple[str, str]]):
         """set units and initialize data.
@@ -58,7 +99,10 @@ class RecorderData(BasicMeasData):
         """
 
         self.units = units
-        self.data = [[] for _ in units]
+        self._channel_index = {ch: i for i, (ch, _) in enumerate(units)}
+        self.data = [np.zeros(0) for _ in units]
+        self.xdata = np.zeros(0)
+        self._stop = self._len = 0
 
     def get_channels(self) -> list[str]:
         """Get list of recorded channel names (data labels)."""
@@ -82,30 +126,94 @@ class RecorderData(BasicMeasData):
         return ret
 
     def index(self, ch: str) -> int:
-        """Get index of channel name (data label)."""
+        """Get index of channel name (data label).
 
-        return self.get_channels().index(ch)
+        :raises ValueError: ``ch`` is not a recorded channel.
 
-    def roll(self, data):
-        """Roll data if the length of recorded data exceeds ``params["max_len"]``."""
+        """
 
-        max_len = self.params.get("max_len", 0)
-        if max_len <= 0 or len(data) <= max_len:
-            return data
-        return data[len(data) - max_len :]
+        try:
+            return self._channel_index[ch]
+        except KeyError:
+            raise ValueError(f"{ch} is not a recorded channel") from None
+
+    def max_len(self) -> int:
+        """Get the maximum length of history. Non-positive value means unbounded."""
+
+        if self.params is None:
+            return 0
+        return self.params.get("max_len", 0)
+
+    def _valid(self, buf: np.ndarray) -> np.ndarray:
+        return buf[self._stop - self._len : self._stop]
+
+    def _reserve(self, y: dict):
+        """Make room for a sample at ``_stop`` by compacting or growing the buffers."""
+
+        capacity = len(self.xdata)
+        if self._stop < capacity:
+            return
+
+        max_len = self.max_len()
+        if capacity == 0:
+            # allocate the buffers for the first time, inferring dtypes from the first sample.
+            dtypes = [
+                _infer_dtype(y[ch]) if ch in y else np.dtype(np.float64) for ch, _ in self.units
+            ]
+        else:
+            dtypes = [buf.dtype for buf in self.data]
+
+        if max_len > 0 and capacity >= 2 * max_len:
+            # the valid region (at most max_len) is moved to the head.
+            # this happens once per max_len appends, keeping append O(1) amortized.
+            head = self._stop - self._len
+            self.xdata[: self._len] = self.xdata[head : self._stop]
+            for buf in self.data:
+                buf[: self._len] = buf[head : self._stop]
+            self._stop = self._len
+            return
+
+        new_capacity = max(2 * capacity, 16)
+        if max_len > 0:
+            new_capacity = min(new_capacity, 2 * max_len)
+        xdata = np.empty(new_capacity, dtype=np.float64)
+        xdata[: self._len] = self.get_xdata()
+        data = []
+        for buf, dtype in zip(self.data, dtypes):
+            b = np.empty(new_capacity, dtype=dtype)
+            b[: self._len] = self._valid(buf)
+            data.append(b)
+        self.xdata, self.data = xdata, data
+        self._stop = self._len
 
     def append(self, x: float, y: dict[str, float]):
-        """Append data points at single x."""
+        """Append data points at single x.
+
+        If a channel is missing in ``y``, it is filled by NaN (or False / None
+        depending on the dtype of the channel).
+
+        """
 
-        self.xdata.append(x)
-        self.xdata = self.roll(self.xdata)
+        self._reserve(y)
+        i = self._stop
+        self.xdata[i] = x
         for ch, value in y.items():
-            i = self.index(ch)
-            self.data[i].append(value)
-            self.data[i] = self.roll(self.data[i])
+            self.data[self.index(ch)][i] = value
+        if len(y) < len(self.units):
+            for ch, buf in zip(self.get_channels(), self.data):
+                if ch not in y:
+                    buf[i] = _fill_value(buf.dtype)
+
+        self._stop += 1
+        self._len += 1
+        max_len = self.max_len()
+        if max_len > 0 and self._len > max_len:
+            self._len = max_len
 
     def get_xdata(self) -> np.ndarray:
-        return np.array(self.xdata)
+        """Get x (time) data. The returned array is a view of internal buffer."""
+
+        return self._valid(self.xdata)
 
     def get_unit(self, ch: str) -> str:
         """Get units of channel ``ch``."""
@@ -113,7 +221,54 @@ class RecorderData(BasicMeasData):
         return self.units[self.index(ch)][1]
 
     def get_ydata(self, ch: str) -> np.ndarray:
-        return np.array(self.data[self.index(ch)])
+        """Get y data of channel ``ch``. The returned array is a view of internal buffer."""
+
+        return self._valid(self.data[self.index(ch)])
+
+    def get_downsampled(
+        self, ch: str, max_points: int, method: str = "minmax"
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Get (x, y) data of channel ``ch`` downsampled to at most ``max_points`` points.
+
+        :param max_points: maximum number of points. Non-positive value disables downsampling.
+        :param method: "minmax" to keep the minimum and maximum in each bucket
+            (preserving spikes for plotting) or "decimate" to take every n-th point.
+
+        """
+
+        x, y = self.get_xdata(), self.get_ydata(ch)
+        n = len(x)
+        if max_points <= 0 or n <= max_points:
+            return x, y
+        if method == "decimate":
+            step = -(-n // max_points)
+            return x[::step], y[::step]
+        if method != "minmax":
+            raise ValueError(f"Unknown downsampling method: {method}")
+        if y.dtype.kind not in "biuf":
+            raise ValueError(f"minmax downsampling is not available for dtype {y.dtype}")
+
+        # two points per bucket. the remainder is dropped from the head (oldest data).
+        size = -(-2 * n // max_points)
+        num = n // size
+        ofs = n - num * size
+        buckets = y[ofs:].reshape((num, size))
+        if y.dtype.kind == "f":
+            # ignore NaN (missing samples). all-NaN buckets are skipped.
+            nan = np.isnan(buckets)
+            imin = np.where(nan, np.inf, buckets).argmin(axis=1)
+            imax = np.where(nan, -np.inf, buckets).argmax(axis=1)
+            valid = ~nan.all(axis=1)
+        else:
+            imin, imax = buckets.argmin(axis=1), buckets.argmax(axis=1)
+            valid = np.ones(num, dtype=np.bool_)
+        # keep the temporal order of min and max in each bucket
+        idx = np.sort(np.stack((imin, imax), axis=1), axis=1)
+        idx += (ofs + size * np.arange(num))[:, np.newaxis]
+        # a single point for constant bucket (imin == imax)
+        keep = np.stack((valid, valid & (imin != imax)), axis=1)
+        idx = idx[keep]
+        return x[idx], y[idx]
 
     def init_axes(self):
         self.xlabel: str = "Time"
@@ -122,32 +277,41 @@ class RecorderData(BasicMeasData):
         self.yscale: str = "linear"
 
     def has_data(self):
-        return self.data and self.xdata
+        return bool(self.data) and self._len > 0
 
     # h5
     def _h5_write_units(self, val):
         d = val.copy()
         return np.void(msgpack.dumps(d))
 
+    def _h5_write_xdata(self, val):
+        return self.get_xdata()
+
     def _h5_write_data(self, val):
-        return np.array(val)
+        return np.array([self._valid(buf) for buf in val])
+
+    def _h5_write_stop(self, val):
+        return self._len
 
     def _h5_read_units(self, val):
         return msgpack.loads(val.tobytes())
 
+    def _h5_read_xdata(self, val):
+        return np.array(val, dtype=np.float64)
+
     def _h5_read_data(self, val):
-        return np.array(val).tolist()
+        return list(np.array(val))
 
     def _h5_attr_writers(self) -> dict:
-        return {"units": self._h5_write_units}
+        return {"units": self._h5_write_units, "_stop": self._h5_write_stop}
 
     def _h5_dataset_writers(self) -> dict:
-        return {"xdata": self._h5_write_data, "data": self._h5_write_data}
+        return {"xdata": self._h5_write_xdata, "data": self._h5_write_data}
 
     def _h5_readers(self) -> dict:
         return {
             "units": self._h5_read_units,
-            "xdata": self._h5_read_data,
+            "xdata": self._h5_read_xdata,
             "data": self._h5_read_data,
         }
 
@@ -158,5 +322,14 @@ def update_data(data: RecorderData):
         data.label = data.params["method"]
         del data.params["method"]
         data.set_version(1)
+    if data.version() <= 1:
+        # version 1 to 2: list to ring buffer
+        data.units = [tuple(u) for u in data.units]
+        data.xdata = np.array(data.xdata, dtype=np.float64)
+        data.data = [np.array(d) for d in data.data]
+        data._stop = data._len = len(data.xdata)
+        data.set_version(2)
+    if not hasattr(data, "_channel_index") or len(data._channel_index) != len(data.units):
+        data._channel_index = {ch: i for i, (ch, _) in enumerate(data.units)}
 
     return data
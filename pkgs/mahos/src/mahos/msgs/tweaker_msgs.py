@@ -22,6 +22,8 @@ class TweakerStatus(Status):
 
     """
 
+    SCHEMA = {"param_dict_ids": None}
+
     def __init__(self, param_dict_ids: list[str]):
         self.param_dict_ids = param_dict_ids
 
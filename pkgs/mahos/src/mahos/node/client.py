@@ -37,7 +37,11 @@ def init_node_client(
 
     host, name = split_name(name)
     conf = gconf[host][name]
-    ctx = Context(context=context, poll_timeout_ms=get_value(gconf, conf, "poll_timeout_ms"))
+    ctx = Context(
+        context=context,
+        poll_timeout_ms=get_value(gconf, conf, "poll_timeout_ms"),
+        auto_transport=get_value(gconf, conf, "auto_transport", True),
+    )
 
     return host, name, conf, ctx
 
@@ -9,8 +9,14 @@ Communication library for mahos Node.
 """
 
 from __future__ import annotations
+import os
 import pickle
 import logging
+import math
+import socket
+import stat
+import tempfile
+import time
 import typing as T
 
 import zmq
@@ -18,7 +24,8 @@ import zmq
 from mahos.msgs.common_msgs import pickle_proto, Message, Request, Reply
 from mahos.util.typing import SubHandler, RepHandler
 
-from mahos.node.log import PUBHandler, DummyLogger
+from mahos.node.log import PUBHandler, QueuePUBHandler, DummyLogger
+from mahos.util.shm import is_local_endpoint
 
 
 def serialize(msg: Message | T.Any) -> bytes:
@@ -42,7 +49,7 @@ def deserialize(b: bytes, msg_type: T.Type[Message] | None) -> Message | T.Any:
     """Deserialize a bytes to reconstruct Message or any object.
 
     msg_type is None (unspecified), deserialize is done assuming default serialization
-    method, pickle.
+    method, pickle (or schema-based one for Status and State).
     Otherwise, classmethod msg_type.deserialize() is invoked.
 
     """
@@ -50,7 +57,87 @@ def deserialize(b: bytes, msg_type: T.Type[Message] | None) -> Message | T.Any:
     if msg_type is not None:
         return msg_type.deserialize(b)
     else:
-        return pickle.loads(b)
+        return Message.deserialize(b)
+
+
+def inproc_alias(endpoint: str) -> str | None:
+    """Get inproc endpoint aliasing TCP `endpoint`. None if `endpoint` is not TCP."""
+
+    if not endpoint.startswith("tcp://"):
+        return None
+    return "inproc://mahos-" + endpoint[len("tcp://") :]
+
+
+def ipc_dir() -> str | None:
+    """Get the per-user directory for ipc aliases, creating it if necessary.
+
+    The directory is ``$XDG_RUNTIME_DIR/mahos`` or ``<tempdir>/mahos-<uid>``,
+    which must be owned by the user and not accessible by the others.
+    None if ipc transport is not available (Windows) or the directory is not safe to use.
+
+    """
+
+    if os.name != "posix" or not zmq.has("ipc"):
+        return None
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir and os.path.isdir(runtime_dir):
+        path = os.path.join(runtime_dir, "mahos")
+    else:
+        path = os.path.join(tempfile.gettempdir(), f"mahos-{os.getuid()}")
+    try:
+        os.mkdir(path, 0o700)
+    except FileExistsError:
+        pass
+    except OSError:
+        return None
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return None
+    # reject the one prepared by another user (or a symlink).
+    if not stat.S_ISDIR(st.st_mode) or st.st_uid != os.getuid() or st.st_mode & 0o077:
+        return None
+    return path
+
+
+def ipc_alias(endpoint: str) -> str | None:
+    """Get ipc endpoint aliasing TCP `endpoint`.
+
+    The path in :func:`ipc_dir` is determined by the port number, which is unique on a host.
+    None if `endpoint` is not TCP or ipc transport is not available.
+
+    """
+
+    if not endpoint.startswith("tcp://"):
+        return None
+    port = endpoint.rsplit(":", 1)[-1]
+    if not port.isdigit():
+        return None
+    if (d := ipc_dir()) is None:
+        return None
+    return "ipc://" + os.path.join(d, f"mahos-{port}.ipc")
+
+
+def ipc_listening(path: str, timeout_sec: float = 0.5) -> bool:
+    """Check if a socket is listening at ipc `path`.
+
+    A socket file can be left behind by a killed process,
+    so the existence of the file is not enough.
+
+    """
+
+    try:
+        if not stat.S_ISSOCK(os.stat(path).st_mode):
+            return False
+    except OSError:
+        return False
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.settimeout(timeout_sec)
+        try:
+            s.connect(path)
+        except OSError:
+            return False
+    return True
 
 
 def get_logger(logger):
@@ -119,12 +206,22 @@ class Requester(object):
 
 
 class Publisher(object):
-    """Class providing publish() for PUB-SUB pattern communication."""
+    """Class providing publish() for PUB-SUB pattern communication.
+
+    :param heartbeat_sec: If given, publish only when the message is changed
+        or heartbeat_sec has passed since the last publish.
+
+    """
 
-    def __init__(self, socket: zmq.Socket, topic: bytes, logger=None):
+    def __init__(
+        self, socket: zmq.Socket, topic: bytes, logger=None, heartbeat_sec: float | None = None
+    ):
         self._socket = socket
         self.topic = bytes(topic)
         self.logger = get_logger(logger)
+        self.heartbeat_sec = heartbeat_sec
+        self._last_msg = None
+        self._last_time = 0.0
 
     def socket(self) -> zmq.Socket:
         """Get zmq socket this publisher uses."""
@@ -134,8 +231,16 @@ class Publisher(object):
     def publish(self, msg):
         """Publish the given message."""
 
+        b = serialize(msg)
+        if self.heartbeat_sec is not None:
+            t = time.monotonic()
+            if b == self._last_msg and t - self._last_time < self.heartbeat_sec:
+                return
+            self._last_msg = b
+            self._last_time = t
+
         try:
-            self._socket.send_multipart([self.topic, serialize(msg)])
+            self._socket.send_multipart([self.topic, b])
         except zmq.ZMQError:
             self.logger.exception("ZMQError in Publisher.publish().")
 
@@ -145,6 +250,52 @@ class Publisher(object):
         self._socket.close()
 
 
+class Coalescer(object):
+    """Latest-value coalescing state of a subscriber socket.
+
+    Only the newest message is kept (without deserialization) until it is delivered,
+    and the delivery is limited to `max_rate` times per second.
+    If `max_rate` is 0 or None, the newest message is delivered at every poll.
+
+    :ivar received: number of received messages.
+    :ivar delivered: number of messages passed to the handler.
+
+    """
+
+    def __init__(self, max_rate: float | None = None):
+        self.interval_sec = 1.0 / max_rate if max_rate else 0.0
+        self.received = 0
+        self.delivered = 0
+        self._pending = None
+        self._last_time = -float("inf")
+
+    def dropped(self) -> int:
+        """Get number of messages dropped in favor of newer ones."""
+
+        return self.received - self.delivered - (self._pending is not None)
+
+    def push(self, frames: list[bytes]):
+        self.received += 1
+        self._pending = frames
+
+    def wait_ms(self, now: float) -> int | None:
+        """Get time in ms until pending message becomes due. None if nothing is pending."""
+
+        if self._pending is None:
+            return None
+        return max(0, math.ceil((self._last_time + self.interval_sec - now) * 1e3))
+
+    def pop(self, now: float) -> list[bytes] | None:
+        """Pop the pending message if it is due."""
+
+        if self._pending is None or now - self._last_time < self.interval_sec:
+            return None
+        frames, self._pending = self._pending, None
+        self._last_time = now
+        self.delivered += 1
+        return frames
+
+
 def null_handler(msg):
     pass
 
@@ -154,6 +305,17 @@ class Context(object):
 
     :param context: if passed, internal ZMQ context is shared.
     :param poll_timeout_ms: polling timeout in milliseconds.
+    :param auto_transport: if True, TCP endpoints are rewritten automatically.
+        Binding sockets additionally bind to inproc and ipc aliases of the TCP endpoint
+        (TCP endpoint stays bound for remote peers).
+        Connecting sockets connect to the inproc alias if the endpoint is in
+        ``inproc_endpoints`` (the endpoints bound in this process, shared among
+        the Contexts sharing ZMQ context), or the ipc alias if the endpoint is on this host
+        and the ipc alias is bound by the same user (see :func:`ipc_dir`).
+
+    :ivar sub_endpoints: mapping from publisher endpoint to the endpoint actually subscribed
+        (e.g. XPUB endpoint of :class:`SubProxy <mahos.node.sub_proxy.SubProxy>`).
+        It is copied to the Contexts created from this Context.
 
     Current implementation is based on ZMQ.
 
@@ -186,13 +348,22 @@ class Context(object):
         context: "Context" | zmq.Context | None = None,
         poll_timeout_ms: int | None = None,
         linger_ms: int | None = None,
+        auto_transport: bool = False,
     ):
         if isinstance(context, Context):
             self.ctx = context.zmq_context()
+            self.inproc_endpoints: set[str] = context.inproc_endpoints
+            self.sub_endpoints: dict[str, str] = dict(context.sub_endpoints)
         elif isinstance(context, zmq.Context):
             self.ctx = context
+            self.inproc_endpoints = set()
+            self.sub_endpoints = {}
         else:
             self.ctx = zmq.Context()
+            self.inproc_endpoints = set()
+            self.sub_endpoints = {}
+        self.auto_transport = auto_transport
+        self._ipc_paths = []
 
         if poll_timeout_ms is None:
             self.poll_timeout_ms = 100
@@ -209,7 +380,12 @@ class Context(object):
         ## socket: handler
         self.rep_handlers: dict[zmq.Socket, tuple[RepHandler, T.Type[Message] | None]] = {}
         self.sub_handlers: dict[zmq.Socket, tuple[SubHandler, T.Type[Message] | None, bool]] = {}
+        ## socket: (topic, coalescer)
+        self.coalescers: dict[zmq.Socket, tuple[bytes, Coalescer]] = {}
+        ## topic: max_rate
+        self.coalesce_rates: dict[bytes, float | None] = {}
         self.broker_handlers = []
+        self.log_handlers: list[QueuePUBHandler] = []
 
         self.poller = zmq.Poller()
         self._closed = False
@@ -229,6 +405,14 @@ class Context(object):
         for xpub, xsub, _, _ in self.broker_handlers:
             xpub.close()
             xsub.close()
+        for h in self.log_handlers:
+            h.close()
+        # Remove ipc files not to let the clients connect to them after this context is closed.
+        for path in self._ipc_paths:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
 
         # Since close_zmq_ctx is False by default, we don't terminate zmq context here.
         # But this will be done in zmq context's destructor.
@@ -240,6 +424,34 @@ class Context(object):
 
         return self.ctx
 
+    def resolve_endpoint(self, endpoint: str) -> str:
+        """Resolve the endpoint to connect to considering auto_transport."""
+
+        if not self.auto_transport or not endpoint.startswith("tcp://"):
+            return endpoint
+        if endpoint in self.inproc_endpoints:
+            return inproc_alias(endpoint)
+        ipc = ipc_alias(endpoint)
+        if ipc is None or not is_local_endpoint(endpoint):
+            return endpoint
+        if ipc_listening(ipc[len("ipc://") :]):
+            return ipc
+        return endpoint
+
+    def _bind(self, sock: zmq.Socket, endpoint: str):
+        sock.bind(endpoint)
+        if not self.auto_transport:
+            return
+        for alias in (inproc_alias(endpoint), ipc_alias(endpoint)):
+            if alias is None:
+                continue
+            try:
+                sock.bind(alias)
+            except zmq.ZMQError:
+                continue
+            if alias.startswith("ipc://"):
+                self._ipc_paths.append(alias[len("ipc://") :])
+
     def add_req(
         self,
         endpoint: str,
@@ -261,7 +473,7 @@ class Context(object):
 
         r = Requester(
             self.ctx,
-            endpoint,
+            self.resolve_endpoint(endpoint),
             self.linger_ms,
             timeout_ms=timeout_ms,
             rep_type=rep_type,
@@ -283,23 +495,41 @@ class Context(object):
 
         sock = self.ctx.socket(zmq.REP)
         sock.setsockopt(zmq.LINGER, self.linger_ms)
-        sock.bind(endpoint)
+        self._bind(sock, endpoint)
         self.poller.register(sock, zmq.POLLIN)
         self.rep_handlers[sock] = (handler, req_type)
 
-    def add_pub(self, endpoint: str, topic: bytes | str, logger=None) -> Publisher:
-        """Add and return a Publisher."""
+    def add_pub(
+        self, endpoint: str, topic: bytes | str, logger=None, heartbeat_sec: float | None = None
+    ) -> Publisher:
+        """Add and return a Publisher.
+
+        :param heartbeat_sec: If given, the Publisher publishes on change only (see Publisher).
+
+        """
 
         if endpoint in self.publishers:
             sock = self.publishers[endpoint].socket()
         else:
             sock = self.ctx.socket(zmq.PUB)
             sock.setsockopt(zmq.LINGER, self.linger_ms)
-            sock.bind(endpoint)
-        p = Publisher(sock, self._topic_to_bytes(topic), logger=logger)
+            self._bind(sock, endpoint)
+        p = Publisher(
+            sock, self._topic_to_bytes(topic), logger=logger, heartbeat_sec=heartbeat_sec
+        )
         self.publishers[endpoint] = p
         return p
 
+    def set_coalesce(self, topic_rates: dict[bytes | str, float | None]):
+        """Set topics to be coalesced by subsequent add_sub().
+
+        :param topic_rates: mapping from topic to max delivery rate (Hz).
+            The rate 0 or None means coalescing without rate limit.
+
+        """
+
+        self.coalesce_rates = {self._topic_to_bytes(t): r for t, r in topic_rates.items()}
+
     def add_sub(
         self,
         endpoint: str,
@@ -307,24 +537,57 @@ class Context(object):
         handler=null_handler,
         msg_type: T.Type[Message] | None = None,
         deserial=True,
-    ):
+    ) -> Coalescer | None:
         """Add sub handler.
 
+        If `topic` is set by set_coalesce(), the messages are coalesced:
+        only the newest message is deserialized and passed to `handler`,
+        at most max_rate times per second.
+
         :param msg_type: Type (class object) of expected message.
             Some value must be passed if custom-serialization will be received.
             Otherwise, it can be omitted.
+        :returns: Coalescer if the messages are coalesced. None otherwise.
 
         """
 
+        topic = self._topic_to_bytes(topic)
         sock = self.ctx.socket(zmq.SUB)
         sock.setsockopt(zmq.LINGER, self.linger_ms)
-        sock.setsockopt(zmq.SUBSCRIBE, self._topic_to_bytes(topic))
-        sock.connect(endpoint)
+        sock.setsockopt(zmq.SUBSCRIBE, topic)
+        sock.connect(self.resolve_endpoint(self.sub_endpoints.get(endpoint, endpoint)))
         self.poller.register(sock, zmq.POLLIN)
         self.sub_handlers[sock] = (handler, msg_type, deserial)
+        if topic in self.coalesce_rates:
+            coalescer = Coalescer(self.coalesce_rates[topic])
+            self.coalescers[sock] = (topic, coalescer)
+            return coalescer
+        return None
+
+    def dropped_counts(self) -> dict[bytes, int]:
+        """Get number of messages dropped by coalescing for each topic."""
+
+        counts = {}
+        for topic, coalescer in self.coalescers.values():
+            counts[topic] = counts.get(topic, 0) + coalescer.dropped()
+        return counts
 
-    def add_pub_handler(self, endpoint: str, root_topic: str = ""):
-        """Add PUBHandler for logging."""
+    def add_pub_handler(
+        self, endpoint: str, root_topic: str = "", queue: bool = False
+    ) -> PUBHandler | QueuePUBHandler:
+        """Add PUBHandler for logging.
+
+        :param queue: if True, add QueuePUBHandler which sends logs in background thread.
+
+        """
+
+        endpoint = self.resolve_endpoint(endpoint)
+        if queue:
+            handler = QueuePUBHandler(
+                self.ctx, endpoint, linger_ms=self.linger_ms, root_topic=root_topic
+            )
+            self.log_handlers.append(handler)
+            return handler
 
         sock = self.ctx.socket(zmq.PUB)
         sock.setsockopt(zmq.LINGER, self.linger_ms)
@@ -337,15 +600,33 @@ class Context(object):
         xsub_endpoint: str,
         xpub_handler=null_handler,
         xsub_handler=null_handler,
+        xsub_connect: bool = False,
+        sndhwm: int | None = None,
+        rcvhwm: int | None = None,
     ):
-        """Add broker (xpub/xsub) handlers."""
+        """Add broker (xpub/xsub) handlers.
+
+        :param xsub_connect: if True, xsub connects to `xsub_endpoint` (a PUB socket)
+            instead of binding it.
+        :param sndhwm: send high water mark of xpub, which is applied to each subscriber.
+            Messages to a subscriber exceeding this are dropped (only for that subscriber).
+        :param rcvhwm: receive high water mark of xsub.
+
+        """
 
         xpub = self.ctx.socket(zmq.XPUB)
         xsub = self.ctx.socket(zmq.XSUB)
         xpub.setsockopt(zmq.LINGER, self.linger_ms)
         xsub.setsockopt(zmq.LINGER, self.linger_ms)
-        xpub.bind(xpub_endpoint)
-        xsub.bind(xsub_endpoint)
+        if sndhwm is not None:
+            xpub.setsockopt(zmq.SNDHWM, sndhwm)
+        if rcvhwm is not None:
+            xsub.setsockopt(zmq.RCVHWM, rcvhwm)
+        self._bind(xpub, xpub_endpoint)
+        if xsub_connect:
+            xsub.connect(self.resolve_endpoint(xsub_endpoint))
+        else:
+            self._bind(xsub, xsub_endpoint)
         self.poller.register(xpub, zmq.POLLIN)
         self.poller.register(xsub, zmq.POLLIN)
         self.broker_handlers.append((xpub, xsub, xpub_handler, xsub_handler))
@@ -367,23 +648,42 @@ class Context(object):
                 rep = handler(msg)
                 sock.send(serialize(rep))
 
+    def _dispatch_sub(self, frames, handler, msg_type, deserial):
+        if not deserial:
+            handler(frames)
+            return
+
+        if len(frames) == 2:
+            topic, msg = frames
+            handler(deserialize(msg, msg_type))
+        else:
+            # this should not happen as ZMQ assures multipart message to be atomic.
+            print(f"[ERROR] {len(frames)} parts received instead of 2.")
+            for f in frames:
+                print(f[:10], end="")
+            print()
+
     def _handle_sub(self, socks):
         for sock, (handler, msg_type, deserial) in self.sub_handlers.items():
-            if sock in socks:
-                if not deserial:
-                    handler(sock.recv_multipart())
-                    continue
-
-                frames = sock.recv_multipart()
-                if len(frames) == 2:
-                    topic, msg = frames
-                    handler(deserialize(msg, msg_type))
-                else:
-                    # this should not happen as ZMQ assures multipart message to be atomic.
-                    print(f"[ERROR] {len(frames)} parts received instead of 2.")
-                    for f in frames:
-                        print(f[:10], end="")
-                    print()
+            if sock not in socks:
+                continue
+            if sock in self.coalescers:
+                # drain the socket to keep the newest one only.
+                coalescer = self.coalescers[sock][1]
+                while True:
+                    try:
+                        coalescer.push(sock.recv_multipart(zmq.NOBLOCK))
+                    except zmq.Again:
+                        break
+            else:
+                self._dispatch_sub(sock.recv_multipart(), handler, msg_type, deserial)
+
+        if not self.coalescers:
+            return
+        now = time.monotonic()
+        for sock, (_, coalescer) in self.coalescers.items():
+            if (frames := coalescer.pop(now)) is not None:
+                self._dispatch_sub(frames, *self.sub_handlers[sock])
 
     def _handle_broker(self, socks):
         for xpub, xsub, xpub_handler, xsub_handler in self.broker_handlers:
@@ -399,7 +699,13 @@ class Context(object):
     def poll(self):
         """Poll inbound sockets and call corresponding handlers."""
 
-        socks = dict(self.poller.poll(self.poll_timeout_ms))
+        timeout_ms = self.poll_timeout_ms
+        if self.coalescers:
+            now = time.monotonic()
+            for _, coalescer in self.coalescers.values():
+                if (wait_ms := coalescer.wait_ms(now)) is not None:
+                    timeout_ms = min(timeout_ms, wait_ms)
+        socks = dict(self.poller.poll(timeout_ms))
         self._handle_rep(socks)
         self._handle_sub(socks)
         self._handle_broker(socks)
@@ -11,8 +11,11 @@ ZMQ-based loggers for mahos Nodes.
 from __future__ import annotations
 import sys
 import io
+import copy
 import logging
 import traceback
+import threading
+import queue
 
 import zmq
 from zmq.utils.strtypes import cast_bytes
@@ -37,7 +40,15 @@ class PUBHandler(logging.Handler):
     def __init__(self, socket: zmq.Socket, root_topic: str = ""):
         logging.Handler.__init__(self)
         self._root_topic = root_topic
-        self.formatters = {
+        self.formatters = self._default_formatters()
+        if not isinstance(socket, zmq.Socket):
+            raise ValueError("zmq.Socket must be given")
+
+        self.socket = socket
+
+    @staticmethod
+    def _default_formatters() -> dict[int, logging.Formatter]:
+        return {
             logging.DEBUG: logging.Formatter(
                 f"%(asctime)s{TIME_DELIM}%(message)s (%(filename)s:%(lineno)d)\n"
             ),
@@ -52,10 +63,6 @@ class PUBHandler(logging.Handler):
                 f"%(asctime)s{TIME_DELIM}%(message)s (%(filename)s:%(lineno)d)\n"
             ),
         }
-        if not isinstance(socket, zmq.Socket):
-            raise ValueError("zmq.Socket must be given")
-
-        self.socket = socket
 
     @property
     def root_topic(self):
@@ -99,8 +106,8 @@ class PUBHandler(logging.Handler):
 
         return self.formatters[record.levelno].format(record)
 
-    def emit(self, record):
-        """Emit a log message on my socket."""
+    def make_frames(self, record) -> list[bytes] | None:
+        """Make message frames [topic, message] from a record. Return None on failure."""
 
         try:
             topic, record.msg = record.msg.split(TOPIC_DELIM, 1)
@@ -110,7 +117,7 @@ class PUBHandler(logging.Handler):
             bmsg = cast_bytes(self.format(record))
         except Exception:
             self.handleError(record)
-            return
+            return None
 
         topic_list = []
 
@@ -124,7 +131,146 @@ class PUBHandler(logging.Handler):
 
         btopic = cast_bytes(TOPIC_DELIM).join(cast_bytes(t) for t in topic_list)
 
-        self.socket.send_multipart([btopic, bmsg])
+        return [btopic, bmsg]
+
+    def emit(self, record):
+        """Emit a log message on my socket."""
+
+        frames = self.make_frames(record)
+        if frames is not None:
+            self.socket.send_multipart(frames)
+
+
+class QueuePUBHandler(PUBHandler):
+    """A logging handler that emits log messages through a PUB socket in background thread.
+
+    emit() only puts the record to a queue so that the logging thread is not blocked
+    by formatting and socket operations.
+    The background thread drains the queue and sends the records in batches.
+
+    :param context: ZMQ context to create the PUB socket.
+    :param endpoint: endpoint to connect the PUB socket.
+    :param linger_ms: LINGER option of the PUB socket.
+    :param root_topic: root topic. See PUBHandler.
+    :param queue_size: max size of the queue. When the queue is full, new records are dropped.
+        The number of dropped records is reported with a WARNING message afterwards.
+    :param batch_size: max number of records sent in a batch.
+
+    """
+
+    def __init__(
+        self,
+        context: zmq.Context,
+        endpoint: str,
+        linger_ms: int = 0,
+        root_topic: str = "",
+        queue_size: int = 10000,
+        batch_size: int = 100,
+    ):
+        # PUBHandler.__init__() is skipped because it requires a socket.
+        logging.Handler.__init__(self)
+        self._root_topic = root_topic
+        self.formatters = PUBHandler._default_formatters()
+
+        self._ctx = context
+        self._endpoint = endpoint
+        self._linger_ms = linger_ms
+        self._batch_size = batch_size
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._dropped = 0
+        self._closed = False
+        self._ready = threading.Event()
+
+        self._thread = threading.Thread(target=self._send_loop, daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def dropped(self) -> int:
+        """Get number of records dropped so far due to full queue."""
+
+        return self._dropped
+
+    def prepare(self, record):
+        """Prepare a record for queuing.
+
+        The message is merged with args and the exception info is formatted here,
+        because these may be modified (or released) after emit().
+        A copy is returned so that the record passed to other handlers is kept intact.
+
+        """
+
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = self.formatters[record.levelno].formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def emit(self, record):
+        """Put a record to the queue."""
+
+        if self._closed:
+            return
+        try:
+            self._queue.put_nowait(self.prepare(record))
+        except queue.Full:
+            self._dropped += 1
+        except Exception:
+            self.handleError(record)
+
+    def _report_dropped(self, socket: zmq.Socket, dropped: int):
+        record = logging.LogRecord(
+            self.name or "", logging.WARN, __file__, 0, "", None, None, "_report_dropped"
+        )
+        record.msg = f"{dropped} log records have been dropped due to full queue."
+        frames = self.make_frames(record)
+        if frames is not None:
+            socket.send_multipart(frames)
+
+    def _send_loop(self):
+        # socket is created (and closed) in this thread because zmq socket is not thread-safe.
+        socket = self._ctx.socket(zmq.PUB)
+        socket.setsockopt(zmq.LINGER, self._linger_ms)
+        socket.connect(self._endpoint)
+        self.socket = socket
+        self._ready.set()
+
+        reported = 0
+        running = True
+        while running:
+            batch = [self._queue.get()]
+            try:
+                while len(batch) < self._batch_size:
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            for record in batch:
+                if record is None:
+                    running = False
+                    break
+                frames = self.make_frames(record)
+                if frames is not None:
+                    socket.send_multipart(frames)
+
+            if self._dropped != reported:
+                dropped = self._dropped
+                self._report_dropped(socket, dropped - reported)
+                reported = dropped
+
+        socket.close()
+
+    def close(self):
+        """Send the remaining records and stop the background thread."""
+
+        if not self._closed:
+            self._closed = True
+            # block here to put sentinel even if queue is full.
+            self._queue.put(None)
+            self._thread.join()
+        logging.Handler.close(self)
 
 
 class TopicLogger(logging.Logger):
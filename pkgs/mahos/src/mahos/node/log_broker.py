@@ -10,12 +10,16 @@ Global log broker.
 
 from __future__ import annotations
 import typing as T
+import os
 from os import path
 import copy
 import datetime
+import time
 import threading
+import queue
 import logging
 
+import numpy as np
 import zmq
 
 from mahos.node.node import NodeBase, Node, NodeName, NAME_DELIM, split_name
@@ -160,8 +164,10 @@ class FileLogger(object):
         log = parse_log(msg)
         if log is None:
             return
-        m = format_log(log)
-        self.write(m)
+        self.write_entry(log)
+
+    def write_entry(self, log: LogEntry):
+        self.write(format_log(log))
 
     def __del__(self):
         self.close()
@@ -176,6 +182,217 @@ class FileLogger(object):
             self.stream.close()
 
 
+def parse_formatted_log(m: str) -> LogEntry | None:
+    """Parse the string formatted by format_log() back into LogEntry."""
+
+    try:
+        i = m.index(" [")
+        j = m.index("]\t", i)
+        timestamp, level = m[:i], m[i + 2 : j]
+        joined, body = m[j + 2 :].split("\t", 1)
+        host, rest = joined.split(NAME_DELIM, 1)
+        if TOPIC_DELIM in rest:
+            name, topic = rest.split(TOPIC_DELIM, 1)
+        else:
+            name, topic = rest, ""
+        return LogEntry(timestamp, level, host, name, topic, body)
+    except ValueError:
+        return None
+
+
+class LogStore(object):
+    """Append-only log store with indices and time-based rotation.
+
+    The logs are written into segment files in `directory`.
+    Each segment consists of a text file (SEGMENT.log) in the same format as FileLogger
+    and a binary index file (SEGMENT.idx).
+    An index record contains the time (when the broker received the log),
+    position in the text file, level, and node id.
+    The node ids are recorded in nodes.txt (line number is the id).
+    Thus, the logs can be queried by time range, level and node names
+    without scanning the whole text files.
+
+    :param directory: directory to store the logs.
+    :param rotation_sec: a new segment is started after this interval.
+    :param keep: number of segments to keep. If None, old segments are never deleted.
+
+    """
+
+    INDEX_DTYPE = np.dtype(
+        [("time", "<f8"), ("offset", "<u8"), ("length", "<u4"), ("level", "u1"), ("node", "<u2")]
+    )
+    SEGMENT_FORMAT = "%Y-%m-%d_%H%M%S"
+    NODES_FILE = "nodes.txt"
+
+    def __init__(self, directory: str, rotation_sec: float = 3600.0, keep: int | None = None):
+        self.directory = directory
+        self.rotation_sec = rotation_sec
+        self.keep = keep
+        os.makedirs(directory, exist_ok=True)
+
+        self._nodes = self.load_nodes(directory)
+        self._node_ids = {n: i for i, n in enumerate(self._nodes)}
+        self._nodes_stream = open(path.join(directory, self.NODES_FILE), "a", encoding="utf-8")
+        self._log_stream = None
+        self._idx_stream = None
+        self._segment_start = 0.0
+        self._offset = 0
+        self._closed = False
+
+    @classmethod
+    def load_nodes(cls, directory: str) -> list[str]:
+        fn = path.join(directory, cls.NODES_FILE)
+        if not path.exists(fn):
+            return []
+        with open(fn, encoding="utf-8") as f:
+            return [line.rstrip("\n") for line in f]
+
+    @classmethod
+    def list_segments(cls, directory: str) -> list[tuple[str, float]]:
+        """List (segment_name, start_time) sorted by start_time."""
+
+        segments = []
+        for fn in os.listdir(directory):
+            name, ext = path.splitext(fn)
+            if ext != ".idx":
+                continue
+            try:
+                t = datetime.datetime.strptime(name, cls.SEGMENT_FORMAT).timestamp()
+            except ValueError:
+                continue
+            segments.append((name, t))
+        return sorted(segments, key=lambda s: s[1])
+
+    def _node_id(self, host: str, name: str) -> int:
+        joined = NAME_DELIM.join((host, name))
+        if joined not in self._node_ids:
+            self._node_ids[joined] = len(self._nodes)
+            self._nodes.append(joined)
+            self._nodes_stream.write(joined + "\n")
+            self._nodes_stream.flush()
+        return self._node_ids[joined]
+
+    def _close_segment(self):
+        for s in (self._log_stream, self._idx_stream):
+            if s is not None:
+                s.close()
+        self._log_stream = self._idx_stream = None
+
+    def _open_segment(self, t: float):
+        self._close_segment()
+        name = datetime.datetime.fromtimestamp(t).strftime(self.SEGMENT_FORMAT)
+        self._log_stream = open(path.join(self.directory, name + ".log"), "ab")
+        self._idx_stream = open(path.join(self.directory, name + ".idx"), "ab")
+        self._offset = self._log_stream.tell()
+        self._segment_start = t
+        self._remove_old_segments()
+
+    def _remove_old_segments(self):
+        if self.keep is None:
+            return
+        segments = self.list_segments(self.directory)
+        for name, _ in segments[: max(len(segments) - self.keep, 0)]:
+            for ext in (".log", ".idx"):
+                fn = path.join(self.directory, name + ext)
+                if path.exists(fn):
+                    os.remove(fn)
+
+    def write(self, log: LogEntry, t: float | None = None):
+        """Append a log entry. `t` is the time of log (default: current time)."""
+
+        if self._closed:
+            return
+        if t is None:
+            t = time.time()
+        if self._log_stream is None or t - self._segment_start >= self.rotation_sec:
+            self._open_segment(t)
+
+        b = format_log(log).encode("utf-8")
+        rec = np.array(
+            [
+                (
+                    t,
+                    self._offset,
+                    len(b),
+                    _level_to_int(log.level),
+                    self._node_id(log.host, log.name),
+                )
+            ],
+            dtype=self.INDEX_DTYPE,
+        )
+        self._log_stream.write(b)
+        self._idx_stream.write(rec.tobytes())
+        self._offset += len(b)
+
+    def flush(self):
+        for s in (self._log_stream, self._idx_stream):
+            if s is not None:
+                s.flush()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._close_segment()
+        self._nodes_stream.close()
+
+    @classmethod
+    def query(
+        cls,
+        directory: str,
+        since: float | None = None,
+        until: float | None = None,
+        level: str = "NOTSET",
+        names: list[str] | None = None,
+    ) -> list[tuple[float, LogEntry]]:
+        """Query stored logs in `directory`. Returns list of (time, LogEntry).
+
+        :param since: start of the time range (UNIX time). None means unbounded.
+        :param until: end of the time range (UNIX time). None means unbounded.
+        :param level: minimum log level.
+        :param names: node names (host::name or name) to include. None means all nodes.
+
+        """
+
+        nodes = cls.load_nodes(directory)
+        if names is not None:
+            node_ids = [i for i, n in enumerate(nodes) if n in names or split_name(n)[1] in names]
+        min_level = _level_to_int(level.upper())
+
+        segments = cls.list_segments(directory)
+        results = []
+        for i, (name, start) in enumerate(segments):
+            if until is not None and start > until:
+                break
+            if since is not None and i + 1 < len(segments) and segments[i + 1][1] <= since:
+                continue
+
+            with open(path.join(directory, name + ".idx"), "rb") as f:
+                b = f.read()
+            # the last record may be partial if the segment is being written.
+            n = len(b) // cls.INDEX_DTYPE.itemsize
+            idx = np.frombuffer(b, dtype=cls.INDEX_DTYPE, count=n)
+
+            # time is monotonic in a segment because the records are appended.
+            head = 0 if since is None else np.searchsorted(idx["time"], since, side="left")
+            tail = n if until is None else np.searchsorted(idx["time"], until, side="right")
+            idx = idx[head:tail]
+            mask = idx["level"] >= min_level
+            if names is not None:
+                mask &= np.isin(idx["node"], node_ids)
+            idx = idx[mask]
+            if not len(idx):
+                continue
+
+            with open(path.join(directory, name + ".log"), "rb") as f:
+                for rec in idx:
+                    f.seek(int(rec["offset"]))
+                    log = parse_formatted_log(f.read(int(rec["length"])).decode("utf-8"))
+                    if log is not None:
+                        results.append((float(rec["time"]), log))
+        return results
+
+
 class LogClient(NodeClient):
     """Simple Log Client."""
 
@@ -237,9 +454,20 @@ def log_broker_is_up(gconf: dict, name: NodeName) -> bool:
         ctx.close()
 
 
+def log_store_directory(conf: dict, joined_name: str) -> str:
+    """Get directory of LogStore for LogBroker with local `conf` and `joined_name`."""
+
+    if "store_dir" in conf:
+        return path.expanduser(conf["store_dir"])
+    return path.join(LOG_DIR, joined_name.replace("::", "-"))
+
+
 class LogBroker(Node):
     """Log broker node.
 
+    The logs are written to the file and / or the LogStore in a background thread,
+    so that the polling (brokering) is not blocked by the file I/O.
+
     :param xpub_endpoint: XPUB endpoint address for log subscribers.
     :type xpub_endpoint: str
     :param xsub_endpoint: XSUB endpoint address for log publishers.
@@ -249,6 +477,16 @@ class LogBroker(Node):
     :param file_name: Optional explicit path to the log file.
         If omitted, an auto-generated file name is used.
     :type file_name: str
+    :param store: Enable indexed log store (LogStore) when True.
+        The stored logs can be queried by ``mahos log --history``.
+    :type store: bool
+    :param store_dir: Optional explicit path to the log store directory.
+        If omitted, a directory named after this node under LOG_DIR is used.
+    :type store_dir: str
+    :param store_rotation_sec: (default: 3600.0) Interval to start new segment of log store.
+    :type store_rotation_sec: float
+    :param store_keep: Number of log store segments to keep. If omitted, all segments are kept.
+    :type store_keep: int
 
     """
 
@@ -274,8 +512,24 @@ class LogBroker(Node):
         else:
             self.file_logger = None
 
+        if self.conf.get("store", False):
+            self.log_store = LogStore(
+                log_store_directory(self.conf, self.joined_name()),
+                rotation_sec=self.conf.get("store_rotation_sec", 3600.0),
+                keep=self.conf.get("store_keep"),
+            )
+        else:
+            self.log_store = None
+
         self.log_mahos_runtime_info()
 
+        if self.file_logger is not None or self.log_store is not None:
+            self._write_queue = queue.SimpleQueue()
+            self._writer = threading.Thread(target=self._write_loop)
+            self._writer.start()
+        else:
+            self._writer = None
+
     @staticmethod
     def _build_runtime_info_messages(info):
         warn_msg = None
@@ -312,12 +566,43 @@ class LogBroker(Node):
             self._write_startup_info_line(warn_msg)
         self._write_startup_info_line(info_msg)
 
+    def _write_loop(self):
+        running = True
+        while running:
+            batch = [self._write_queue.get()]
+            try:
+                while True:
+                    batch.append(self._write_queue.get_nowait())
+            except queue.Empty:
+                pass
+
+            for item in batch:
+                if item is None:
+                    running = False
+                    break
+                t, msg = item
+                log = parse_log(msg)
+                if log is None:
+                    continue
+                if self.file_logger is not None:
+                    self.file_logger.write_entry(log)
+                if self.log_store is not None:
+                    self.log_store.write(log, t)
+            if self.log_store is not None:
+                self.log_store.flush()
+
     def close_resources(self):
+        if getattr(self, "_writer", None) is not None:
+            self._write_queue.put(None)
+            self._writer.join()
+            self._writer = None
         if hasattr(self, "file_logger") and self.file_logger is not None:
             self.file_logger.close()
+        if hasattr(self, "log_store") and self.log_store is not None:
+            self.log_store.close()
 
     def xsub_handler(self, msg):
-        """Handle XPUB: write log to file when ``conf["file"]`` is True."""
+        """Handle XPUB: pass log to the writer thread if file or store is enabled."""
 
-        if self.file_logger is not None:
-            self.file_logger.write_log(msg)
+        if self._writer is not None:
+            self._write_queue.put((time.time(), msg))
@@ -86,6 +86,16 @@ def local_conf(gconf: dict, name: NodeName) -> dict:
     return gconf[names[0]][names[1]]
 
 
+def sub_proxy_endpoints(gconf: dict, proxy_name: NodeName) -> dict[str, str]:
+    """get mapping from pub_endpoint of nodes to XPUB endpoint of SubProxy `proxy_name`."""
+
+    pconf = local_conf(gconf, proxy_name)
+    return {
+        local_conf(gconf, name)["pub_endpoint"]: endpoint
+        for name, endpoint in pconf["xpub_endpoints"].items()
+    }
+
+
 GLOBAL_KEY = "global"
 THREAD_KEY = "thread"
 
@@ -223,7 +233,11 @@ def init_logger(gconf, my_name, log_name, context: Context):
         level = logging.INFO
 
     joined_name = join_name(my_name)
-    handler = context.add_pub_handler(log_conf["xsub_endpoint"], root_topic=joined_name)
+    handler = context.add_pub_handler(
+        log_conf["xsub_endpoint"],
+        root_topic=joined_name,
+        queue=get_value(gconf, my_conf, "log_queue", False),
+    )
     logger = logging.getLogger(joined_name)
     logger.setLevel(level)
     logger.addHandler(handler)
@@ -255,12 +269,19 @@ class Node(NodeBase):
     def __init__(self, gconf: dict, name: NodeName, context: Context | None = None):
         NodeBase.__init__(self, gconf, name)
         self.ctx = Context(
-            context=context, poll_timeout_ms=get_value(gconf, self.conf, "poll_timeout_ms")
+            context=context,
+            poll_timeout_ms=get_value(gconf, self.conf, "poll_timeout_ms"),
+            auto_transport=get_value(gconf, self.conf, "auto_transport", True),
         )
         if "target" in self.conf and "log" in self.conf["target"]:
             self.logger = init_logger(gconf, name, self.conf["target"]["log"], self.ctx)
         else:
             self.logger = DummyLogger(join_name(name))
+        if "target" in self.conf and "sub_proxy" in self.conf["target"]:
+            self.ctx.sub_endpoints.update(
+                sub_proxy_endpoints(gconf, self.conf["target"]["sub_proxy"])
+            )
+        self._status_heartbeat_sec = get_value(gconf, self.conf, "status_heartbeat_sec")
         self._clients = []
         self._closed = False
         self._shutdown = False
@@ -319,10 +340,23 @@ class Node(NodeBase):
             handler = self._handle_req
         self.ctx.add_rep(self.conf[endpoint], handler, req_type=req_type)
 
-    def add_pub(self, topic: bytes | str, endpoint: str = "pub_endpoint") -> Publisher:
-        """Add and return a Publisher for `topic` at `endpoint`."""
+    def add_pub(
+        self,
+        topic: bytes | str,
+        endpoint: str = "pub_endpoint",
+        heartbeat_sec: float | None = None,
+    ) -> Publisher:
+        """Add and return a Publisher for `topic` at `endpoint`.
+
+        :param heartbeat_sec: If given, the Publisher publishes only when the message is changed
+            or heartbeat_sec has passed since the last publish.
+            For the status topic, the default is taken from the conf ``status_heartbeat_sec``.
+
+        """
 
-        return self.ctx.add_pub(self.conf[endpoint], topic, self.logger)
+        if heartbeat_sec is None and topic in (b"status", "status"):
+            heartbeat_sec = self._status_heartbeat_sec
+        return self.ctx.add_pub(self.conf[endpoint], topic, self.logger, heartbeat_sec)
 
     def _handle_req(self, msg: Request) -> Reply:
         """The default RepHandler to wrap handle_req()."""
@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+
+"""
+Subscription proxy for fan-out of published messages.
+
+.. This file is a part of MAHOS project, which is released under the 3-Clause BSD license.
+.. See included LICENSE file or https://github.com/ToyotaCRDL/mahos/blob/main/LICENSE for details.
+
+"""
+
+from __future__ import annotations
+
+from mahos.node.node import Node, local_conf
+
+
+class SubProxy(Node):
+    """Subscription proxy node.
+
+    SubProxy subscribes to the PUB sockets of the nodes (upstreams) through XSUB
+    and fans out the messages to the local subscribers through XPUB.
+    Running a SubProxy on each host, an upstream node sends each topic only once per host
+    regardless of the number of the subscribers (GUIs, etc.) on that host,
+    and slow subscribers don't affect the upstream or the other hosts.
+
+    The subscribers use the proxy if the ``sub_proxy`` target (full name of SubProxy)
+    is given in the conf of the node (or GUI node) creating the clients.
+
+    :param xpub_endpoints: Mapping from upstream node name (full name) to XPUB endpoint
+        for local subscribers.
+    :type xpub_endpoints: dict[str, str]
+    :param sndhwm: Send high water mark of XPUB applied to each subscriber.
+        Messages to a slow subscriber exceeding this are dropped for that subscriber only.
+    :type sndhwm: int
+    :param rcvhwm: Receive high water mark of XSUB.
+    :type rcvhwm: int
+
+    """
+
+    def __init__(self, gconf: dict, name, context=None):
+        Node.__init__(self, gconf, name, context=context)
+
+        for upstream, xpub_endpoint in self.conf["xpub_endpoints"].items():
+            self.ctx.add_broker(
+                xpub_endpoint,
+                local_conf(gconf, upstream)["pub_endpoint"],
+                xsub_connect=True,
+                sndhwm=self.conf.get("sndhwm"),
+                rcvhwm=self.conf.get("rcvhwm"),
+            )
@@ -9,7 +9,9 @@ Fitting module.
 """
 
 import numpy as np
-from scipy import optimize
+from mahos.util.lazy import lazy_import
+
+optimize = lazy_import("scipy.optimize")
 
 
 def gaussian2d(height, center_x, center_y, width_x, width_y, background=0.0):
@@ -9,6 +9,8 @@ Graph algorithm utilities.
 """
 
 from __future__ import annotations
+import typing as T
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 
 import networkx as nx
 
@@ -33,3 +35,39 @@ def sort_dependency(dep_dict: dict) -> list:
             #  new node may be automatically created here if u is not in dep_dict.keys().
             G.add_edge(u, v)
     return list(nx.topological_sort(G))
+
+
+def run_dependency(dep_dict: dict, func: T.Callable, max_workers: int = 1) -> dict:
+    """call func(node) for each node in dep_dict after func() for its dependencies returns.
+
+    Dependencies not included in dep_dict.keys() are considered already resolved.
+
+    :param dep_dict: a dict to represent nodes and their dependencies (see sort_dependency()).
+    :param func: the function to call with a node.
+    :param max_workers: if larger than 1, func() is called concurrently in a thread pool
+        as soon as all the dependencies of the node are resolved.
+        Otherwise, func() is called sequentially in this thread in the topological order.
+
+    :returns: dict[Hashable, Any] mapping from node to the return value of func(node).
+
+    """
+
+    nodes = [n for n in sort_dependency(dep_dict) if n in dep_dict]
+    if max_workers <= 1:
+        return {n: func(n) for n in nodes}
+
+    waiting = {n: {d for d in dep_dict[n] if d in dep_dict} for n in nodes}
+    results = {}
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while waiting or running:
+            for n in [n for n, deps in waiting.items() if not deps]:
+                del waiting[n]
+                running[executor.submit(func, n)] = n
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                n = running.pop(future)
+                results[n] = future.result()
+                for deps in waiting.values():
+                    deps.discard(n)
+    return {n: results[n] for n in nodes}
@@ -11,9 +11,12 @@ Plot / Convertion functions for 2D image data.
 import os
 
 import numpy as np
-import pandas as pd
-import matplotlib.pyplot as plt
+from numpy.typing import NDArray
 from mahos.util import cui
+from mahos.util.lazy import lazy_import
+
+pd = lazy_import("pandas")
+plt = lazy_import("matplotlib.pyplot")
 
 
 def to_map(df, xl, yl, cl):
@@ -310,16 +313,72 @@ def save_image(
     plt.close()
 
 
-def apply_binning(data, binning=1):
-    if data.shape[0] % binning != 0 or data.shape[1] % binning != 0:
-        print("the data shape cannot be devided by binning")
-        return
+def _binned_shape(length: int, binning: int, remainder: str) -> int:
+    if remainder == "crop":
+        return length // binning
+    elif remainder == "pad":
+        return -(-length // binning)
+    elif length % binning:
+        raise ValueError(f"data shape cannot be divided by binning ({binning})")
+    return length // binning
+
+
+def apply_binning(
+    data: NDArray, binning: int = 1, remainder: str = "error", dtype=np.float64
+) -> NDArray:
+    """Apply binning (mean of binning x binning pixels) to image(s).
+
+    The last two axes of data are considered as (height, width).
+    Thus, a stack of images (e.g. shape (frames, height, width)) can be binned at once.
+
+    :param data: the image data. ndim must be larger than or equal to 2.
+    :param binning: the binning factor.
+    :param remainder: how to treat the shape indivisible by binning.
+        "error": raise ValueError.
+        "crop": discard remainder pixels at the bottom / right edges.
+        "pad": take mean of existing pixels in the edge bins.
+    :param dtype: dtype used for accumulation and returned array (e.g. np.float32).
+    :returns: the binned image(s) with shape (..., height // binning, width // binning).
+        When remainder is "pad", the shape is rounded up instead.
+
+    """
+
+    data = np.asarray(data)
+    if data.ndim < 2:
+        raise ValueError(f"data must have at least 2 dimensions. Got {data.ndim}")
+    if binning < 1:
+        raise ValueError(f"binning must be positive int. Got {binning}")
 
-    new_data = np.zeros((data.shape[0] // binning, data.shape[1] // binning))
-    for i in range(new_data.shape[0]):
-        for j in range(new_data.shape[1]):
-            new_data[i, j] = np.mean(
-                data[i * binning : (i + 1) * binning, j * binning : (j + 1) * binning]
-            )
+    *lead, h, w = data.shape
+    H = _binned_shape(h, binning, remainder)
+    W = _binned_shape(w, binning, remainder)
+    if binning == 1:
+        return data.astype(dtype, copy=False)
+
+    if H * binning == h and W * binning == w:
+        blocks = data
+    elif remainder == "crop":
+        blocks = data[..., : H * binning, : W * binning]
+    else:  # pad
+        blocks = np.full((*lead, H * binning, W * binning), np.nan, dtype=dtype)
+        blocks[..., :h, :w] = data
+        blocks = blocks.reshape((*lead, H, binning, W, binning))
+        return np.nanmean(blocks, axis=(-3, -1), dtype=dtype)
+
+    blocks = blocks.reshape((*lead, H, binning, W, binning))
+    return blocks.mean(axis=(-3, -1), dtype=dtype)
+
+
+def downsample(data: NDArray, max_size: int, remainder: str = "crop", dtype=np.float64) -> NDArray:
+    """Downsample image(s) by binning so that the height and width is at most max_size.
+
+    This is useful to make quick preview of large images.
+    See apply_binning() for the arguments.
+
+    """
 
-    return new_data
+    if max_size < 1:
+        raise ValueError(f"max_size must be positive int. Got {max_size}")
+    size = max(np.shape(data)[-2:])
+    binning = max(-(-size // max_size), 1)
+    return apply_binning(data, binning, remainder=remainder, dtype=dtype)
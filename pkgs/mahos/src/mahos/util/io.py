@@ -12,9 +12,10 @@ from __future__ import annotations
 import pickle
 import bz2
 
-import h5py
-
 from mahos.msgs.data_msgs import Data
+from mahos.util.lazy import lazy_import
+
+h5py = lazy_import("h5py")
 
 
 def save_pickle(
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+"""
+Lazy import of heavy modules.
+
+.. This file is a part of MAHOS project, which is released under the 3-Clause BSD license.
+.. See included LICENSE file or https://github.com/ToyotaCRDL/mahos/blob/main/LICENSE for details.
+
+"""
+
+from __future__ import annotations
+import sys
+import types
+import importlib
+
+
+class LazyModule(types.ModuleType):
+    """Proxy of a module which is imported at the first attribute access.
+
+    The attributes of loaded module are copied to the proxy
+    so that the later accesses cost as much as the usual module attribute access.
+
+    """
+
+    def __init__(self, name: str):
+        types.ModuleType.__init__(self, name)
+        self.__dict__["_lazy_module"] = None
+
+    def _load(self) -> types.ModuleType:
+        module = self.__dict__["_lazy_module"]
+        if module is None:
+            module = importlib.import_module(self.__name__)
+            self.__dict__["_lazy_module"] = module
+            self.__dict__.update(
+                {k: v for k, v in module.__dict__.items() if not k.startswith("__")}
+            )
+        return module
+
+    def __getattr__(self, attr: str):
+        # called only for the attributes missing in __dict__.
+        return getattr(self._load(), attr)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        if self.__dict__["_lazy_module"] is None:
+            return f"<lazy module '{self.__name__}' (not loaded)>"
+        return repr(self.__dict__["_lazy_module"])
+
+
+def lazy_import(name: str) -> types.ModuleType:
+    """Import module `name` lazily.
+
+    The module is imported at the first attribute access of returned object.
+    If the module has already been imported, it is returned as is.
+    Use this for heavy dependencies (fitting, plotting, or file formats)
+    which are required only by some functions of the module,
+    so that the processes not using them (e.g. nodes and lightweight CLI commands)
+    don't pay the import time.
+
+    """
+
+    if name in sys.modules:
+        return sys.modules[name]
+    return LazyModule(name)
+
+
+def is_loaded(name: str) -> bool:
+    """Check if module `name` has actually been imported."""
+
+    return name in sys.modules
@@ -10,8 +10,9 @@ Plot utility module.
 
 from __future__ import annotations
 
-import matplotlib as mpl
-from matplotlib.colors import to_hex
+from mahos.util.lazy import lazy_import
+
+mpl = lazy_import("matplotlib")
 
 
 def colors_tab10() -> list[str]:
@@ -22,7 +23,7 @@ def colors_tab10() -> list[str]:
     """
 
     colors = mpl.colormaps.get("tab10").colors
-    return [to_hex(c) for c in colors]
+    return [mpl.colors.to_hex(c) for c in colors]
 
 
 def colors_tab20_pair() -> list[tuple[str, str]]:
@@ -33,4 +34,7 @@ def colors_tab20_pair() -> list[tuple[str, str]]:
     """
 
     colors = mpl.colormaps.get("tab20").colors
-    return [(to_hex(c0), to_hex(c1)) for c0, c1 in zip(colors[0::2], colors[1::2])]
+    return [
+        (mpl.colors.to_hex(c0), mpl.colors.to_hex(c1))
+        for c0, c1 in zip(colors[0::2], colors[1::2])
+    ]
@@ -0,0 +1,359 @@
+#!/usr/bin/env python3
+
+"""
+Shared-memory ring buffer to pass arrays between processes on the same host.
+
+.. This file is a part of MAHOS project, which is released under the 3-Clause BSD license.
+.. See included LICENSE file or https://github.com/ToyotaCRDL/mahos/blob/main/LICENSE for details.
+
+"""
+
+from __future__ import annotations
+import typing as T
+import copy
+import ctypes
+import os
+import sys
+import time
+import uuid
+import weakref
+from multiprocessing import shared_memory, resource_tracker
+
+import numpy as np
+
+from mahos.msgs.common_msgs import Message
+
+#: alignment of slots in bytes.
+ALIGN = 64
+
+_LOCAL_HOSTS = ("localhost", "127.0.0.1", "[::1]", "::1")
+
+
+def _align(n: int) -> int:
+    return -(-n // ALIGN) * ALIGN
+
+
+def is_local_endpoint(endpoint: str) -> bool:
+    """Check if a ZMQ endpoint is on this host (loopback, ipc, or inproc)."""
+
+    if endpoint.startswith(("ipc://", "inproc://")):
+        return True
+    if not endpoint.startswith("tcp://"):
+        return False
+    host = endpoint[len("tcp://") :].rsplit(":", 1)[0]
+    return host in _LOCAL_HOSTS
+
+
+def _pid_alive(pid: int) -> bool:
+    """Check if the process `pid` is alive."""
+
+    if os.name == "nt":
+        kernel32 = ctypes.windll.kernel32
+        # PROCESS_QUERY_LIMITED_INFORMATION
+        handle = kernel32.OpenProcess(0x1000, False, pid)
+        if not handle:
+            # ERROR_ACCESS_DENIED: the process exists.
+            return kernel32.GetLastError() == 5
+        code = ctypes.c_ulong()
+        ok = kernel32.GetExitCodeProcess(handle, ctypes.byref(code))
+        kernel32.CloseHandle(handle)
+        # STILL_ACTIVE
+        return not ok or code.value == 259
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SharedSlot(T.NamedTuple):
+    """Descriptor of an array stored in a slot of SharedRingBuffer."""
+
+    name: str
+    slots: int
+    index: int
+    seq: int
+    offset: int
+    dtype: str
+    shape: tuple[int, ...]
+
+
+class SharedRingBuffer(object):
+    """Ring of fixed-size slots in shared memory (the writer side).
+
+    The writer copies arrays into free slots and passes :class:`SharedSlot` descriptors
+    to the readers (:class:`SharedRingReader`), which get zero-copy views of the slots.
+    A slot is released when the reader's view (and all the views derived from it)
+    is garbage-collected.
+
+    The writer never blocks nor overwrites the slots in use.
+    Like :class:`RollingQueue <mahos.util.queue.RollingQueue>`, :meth:`append` reports
+    overflow by the return value: None is returned if all the slots are in use
+    (or the array is too large for a slot), and the caller should pass the array
+    by the regular (copying) way instead. The number of such overflows is counted.
+
+    The reader records its pid as the holder of the slot when it gets the view.
+    If no slot is free, the writer reclaims the slots whose holder process has exited,
+    and the slots which have not been claimed by any reader within `lease_sec`
+    (e.g., the reply was lost by timeout of the request).
+
+    :param slots: number of slots.
+    :param slot_bytes: size of each slot in bytes.
+    :param name: name of shared memory block. If None, a unique name is generated.
+    :param lease_sec: time limit for a reader to claim the slot.
+
+    """
+
+    def __init__(
+        self, slots: int, slot_bytes: int, name: str | None = None, lease_sec: float = 30.0
+    ):
+        if slots <= 0 or slot_bytes <= 0:
+            raise ValueError("slots and slot_bytes must be positive")
+        self._slots = slots
+        self.slot_bytes = _align(slot_bytes)
+        self.lease_sec = lease_sec
+        self._header_bytes = _align(slots * 16)
+        if name is None:
+            name = f"mahos-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        size = self._header_bytes + slots * self.slot_bytes
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            # remove stale block left by crashed process.
+            shared_memory.SharedMemory(name=name).unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.name = self.shm.name
+        # owner[i] is the sequence number of data in slot i, or 0 if the slot is free.
+        # holder[i] is the pid of reader holding slot i, or 0 if not claimed yet.
+        header = np.ndarray((2, slots), dtype=np.int64, buffer=self.shm.buf)
+        header[:] = 0
+        self._owner, self._holder = header
+        self._written = np.zeros(slots, dtype=np.float64)
+        self._seq = 0
+        self._cursor = 0
+        self._overflows = 0
+        self._reclaims = 0
+
+    def __len__(self):
+        """Number of slots in use."""
+
+        return int(np.count_nonzero(self._owner))
+
+    def size(self) -> int:
+        return self._slots
+
+    def is_full(self) -> bool:
+        return len(self) >= self._slots
+
+    def overflows(self) -> int:
+        """Number of arrays which couldn't be stored."""
+
+        return self._overflows
+
+    def reclaims(self) -> int:
+        """Number of slots reclaimed from dead or lost readers."""
+
+        return self._reclaims
+
+    def reclaim(self) -> int:
+        """Free the slots held by exited processes or unclaimed within lease_sec.
+
+        :returns: number of reclaimed slots.
+
+        """
+
+        now = time.monotonic()
+        num = 0
+        for index in np.flatnonzero(self._owner):
+            pid = int(self._holder[index])
+            if (pid and not _pid_alive(pid)) or (
+                not pid and now - self._written[index] > self.lease_sec
+            ):
+                self._owner[index] = 0
+                num += 1
+        self._reclaims += num
+        return num
+
+    def _find_free(self) -> int | None:
+        for i in range(self._slots):
+            index = (self._cursor + i) % self._slots
+            if not self._owner[index]:
+                return index
+        return None
+
+    def fits(self, arr: np.ndarray) -> bool:
+        """Check if `arr` can be stored in a slot."""
+
+        return arr.nbytes <= self.slot_bytes and not arr.dtype.hasobject
+
+    def append(self, arr: np.ndarray) -> SharedSlot | None:
+        """Copy `arr` into a free slot. Returns None on overflow."""
+
+        if not self.fits(arr):
+            self._overflows += 1
+            return None
+        index = self._find_free()
+        if index is None and self.reclaim():
+            index = self._find_free()
+        if index is None:
+            self._overflows += 1
+            return None
+
+        self._seq += 1
+        offset = self._header_bytes + index * self.slot_bytes
+        dst = np.ndarray(arr.shape, dtype=arr.dtype, buffer=self.shm.buf, offset=offset)
+        dst[...] = arr
+        del dst
+        self._holder[index] = 0
+        self._written[index] = time.monotonic()
+        self._owner[index] = self._seq
+        self._cursor = (index + 1) % self._slots
+        return SharedSlot(
+            self.name, self._slots, index, self._seq, offset, arr.dtype.str, arr.shape
+        )
+
+    def close(self):
+        """Close and remove the shared memory block."""
+
+        if self.shm is None:
+            return
+        del self._owner, self._holder
+        self.shm.close()
+        self.shm.unlink()
+        self.shm = None
+
+
+#: attached blocks which couldn't be closed because of the views alive.
+_busy_shms: list[shared_memory.SharedMemory] = []
+
+
+def _release(owner: np.ndarray, index: int, seq: int):
+    if owner[index] == seq:
+        owner[index] = 0
+
+
+class SharedRingReader(object):
+    """Reader of SharedRingBuffers in other processes.
+
+    Shared memory blocks are attached lazily by the name in :class:`SharedSlot`.
+
+    """
+
+    def __init__(self):
+        self._shms: dict[str, shared_memory.SharedMemory] = {}
+        self._headers: dict[str, np.ndarray] = {}
+
+    def attach(self, name: str) -> bool:
+        """Attach to the shared memory block `name`. Returns False if it is not found."""
+
+        if name in self._shms:
+            return True
+        # the block is owned (and unlinked) by the writer.
+        # prevent resource_tracker of this process from unlinking it at exit.
+        try:
+            if sys.version_info >= (3, 13):
+                shm = shared_memory.SharedMemory(name=name, track=False)
+            else:
+                shm = shared_memory.SharedMemory(name=name)
+                if os.name == "posix":
+                    # the block is registered to resource_tracker only on POSIX.
+                    resource_tracker.unregister(shm._name, "shared_memory")
+        except FileNotFoundError:
+            return False
+        self._shms[name] = shm
+        return True
+
+    def _header(self, slot: SharedSlot) -> np.ndarray:
+        if slot.name not in self._headers:
+            if not self.attach(slot.name):
+                raise FileNotFoundError(f"Shared memory {slot.name} is not found")
+            buf = self._shms[slot.name].buf
+            self._headers[slot.name] = np.ndarray((2, slot.slots), dtype=np.int64, buffer=buf)
+        return self._headers[slot.name]
+
+    def view(self, slot: SharedSlot) -> np.ndarray:
+        """Get a zero-copy view of `slot`.
+
+        The slot is released when the view and all the views derived from it are deleted.
+        The writer doesn't touch the slot until then, so the view can be modified in place.
+
+        """
+
+        owner, holder = self._header(slot)
+        if owner[slot.index] != slot.seq:
+            raise ValueError(f"Slot {slot.index} of {slot.name} is no longer valid")
+        holder[slot.index] = os.getpid()
+        # the slot may have been reclaimed in between.
+        if owner[slot.index] != slot.seq:
+            raise ValueError(f"Slot {slot.index} of {slot.name} is no longer valid")
+        dtype = np.dtype(slot.dtype)
+        nbytes = int(np.prod(slot.shape, dtype=np.int64)) * dtype.itemsize
+        buf = (ctypes.c_char * nbytes).from_buffer(self._shms[slot.name].buf, slot.offset)
+        weakref.finalize(buf, _release, owner, slot.index, slot.seq)
+        return np.frombuffer(buf, dtype=dtype).reshape(slot.shape)
+
+    def close(self):
+        """Detach from the shared memory blocks.
+
+        A block is kept attached while the views are alive.
+
+        """
+
+        self._headers.clear()
+        for name in list(self._shms):
+            shm = self._shms.pop(name)
+            try:
+                shm.close()
+            except BufferError:
+                # the views are still alive. keep the block attached until exit
+                # (closing it again in SharedMemory.__del__ would fail).
+                _busy_shms.append(shm)
+
+
+def pack_shared(value, ring: SharedRingBuffer):
+    """Replace arrays in `value` by SharedSlots.
+
+    `value` can be an array, list or tuple of arrays, or a Message having array attributes.
+    Arrays which couldn't be stored in `ring` are kept as they are.
+
+    """
+
+    def pack(v):
+        if isinstance(v, np.ndarray):
+            slot = ring.append(v)
+            return v if slot is None else slot
+        return v
+
+    if isinstance(value, np.ndarray):
+        return pack(value)
+    if isinstance(value, (list, tuple)) and not hasattr(value, "_fields"):
+        return type(value)(pack(v) for v in value)
+    if isinstance(value, Message) and hasattr(value, "__dict__"):
+        if not any(isinstance(v, np.ndarray) for v in value.__dict__.values()):
+            return value
+        value = copy.copy(value)
+        for k, v in list(value.__dict__.items()):
+            setattr(value, k, pack(v))
+        return value
+    return value
+
+
+def unpack_shared(value, reader: SharedRingReader):
+    """Replace SharedSlots in `value` by views. Inverse of :func:`pack_shared`."""
+
+    def unpack(v):
+        if isinstance(v, SharedSlot):
+            return reader.view(v)
+        return v
+
+    if isinstance(value, SharedSlot):
+        return unpack(value)
+    if isinstance(value, (list, tuple)) and not hasattr(value, "_fields"):
+        return type(value)(unpack(v) for v in value)
+    if isinstance(value, Message) and hasattr(value, "__dict__"):
+        for k, v in list(value.__dict__.items()):
+            if isinstance(v, SharedSlot):
+                setattr(value, k, unpack(v))
+    return value
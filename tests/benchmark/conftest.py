@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+
+"""
+Fixtures for the benchmark suite.
+
+Benchmarks are skipped unless pytest is invoked with ``--mahos-bench``.
+Results are written as JSON if ``--mahos-bench-json=PATH`` is given.
+
+.. This file is a part of MAHOS project, which is released under the 3-Clause BSD license.
+.. See included LICENSE file or https://github.com/ToyotaCRDL/mahos/blob/main/LICENSE for details.
+
+"""
+
+from __future__ import annotations
+import typing as T
+from dataclasses import asdict
+import json
+import platform
+import statistics
+import time
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from mahos.version import get_mahos_runtime_info
+
+
+class Benchmark(object):
+    """Timer for a benchmarked callable.
+
+    :param name: name of the benchmark (test node name).
+    :param results: list to which the result dict is appended.
+    :param rounds: number of timed rounds.
+
+    """
+
+    def __init__(self, name: str, results: list[dict], rounds: int):
+        self.name = name
+        self.results = results
+        self.rounds = rounds
+        self.extra_info = {}
+
+    def __call__(
+        self,
+        func: T.Callable,
+        *args,
+        setup: T.Callable[[], tuple] | None = None,
+        rounds: int | None = None,
+        **kwargs,
+    ):
+        """Run `func` for `rounds` times and record the statistics.
+
+        If `setup` is given, it is called before each round (not timed)
+        and the returned tuple is passed to `func` as positional args.
+        The peak traced memory is measured in an additional (untimed) round.
+
+        :returns: return value of `func` at the last round.
+
+        """
+
+        rounds = rounds or self.rounds
+
+        def run():
+            a = setup() if setup is not None else args
+            t0 = time.perf_counter()
+            ret = func(*a, **kwargs)
+            return time.perf_counter() - t0, ret
+
+        # warm up
+        run()
+        times = []
+        for _ in range(rounds):
+            t, ret = run()
+            times.append(t)
+
+        a = setup() if setup is not None else args
+        tracemalloc.start()
+        try:
+            func(*a, **kwargs)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        self.results.append(
+            {
+                "name": self.name,
+                "rounds": rounds,
+                "min": min(times),
+                "max": max(times),
+                "mean": statistics.mean(times),
+                "median": statistics.median(times),
+                "stddev": statistics.stdev(times) if len(times) > 1 else 0.0,
+                "peak_memory": peak,
+                "extra_info": self.extra_info,
+            }
+        )
+        return ret
+
+
+def machine_info() -> dict:
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+    }
+
+
+@pytest.fixture(scope="session")
+def bench_results(request):
+    results = []
+    yield results
+
+    fn = request.config.getoption("--mahos-bench-json")
+    if not fn or not results:
+        return
+    report = {
+        "datetime": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "machine_info": machine_info(),
+        "mahos": asdict(get_mahos_runtime_info()),
+        "benchmarks": results,
+    }
+    with open(fn, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, default=str)
+
+
+@pytest.fixture
+def bench(request, bench_results):
+    return Benchmark(
+        request.node.name, bench_results, request.config.getoption("--mahos-bench-rounds")
+    )
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks for mahos_dq hot paths.
+
+.. This file is a part of MAHOS project, which is released under the 3-Clause BSD license.
+.. See included LICENSE file or https://github.com/ToyotaCRDL/mahos/blob/main/LICENSE for details.
+
+"""
+
+import copy
+import pickle
+
+import numpy as np
+import pytest
+
+from util import h5_roundtrip
+from mahos.msgs.inst.pg_msgs import Block, Blocks
+from mahos.inst.tdc_core.event_sim import PhotonEventSimulator
+from mahos_dq.msgs.podmr_msgs import PODMRData, TDCStatus, is_sweepN
+from mahos_dq.msgs.odmr_msgs import ODMRData
+from mahos_dq.msgs.confocal_msgs import Image, ScanDirection, ScanMode, LineMode
+from mahos_dq.msgs.qdyne_msgs import QdyneData
+from mahos_dq.meas.podmr_worker import PODMRDataOperator
+from mahos_dq.meas.podmr_generator.generator import make_generators
+from mahos_dq.meas.qdyne_worker import QdyneAnalyzer
+from mahos_dq.meas import iodmr_fitter
+from mahos_dq.meas import odmr_fitter
+from mahos_dq.util.nv import peaks_of_B_array
+
+pytestmark = pytest.mark.mahos_bench
+
+LASER_PERIOD = 2000  # laser period in time bins for synthetic PODMR histogram
+
+pulse_params = {
+    "base_width": 320e-9,
+    "laser_delay": 45e-9,
+    "laser_width": 5e-6,
+    "mw_delay": 1e-6,
+    "trigger_width": 20e-9,
+    "init_delay": 0.0,
+    "final_delay": 5e-6,
+    "partial": -1,
+    "nomw": False,
+    "divide_block": False,
+    "pulse": {
+        "90pulse": 10e-9,
+        "180pulse": 20e-9,
+        "tauconst": 150e-9,
+        "tau2const": 160e-9,
+        "Nconst": 2,
+        "N2const": 2,
+        "N3const": 2,
+        "ddphase": "Y:X:Y:X,Y:X:Y:iX",
+        "supersample": 1,
+        "iq_delay": 16e-9,
+        "readY": False,
+        "invertY": False,
+        "reinitX": False,
+        "flip_head": True,
+    },
+}
+
+
+def pickle_roundtrip(data):
+    return pickle.loads(pickle.dumps(data))
+
+
+def make_podmr_data(num: int, enable_roi: bool) -> PODMRData:
+    tbin = 1.0e-9
+    margin = 100.0e-9 if enable_roi else -1.0
+    params = {
+        "num_pattern": 2,
+        "partial": -1,
+        "start": 1.0e-9,
+        "num": num,
+        "step": 1.0e-9,
+        "log": False,
+        "invert_sweep": False,
+        "pulse": {},
+        "plot": {
+            "plotmode": "data01",
+            "taumode": "raw",
+            "refmode": "ignore",
+            "refaverage": False,
+            "flipY": False,
+            "sigdelay": 200.0e-9,
+            "sigwidth": 300.0e-9,
+            "refdelay": 400.0e-9,
+            "refwidth": 300.0e-9,
+        },
+        "instrument": {"tbin": tbin, "trange": 2 * num * LASER_PERIOD * tbin},
+        "laser_width": 1.0e-6,
+        "roi_head": margin,
+        "roi_tail": margin,
+    }
+    data = PODMRData(params, "rabi")
+    data.laser_timing = (np.arange(2 * num) * LASER_PERIOD + 100) * tbin
+
+    rng = np.random.default_rng(0)
+    hist = rng.poisson(10.0, size=2 * num * LASER_PERIOD).astype(np.float64)
+    if enable_roi:
+        data.raw_data = np.array([hist[start:stop] for start, stop in data.get_rois()])
+    else:
+        data.raw_data = hist
+    data.tdc_status = TDCStatus(1, 100, int(hist.sum()), 0)
+    return data
+
+
+@pytest.mark.parametrize("enable_roi", (False, True), ids=("noroi", "roi"))
+@pytest.mark.parametrize("num", (10, 100, 1000))
+def test_podmr_analyze(bench, num, enable_roi):
+    op = PODMRDataOperator()
+    data = make_podmr_data(num, enable_roi)
+    op.get_marker_indices(data)
+    bench(op.analyze, data)
+    assert data.data(0) is not None and len(data.data(0)) == num
+
+
+@pytest.mark.parametrize("roundtrip", (h5_roundtrip, pickle_roundtrip), ids=("h5", "pickle"))
+@pytest.mark.parametrize("num", (10, 100, 1000))
+def test_podmr_data_io(bench, num, roundtrip):
+    op = PODMRDataOperator()
+    data = make_podmr_data(num, False)
+    op.get_marker_indices(data)
+    op.analyze(data)
+    loaded = bench(roundtrip, data)
+    assert np.array_equal(loaded.raw_data, data.raw_data)
+
+
+@pytest.mark.parametrize("roundtrip", (h5_roundtrip, pickle_roundtrip), ids=("h5", "pickle"))
+@pytest.mark.parametrize("sweeps", (10, 100, 1000))
+def test_odmr_data_io(bench, sweeps, roundtrip):
+    num = 1001
+    data = ODMRData({"start": 2.77e9, "stop": 2.97e9, "num": num}, "cw")
+    data.data = np.random.default_rng(0).normal(size=(num, sweeps))
+    loaded = bench(roundtrip, data)
+    assert np.array_equal(loaded.data, data.data)
+
+
+@pytest.mark.parametrize("roundtrip", (h5_roundtrip, pickle_roundtrip), ids=("h5", "pickle"))
+@pytest.mark.parametrize("size", (64, 256, 1024))
+def test_confocal_image_io(bench, size, roundtrip):
+    params = {
+        "direction": ScanDirection.XY,
+        "mode": ScanMode.ANALOG,
+        "line_mode": LineMode.ASCEND,
+        "xnum": size,
+        "ynum": size,
+    }
+    data = Image(params)
+    data.image = np.random.default_rng(0).normal(size=(size, size))
+    loaded = bench(roundtrip, data)
+    assert np.array_equal(loaded.image, data.image)
+
+
+@pytest.fixture(scope="module")
+def generators():
+    return make_generators(print_fn=lambda *args: None)
+
+
+@pytest.mark.parametrize("num", (10, 50))
+@pytest.mark.parametrize("method", list(make_generators(print_fn=lambda *args: None)))
+def test_podmr_generate(bench, generators, method, num):
+    if is_sweepN(method):
+        xdata = np.arange(1, num + 1)
+    else:
+        xdata = np.linspace(100e-9, 1e-6, num)
+    params = copy.deepcopy(pulse_params)
+    blocks, freq, laser_timing = bench(generators[method].generate, xdata, params)
+    assert len(laser_timing)
+
+
+@pytest.mark.parametrize("run_length", (1e-4, 1e-3))
+def test_qdyne_analyze(bench, run_length):
+    freq = 1.0e9
+    laser_width = 500
+    blocks = Blocks([Block("qdyne", [(("laser", "sync"), laser_width), ("mw", 50), (None, 950)])])
+    sim = PhotonEventSimulator(blocks, freq, count_rate=1e7, ac_freq=1.1e5, seed=0)
+    data = QdyneData({"instrument": {"tbin": sim.tbin, "pg_length": 1500, "pg_freq": freq}})
+    # signal window: the first 300 ns of laser pulse, in TDC bins
+    data.marker_indices = np.array([[0], [1500], [0], [0]], dtype=np.int64)
+    data.raw_data = sim.events(run_length)
+    bench.extra_info["events"] = len(data.raw_data)
+
+    analyzer = QdyneAnalyzer()
+    bench(analyzer.analyze, data, rounds=2)
+    assert len(data.data) == sim.num_periods(run_length)
+
+
+@pytest.mark.parametrize("size", (4, 8))
+def test_iodmr_fit_single(bench, size):
+    num = 51
+    xdata = np.linspace(2.80e3, 2.94e3, num)
+    x0 = np.linspace(2.85e3, 2.89e3, size * size).reshape((1, size, size))
+    line = 1.0 - 0.1 * np.exp(-((xdata[:, None, None] - x0) ** 2) / (2 * 5.0**2))
+    image = line + np.random.default_rng(0).normal(scale=0.005, size=line.shape)
+    results = bench(
+        iodmr_fitter.fit_single, xdata, image, n_workers=1, print_fn=lambda *args: None, rounds=2
+    )
+    assert len(results) == size * size
+
+
+def test_peaks_of_B_array(bench):
+    rng = np.random.default_rng(0)
+    B = rng.uniform(0.0, 20.0, 100_000)
+    theta = rng.uniform(0.0, np.pi, 100_000)
+    phi = rng.uniform(0.0, 2 * np.pi, 100_000)
+    peaks = bench(peaks_of_B_array, B, theta, phi)
+    assert peaks.shape == (100_000, 8)
+
+
+@pytest.mark.parametrize("many", (False, True))
+def test_odmr_fit_nvb(bench, many):
+    xdata = np.linspace(2.70e3, 3.04e3, 341)
+    ydata = 1.0 + odmr_fitter.B_lorentzians(xdata, 3.0, 0.6, 0.3, -0.05, 3.0)
+    ydata += np.random.default_rng(0).normal(scale=0.003, size=len(xdata))
+    res = bench(
+        odmr_fitter.fit_NVB,
+        xdata,
+        ydata,
+        peak_type=odmr_fitter.PeakType.Lorentzian,
+        many=many,
+        silent=True,
+        rounds=3,
+    )
+    assert res.success
+
+
+@pytest.mark.parametrize("size", (4, 8))
+def test_iodmr_fit_nvba(bench, size):
+    xdata = np.linspace(2.70e3, 3.04e3, 101)
+    B = np.linspace(2.0, 4.0, size * size).reshape((size, size))
+    image = np.empty((len(xdata), size, size))
+    for i, b in np.ndenumerate(B):
+        image[:, i[0], i[1]] = 1.0 + odmr_fitter.B_lorentzians_aligned(
+            xdata, b, -0.05, -0.05, 3.0, 3.0
+        )
+    image += np.random.default_rng(0).normal(scale=0.003, size=image.shape)
+    results = bench(
+        iodmr_fitter.fit_NVB_aligned,
+        xdata,
+        image,
+        peak_type=odmr_fitter.PeakType.Lorentzian,
+        n_workers=1,
+        print_fn=lambda *args: None,
+        rounds=2,
+    )
+    assert len(results) == size * size
@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+"""
+Benchmarks for mahos core hot paths.
+
+.. This file is a part of MAHOS project, which is released under the 3-Clause BSD license.
+.. See included LICENSE file or https://github.com/ToyotaCRDL/mahos/blob/main/LICENSE for details.
+
+"""
+
+import os
+import pickle
+
+import numpy as np
+import pytest
+
+from util import h5_roundtrip
+from mahos.inst.mock import DTG5274_mock, PulseStreamer_mock
+from mahos.inst.pg_core.compress import compress_blocks, estimate_instructions
+from mahos.msgs.inst.pg_msgs import Block, Blocks
+from mahos.msgs.inst.tdc_msgs import RawEvents
+from mahos.msgs.recorder_msgs import RecorderData
+from mahos.inst.tdc_core.event_sim import PhotonEventSimulator
+from mahos.inst.tdc_core.correlator import correlate
+
+pytestmark = pytest.mark.mahos_bench
+
+
+def make_blocks(num_blocks: int) -> Blocks[Block]:
+    blocks = []
+    for i in range(num_blocks):
+        blocks.append(
+            Block(
+                f"B{i}",
+                [(("laser", "sync"), 1000), (None, 100 + i), (("mw",), 50 + i), (None, 100)],
+                Nrep=4,
+            )
+        )
+    return Blocks(blocks)
+
+
+@pytest.mark.parametrize("num_blocks", (10, 100, 1000))
+def test_blocks_decode_digital(bench, num_blocks):
+    blocks = make_blocks(num_blocks)
+    bench.extra_info["length"] = blocks.total_length()
+    ptn = bench(blocks.decode_digital, "mw")
+    assert len(ptn) == blocks.total_length()
+
+
+@pytest.mark.parametrize("num_blocks", (10, 100, 1000))
+def test_dtg_upload(bench, num_blocks):
+    tests_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    pg = DTG5274_mock("pg", {"local_dir": tests_dir, "channels": {"laser": 6, "sync": 5, "mw": 4}})
+    blocks = make_blocks(num_blocks)
+    bench.extra_info["length"] = blocks.total_length()
+
+    def setup():
+        # configure_blocks() adjusts the blocks in place.
+        return (Blocks([b.copy() for b in blocks]), 1e9)
+
+    assert bench(pg.configure_blocks, setup=setup)
+
+
+def make_dd_blocks(num_points: int, Nrep: int) -> Blocks[Block]:
+    """Blocks like CPMG / XY8 sweeping tau with `Nrep` repetitions of pi pulses."""
+
+    blocks = []
+    for i in range(num_points):
+        tau = 100 + 8 * i
+        blocks.append(Block(f"init{i}", [(("laser", "sync"), 3000), (None, 1000), ("mw", 16)]))
+        blocks.append(Block(f"dd{i}", [(None, tau), ("mw", 32), (None, tau)], Nrep=Nrep))
+        blocks.append(Block(f"read{i}", [("mw", 16), (None, 100), (("laser", "gate"), 3000)]))
+    return Blocks(blocks)
+
+
+@pytest.mark.parametrize("num_points,Nrep", ((100, 8), (100, 256), (20, 4096)))
+def test_pulse_streamer_configure(bench, num_points, Nrep):
+    pg = PulseStreamer_mock(
+        "pg", {"resource": "mock", "channels": {"laser": 0, "sync": 1, "mw": 2, "gate": 3}}
+    )
+    blocks = make_dd_blocks(num_points, Nrep)
+    bench.extra_info["length"] = blocks.total_length()
+    bench.extra_info["pattern_num"] = blocks.total_pattern_num()
+    assert bench(pg.configure_blocks, blocks, 1e9)
+
+
+@pytest.mark.parametrize("num_points,Nrep", ((100, 8), (20, 256)))
+def test_compress_blocks(bench, num_points, Nrep):
+    # DD blocks with collapsed Nrep, like generated ones without explicit loops
+    blocks = Blocks([b.collapse() for b in make_dd_blocks(num_points, Nrep)])
+    bench.extra_info["pattern_num"] = blocks.total_pattern_num()
+    bs = bench(compress_blocks, blocks)
+    bench.extra_info["instructions"] = estimate_instructions(bs)
+    assert bs.total_length() == blocks.total_length()
+
+
+@pytest.mark.parametrize("num", (1_000, 10_000))
+def test_recorder_data_append(bench, num):
+    def append(data):
+        for i in range(num):
+            data.append(i * 0.1, {"x": float(i), "y": -float(i), "z": 0.5 * i})
+        return data
+
+    def setup():
+        data = RecorderData({"max_len": num // 2}, "bench")
+        data.set_units([("x", "V"), ("y", "V"), ("z", "A")])
+        return (data,)
+
+    data = bench(append, setup=setup)
+    assert len(data.get_xdata()) == num // 2
+
+
+@pytest.mark.parametrize("run_length", (1e-3, 1e-2))
+def test_raw_events_h5(bench, run_length):
+    blocks = Blocks([Block("laser", [(("laser", "sync"), 1000), (None, 1000)])])
+    sim = PhotonEventSimulator(blocks, 1e9, count_rate=1e8, seed=0)
+    raw = sim.raw_events(run_length)
+    bench.extra_info["events"] = len(raw.data)
+    loaded = bench(h5_roundtrip, raw)
+    assert np.array_equal(loaded.data, raw.data)
+
+
+@pytest.mark.parametrize("run_length", (1e-3, 1e-2))
+def test_raw_events_pickle(bench, run_length):
+    blocks = Blocks([Block("laser", [(("laser", "sync"), 1000), (None, 1000)])])
+    sim = PhotonEventSimulator(blocks, 1e9, count_rate=1e8, seed=0)
+    raw = sim.raw_events(run_length)
+    bench.extra_info["events"] = len(raw.data)
+    loaded = bench(lambda d: pickle.loads(pickle.dumps(d)), raw)
+    assert isinstance(loaded, RawEvents)
+
+
+@pytest.mark.parametrize("num", (100_000, 1_000_000))
+def test_correlate(bench, num):
+    rng = np.random.default_rng(0)
+    # 1 Mcps on each channel with 0.2 ns resolution
+    duration = num * 5000
+    start = np.sort(rng.integers(0, duration, num))
+    stop = np.sort(rng.integers(0, duration, num))
+    _, hist = bench(correlate, start, stop, 5000, 5)
+    assert len(hist) == 2001
@@ -5,6 +5,27 @@ from __future__ import annotations
 import sys
 from pathlib import Path
 
+import pytest
+
 tests_dir = Path(__file__).resolve().parent
 if str(tests_dir) not in sys.path:
     sys.path.insert(0, str(tests_dir))
+
+
+def pytest_addoption(parser):
+    # options are prefixed to avoid collision with pytest-benchmark plugin.
+    group = parser.getgroup("mahos_bench", "mahos benchmarks")
+    group.addoption("--mahos-bench", action="store_true", help="run benchmarks in tests/benchmark")
+    group.addoption("--mahos-bench-json", metavar="PATH", help="write benchmark results to PATH")
+    group.addoption(
+        "--mahos-bench-rounds", type=int, default=5, help="number of timed rounds per benchmark"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    if config.getoption("--mahos-bench"):
+        return
+    skip = pytest.mark.skip(reason="benchmarks run only with --mahos-bench")
+    for item in items:
+        if "mahos_bench" in item.keywords:
+            item.add_marker(skip)
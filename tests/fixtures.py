@@ -275,6 +275,31 @@ def server_2clients(ctx, gconf):
     stop_proc(proc, shutdown_ev)
 
 
+@pytest.fixture
+def server_init_workers(ctx, gconf):
+    local_conf(gconf, server_name)["init_workers"] = 4
+    proc, shutdown_ev = start_node_proc(ctx, InstrumentServer, gconf, server_name)
+    client = InstrumentClient(gconf, server_name)
+    yield client
+    client.close()
+    stop_proc(proc, shutdown_ev)
+
+
+@pytest.fixture
+def server_shm_2clients(ctx, gconf):
+    local_conf(gconf, server_name)["shm"] = {
+        "camera": {"slots": 4, "slot_bytes": 3_000_000},
+        "isweeper": {"slots": 2, "slot_bytes": 30_000_000},
+    }
+    proc, shutdown_ev = start_node_proc(ctx, InstrumentServer, gconf, server_name)
+    client0 = InstrumentClient(gconf, server_name)
+    client1 = InstrumentClient(gconf, server_name)
+    yield client0, client1
+    client0.close()
+    client1.close()
+    stop_proc(proc, shutdown_ev)
+
+
 @pytest.fixture
 def global_params(ctx, gconf):
     proc, shutdown_ev = start_node_proc(ctx, GlobalParams, gconf, gparams_name)
@@ -455,6 +480,16 @@ def qdyne(ctx, gconf):
     stop_proc(proc, shutdown_ev)
 
 
+@pytest.fixture
+def qdyne_stream(ctx, gconf):
+    local_conf(gconf, qdyne_name)["pulser"]["stream_raw_events"] = True
+    proc, shutdown_ev = start_node_proc(ctx, Qdyne, gconf, qdyne_name)
+    client = QdyneClient(gconf, qdyne_name)
+    yield client
+    client.close()
+    stop_proc(proc, shutdown_ev)
+
+
 @pytest.fixture
 def hbt(ctx, gconf):
     proc, shutdown_ev = start_node_proc(ctx, HBT, gconf, hbt_name)
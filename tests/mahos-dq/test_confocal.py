@@ -12,9 +12,14 @@ import time
 import uuid
 from io import BytesIO
 
+import numpy as np
+
 from mahos_dq.meas.confocal import ConfocalClient, ConfocalIO
 from mahos.msgs.common_msgs import BinaryState
 from mahos_dq.msgs.confocal_msgs import ConfocalState, Axis, ScanDirection, ScanMode, LineMode
+from mahos_dq.msgs.confocal_msgs import Image, ImageAssembler, ConfocalStatus, PiezoPos
+from mahos.msgs.common_msgs import schema_magic
+from mahos.node.comm import serialize, deserialize
 from mahos_dq.msgs.confocal_tracker_msgs import OptMode
 from mahos_dq.inst.overlay.confocal_scanner_mock import DUMMY_CAPABILITY
 from mahos.util.comp import dict_equal_inspect
@@ -71,6 +76,54 @@ def save_load_test(image, trace):
     assert dict_equal_inspect(trace.__dict__, loaded.__dict__)
 
 
+def test_image_assembler():
+    params = scan_params()
+    img = Image(params)
+    lines = np.arange(params["xnum"] * 7, dtype=np.float64).reshape(7, params["xnum"])
+
+    def delta(offset, num):
+        d = Image(params)
+        d.image = lines[offset : offset + num].T
+        d.line_offset = offset
+        return d
+
+    asm = ImageAssembler()
+    # delta without preceding full image is ignored
+    assert asm.assemble(delta(0, 2)) is None
+    assert asm.latest() is None
+
+    assert asm.assemble(img) is img
+    a = asm.assemble(delta(0, 2))
+    assert not a.is_delta()
+    assert np.array_equal(a.image, lines[:2].T)
+    b = asm.assemble(delta(2, 3))
+    assert np.array_equal(b.image, lines[:5].T)
+    # earlier views are kept valid
+    assert np.array_equal(a.image, lines[:2].T)
+    # missed lines: ignored until next full image
+    assert asm.assemble(delta(6, 1)) is None
+    assert asm.latest() is b
+
+    full = Image(params)
+    full.image = lines[:6].T
+    assert asm.assemble(full) is full
+    c = asm.assemble(delta(6, 1))
+    assert np.array_equal(c.image, lines.T)
+
+
+def test_confocal_status_serialize():
+    pos = PiezoPos(1.0, 2.0, 3.0, (0.0, 10.0), (0.0, 10.0), (0.0, 5.0), True, True, False)
+    s = ConfocalStatus(ConfocalState.PIEZO, pos, False)
+    b = serialize(s)
+    assert b.startswith(schema_magic)
+
+    s1 = deserialize(b, None)
+    assert s1.state == ConfocalState.PIEZO
+    assert s1.pos.__dict__ == pos.__dict__
+    assert isinstance(s1.pos.x_range, tuple)
+    assert not s1.tracer_paused
+
+
 def test_confocal(server, confocal, confocal_conf):
     poll_timeout_ms = confocal_conf["poll_timeout_ms"]
     tracer_size = confocal_conf["tracer"]["size"]
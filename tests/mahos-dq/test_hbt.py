@@ -8,7 +8,10 @@ Tests for mahos_dq.meas.hbt.
 
 """
 
+import numpy as np
+
 from mahos_dq.meas.hbt import HBTClient, HBTIO
+from mahos.msgs.inst.tdc_msgs import RawEvents
 from mahos.msgs.common_msgs import BinaryState
 from util import get_some, expect_value, save_load_test
 from fixtures import ctx, gconf, server, hbt, server_conf, hbt_conf
@@ -42,3 +45,30 @@ def test_hbt(server, hbt, server_conf, hbt_conf):
     assert hbt.change_state(BinaryState.IDLE)
 
     save_load_test(HBTIO(), data)
+
+
+def test_hbt_correlate_raw_events():
+    rng = np.random.default_rng(0)
+    tbin = 0.2e-9
+    start = np.sort(rng.integers(0, 10_000_000, 5000))
+    # correlated stop events delayed by 20 ns (100 tbins) and uncorrelated ones.
+    stop = np.sort(np.concatenate((start[::5] + 100, rng.integers(0, 10_000_000, 4000))))
+    data = np.concatenate((start, stop))
+    channels = np.repeat(np.arange(2, dtype=np.uint8), [len(start), len(stop)])
+    idx = np.argsort(data, kind="stable")
+    raw_events = RawEvents(data[idx].astype(np.uint64), channels[idx])
+
+    params = {"range": 100e-9, "bin": 1e-9, "plot": {"t0": 0.0}}
+    io = HBTIO()
+    data = io.correlate_raw_events(raw_events, params, tbin)
+    x = data.get_xdata()
+    assert len(x) == 101
+    assert abs(data.get_bin() - 1e-9) < 1e-15
+    assert abs(x[np.argmax(data.data)] - 20e-9) < 1e-12
+    assert data.has_data_normalized()
+
+    # re-binning after acquisition
+    params["bin"] = 2e-9
+    assert len(io.correlate_raw_events(raw_events, params, tbin).get_xdata()) == 51
+
+    assert io.correlate_raw_events(RawEvents(data.data), params, tbin) is None
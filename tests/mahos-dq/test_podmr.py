@@ -20,7 +20,7 @@ from mahos.inst.tdc_core import TDCBase
 from mahos.msgs.inst.tdc_msgs import ChannelStatus
 from mahos.msgs import param_msgs as P
 from mahos_dq.meas.podmr_generator.generator import make_generators
-from mahos_dq.meas.podmr_worker import Pulser, PODMRDataOperator
+from mahos_dq.meas.podmr_worker import Pulser, PODMRDataOperator, LaserTimingDetector
 from util import get_some, expect_value, save_load_test
 from fixtures import ctx, gconf, server, podmr, server_conf, podmr_conf
 from podmr_patterns import patterns
@@ -207,6 +207,33 @@ def test_find_laser_timing_noroi_no_monotonic():
     _find_laser_timing_case(enable_roi=False, monotonic=False)
 
 
+def test_laser_timing_detector_batch():
+    detector = LaserTimingDetector()
+    rng = np.random.default_rng(3)
+
+    x = rng.normal(size=(4, 30))
+    for window in (1, 3, 7):
+        expected = [np.convolve(r, np.full(window, 1.0 / window), mode="same") for r in x]
+        np.testing.assert_allclose(detector._moving_average(x, window), expected, atol=1e-12)
+
+    # segments of different lengths (clipped at both ends of raw) and flat segment (no edge).
+    raw = rng.normal(0.0, 0.1, size=300)
+    for edge in (5, 100, 200, 295):
+        raw[edge:] += 10.0
+    raw[140:180] = 1.0
+    starts = np.array([-10, 80, 150, 185, 280])
+    stops = np.array([20, 120, 180, 225, 310])
+    starts, stops = np.maximum(0, starts), np.minimum(len(raw), stops)
+
+    edges = detector._estimate_segment_edges(raw, starts, stops, 5, 0.5)
+    for start, stop, e in zip(starts, stops, edges):
+        each = detector._estimate_edges_constant_fraction(raw[np.newaxis, start:stop], 5, 0.5)
+        np.testing.assert_allclose(e, each[0])
+    assert np.isnan(edges[2])
+    # the edges near the ends of raw are biased by zero padding of moving average.
+    np.testing.assert_allclose((starts + edges)[[0, 1, 3, 4]], [5, 100, 200, 295], atol=2.0)
+
+
 @pytest.mark.parametrize("partial", (-1, 0), ids=("complementary", "partial"))
 @pytest.mark.parametrize(
     ("sigwidth", "refwidth", "refdelay", "roi_margin"),
@@ -8,8 +8,11 @@ Tests for mahos_dq.msgs.podmr_msgs.
 
 """
 
+import pickle
+
 import numpy as np
 import pytest
+import h5py
 
 from mahos_dq.msgs.podmr_msgs import PODMRData
 
@@ -242,3 +245,43 @@ def test_snapshot_for_save_preserves_existing_finish_time():
     snap = data.snapshot_for_save(finalize=True)
 
     assert snap.finish_time == finish_time
+
+
+def test_memoized_derived_arrays(tmp_path):
+    data = make_data(2, "diff")
+    s0 = np.array([5.0, 7.0])
+    s1 = np.array([1.0, 2.0])
+    r = np.array([10.0, 10.0])
+    set_pattern_data(data, [s0, s1], [r, r])
+
+    x = data.get_xdata()
+    y, _ = data.get_ydata()
+    # cached values are returned until data is modified
+    assert data.get_xdata() is x
+    assert data.get_ydata()[0] is y
+    assert data.get_xdata(force_taumode="index") is not x
+
+    # setter invalidates the cache
+    data.set_data(0, s0 * 2)
+    y2, _ = data.get_ydata()
+    assert np.array_equal(y2, s0 * 2 - s1)
+
+    # in-place modification of plot params is tracked
+    data.params["plot"]["plotmode"] = "average"
+    assert np.array_equal(data.get_ydata()[0], (s0 * 2 + s1) / 2)
+
+    # other in-place modifications require explicit invalidation
+    y3 = data.get_ydata()[0]
+    data.data0[:] = 0.0
+    assert data.get_ydata()[0] is y3
+    data.invalidate_cache()
+    assert np.array_equal(data.get_ydata()[0], s1 / 2)
+
+    # cache is not pickled nor written into HDF5
+    assert "_memo" in data.__dict__
+    d = pickle.loads(pickle.dumps(data))
+    assert "_memo" not in d.__dict__ and "_generation" not in d.__dict__
+    assert np.array_equal(d.get_ydata()[0], s1 / 2)
+    with h5py.File(tmp_path / "data.h5", "w") as f:
+        data.to_h5(f)
+        assert "_memo" not in f.attrs and "_generation" not in f.attrs
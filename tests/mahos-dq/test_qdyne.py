@@ -19,7 +19,7 @@ from mahos_dq.msgs.qdyne_msgs import QdyneData, MWMode
 from mahos_dq.meas.qdyne_worker import QdyneAnalyzer, Pulser
 from mahos.msgs.common_msgs import BinaryState
 from util import get_some, get_final_data, expect_value, save_load_test
-from fixtures import ctx, gconf, server, qdyne, server_conf, qdyne_conf
+from fixtures import ctx, gconf, server, qdyne, qdyne_stream, server_conf, qdyne_conf
 
 
 def _qt_binding_loaded() -> bool:
@@ -73,6 +73,15 @@ def test_qdyne_analyzer():
         analyzer._analyze_py(data)
         assert np.all(data.data == np.array(expect, dtype=np.uint64))
 
+        # incremental analysis gives same result for any split of events into chunks.
+        for split in range(len(raw) + 1):
+            analyzer.reset()
+            data.raw_data = None
+            assert analyzer.analyze_chunk(data, np.array(raw[:split], dtype=np.uint64))
+            assert analyzer.analyze_chunk(data, np.array(raw[split:], dtype=np.uint64))
+            assert np.all(data.data == np.array(expect, dtype=np.uint64))
+            assert np.all(data.xdata == np.arange(0, len(expect) * 5, 5))
+
     # same tests as test_cqdyne_analyzer (N = 3).
     do_test([1, 6, 11, 14], [1, 1, 1])
     do_test([3, 3, 8, 8, 13, 13, 14], [2, 2, 2])
@@ -111,3 +120,37 @@ def test_qdyne(server, qdyne, server_conf, qdyne_conf):
     data = get_final_data(qdyne.get_data, poll_timeout_ms)
     assert data.params["instrument"]["mw_modes"] == expected_mw_modes
     save_load_test(QdyneIO(), data)
+
+
+def test_qdyne_stream(server, qdyne_stream, server_conf, qdyne_conf):
+    qdyne = qdyne_stream
+    poll_timeout_ms = qdyne_conf["poll_timeout_ms"]
+    expected_mw_modes = [MWMode.parse(m).name for m in qdyne_conf["pulser"]["mw_modes"]]
+
+    qdyne.wait()
+
+    assert get_some(qdyne.get_status, poll_timeout_ms).state == BinaryState.IDLE
+    params = qdyne.get_param_dict("xy8")
+    params["interval"].set(0.1)
+
+    assert qdyne.validate(params, "xy8")
+    assert qdyne.start(params, "xy8")
+    assert expect_value(qdyne.get_state, BinaryState.ACTIVE, poll_timeout_ms)
+
+    # With stream_raw_events, chunks of raw events are analyzed during the measurement.
+    assert expect_value(
+        lambda: (d := qdyne.get_data()) is not None and d.has_data(), True, poll_timeout_ms
+    )
+    assert qdyne.stop()
+    assert expect_value(qdyne.get_state, BinaryState.IDLE, poll_timeout_ms)
+    data = get_final_data(qdyne.get_data, poll_timeout_ms)
+    assert data.params["instrument"]["mw_modes"] == expected_mw_modes
+    assert data.has_data()
+    save_load_test(QdyneIO(), data)
+
+    # Retaining raw_data, data is fetched and analyzed on stop() even if streaming is enabled.
+    params["remove_raw_data"].set(False)
+    assert qdyne.start(params, "xy8")
+    assert expect_value(qdyne.get_state, BinaryState.ACTIVE, poll_timeout_ms)
+    assert qdyne.stop()
+    assert expect_value(qdyne.get_state, BinaryState.IDLE, poll_timeout_ms)
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+"""
+Tests for mahos_dq.util.nv.
+
+.. This file is a part of MAHOS project, which is released under the 3-Clause BSD license.
+.. See included LICENSE file or https://github.com/ToyotaCRDL/mahos/blob/main/LICENSE for details.
+
+"""
+
+import numpy as np
+import pytest
+
+from mahos_dq.util.nv import peaks_of_B, peaks_of_B_eigh, peaks_of_B_array, sorted_peaks_of_B
+from mahos_dq.meas import odmr_fitter as OF
+
+
+def test_peaks_of_B():
+    rng = np.random.default_rng(0)
+    for _ in range(200):
+        B = 10 ** rng.uniform(-8, 3)
+        theta, phi = rng.uniform(0.0, np.pi), rng.uniform(0.0, 2 * np.pi)
+        assert peaks_of_B(B, theta, phi) == pytest.approx(peaks_of_B_eigh(B, theta, phi), abs=1e-9)
+    vec = np.array([1.0, -2.0, 3.0])
+    assert peaks_of_B(vec) == pytest.approx(peaks_of_B_eigh(vec), abs=1e-9)
+    assert peaks_of_B(0.0, 0.0, 0.0) == pytest.approx([2870.0] * 8)
+    assert peaks_of_B(1.0, 0.0, 0.0, num=2) == pytest.approx(
+        peaks_of_B_eigh(1.0, 0.0, 0.0, num=2), abs=1e-9
+    )
+
+
+def test_peaks_of_B_array():
+    B = np.linspace(0.0, 10.0, 5)
+    theta = np.linspace(0.0, np.pi, 3)[:, np.newaxis]
+    peaks = peaks_of_B_array(B, theta, 0.3)
+    assert peaks.shape == (3, 5, 8)
+    for i in range(3):
+        for j in range(5):
+            expected = peaks_of_B_eigh(B[j], theta[i, 0], 0.3)
+            assert peaks[i, j] == pytest.approx(expected, abs=1e-9)
+
+    vecs = np.random.default_rng(0).normal(size=(4, 3))
+    peaks = peaks_of_B_array(vecs)
+    assert peaks.shape == (4, 8)
+    for v, p in zip(vecs, peaks):
+        assert p == pytest.approx(peaks_of_B_eigh(v), abs=1e-9)
+
+    s = sorted_peaks_of_B(5.0, 0.3, 0.2)
+    assert s is sorted_peaks_of_B(5.0, 0.3, 0.2)
+    assert list(s) == pytest.approx(sorted(peaks_of_B_eigh(5.0, 0.3, 0.2)), abs=1e-9)
+
+
+def test_fused_models():
+    x = np.linspace(2.7e3, 3.04e3, 201)
+    B, theta, phi = 5.0, 0.6, 0.3
+    centers = sorted(peaks_of_B_eigh(B, theta, phi))
+    expected = sum(OF.lorentzian(x, -0.1, c, 3.0) for c in centers)
+    assert OF.B_lorentzians(x, B, theta, phi, -0.1, 3.0) == pytest.approx(expected)
+
+    amps = np.linspace(-0.1, -0.2, 8)
+    sigmas = np.linspace(1.0, 3.0, 8)
+    expected = sum(OF.gaussian(x, a, c, s) for a, c, s in zip(amps, centers, sigmas))
+    assert OF.B_gaussians_many(x, B, theta, phi, *amps, *sigmas) == pytest.approx(expected)
+
+    centers = sorted(peaks_of_B_eigh(B, 0.0, 0.0, num=2))
+    amps = (-0.1, -0.2, -0.2, -0.1)
+    expected = sum(OF.voigt(x, a, c, 1.0, 2.0) for a, c in zip(amps, centers))
+    result = OF.B_voigts_aligned(x, B, -0.1, -0.2, 1.0, 1.0, 2.0, 2.0)
+    assert result == pytest.approx(expected)
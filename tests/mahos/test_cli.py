@@ -1,8 +1,11 @@
 #!/usr/bin/env python3
 
+import subprocess
+import sys
+import time
 from types import SimpleNamespace
 
-from mahos.cli import data, main
+from mahos.cli import data, launch, main
 from mahos.node.client import EchoSubscriber
 
 
@@ -91,3 +94,94 @@ def test_echo_print_rate_size(monkeypatch, capsys):
         "1 msgs in 2.0 sec.: 0.50 Hz, latest: 2097152 bytes (2.00 MiB), "
         "average: 2097152 bytes (2.00 MiB/msg), throughput: 1.00 MiB/s\n"
     )
+
+
+def test_launch_preload_modules():
+    gconf = {
+        "localhost": {
+            "log": {"module": "mahos.node.log_broker", "class": "LogBroker"},
+            "server": {"module": "mahos.inst.server", "class": "InstrumentServer"},
+            "gui": {"module": "mahos.gui.main_monitor", "class": "MainMonitor"},
+            "tweaker": {"module": "mahos.meas.tweaker", "class": "Tweaker"},
+            # GUI node outside mahos.gui is detected by class name
+            "my_gui": {"module": "mygui", "class": "MyGUI"},
+            # cannot be imported (ignored by the forkserver)
+            "ivcurve": {"module": "ivcurve", "class": "IVCurve"},
+            "excluded": {"module": "mypkg.qtwidgets", "class": "Widgets"},
+        }
+    }
+    names = ["log", "server", "gui", "tweaker", "my_gui", "ivcurve", "excluded"]
+    modules = launch.preload_modules(gconf, "localhost", names, ["scipy", "numpy"], ["mypkg"])
+
+    assert modules[: len(launch.COMMON_PRELOAD)] == list(launch.COMMON_PRELOAD)
+    assert modules[len(launch.COMMON_PRELOAD) :] == [
+        "scipy",
+        "mahos.node.log_broker",
+        "mahos.inst.server",
+        "mahos.meas.tweaker",
+        "ivcurve",
+    ]
+
+
+def test_launch_preload_modules_no_import():
+    """preload_modules() doesn't import the node modules (GUI / Qt in particular)."""
+
+    code = """
+import sys
+from mahos.cli import launch
+gconf = {"localhost": {
+    "server": {"module": "mahos.inst.server", "class": "InstrumentServer"},
+    "gui": {"module": "mahos.gui.main_monitor", "class": "MainMonitor"},
+    "tweaker_gui": {"module": "mahos.gui.tweaker", "class": "TweakerGUI"},
+}}
+launch.preload_modules(gconf, "localhost", ["server", "gui", "tweaker_gui"])
+qt = ("mahos.gui", "mahos.inst.server", "PyQt", "PySide", "qtpy", "pyqtgraph")
+print([m for m in sys.modules if m.startswith(qt)])
+"""
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    ).stdout
+    assert out.strip() == "[]"
+
+
+def test_launch_start_method_arg():
+    args = launch.parse_args(["-m", "forkserver", "-r", "log", "server"])
+    assert args.start_method == "forkserver"
+    assert args.restart
+    assert args.max_restarts is None
+    assert args.include == ["log", "server"]
+    assert launch.parse_args(["-r", "--max-restarts", "3"]).max_restarts == 3
+
+
+def test_launch_restart(tmp_path, capsys):
+    fn = tmp_path / "conf.toml"
+    # node failing immediately
+    fn.write_text(
+        """
+[localhost.broken]
+module = "mahos_nonexistent_module"
+class = "Broken"
+"""
+    )
+    launcher = launch.Launcher(str(fn), "localhost", [], [], restart=True, max_restarts=2)
+    launcher.restart_backoff_sec = 0.05
+    launcher.start_all_nodes()
+    name = "localhost::broken"
+
+    starts = 1
+    t0 = time.monotonic()
+    while time.monotonic() - t0 < 30.0:
+        proc = launcher.procs.get(name)
+        launcher.check_alive()
+        if launcher.procs.get(name) not in (None, proc):
+            starts += 1
+        if name not in launcher.procs and name not in launcher._pending_restarts:
+            break
+        time.sleep(0.02)
+    launcher.terminate_procs()
+
+    assert starts == 3
+    assert launcher._restart_counts[name] == 2
+    out = capsys.readouterr().out
+    assert "Restarting localhost::broken in 0.1 sec (2/2)." in out
+    assert "Not restarting localhost::broken" in out
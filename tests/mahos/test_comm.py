@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+
+"""
+Tests for mahos.node.comm.
+
+.. This file is a part of MAHOS project, which is released under the 3-Clause BSD license.
+.. See included LICENSE file or https://github.com/ToyotaCRDL/mahos/blob/main/LICENSE for details.
+
+"""
+
+import os
+import socket
+import stat
+import threading
+import time
+
+import pytest
+import zmq
+
+from mahos.node.comm import Context, inproc_alias, ipc_alias, ipc_dir
+from mahos.cli.threaded_nodes import tcp_endpoints_in_group
+
+endpoint = "tcp://127.0.0.1:5590"
+
+
+def serve_once(ctx: Context):
+    ctx.add_rep(endpoint, lambda msg: msg * 2)
+    ctx.poll()
+
+
+def test_aliases():
+    assert inproc_alias(endpoint) == "inproc://mahos-127.0.0.1:5590"
+    assert inproc_alias("inproc://rep") is None
+    if zmq.has("ipc"):
+        assert ipc_alias(endpoint).endswith("mahos-5590.ipc")
+    assert ipc_alias("ipc:///tmp/rep") is None
+
+
+def test_resolve_inproc():
+    server = Context(auto_transport=True, poll_timeout_ms=2000)
+    server.inproc_endpoints.add(endpoint)
+    client = Context(context=server, auto_transport=True)
+    assert client.resolve_endpoint(endpoint) == inproc_alias(endpoint)
+
+    req = client.add_req(endpoint, timeout_ms=2000)
+    th = threading.Thread(target=serve_once, args=(server,))
+    th.start()
+    assert req.request(21) == 42
+    th.join()
+    client.close()
+    server.close()
+
+
+@pytest.mark.skipif(not zmq.has("ipc"), reason="ipc transport is not available")
+def test_resolve_ipc():
+    client = Context(auto_transport=True)
+    assert client.resolve_endpoint(endpoint) == endpoint
+
+    server = Context(auto_transport=True, poll_timeout_ms=2000)
+    server.add_rep(endpoint, lambda msg: msg * 2)
+    path = ipc_alias(endpoint)[len("ipc://") :]
+    assert os.path.exists(path)
+    assert client.resolve_endpoint(endpoint) == ipc_alias(endpoint)
+    assert Context().resolve_endpoint(endpoint) == endpoint
+    assert client.resolve_endpoint("tcp://192.0.2.1:5590") == "tcp://192.0.2.1:5590"
+
+    req = client.add_req(endpoint, timeout_ms=2000)
+    th = threading.Thread(target=server.poll)
+    th.start()
+    assert req.request(21) == 42
+    th.join()
+    client.close()
+    server.close()
+    assert not os.path.exists(path)
+
+
+@pytest.mark.skipif(not zmq.has("ipc") or os.name != "posix", reason="ipc is not available")
+def test_ipc_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_RUNTIME_DIR", str(tmp_path))
+    d = ipc_dir()
+    assert d == str(tmp_path / "mahos")
+    assert stat.S_IMODE(os.stat(d).st_mode) == 0o700
+    assert ipc_alias(endpoint) == "ipc://" + os.path.join(d, "mahos-5590.ipc")
+
+    # directory accessible by the others is not used
+    os.chmod(d, 0o777)
+    assert ipc_dir() is None
+    assert ipc_alias(endpoint) is None
+    os.chmod(d, 0o700)
+
+    # stale socket file left by a killed process is not resolved
+    client = Context(auto_transport=True)
+    path = ipc_alias(endpoint)[len("ipc://") :]
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as s:
+        s.bind(path)
+    assert os.path.exists(path)
+    assert client.resolve_endpoint(endpoint) == endpoint
+
+    # binding replaces the stale file
+    server = Context(auto_transport=True)
+    server.add_rep(endpoint, lambda msg: msg)
+    assert client.resolve_endpoint(endpoint) == ipc_alias(endpoint)
+    server.close()
+    assert client.resolve_endpoint(endpoint) == endpoint
+    client.close()
+
+
+def test_tcp_endpoints_in_group():
+    gconf = {
+        "localhost": {
+            "server": {"rep_endpoint": "tcp://127.0.0.1:5566", "pub_endpoint": "inproc://pub"},
+            "log": {
+                "xpub_endpoint": "tcp://127.0.0.1:5555",
+                "xsub_endpoint": "tcp://127.0.0.1:5556",
+                "auto_transport": False,
+            },
+            "gui": {"target": {"server": "localhost::server"}},
+        }
+    }
+    eps = tcp_endpoints_in_group(gconf, "localhost", ["server", "log", "gui"])
+    assert eps == {"tcp://127.0.0.1:5566"}
+
+
+def test_coalesce():
+    ep = "tcp://127.0.0.1:5591"
+    pub_ctx = Context()
+    pub = pub_ctx.add_pub(ep, b"data")
+    status_pub = pub_ctx.add_pub(ep, b"status")
+
+    ctx = Context(poll_timeout_ms=10)
+    ctx.set_coalesce({"data": 20.0})
+    received = {"data": [], "status": []}
+    coalescer = ctx.add_sub(ep, b"data", received["data"].append)
+    assert ctx.add_sub(ep, b"status", received["status"].append) is None
+
+    # wait for connection
+    while not received["status"]:
+        status_pub.publish(-1)
+        ctx.poll()
+    received["status"].clear()
+
+    for i in range(50):
+        pub.publish(i)
+        status_pub.publish(i)
+    time.sleep(0.1)
+    ctx.poll()
+    # newest one only, while non-coalesced messages are handled one by one.
+    assert received["data"] == [49]
+    while len(received["status"]) < 50:
+        ctx.poll()
+    assert received["status"] == list(range(50))
+    assert received["data"] == [49]
+    assert coalescer.dropped() == ctx.dropped_counts()[b"data"] == 49
+
+    # rate limited
+    pub.publish(50)
+    time.sleep(0.01)
+    ctx.poll()
+    pub.publish(51)
+    time.sleep(0.01)
+    ctx.poll()
+    assert received["data"] == [49]
+    t0 = time.monotonic()
+    while len(received["data"]) == 1:
+        ctx.poll()
+    assert received["data"] == [49, 51]
+    assert time.monotonic() - t0 < 0.5
+    assert coalescer.dropped() == 50
+
+    ctx.close()
+    pub_ctx.close()
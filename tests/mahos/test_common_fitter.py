@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+
+"""
+Tests for mahos.meas.common_fitter.
+
+.. This file is a part of MAHOS project, which is released under the 3-Clause BSD license.
+.. See included LICENSE file or https://github.com/ToyotaCRDL/mahos/blob/main/LICENSE for details.
+
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import lmfit as F
+import numpy as np
+import pytest
+
+from mahos.meas.common_fitter import BaseFitter, lorentzian
+from mahos.msgs import param_msgs as P
+
+
+def two_peaks(x, c, a1, x1, g1, a2, x2, g2):
+    return c + lorentzian(x, a1, x1, g1) + lorentzian(x, a2, x2, g2)
+
+
+class TwoPeakFitter(BaseFitter):
+    def model_params(self):
+        return P.ParamDict(
+            c=self.make_model_param(0.0, -1.0, 1.0),
+            a1=self.make_model_param(0.5, 0.0, 2.0),
+            x1=self.make_model_param(0.0, -10.0, 10.0),
+            g1=self.make_model_param(0.5, 0.05, 5.0),
+            a2=self.make_model_param(0.5, 0.0, 2.0),
+            x2=self.make_model_param(0.0, -10.0, 10.0),
+            g2=self.make_model_param(0.5, 0.05, 5.0),
+        )
+
+    def model(self, raw_params):
+        return F.Model(two_peaks)
+
+
+def make_data():
+    x = np.linspace(-10.0, 10.0, 401)
+    y = two_peaks(x, 0.1, 1.0, -6.0, 0.3, 0.8, 5.0, 0.4)
+    y += np.random.default_rng(0).normal(scale=0.01, size=len(x))
+    return x, y
+
+
+@pytest.mark.parametrize("pool", ("serial", "thread", "process"))
+def test_multi_start(pool):
+    x, y = make_data()
+    fitter = TwoPeakFitter(
+        print_fn=None, conf={"multi_start_pool": pool, "multi_start_workers": 4}
+    )
+    params = P.unwrap(fitter.param_dict())
+    params["guess"] = False
+
+    single = fitter.fit_xyd(x, y, params, "")
+    params["multi_start"] = 16
+    params["multi_start_scale"] = 0.3
+    multi = fitter.fit_xyd(x, y, params, "")
+
+    stats = multi["stats"]
+    assert stats["starts"] == 16
+    assert 0 < stats["converged"] <= 16
+    assert len(stats["start_chisqr"]) == 16
+    assert stats["time"] > 0.0
+    # the result of the best start is taken as is (not re-fitted)
+    assert stats["chisqr"] == stats["start_chisqr"][stats["best_start"]]
+    assert stats["chisqr"] == min(c for c in stats["start_chisqr"] if c is not None)
+    assert stats["nfev"] < stats["total_nfev"]
+    # the single fit from the poor initial values is trapped in a local minimum
+    assert stats["chisqr"] < single["stats"]["chisqr"]
+    popt = multi["popt"]
+    assert sorted([popt["x1"], popt["x2"]]) == pytest.approx([-6.0, 5.0], abs=0.05)
+
+
+def test_multi_start_unpicklable():
+    """Default process pool falls back to threads for a model that cannot be pickled."""
+
+    messages = []
+
+    class LocalFitter(TwoPeakFitter):
+        def model(self, raw_params):
+            def local_two_peaks(x, c, a1, x1, g1, a2, x2, g2):
+                return two_peaks(x, c, a1, x1, g1, a2, x2, g2)
+
+            return F.Model(local_two_peaks)
+
+    x, y = make_data()
+    fitter = LocalFitter(print_fn=messages.append, conf={"multi_start_workers": 4})
+    params = P.unwrap(fitter.param_dict())
+    params["guess"] = False
+    params["multi_start"] = 8
+    params["multi_start_scale"] = 0.3
+    res = fitter.fit_xyd(x, y, params, "")
+    assert any("Falling back to thread pool" in m for m in messages)
+    assert res["stats"]["starts"] == 8
+
+
+def test_multi_start_concurrent():
+    """Concurrent fits share the process pool."""
+
+    x, y = make_data()
+    fitter = TwoPeakFitter(
+        print_fn=None, conf={"multi_start_pool": "process", "multi_start_workers": 4}
+    )
+    params = P.unwrap(fitter.param_dict())
+    params["guess"] = False
+    params["multi_start"] = 8
+    params["multi_start_scale"] = 0.3
+
+    # different data in each thread to detect mixed-up jobs
+    ys = [y, y[::-1]]
+    with ThreadPoolExecutor(2) as executor:
+        results = list(executor.map(lambda y_: fitter.fit_xyd(x, y_, params, ""), ys))
+    for res, expected in zip(results, ([-6.0, 5.0], [-5.0, 6.0])):
+        popt = res["popt"]
+        assert sorted([popt["x1"], popt["x2"]]) == pytest.approx(expected, abs=0.05)
+
+
+def test_warm_start():
+    x, y = make_data()
+    fitter = TwoPeakFitter(print_fn=None, conf={"multi_start_pool": "serial"})
+    params = P.unwrap(fitter.param_dict())
+    params["guess"] = False
+    params["warm_start"] = True
+
+    # no previous result
+    params["multi_start"] = 16
+    params["multi_start_scale"] = 0.3
+    first = fitter.fit_xyd(x, y, params, "")
+    assert not first["stats"]["warm_start"]
+
+    params["multi_start"] = 1
+    second = fitter.fit_xyd(x, y, params, "")
+    assert second["stats"]["warm_start"]
+    params["warm_start"] = False
+    cold = fitter.fit_xyd(x, y, params, "")
+    assert second["stats"]["nfev"] < cold["stats"]["nfev"]
+    assert second["stats"]["chisqr"] == pytest.approx(first["stats"]["chisqr"], rel=1e-3)
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+"""
+Tests for serialization of mahos.msgs.common_msgs.
+
+.. This file is a part of MAHOS project, which is released under the 3-Clause BSD license.
+.. See included LICENSE file or https://github.com/ToyotaCRDL/mahos/blob/main/LICENSE for details.
+
+"""
+
+import pickle
+
+from mahos.msgs.common_msgs import BinaryState, BinaryStatus, schema_magic
+from mahos.msgs.inst.server_msgs import Ident, ServerStatus
+from mahos.msgs.state_manager_msgs import ManagerStatus
+from mahos.node.comm import Publisher, deserialize, serialize
+
+
+def test_binary_status():
+    s = BinaryStatus(BinaryState.ACTIVE)
+    b = serialize(s)
+    assert b.startswith(schema_magic)
+    assert len(b) < len(pickle.dumps(s, protocol=5)) // 2
+
+    for msg_type in (None, BinaryStatus):
+        s1 = deserialize(b, msg_type)
+        assert type(s1) is BinaryStatus
+        assert s1.state == BinaryState.ACTIVE
+
+
+def test_state():
+    b = serialize(BinaryState.ACTIVE)
+    assert b.startswith(schema_magic)
+    assert deserialize(b, None) is BinaryState.ACTIVE
+
+
+def test_nested_status():
+    ident = Ident("client")
+    locks = {"pg": ident, "mw": None}
+    s = ServerStatus("localhost", "server", locks, 2, 0)
+    s1 = deserialize(serialize(s), None)
+    assert s1.__dict__.keys() == s.__dict__.keys()
+    assert s1.locks["mw"] is None
+    assert s1.locks["pg"] == ident
+    assert (s1.host, s1.name, s1.inst_num, s1.overlay_num) == ("localhost", "server", 2, 0)
+
+
+def test_fallback_pickle():
+    # attributes don't match the SCHEMA
+    s = BinaryStatus(BinaryState.IDLE)
+    s.extra = 1
+    b = serialize(s)
+    assert not b.startswith(schema_magic)
+    assert deserialize(b, None).extra == 1
+
+    # value of wrong type
+    s = BinaryStatus(0)
+    b = serialize(s)
+    assert not b.startswith(schema_magic)
+    assert deserialize(b, None).state == 0
+
+    # Status without SCHEMA
+    s = ManagerStatus({"a": BinaryState.IDLE})
+    assert not serialize(s).startswith(schema_magic)
+
+
+class FakeSocket(object):
+    def __init__(self):
+        self.sent = []
+
+    def send_multipart(self, frames):
+        self.sent.append(frames)
+
+
+def test_publisher_heartbeat(monkeypatch):
+    t = [0.0]
+    monkeypatch.setattr("mahos.node.comm.time.monotonic", lambda: t[0])
+
+    sock = FakeSocket()
+    pub = Publisher(sock, b"status", heartbeat_sec=1.0)
+    idle = BinaryStatus(BinaryState.IDLE)
+    active = BinaryStatus(BinaryState.ACTIVE)
+
+    pub.publish(idle)
+    pub.publish(idle)
+    assert len(sock.sent) == 1
+    t[0] = 0.5
+    pub.publish(active)
+    pub.publish(active)
+    assert len(sock.sent) == 2
+    t[0] = 1.6
+    pub.publish(active)
+    assert len(sock.sent) == 3
+
+    sock = FakeSocket()
+    pub = Publisher(sock, b"status")
+    pub.publish(idle)
+    pub.publish(idle)
+    assert len(sock.sent) == 2
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+
+"""
+Tests for import time of mahos modules.
+
+.. This file is a part of MAHOS project, which is released under the 3-Clause BSD license.
+.. See included LICENSE file or https://github.com/ToyotaCRDL/mahos/blob/main/LICENSE for details.
+
+"""
+
+import sys
+import subprocess
+
+import pytest
+
+# Heavy modules which must not be loaded by non-GUI nodes and lightweight CLI commands.
+HEAVY_MODULES = ("matplotlib", "lmfit", "scipy", "h5py", "pandas", "PyQt6", "pyqtgraph")
+
+# (module, budget of cumulative import time in sec)
+# The budgets are loose to absorb the slow CI machines.
+IMPORT_BUDGETS = [
+    ("mahos.cli.main", 0.5),
+    ("mahos.cli.ls", 0.5),
+    ("mahos.cli.echo", 0.5),
+    ("mahos.node.node", 2.0),
+    ("mahos.msgs.data_msgs", 2.0),
+    ("mahos.util.io", 2.0),
+    ("mahos.meas.common_fitter", 2.0),
+    ("mahos.meas.recorder", 2.0),
+    ("mahos.meas.sweeper", 2.0),
+]
+
+
+def importtime(module: str) -> tuple[float, list[str]]:
+    """Import `module` in a fresh interpreter with -X importtime.
+
+    :returns: (cumulative import time of `module` in sec, list of imported top-level modules)
+
+    """
+
+    code = f"import sys, {module}; print(' '.join(sorted(sys.modules)))"
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    cumulative_us = None
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        # import time: self [us] | cumulative | imported package
+        _self, cumulative, name = line[len("import time:") :].split("|")
+        if name.strip() == module:
+            cumulative_us = int(cumulative)
+    assert cumulative_us is not None
+    return cumulative_us * 1e-6, proc.stdout.split()
+
+
+def test_lazy_import():
+    from mahos.util.lazy import lazy_import, LazyModule
+
+    json = lazy_import("json")
+    assert json is sys.modules["json"]
+
+    code = (
+        "import sys\n"
+        "from mahos.util.lazy import lazy_import, is_loaded\n"
+        "m = lazy_import('xml.dom.minidom')\n"
+        "assert not is_loaded('xml.dom.minidom')\n"
+        "assert m.parseString('<a/>').documentElement.tagName == 'a'\n"
+        "assert is_loaded('xml.dom.minidom')\n"
+        "assert m.parseString is sys.modules['xml.dom.minidom'].parseString\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+    m = LazyModule("json")
+    with pytest.raises(AttributeError):
+        m.no_such_attribute
+
+
+@pytest.mark.parametrize("module,budget", IMPORT_BUDGETS)
+def test_import_time(module, budget):
+    t, modules = importtime(module)
+    loaded = [m for m in HEAVY_MODULES if m in modules]
+    assert not loaded, f"{module} loads heavy modules: {loaded}"
+    assert t < budget, f"{module} took {t:.3f} sec to import (budget: {budget:.3f} sec)"
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+
+"""
+Tests for mahos.inst.pg_core (DTG).
+
+.. This file is a part of MAHOS project, which is released under the 3-Clause BSD license.
+.. See included LICENSE file or https://github.com/ToyotaCRDL/mahos/blob/main/LICENSE for details.
+
+"""
+
+import io
+import os
+import shutil
+
+import numpy as np
+import pytest
+
+from mahos.inst.mock import DTG5274_mock
+from mahos.inst.pg_core import dtg_io
+from mahos.msgs.inst.pg_msgs import Block, Blocks
+
+script_dir = os.path.dirname(os.path.abspath(__file__))
+scaffold_dir = os.path.dirname(script_dir)
+
+CHANNELS = {"mw": 7, "laser": 6, "sync": 5, "gate": 4}
+
+
+@pytest.fixture
+def dtg(tmp_path):
+    shutil.copy(os.path.join(scaffold_dir, "scaffold.dtg"), tmp_path / "scaffold.dtg")
+    return DTG5274_mock("dtg", {"local_dir": str(tmp_path), "channels": CHANNELS})
+
+
+def make_blocks():
+    return Blocks(
+        [
+            Block("init", [(("laser", "sync"), 1000), (None, 200), ("mw", 100), (None, 300)]),
+            Block("main", [("laser", 1200), (None, 100), (("mw", "gate"), 300)], Nrep=5),
+        ]
+    )
+
+
+def test_encode_pattern(dtg):
+    for block in make_blocks():
+        expected = np.concatenate(
+            [
+                dtg.channels_to_int(channels) * np.ones(length, dtype=np.uint8)
+                for channels, length in block.pattern
+            ]
+        )
+        pulses = dtg.encode_pattern(block)
+        assert pulses.dtype == np.uint8
+        np.testing.assert_array_equal(pulses, expected)
+
+
+def test_dump_tree(dtg):
+    blocks = make_blocks()
+    scaffold_path = os.path.join(dtg.LOCAL_DIR, dtg.SCAFFOLD)
+    tree = dtg.generate_tree(blocks, 1e9, scaffold_path=scaffold_path)
+
+    f = io.BytesIO()
+    dtg_io.dump_tree(tree, f)
+    data = f.getvalue()
+    assert len(data) == dtg_io.tree_nbytes(tree)
+
+    buf = bytearray(len(data) + 10)
+    assert dtg_io.dump_tree_into(tree, buf) == len(data)
+    assert bytes(buf[: len(data)]) == data
+    with pytest.raises(ValueError):
+        dtg_io.dump_tree_into(tree, bytearray(len(data) - 1))
+
+    ptns = dtg_io.find_record(dtg_io.read_tree(data), "DTG_PATTERNDATA_RECID")
+    assert len(ptns) == len(blocks)
+    for (_, _, pulses), block in zip(ptns, blocks):
+        np.testing.assert_array_equal(pulses.view(np.uint8), dtg.encode_pattern(block))
+
+
+def test_scaffold_cache(dtg):
+    scaffold_path = os.path.join(dtg.LOCAL_DIR, dtg.SCAFFOLD)
+    tree0 = dtg.load_scaffold(scaffold_path)
+    tree0[0][-1].pop()
+    tree1 = dtg.load_scaffold(scaffold_path)
+    # cached tree is not affected by modification of the returned one.
+    assert len(tree1[0][-1]) == len(tree0[0][-1]) + 1
+
+    # modified file is parsed again.
+    with open(scaffold_path, "wb") as f:
+        dtg_io.dump_tree(tree0, f)
+    st = os.stat(scaffold_path)
+    os.utime(scaffold_path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+    tree2 = dtg.load_scaffold(scaffold_path)
+    assert len(tree2[0][-1]) == len(tree0[0][-1])
+
+
+def test_configure(dtg):
+    assert dtg.configure({"blocks": make_blocks(), "freq": 1e9})
+    assert dtg.get("length") == make_blocks().total_length()
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+
+"""
+Tests for mahos.inst.pg_core.compress.
+
+.. This file is a part of MAHOS project, which is released under the 3-Clause BSD license.
+.. See included LICENSE file or https://github.com/ToyotaCRDL/mahos/blob/main/LICENSE for details.
+
+"""
+
+import pytest
+
+from mahos.inst.instrument import Instrument
+from mahos.inst.pg_core.compress import compress_blocks, estimate_instructions, find_repeats
+from mahos.msgs.inst.pg_msgs import Block, Blocks
+
+CHANNELS = {"laser": 0, "sync": 1, "mw": 2, "mw_n": 3}
+
+
+class FakeDLL(object):
+    """Records the instructions instead of programming PulseBlaster."""
+
+    def __init__(self):
+        self.insts = []
+
+    def pb_inst_pbonly(self, output, inst, inst_data, duration_ns):
+        self.insts.append((output, inst, inst_data, duration_ns.value))
+        return len(self.insts) - 1
+
+    def pb_start_programming(self, target):
+        return 0
+
+    def pb_stop_programming(self):
+        return 0
+
+    def pb_stop(self):
+        return 0
+
+    def pb_reset(self):
+        return 0
+
+    def pb_close(self):
+        return 0
+
+
+def make_pulse_blaster(conf: dict):
+    """PulseBlaster with FakeDLL."""
+
+    pb_module = pytest.importorskip("mahos.inst.pg.pulse_blaster")
+
+    class FakePulseBlaster(pb_module.SpinCore_PulseBlasterESR_PRO):
+        def __init__(self, conf):
+            Instrument.__init__(self, "pb", conf)
+            self.CHANNELS = CHANNELS
+            self.dll = FakeDLL()
+            self.length = 0
+            self.offsets = None
+            self._freq = 500.0e6
+            self._min_duration_ns = 10
+            self._max_instructions = conf.get("max_instructions", 4096)
+            self._max_loop_num = 1_048_576
+            self._verbose = False
+            self._sanity_check = True
+            self._compress = conf.get("compress", False)
+            self._last_addr = 0
+
+    return FakePulseBlaster(conf)
+
+
+def run_program(insts) -> list[tuple[int, int]]:
+    """Run the program until BRANCH and return merged (output, duration_ns) list."""
+
+    counters = {}
+    out = []
+    addr = 0
+    while True:
+        output, inst, data, dur = insts[addr]
+        if out and out[-1][0] == output:
+            out[-1] = (output, out[-1][1] + dur)
+        else:
+            out.append((output, dur))
+        if inst == 0:  # CONTINUE
+            addr += 1
+        elif inst == 2:  # LOOP
+            counters.setdefault(addr, data)
+            addr += 1
+        elif inst == 3:  # END_LOOP
+            counters[data] -= 1
+            if counters[data]:
+                addr = data
+            else:
+                del counters[data]
+                addr += 1
+        elif inst == 6:  # BRANCH
+            return out
+        else:
+            raise ValueError(f"unexpected instruction {inst}")
+
+
+def expected_output(pb, blocks: Blocks[Block]) -> list[tuple[int, int]]:
+    out = []
+    for channels, duration in blocks.collapse().pattern:
+        output = pb.channels_to_output(channels)
+        dur = duration * 2
+        if out and out[-1][0] == output:
+            out[-1] = (output, out[-1][1] + dur)
+        else:
+            out.append((output, dur))
+    return out
+
+
+def make_xy_blocks(num: int, Npi: int) -> Blocks[Block]:
+    blocks = []
+    for i in range(num):
+        tau = 50 + 10 * i
+        for name, last in (("normal", "mw"), ("flip", "mw_n")):
+            pattern = [(("laser", "sync"), 1500), (None, 500), (last, 25)]
+            pattern += [(None, tau), ("mw", 50), (None, tau)] * Npi
+            pattern += [(last, 25), (None, 100)]
+            blocks.append(Block(f"{name}{i}", pattern))
+    # same measurement repeated
+    return Blocks(blocks * 4)
+
+
+def test_find_repeats():
+    assert find_repeats(list("abcabcabcd")) == [(0, 3, 3), (9, 1, 1)]
+    assert find_repeats(list("xaaaay")) == [(0, 1, 1), (1, 1, 4), (5, 1, 1)]
+    assert find_repeats(list("abcd")) == [(0, 4, 1)]
+    assert find_repeats(list("abab"), min_period=3) == [(0, 4, 1)]
+    assert find_repeats([]) == []
+
+
+def test_compress_blocks():
+    blocks = make_xy_blocks(3, 16)
+    bs = compress_blocks(blocks)
+    assert bs.equivalent(blocks)
+    assert bs.total_length() == blocks.total_length()
+    assert estimate_instructions(bs) * 10 < sum(b.total_pattern_num() for b in blocks)
+    assert bs.nest_depth() <= 8
+
+    blocks = Blocks([Block("a", [("mw", 10)], Nrep=3, trigger=True), Block("b", [(None, 10)])])
+    bs = compress_blocks(blocks)
+    assert bs.trigger
+    assert bs.equivalent(blocks)
+    # loop of single pulse is merged into long pulse.
+    assert bs.data[0].pattern == [(("mw",), 30)] and bs.data[0].Nrep == 1
+
+
+@pytest.mark.parametrize("compress", (False, True))
+def test_pulse_blaster_program(compress):
+    pb = make_pulse_blaster({"compress": compress})
+    blocks = make_xy_blocks(2, 8)
+    assert pb.configure_blocks(blocks, 500.0e6)
+    assert pb.get("length") == blocks.total_length()
+    assert run_program(pb.dll.insts) == expected_output(pb, blocks)
+    if compress:
+        assert len(pb.dll.insts) < sum(b.raw_pattern_num() for b in blocks) // 4
+
+
+def test_pulse_blaster_auto_compress():
+    blocks = make_xy_blocks(4, 32)
+    assert sum(b.raw_pattern_num() for b in blocks) > 1000
+
+    pb = make_pulse_blaster({"max_instructions": 1000})
+    assert pb.configure_blocks(blocks, 500.0e6)
+    assert len(pb.dll.insts) < 1000
+    assert run_program(pb.dll.insts) == expected_output(pb, blocks)
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+
+"""
+Tests for mahos.inst.pg_core.pulse_streamer_core.
+
+.. This file is a part of MAHOS project, which is released under the 3-Clause BSD license.
+.. See included LICENSE file or https://github.com/ToyotaCRDL/mahos/blob/main/LICENSE for details.
+
+"""
+
+import numpy as np
+
+from mahos.inst.mock import PulseStreamer_mock
+from mahos.inst.pg_core.pulse_streamer_core import merge_runs
+from mahos.msgs.inst.pg_msgs import Block, Blocks
+from mahos.msgs.inst.pg_msgs import AnalogChannel as A
+
+CHANNELS = {"laser": 0, "sync": 1, "mw": 2, "gate": 3}
+
+
+def make_ps(**conf):
+    return PulseStreamer_mock("ps", {"resource": "mock", "channels": CHANNELS, **conf})
+
+
+def expand(rle):
+    durations, levels = rle
+    return np.repeat(levels, durations)
+
+
+def make_blocks():
+    return Blocks(
+        [
+            Block("init", [(("laser", "sync"), 100), (None, 20), ("mw", 0), (None, 40)]),
+            Block("dd", [("mw", 8), (None, 16), ("mw", 8)], Nrep=10),
+            Block("read", [(("laser", "gate"), 120), (None, 8)], Nrep=2),
+        ]
+    )
+
+
+def test_merge_runs():
+    d, l = merge_runs(np.array([1, 2, 3, 4, 5]), np.array([0, 0, 1, 1, 0]))
+    np.testing.assert_array_equal(d, [3, 7, 5])
+    np.testing.assert_array_equal(l, [0, 1, 0])
+    d, l = merge_runs(np.array([], dtype=np.int64), np.array([], dtype=np.int64))
+    assert len(d) == len(l) == 0
+
+
+def test_generate_rle_digital():
+    ps = make_ps()
+    blocks = make_blocks()
+    digital, analog = ps._generate_rle_blocks(blocks)
+    assert analog == []
+    assert sorted(digital.keys()) == [0, 1, 2, 3]
+    for name, ch in CHANNELS.items():
+        np.testing.assert_array_equal(expand(digital[ch]), blocks.decode_digital(name))
+        # adjacent runs are merged
+        assert np.all(np.diff(digital[ch][1]) != 0)
+    # mw pulses separated by zero-duration step and repeated block boundaries are merged
+    np.testing.assert_array_equal(digital[2][0][:4], [160, 8, 16, 16])
+
+    assert ps.configure_blocks(blocks, 1e9)
+    assert ps.get("length") == blocks.total_length()
+
+
+def test_generate_rle_analog():
+    ps = make_ps(analog={"channels": ["a0", "a1"]})
+    blocks = Blocks(
+        [
+            Block("b0", [((A("a0", 0.5), "mw"), 10), ((A("a0", 0.5), A("a1", -0.5)), 6)]),
+            Block("b1", [("laser", 8), (None, 8)], Nrep=3),
+        ]
+    )
+    digital, (a0, a1) = ps._generate_rle_blocks(blocks)
+    np.testing.assert_array_equal(expand(a0), blocks.decode_analog("a0"))
+    np.testing.assert_array_equal(expand(a1), blocks.decode_analog("a1"))
+    np.testing.assert_array_equal(expand(digital[2]), blocks.decode_digital("mw"))
+
+    # sparse D/A conversion of digital patterns
+    values = {"00": [0.0, 0.0], "01": [0.0, 1.0], "10": [1.0, 0.0], "11": [1.0, 1.0]}
+    ps = make_ps(analog={"channels": ["i", "q"], "values": values})
+    blocks = Blocks([Block("iq", [("i", 8), (("i", "q"), 8), ("laser", 16)], Nrep=2)])
+    digital, (a0, a1) = ps._generate_rle_blocks(blocks)
+    assert sorted(digital.keys()) == [0]
+    np.testing.assert_array_equal(expand(a0), [1.0] * 16 + [0.0] * 16 + [1.0] * 16 + [0.0] * 16)
+    np.testing.assert_array_equal(a1[0], [8, 8, 24, 8, 16])
@@ -8,14 +8,25 @@ Tests for mahos.inst.server.
 
 """
 
+import time
+
 import pytest
 import networkx as nx
 
 from mahos_dq.msgs.confocal_msgs import Axis
 from mahos_dq.inst.overlay.confocal_scanner_mock import DUMMY_CAPABILITY
-from mahos.inst.server import OverlayConf
+from mahos.inst.server import OverlayConf, Locks, ParamDictCache, InstrumentClient
+from mahos.msgs import param_msgs as P
 
-from fixtures import ctx, gconf, server_2clients
+from fixtures import (
+    ctx,
+    gconf,
+    server_conf,
+    server_2clients,
+    server_init_workers,
+    server_shm_2clients,
+    server_name,
+)
 
 
 def test_overlay_conf():
@@ -160,3 +171,150 @@ def test_overlay(server_2clients):
     assert client.release("scanner")
     assert client2.get("scanner", "capability") == DUMMY_CAPABILITY
     assert client2.set("piezo", "target", {"ax": Axis.X, "pos": 5.6})
+
+
+def test_init_workers(server_init_workers, server_conf):
+    client = server_init_workers
+
+    client.wait()
+    # all the instruments and overlays are initialized concurrently
+    for key in ("instrument", "instrument_overlay"):
+        for inst, c in server_conf[key].items():
+            assert client.class_name(inst) == c["class"]
+    assert client.set("sg", "output", True)
+
+
+def test_shm(server_shm_2clients):
+    client, client2 = server_shm_2clients
+
+    client.wait()
+    # camera is configured to use shared memory by the fixture
+    assert client._use_shm("camera")
+    assert not client._use_shm("sg")
+
+    assert client.lock("camera")
+    assert client.configure("camera", {"exposure_time": 0.01}, label="continuous")
+    assert client.start("camera")
+
+    # keep more frames alive than the slots: overflowed frames are copied instead
+    frames = [client.get("camera", "frame") for _ in range(6)]
+    for res in frames:
+        assert not res.is_empty()
+        assert res.frame.shape == (450, 800)
+    # the first frame is a view of shared memory
+    assert not frames[0].frame.flags.owndata
+    assert client.stop("camera")
+    assert client.release("camera")
+
+
+def test_no_shm(server_2clients):
+    client, client2 = server_2clients
+
+    client.wait()
+    # shared memory is not used by default
+    assert not client._use_shm("camera")
+
+    assert client.lock("camera")
+    assert client.configure("camera", {"exposure_time": 0.01}, label="continuous")
+    assert client.start("camera")
+    res = client.get("camera", "frame")
+    assert not res.is_empty()
+    assert res.frame.shape == (450, 800)
+    assert client.stop("camera")
+    assert client.release("camera")
+
+
+def test_param_dict_cache():
+    locks = Locks(["i1", "i2", "i3"])
+    locks.add_overlay("o1", ["i1", "i2"])
+    locks.add_overlay("o2", ["i2"])
+    cache = ParamDictCache(locks)
+
+    assert cache.related("i1") == {"i1", "o1"}
+    assert cache.related("i2") == {"i2", "o1", "o2"}
+    assert cache.related("o2") == {"i2", "o1", "o2"}
+    assert cache.related("i3") == {"i3"}
+
+    pd = P.ParamDict(a=P.IntParam(1))
+    for inst in ("i1", "i3", "o2"):
+        cache.put(inst, "", pd)
+    cache.put_labels("i1", ["", "x"])
+    # stored by copy
+    pd["a"].set(2)
+    assert cache.get("i1", "").unwrap() == {"a": 1}
+    assert cache.get("i1", "x") is None
+    assert cache.get_labels("i1") == ["", "x"]
+
+    assert cache.invalidate("i2") == ["o2"]
+    assert cache.get("o2", "") is None
+    assert cache.get("i1", "") is not None
+    assert cache.invalidate("o1") == ["i1"]
+    assert cache.get("i1", "") is None
+    assert cache.get_labels("i1") is None
+    assert cache.invalidate("o1") == []
+    assert cache.get("i3", "") is not None
+
+    cache = ParamDictCache(locks, enable=False)
+    cache.put("i1", "", pd)
+    assert cache.get("i1", "") is None
+    assert cache.invalidate("i1") == ["i1"]
+
+    # per-instrument opt-out, also applied to the overlays referencing it
+    cache = ParamDictCache(locks, uncached=["i1"])
+    assert cache.uncached == {"i1", "o1"}
+    for inst in ("i1", "o1", "i2", "o2"):
+        cache.put(inst, "", pd)
+    cache.put_labels("i1", ["", "x"])
+    assert cache.get("i1", "") is None
+    assert cache.get("o1", "") is None
+    assert cache.get_labels("i1") is None
+    assert cache.get("i2", "") is not None
+    assert cache.get("o2", "") is not None
+    assert cache.invalidate("i1") == ["i1", "o1"]
+
+
+def test_param_dict(gconf, server_2clients):
+    client, client2 = server_2clients
+    changes = []
+    client3 = InstrumentClient(gconf, server_name, param_dict_handler=changes.append)
+
+    client.wait()
+    client3.wait()
+
+    assert client.get_param_dict_labels("paramX") == ["labelA", "labelB"]
+    pdA = client.get_param_dict("paramX", "labelA")
+    assert pdA["paramA"].value() == 3
+
+    pds = client.get_param_dicts([("paramX", "labelA"), ("paramY", "labelB"), ("paramZ", "")])
+    assert P.isclose(pds[0], pdA)
+    assert pds[1]["paramC"].value() == "aaa"
+    assert pds[2] is None
+    assert client.get_param_dicts([]) == []
+
+    # cached value is invalidated by configure()
+    for i in range(100):
+        # retry as the subscription of client3 may not be established yet
+        assert client.configure("paramX", {"paramA": 5, "paramB": 0.1}, label="labelA")
+        assert client2.get_param_dict("paramX", "labelA")["paramA"].value() == 5
+        time.sleep(0.05)
+        if changes:
+            break
+    assert changes[0].insts == ["paramX"]
+
+    # lock is respected even if the value is cached
+    assert client.lock("paramX")
+    assert client2.get_param_dict("paramX", "labelA") is None
+    assert client2.get_param_dicts([("paramX", "labelA")]) == [None]
+    assert client.get_param_dict("paramX", "labelA")["paramA"].value() == 5
+    assert client.release("paramX")
+
+    # refresh bypasses the cache
+    reads = client.get("paramX", "reads")
+    assert client.get_param_dict("paramX", "labelA")["paramA"].value() == 5
+    assert client.get_param_dicts([("paramX", "labelA")])[0] is not None
+    assert client.get("paramX", "reads") == reads
+    assert client.get_param_dict("paramX", "labelA", refresh=True)["paramA"].value() == 5
+    assert client.get_param_dicts([("paramX", "labelA")], refresh=True)[0] is not None
+    assert client.get("paramX", "reads") == reads + 2
+
+    client3.close()
@@ -13,7 +13,12 @@ from __future__ import annotations
 import numpy as np
 import pytest
 
-from mahos.inst.tdc_core import TDCBase
+from mahos.inst.tdc_core import TDCBase, PhotonEventSimulator, Correlator, correlate
+from mahos.inst.tdc_core.event_sim import remove_dead_time
+from mahos.msgs.inst.tdc_msgs import RawEvents
+from mahos.util.io import save_h5, load_h5
+from mahos.node.log import DummyLogger
+from mahos.msgs.inst.pg_msgs import Block, Blocks
 
 
 class DummyTDC(TDCBase):
@@ -66,3 +71,239 @@ def test_get_data_roi_no_data():
     inst = DummyTDC(None)
 
     assert inst.get_data_roi(0, [(0, 3)]) is None
+
+
+def _sim_blocks(freq: float, mw_width: float = 0.0) -> Blocks:
+    mw = int(round(mw_width * freq))
+    pattern = [(None, 1000), ("laser", 3000), (None, 1000)]
+    if mw:
+        pattern.append(("mw", mw))
+    pattern.append((None, 5000 - mw))
+    return Blocks([Block("sim", pattern)])
+
+
+def test_remove_dead_time():
+    events = np.array([0, 3, 5, 6, 20, 21, 40], dtype=np.uint64)
+    np.testing.assert_array_equal(remove_dead_time(events, 5), [0, 5, 20, 40])
+    np.testing.assert_array_equal(remove_dead_time(events, 5, last=-3), [3, 20, 40])
+
+
+def test_event_simulator_reproducible():
+    freq = 1.0e9
+    sim0 = PhotonEventSimulator(_sim_blocks(freq), freq, tbin=1e-9, seed=1)
+    sim1 = PhotonEventSimulator(_sim_blocks(freq), freq, tbin=1e-9, seed=1)
+    assert sim0.period == pytest.approx(10e-6)
+    ev0 = sim0.events(0.01, chunk_periods=100)
+    ev1 = np.concatenate(list(sim1.iter_chunks(0.01, chunk_periods=100)))
+    np.testing.assert_array_equal(ev0, ev1)
+
+    assert ev0.dtype == np.uint64
+    assert np.all(np.diff(ev0.astype(np.int64)) >= 0)
+    # count rate 1e6 during laser (3 us) in 1000 periods: 3000 on average
+    assert 2500 < len(ev0) < 3500
+    # photons only in laser windows
+    t = np.mod(ev0, 10000)
+    assert np.all((t >= 1000) & (t < 4000))
+
+
+def test_event_simulator_dead_time_contrast():
+    freq = 1.0e9
+    sim = PhotonEventSimulator(
+        _sim_blocks(freq), freq, tbin=1e-9, count_rate=1e8, dead_time=50e-9, seed=0
+    )
+    ev = sim.events(1e-3).astype(np.int64)
+    assert np.all(np.diff(ev) >= 50)
+
+    # pi pulse (50 ns at 10 MHz Rabi) reduces counts in readout window.
+    n = 2000
+    hist_bright = PhotonEventSimulator(
+        _sim_blocks(freq), freq, tbin=1e-9, count_rate=1e7, contrast=0.3, seed=0
+    ).histogram(n * 10e-6, 10000)
+    hist_dark = PhotonEventSimulator(
+        _sim_blocks(freq, 50e-9), freq, tbin=1e-9, count_rate=1e7, contrast=0.3, seed=0
+    ).histogram(n * 10e-6, 10000)
+    ratio = hist_dark[1000:1300].sum() / hist_bright[1000:1300].sum()
+    assert ratio == pytest.approx(0.7, abs=0.05)
+    ratio = hist_dark[2000:4000].sum() / hist_bright[2000:4000].sum()
+    assert ratio == pytest.approx(1.0, abs=0.05)
+
+
+def test_event_simulator_save_h5(tmp_path):
+    from mahos.msgs.inst.tdc_msgs import RawEvents
+    from mahos.node.log import DummyLogger
+    from mahos.util.io import load_h5
+
+    freq = 1.0e9
+    sim = PhotonEventSimulator(_sim_blocks(freq), freq, seed=2)
+    fn = str(tmp_path / "events.h5")
+    num = sim.save_h5(fn, 0.01, chunk_periods=100)
+    sim.reset()
+    sim.rng = np.random.default_rng(2)
+    expected = sim.events(0.01, chunk_periods=100)
+    data = load_h5(fn, RawEvents, DummyLogger())
+    assert num == len(expected)
+    np.testing.assert_array_equal(data.data, expected)
+
+
+def test_tdc_mock_simulator():
+    from mahos.inst.mock import TDC_mock
+
+    tdc = TDC_mock("tdc", conf={"simulator": {"freq": 1.0e9, "run_length": 0.01, "seed": 0}})
+    assert tdc.configure({"range": 10e-6, "bin": 1e-9}, label="histogram")
+    assert tdc.start()
+    tdc._tstart -= 0.01  # pretend 10 ms has elapsed
+    hist = tdc.get_data(0)
+    assert hist.shape == (10000,)
+    assert hist[:3000].sum() > 0 and hist[3000:].sum() == 0
+    assert tdc.stop()
+
+    raw = tdc.get_raw_events()
+    assert 2500 < len(raw.data) < 3500
+
+    assert tdc.set("simulator", None)
+    assert len(tdc.get_raw_events().data) == 1_000_000
+
+
+def test_tdc_mock_simulator_before_start():
+    from mahos.inst.mock import TDC_mock
+
+    tdc = TDC_mock("tdc")
+    assert tdc.set("simulator", {})
+    # histogram is available before start()
+    hist = tdc.get_data(0)
+    assert hist.shape == (10,)
+    assert hist.dtype == np.uint64
+
+    # range is changed while running
+    assert tdc.start()
+    assert tdc.configure({"range": 10e-6, "bin": 1e-9}, label="histogram")
+    tdc._tstart -= 0.01  # pretend 10 ms has elapsed
+    assert tdc.get_data(0).shape == (10000,)
+    assert tdc.stop()
+
+
+def test_tdc_mock_raw_events_chunk():
+    from mahos.inst.mock import TDC_mock
+
+    tdc = TDC_mock("tdc", conf={"simulator": {"freq": 1.0e9, "seed": 0}})
+    assert tdc.configure({"base_config": "", "save_file": "", "stream": True}, "raw_events")
+    assert tdc.start()
+    chunks = []
+    for i in range(3):
+        tdc._tstart -= 0.01  # pretend 10 ms has elapsed
+        chunks.append(tdc.get("raw_events_chunk").data)
+    assert tdc.stop()
+    chunks.append(tdc.get("raw_events_chunk", True).data)
+
+    events = np.concatenate(chunks)
+    assert np.all(np.diff(events.astype(np.int64)) >= 0)
+    assert all(len(c) for c in chunks[:3])
+    # events are generated for the elapsed periods (10 us each)
+    num = tdc._chunk_periods
+    assert num >= 3000
+    assert 2.5 * num < len(events) < 3.5 * num
+    assert events[-1] < num * 10e-6 / tdc._bin
+
+
+def _brute_full(start, stop, window, binwidth):
+    n = window // binwidth
+    dt = (stop[np.newaxis, :].astype(np.int64) - start[:, np.newaxis].astype(np.int64)).ravel()
+    dt = dt[np.abs(dt) <= window]
+    k = np.floor_divide(dt + binwidth // 2, binwidth) + n
+    k = k[(k >= 0) & (k <= 2 * n)]
+    return np.bincount(k, minlength=2 * n + 1)
+
+
+def _brute_start_stop(start, stop, window, binwidth):
+    n = window // binwidth
+    hist = np.zeros(n + 1, dtype=np.int64)
+    for j, a in enumerate(start):
+        i = np.searchsorted(stop, a)
+        if i == len(stop) or (j + 1 < len(start) and stop[i] >= start[j + 1]):
+            continue
+        dt = int(stop[i]) - int(a)
+        k = (dt + binwidth // 2) // binwidth
+        if dt <= window and k <= n:
+            hist[k] += 1
+    return hist
+
+
+@pytest.mark.parametrize("mode", ["full", "start_stop"])
+def test_correlator(mode):
+    rng = np.random.default_rng(1)
+    start = np.sort(rng.integers(0, 100_000, 1500)).astype(np.uint64)
+    stop = np.sort(rng.integers(0, 100_000, 1500)).astype(np.uint64)
+    window, binwidth = 300, 7
+    brute = _brute_full if mode == "full" else _brute_start_stop
+    expected = brute(start, stop, window, binwidth)
+
+    delays, hist = correlate(start, stop, window, binwidth, mode)
+    assert len(delays) == len(hist)
+    assert delays[-1] == (window // binwidth) * binwidth
+    np.testing.assert_array_equal(hist, expected)
+
+    # incremental: the result doesn't depend on chunking.
+    for until in (False, True):
+        c = Correlator(window, binwidth, mode, block=64)
+        edges = np.concatenate(([0], np.sort(rng.integers(0, 100_000, 30)), [100_001]))
+        for lo, hi in zip(edges[:-1], edges[1:]):
+            c.add(
+                start[(start >= lo) & (start < hi)],
+                stop[(stop >= lo) & (stop < hi)],
+                until=int(hi) if until else None,
+            )
+            # only the events near the head are retained.
+            assert len(c._start) + len(c._stop) < 100
+        c.finalize()
+        np.testing.assert_array_equal(c.hist, expected)
+        assert c.starts == len(start) and c.stops == len(stop)
+
+
+@pytest.mark.parametrize("mode", ["full", "start_stop"])
+def test_correlator_skewed_chunks(mode):
+    c = Correlator(20, 1, mode)
+    c.add([0, 10], [])
+    c.add([], [5])
+    c.finalize()
+    np.testing.assert_array_equal(c.hist, correlate([0, 10], [5], 20, 1, mode)[1])
+
+    # chunks of start and stop channels are split independently.
+    rng = np.random.default_rng(3)
+    for _ in range(200):
+        start = np.sort(rng.integers(0, 1000, rng.integers(0, 60)))
+        stop = np.sort(rng.integers(0, 1000, rng.integers(0, 60)))
+        expected = correlate(start, stop, 50, 3, mode)[1]
+
+        start_chunks = np.split(start, np.sort(rng.integers(0, len(start) + 1, 4)))
+        stop_chunks = np.split(stop, np.sort(rng.integers(0, len(stop) + 1, 4)))
+        c = Correlator(50, 3, mode)
+        for a, b in zip(start_chunks, stop_chunks):
+            c.add(a, b)
+        c.finalize()
+        np.testing.assert_array_equal(c.hist, expected)
+
+
+def test_correlator_normalized():
+    rng = np.random.default_rng(2)
+    duration = 10_000_000
+    start = np.sort(rng.integers(0, duration, 20_000))
+    stop = np.sort(rng.integers(0, duration, 20_000))
+    c = Correlator(1000, 100)
+    c.add(start, stop)
+    # g2 of uncorrelated sources is unity.
+    assert np.abs(np.mean(c.normalized(duration)) - 1.0) < 0.05
+
+
+def test_raw_events_channels(tmp_path):
+    logger = DummyLogger()
+    data = np.array([1, 3, 4, 8], dtype=np.uint64)
+    ev = RawEvents(data, np.array([0, 1, 0, 1], dtype=np.uint8))
+    fn = str(tmp_path / "raw_events.h5")
+    assert save_h5(fn, ev, RawEvents, logger)
+    ev = load_h5(fn, RawEvents, logger)
+    np.testing.assert_array_equal(ev.get_channel_data(1), [3, 8])
+
+    ev = RawEvents(data)
+    assert not ev.has_channels()
+    with pytest.raises(ValueError):
+        ev.get_channel_data(0)
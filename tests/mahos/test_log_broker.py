@@ -107,3 +107,165 @@ def test_log(log_broker, dummy_logging):
     n = int(log_bodies[0][:-1])
     assert log_bodies == [str(i) + "\n" for i in range(n, n + N)]
     assert log_broker.pop_log()[-1] == log_bodies[0]
+
+
+def test_log_store(tmp_path):
+    from mahos.node.log_broker import LogStore, LogEntry
+
+    store = LogStore(str(tmp_path), rotation_sec=100.0, keep=2)
+    t0 = 1.7e9
+    entries = [
+        LogEntry("ts0", "DEBUG", "localhost", "a", "", "msg0\n"),
+        LogEntry("ts1", "INFO", "localhost", "b", "topic", "msg1\n"),
+        LogEntry("ts2", "ERROR", "localhost", "a", "", "msg2\nwith\ttab\n"),
+        LogEntry("ts3", "WARNING", "localhost", "b", "", "msg3\n"),
+    ]
+    for i, e in enumerate(entries):
+        store.write(e, t0 + i * 60.0)
+    store.close()
+
+    # rotated at t0 + 120.0
+    assert len(LogStore.list_segments(str(tmp_path))) == 2
+
+    logs = LogStore.query(str(tmp_path))
+    assert [l for _, l in logs] == entries
+    assert [t for t, _ in logs] == [t0 + i * 60.0 for i in range(4)]
+
+    logs = LogStore.query(str(tmp_path), level="INFO")
+    assert [l for _, l in logs] == entries[1:]
+    logs = LogStore.query(str(tmp_path), names=["localhost::a"])
+    assert [l for _, l in logs] == [entries[0], entries[2]]
+    logs = LogStore.query(str(tmp_path), since=t0 + 30.0, until=t0 + 150.0, names=["b"])
+    assert [l for _, l in logs] == [entries[1]]
+
+    # old segment is removed on rotation
+    store = LogStore(str(tmp_path), rotation_sec=100.0, keep=2)
+    store.write(entries[0], t0 + 500.0)
+    store.close()
+    assert len(LogStore.list_segments(str(tmp_path))) == 2
+    logs = LogStore.query(str(tmp_path))
+    assert [l for _, l in logs] == entries[2:] + entries[:1]
+
+
+def test_queue_pub_handler():
+    import logging
+    import zmq
+    from mahos.node.log import QueuePUBHandler
+    from mahos.node.log_broker import parse_log
+
+    ctx = zmq.Context()
+    sub = ctx.socket(zmq.SUB)
+    sub.setsockopt(zmq.SUBSCRIBE, b"")
+    sub.setsockopt(zmq.RCVTIMEO, 3000)
+    sub.bind("inproc://test_queue_pub_handler")
+
+    handler = QueuePUBHandler(
+        ctx, "inproc://test_queue_pub_handler", linger_ms=1000, root_topic="host::node"
+    )
+    logger = logging.getLogger("test_queue_pub_handler")
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+    # wait for the subscription to be propagated.
+    # poll() is used instead of sleep() to let SUB socket process commands.
+    sub.poll(200)
+
+    N = 50
+    for i in range(N):
+        logger.info("topic->%d", i)
+    handler.close()
+
+    logs = [parse_log(sub.recv_multipart()) for _ in range(N)]
+    assert [l.body for l in logs] == [f"{i}\n" for i in range(N)]
+    assert all(
+        (l.host, l.name, l.level, l.topic) == ("host", "node", "INFO", "topic") for l in logs
+    )
+    assert handler.dropped() == 0
+
+    logger.removeHandler(handler)
+    sub.close()
+    ctx.term()
+
+
+def test_queue_pub_handler_keeps_record():
+    """QueuePUBHandler doesn't modify the record passed to the other handlers."""
+
+    import logging
+    import zmq
+    from mahos.node.log import QueuePUBHandler
+    from mahos.node.log_broker import parse_log
+
+    class RecordHandler(logging.Handler):
+        def __init__(self):
+            logging.Handler.__init__(self)
+            self.records = []
+
+        def emit(self, record):
+            self.records.append(record)
+
+    ctx = zmq.Context()
+    sub = ctx.socket(zmq.SUB)
+    sub.setsockopt(zmq.SUBSCRIBE, b"")
+    sub.setsockopt(zmq.RCVTIMEO, 3000)
+    sub.bind("inproc://test_queue_pub_handler_keeps_record")
+
+    handler = QueuePUBHandler(
+        ctx,
+        "inproc://test_queue_pub_handler_keeps_record",
+        linger_ms=1000,
+        root_topic="host::node",
+    )
+    rec_handler = RecordHandler()
+    logger = logging.getLogger("test_queue_pub_handler_keeps_record")
+    logger.setLevel(logging.DEBUG)
+    logger.addHandler(handler)
+    logger.addHandler(rec_handler)
+    sub.poll(200)
+
+    try:
+        raise ValueError("test error")
+    except ValueError:
+        logger.exception("failed %s", "here")
+    handler.close()
+
+    log = parse_log(sub.recv_multipart())
+    assert log.body.startswith("failed here")
+    assert "ValueError: test error" in log.body
+
+    (record,) = rec_handler.records
+    assert record.msg == "failed %s"
+    assert record.args == ("here",)
+    assert record.exc_info is not None and record.exc_info[0] is ValueError
+
+    logger.removeHandler(handler)
+    logger.removeHandler(rec_handler)
+    sub.close()
+    ctx.term()
+
+
+def test_log_queue_store(ctx, gconf, tmp_path):
+    from fixtures import DummyLoggingNode, stop_proc, log_name, dummy_name as dummy_joined_name
+    from mahos.node.node import local_conf, start_node_proc
+    from mahos.node.log_broker import LogClient, LogStore
+
+    local_conf(gconf, log_name).update({"store": True, "store_dir": str(tmp_path)})
+    local_conf(gconf, dummy_joined_name)["log_queue"] = True
+    N = 10
+
+    broker_proc, broker_ev = start_node_proc(ctx, LogBroker, gconf, log_name)
+    client = LogClient(gconf, log_name)
+    dummy_proc, dummy_ev = start_node_proc(ctx, DummyLoggingNode, gconf, dummy_joined_name)
+    try:
+        for i in range(1000):
+            logs = pick_dummy_logs(client.get_logs())
+            if len(logs) >= N:
+                break
+            time.sleep(dummy_interval_sec)
+        assert len(logs) >= N
+    finally:
+        stop_proc(dummy_proc, dummy_ev)
+        client.close()
+        stop_proc(broker_proc, broker_ev)
+
+    stored = [l for _, l in LogStore.query(str(tmp_path), names=["dummy"])]
+    assert len(stored) >= N
+    assert pick_bodies(stored[:N]) == pick_bodies(logs[:N])
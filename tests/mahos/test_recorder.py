@@ -8,7 +8,14 @@ Tests for Recorder.
 
 """
 
+import pickle
+
+import numpy as np
+import h5py
+import pytest
+
 from mahos.meas.recorder import RecorderClient, RecorderIO
+from mahos.msgs.recorder_msgs import RecorderData, update_data
 from mahos.msgs.common_msgs import BinaryState
 from util import get_some, expect_value, save_load_test
 from fixtures import ctx, gconf, server, recorder, server_conf, recorder_conf
@@ -69,3 +76,101 @@ def test_recorder_channel_key_and_unit_conf(server, recorder, server_conf, recor
     assert channels["dmm1_ready"]["label"] == "ch1_dcv"
     assert channels["dmm1_ready"]["key"] == "opc"
     assert channels["dmm1_ready"]["unit"] == ""
+
+
+def test_recorder_data_ring_buffer():
+    data = RecorderData({"max_len": 5}, "test")
+    data.set_units([("a", "V"), ("b", ""), ("c", "A")])
+    assert not data.has_data()
+
+    for i in range(23):
+        y = {"a": float(i), "b": bool(i % 2)}
+        if i % 3:
+            y["c"] = i
+        data.append(0.1 * i, y)
+
+        n = min(i + 1, 5)
+        assert len(data) == n
+        np.testing.assert_allclose(data.get_xdata(), 0.1 * np.arange(i + 1 - n, i + 1))
+        np.testing.assert_array_equal(data.get_ydata("a"), np.arange(i + 1 - n, i + 1))
+    # capacity is bounded by twice of max_len
+    assert len(data.xdata) <= 10
+    assert data.get_ydata("b").dtype.kind == "b"
+    np.testing.assert_array_equal(data.get_ydata("b"), [False, True, False, True, False])
+    c = data.get_ydata("c")
+    assert np.isnan(c[[0, 3]]).all()
+    np.testing.assert_array_equal(c[[1, 2, 4]], [19, 20, 22])
+
+    with pytest.raises(ValueError):
+        data.index("d")
+
+    loaded = pickle.loads(pickle.dumps(data))
+    assert len(loaded.xdata) == 5
+    np.testing.assert_array_equal(loaded.get_xdata(), data.get_xdata())
+    np.testing.assert_array_equal(loaded.get_ydata("b"), data.get_ydata("b"))
+    loaded.append(2.3, {"a": 23.0, "b": True, "c": 23})
+    np.testing.assert_array_equal(loaded.get_ydata("a"), np.arange(19, 24))
+
+    with h5py.File("recorder.h5", "w", driver="core", backing_store=False) as f:
+        data.to_h5(f)
+        loaded = RecorderData.of_h5(f)
+    np.testing.assert_array_equal(loaded.get_xdata(), data.get_xdata())
+    np.testing.assert_array_equal(loaded.get_ydata("a"), data.get_ydata("a"))
+
+
+def test_recorder_data_update_v1():
+    data = RecorderData({"max_len": 3}, "test")
+    data.set_version(1)
+    data.units = [["a", "V"]]
+    data.xdata = [0.0, 1.0]
+    data.data = [[2.0, 3.0]]
+    del data._channel_index, data._stop, data._len
+
+    data = update_data(data)
+    assert data.version() == 2
+    np.testing.assert_array_equal(data.get_ydata("a"), [2.0, 3.0])
+    data.append(2.0, {"a": 4.0})
+    data.append(3.0, {"a": 5.0})
+    np.testing.assert_array_equal(data.get_ydata("a"), [3.0, 4.0, 5.0])
+
+
+def test_recorder_data_downsample():
+    data = RecorderData()
+    data.set_units([("a", "V")])
+    y = np.zeros(1000)
+    y[123] = 10.0
+    y[456] = -10.0
+    for i, v in enumerate(y):
+        data.append(float(i), {"a": v})
+
+    x, yd = data.get_downsampled("a", 100)
+    assert len(x) == len(yd) <= 100
+    assert np.all(np.diff(x) >= 0)
+    assert yd.max() == 10.0 and yd.min() == -10.0
+    assert x[np.argmax(yd)] == 123.0 and x[np.argmin(yd)] == 456.0
+
+    x, yd = data.get_downsampled("a", 100, method="decimate")
+    assert len(x) == 100
+    np.testing.assert_array_equal(x, np.arange(0, 1000, 10))
+
+    x, yd = data.get_downsampled("a", 0)
+    assert len(x) == 1000
+
+
+def test_recorder_data_downsample_nan():
+    data = RecorderData()
+    data.set_units([("a", "V"), ("b", "V")])
+    for i in range(100):
+        # channel b is missing for the first half, and constant for the rest.
+        data.append(float(i), {"a": float(i)} if i < 50 else {"a": float(i), "b": 1.0})
+
+    x, yd = data.get_downsampled("b", 10)
+    assert not np.any(np.isnan(yd))
+    np.testing.assert_array_equal(yd, 1.0)
+    # 5 buckets of 20 samples: 2 all-NaN buckets are skipped,
+    # and a single point for each constant bucket
+    assert len(x) == len(np.unique(x)) == 3
+    assert x[0] >= 50.0
+
+    x, yd = data.get_downsampled("a", 10)
+    assert len(x) == 10
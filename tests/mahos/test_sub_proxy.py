@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+"""
+Tests for mahos.node.sub_proxy.
+
+.. This file is a part of MAHOS project, which is released under the 3-Clause BSD license.
+.. See included LICENSE file or https://github.com/ToyotaCRDL/mahos/blob/main/LICENSE for details.
+
+"""
+
+import threading
+
+from mahos.node.comm import Context
+from mahos.node.node import Node, sub_proxy_endpoints
+from mahos.node.sub_proxy import SubProxy
+
+gconf = {
+    "localhost": {
+        "up": {"pub_endpoint": "tcp://127.0.0.1:5592"},
+        "proxy": {
+            "poll_timeout_ms": 10,
+            "xpub_endpoints": {"localhost::up": "tcp://127.0.0.1:5593"},
+            "sndhwm": 100,
+        },
+        "sub": {"poll_timeout_ms": 10, "target": {"sub_proxy": "localhost::proxy"}},
+    }
+}
+
+
+def test_sub_proxy_endpoints():
+    assert sub_proxy_endpoints(gconf, "localhost::proxy") == {
+        "tcp://127.0.0.1:5592": "tcp://127.0.0.1:5593"
+    }
+
+
+def test_sub_proxy():
+    pub_ctx = Context()
+    pub = pub_ctx.add_pub("tcp://127.0.0.1:5592", b"data")
+
+    proxy = SubProxy(gconf, "localhost::proxy")
+    shutdown_ev = threading.Event()
+    th = threading.Thread(target=proxy.main_event, args=(shutdown_ev,))
+    th.start()
+
+    # the clients created with sub's context subscribe through the proxy
+    sub = Node(gconf, "localhost::sub")
+    assert sub.ctx.sub_endpoints == {"tcp://127.0.0.1:5592": "tcp://127.0.0.1:5593"}
+    ctxs = [Context(context=sub.ctx, poll_timeout_ms=10) for _ in range(3)]
+    received = [[] for _ in ctxs]
+    for ctx, r in zip(ctxs, received):
+        ctx.add_sub(gconf["localhost"]["up"]["pub_endpoint"], b"data", r.append)
+
+    for i in range(500):
+        pub.publish(i)
+        for ctx in ctxs:
+            ctx.poll()
+        if all(received):
+            break
+    assert all(received)
+
+    shutdown_ev.set()
+    th.join()
+    proxy.close()
+    for ctx in ctxs:
+        ctx.close()
+    sub.close()
+    pub_ctx.close()
@@ -8,6 +8,8 @@ Tests for Tweaker.
 
 """
 
+import time
+
 from util import get_some
 
 from fixtures import ctx, gconf, server, tweaker, tweaker_conf
@@ -43,3 +45,29 @@ def test_tweaker(server, tweaker, tweaker_conf):
     success, param_dicts_new = tweaker.read_all()
     assert success
     assert P.isclose(P.ParamDict(param_dicts), P.ParamDict(param_dicts_new))
+
+
+def test_tweaker_param_dict_cache(server, tweaker, tweaker_conf):
+    poll_timeout_ms = tweaker_conf["poll_timeout_ms"]
+
+    tweaker.wait()
+    get_some(tweaker.get_status, poll_timeout_ms)
+
+    assert tweaker.read_all()[0]
+    reads = server.get("paramX", "reads")
+    # served from the cache of the server
+    assert tweaker.read_all()[0]
+    assert tweaker.read("paramX::labelA") is not None
+    assert server.get("paramX", "reads") == reads
+
+    # ParamDictChanged makes tweaker re-read the ParamDicts
+    for i in range(100):
+        # retry as the subscription of tweaker may not be established yet
+        assert server.configure("paramX", {"paramA": 7, "paramB": 0.2}, label="labelA")
+        time.sleep(0.05)
+        if server.get("paramX", "reads") > reads:
+            break
+    assert server.get("paramX", "reads") > reads
+    success, param_dicts = tweaker.read_all()
+    assert success
+    assert param_dicts["paramX::labelA"]["paramA"].value() == 7
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+
+"""
+Tests for mahos.util.graph.
+
+.. This file is a part of MAHOS project, which is released under the 3-Clause BSD license.
+.. See included LICENSE file or https://github.com/ToyotaCRDL/mahos/blob/main/LICENSE for details.
+
+"""
+
+import threading
+import time
+
+import pytest
+import networkx as nx
+
+from mahos.util.graph import sort_dependency, run_dependency
+
+
+def test_sort_dependency():
+    assert sort_dependency({"a": ("b", "c"), "b": ("c",)}) == ["c", "b", "a"]
+    with pytest.raises(nx.NetworkXUnfeasible):
+        sort_dependency({"a": ("b",), "b": ("a",)})
+
+
+@pytest.mark.parametrize("max_workers", (1, 4))
+def test_run_dependency(max_workers):
+    # "x" is not in keys: considered resolved.
+    dep_dict = {"i1": (), "i2": (), "i3": ("x",), "o1": ("i1", "i2"), "o2": ("o1", "i3")}
+    lock = threading.Lock()
+    done = []
+    threads = set()
+
+    def func(n):
+        time.sleep(0.05 if n.startswith("i") else 0.0)
+        with lock:
+            assert all(d in done for d in dep_dict[n] if d in dep_dict)
+            done.append(n)
+            threads.add(threading.get_ident())
+        return n * 2
+
+    t0 = time.perf_counter()
+    results = run_dependency(dep_dict, func, max_workers=max_workers)
+    elapsed = time.perf_counter() - t0
+    assert results == {n: n * 2 for n in dep_dict}
+    assert sorted(done) == sorted(dep_dict)
+    if max_workers == 1:
+        assert threads == {threading.get_ident()}
+    else:
+        # independent ones run concurrently
+        assert elapsed < 0.12
+
+
+def test_run_dependency_error():
+    def func(n):
+        raise RuntimeError(n)
+
+    with pytest.raises(RuntimeError):
+        run_dependency({"a": (), "b": ("a",)}, func, max_workers=2)
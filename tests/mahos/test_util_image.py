@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+
+"""
+Tests for mahos.util.image.
+
+.. This file is a part of MAHOS project, which is released under the 3-Clause BSD license.
+.. See included LICENSE file or https://github.com/ToyotaCRDL/mahos/blob/main/LICENSE for details.
+
+"""
+
+import numpy as np
+import pytest
+
+from mahos.util.image import apply_binning, downsample
+
+
+def _binning_loop(data, binning):
+    H, W = data.shape[0] // binning, data.shape[1] // binning
+    new_data = np.zeros((H, W))
+    for i in range(H):
+        for j in range(W):
+            new_data[i, j] = np.mean(
+                data[i * binning : (i + 1) * binning, j * binning : (j + 1) * binning]
+            )
+    return new_data
+
+
+def test_apply_binning_2d():
+    rng = np.random.default_rng(0)
+    img = rng.random((12, 8))
+    for b in (1, 2, 4):
+        np.testing.assert_allclose(apply_binning(img, b), _binning_loop(img, b))
+
+
+def test_apply_binning_stack():
+    rng = np.random.default_rng(0)
+    stack = rng.integers(0, 1000, size=(5, 6, 9))
+    binned = apply_binning(stack, 3)
+    assert binned.shape == (5, 2, 3)
+    for img, b in zip(stack, binned):
+        np.testing.assert_allclose(b, _binning_loop(img, 3))
+
+
+def test_apply_binning_remainder():
+    img = np.arange(5 * 7, dtype=np.float64).reshape((5, 7))
+    with pytest.raises(ValueError):
+        apply_binning(img, 2)
+
+    cropped = apply_binning(img, 2, remainder="crop")
+    np.testing.assert_allclose(cropped, _binning_loop(img, 2))
+
+    padded = apply_binning(img, 2, remainder="pad")
+    assert padded.shape == (3, 4)
+    np.testing.assert_allclose(padded[:2, :3], cropped)
+    assert padded[2, 3] == img[4, 6]
+    assert padded[0, 3] == np.mean(img[0:2, 6])
+
+
+def test_apply_binning_dtype():
+    img = np.ones((4, 4), dtype=np.uint16)
+    assert apply_binning(img, 2).dtype == np.float64
+    assert apply_binning(img, 2, dtype=np.float32).dtype == np.float32
+    assert apply_binning(img, 2, remainder="pad", dtype=np.float32).dtype == np.float32
+
+
+def test_downsample():
+    img = np.zeros((3, 100, 60))
+    assert downsample(img, 50).shape == (3, 50, 30)
+    assert downsample(img, 30).shape == (3, 25, 15)
+    assert downsample(img, 200).shape == (3, 100, 60)
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+
+"""
+Tests for mahos.util.shm.
+
+.. This file is a part of MAHOS project, which is released under the 3-Clause BSD license.
+.. See included LICENSE file or https://github.com/ToyotaCRDL/mahos/blob/main/LICENSE for details.
+
+"""
+
+import gc
+import pickle
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from mahos.msgs.inst.camera_msgs import FrameResult
+from mahos.util.shm import (
+    SharedRingBuffer,
+    SharedRingReader,
+    SharedSlot,
+    is_local_endpoint,
+    pack_shared,
+    unpack_shared,
+)
+
+
+def test_is_local_endpoint():
+    assert is_local_endpoint("tcp://127.0.0.1:5555")
+    assert is_local_endpoint("tcp://localhost:5555")
+    assert is_local_endpoint("ipc:///tmp/mahos")
+    assert is_local_endpoint("inproc://log")
+    assert not is_local_endpoint("tcp://192.168.0.10:5555")
+    assert not is_local_endpoint("")
+
+
+def test_shared_ring_buffer():
+    ring = SharedRingBuffer(2, 1000)
+    reader = SharedRingReader()
+    try:
+        a = np.arange(100, dtype=np.float64)
+        slot = ring.append(a)
+        assert isinstance(slot, SharedSlot)
+        # descriptor is small and picklable
+        slot = pickle.loads(pickle.dumps(slot))
+        assert len(ring) == 1
+
+        v = reader.view(slot)
+        np.testing.assert_array_equal(v, a)
+        # the view is writable as the slot is owned by the reader
+        v[0] = -1.0
+
+        # views derived from the view keep the slot
+        sub = v[10:20]
+        del v
+        gc.collect()
+        assert len(ring) == 1
+        np.testing.assert_array_equal(sub, a[10:20])
+
+        slot2 = ring.append(a * 2)
+        assert ring.is_full()
+        # full: overflow is reported by None
+        assert ring.append(a) is None
+        # too large for a slot
+        assert ring.append(np.zeros(1000)) is None
+        assert ring.overflows() == 2
+
+        del sub
+        gc.collect()
+        assert len(ring) == 1
+        slot3 = ring.append(a * 3)
+        assert slot3 is not None and slot3.index == slot.index
+
+        np.testing.assert_array_equal(reader.view(slot2), a * 2)
+        gc.collect()
+        assert len(ring) == 1
+    finally:
+        reader.close()
+        ring.close()
+
+
+def test_shared_ring_buffer_reclaim():
+    ring = SharedRingBuffer(3, 1000, lease_sec=60.0)
+    reader = SharedRingReader()
+    try:
+        a = np.arange(100, dtype=np.float64)
+        # lost: never claimed by reader
+        lost = ring.append(a)
+        # held by this (alive) process
+        v = reader.view(ring.append(a * 2))
+        # held by exited process
+        dead = ring.append(a * 3)
+        proc = subprocess.Popen([sys.executable, "-c", "pass"])
+        proc.wait()
+        ring._holder[dead.index] = proc.pid
+        assert ring.is_full()
+
+        # the lost slot is kept within the lease
+        slot = ring.append(a)
+        assert slot is not None and slot.index == dead.index
+        assert ring.reclaims() == 1
+        assert ring.append(a) is None
+
+        ring.lease_sec = 0.01
+        time.sleep(0.02)
+        slot = ring.append(a)
+        assert slot is not None and slot.index == lost.index
+        # the view is intact
+        np.testing.assert_array_equal(v, a * 2)
+    finally:
+        del v
+        reader.close()
+        ring.close()
+
+
+def test_pack_shared():
+    ring = SharedRingBuffer(4, 10_000)
+    reader = SharedRingReader()
+    try:
+        a = np.arange(10)
+        packed = pack_shared([a, a + 1], ring)
+        assert all(isinstance(p, SharedSlot) for p in packed)
+        data = unpack_shared(pickle.loads(pickle.dumps(packed)), reader)
+        np.testing.assert_array_equal(data[1], a + 1)
+
+        res = FrameResult(frame=np.ones((10, 10)), count=3)
+        packed = pack_shared(res, ring)
+        assert isinstance(packed.frame, SharedSlot)
+        # original message is untouched
+        assert isinstance(res.frame, np.ndarray)
+        unpacked = unpack_shared(packed, reader)
+        assert unpacked.count == 3
+        np.testing.assert_array_equal(unpacked.frame, res.frame)
+
+        # arrays not fitting in the ring are passed as is
+        b = np.zeros(10_000)
+        v, overflow = pack_shared((b, True), ring)
+        assert v is b and overflow
+
+        assert pack_shared("value", ring) == "value"
+    finally:
+        del data, unpacked
+        reader.close()
+        ring.close()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+"""
+Tests for mahos.inst.visa_instrument using pyvisa-sim.
+
+.. This file is a part of MAHOS project, which is released under the 3-Clause BSD license.
+.. See included LICENSE file or https://github.com/ToyotaCRDL/mahos/blob/main/LICENSE for details.
+
+"""
+
+import os
+
+import pytest
+
+pytest.importorskip("pyvisa_sim")
+
+from mahos.inst.sg import N5182B  # noqa: E402
+
+sim_yaml = os.path.join(os.path.dirname(__file__), "visa_sim.yaml")
+
+
+@pytest.fixture
+def make_sg():
+    sgs = []
+
+    def make(**conf):
+        c = {"resource": "GPIB0::19::INSTR", "visa_library": sim_yaml + "@sim", "clear": False}
+        c.update(conf)
+        sg = N5182B("sg", c)
+        sgs.append(sg)
+        written = []
+        write = sg.inst.write
+
+        def record(cmd):
+            # inst.query() writes the query through inst.write().
+            if not cmd.endswith("?"):
+                written.append(cmd)
+            return write(cmd)
+
+        sg.inst.write = record
+        return sg, written
+
+    yield make
+    for sg in sgs:
+        sg.close()
+
+
+def test_state_cache(make_sg):
+    sg, written = make_sg(state_cache=True)
+
+    assert sg.configure_cw(2.87e9, -10.0)
+    assert written == [
+        "*RST;*CLS",
+        "FREQ:MODE CW",
+        "POW:MODE FIX",
+        "FREQ 2.870000000000E+09",
+        "POW -10.000 dBm",
+    ]
+
+    # unchanged settings are skipped
+    written.clear()
+    assert sg.configure_cw(2.87e9, -10.0, reset=False)
+    assert written == []
+
+    written.clear()
+    assert sg.configure_cw(2.88e9, -10.0, reset=False)
+    assert written == ["FREQ 2.880000000000E+09"]
+
+    # reset invalidates the cache
+    written.clear()
+    assert sg.reset()
+    assert sg.configure_cw(2.87e9, -10.0, reset=False)
+    assert len(written) == 5
+
+
+def test_no_state_cache(make_sg):
+    sg, written = make_sg()
+
+    assert sg.configure_cw(2.87e9, -10.0)
+    written.clear()
+    assert sg.configure_cw(2.87e9, -10.0, reset=False)
+    assert len(written) == 4
+
+
+def test_coalesce_writes(make_sg):
+    sg, written = make_sg(state_cache=True, coalesce_writes=True)
+
+    assert sg.configure_cw(2.87e9, -10.0)
+    assert written == [
+        "*RST;*CLS;:FREQ:MODE CW;:POW:MODE FIX;:FREQ 2.870000000000E+09;:POW -10.000 dBm"
+    ]
+    written.clear()
+    assert sg.configure_cw(2.88e9, -10.0, reset=False)
+    assert written == [":FREQ 2.880000000000E+09"]
+
+    assert sg._join_commands(["A 1", "B 2", "C 3"]) == [":A 1;:B 2;:C 3"]
+    sg._coalesce_max_len = 9
+    assert sg._join_commands(["A 1", "B 2", "C 3"]) == [":A 1;:B 2", ":C 3"]
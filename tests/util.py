@@ -11,6 +11,8 @@ Common utilities for tests.
 import time
 from io import BytesIO
 
+import h5py
+
 from mahos.util.comp import dict_equal_inspect
 
 
@@ -64,3 +66,11 @@ def save_load_test(io, data):
     loaded = io.load_data(f)
     assert loaded is not None
     assert dict_equal_inspect(data.__dict__, loaded.__dict__)
+
+
+def h5_roundtrip(data):
+    """Write data to in-memory hdf5 file and read it back."""
+
+    with h5py.File("roundtrip.h5", "w", driver="core", backing_store=False) as f:
+        data.to_h5(f)
+        return data.__class__.of_h5(f)